@@ -3,13 +3,12 @@
 from typing import Annotated, Optional
 
 from fastapi import Depends, Header, HTTPException, status
-from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.config import get_settings
 from app.core.database import get_db
 from app.core.security import decode_token
-from app.models.user import User
+from app.services.user_cache import AuthenticatedUser, user_cache
 
 settings = get_settings()
 
@@ -17,8 +16,12 @@ settings = get_settings()
 async def get_current_user(
     authorization: Annotated[Optional[str], Header()] = None,
     db: AsyncSession = Depends(get_db)
-) -> User:
-    """Get the current authenticated user."""
+) -> AuthenticatedUser:
+    """Get the current authenticated user.
+
+    The user, its roles and permissions are served from the principal cache,
+    so authenticated requests normally cost no database round trips.
+    """
     if not authorization or not authorization.startswith("Bearer "):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -51,8 +54,7 @@ async def get_current_user(
             headers={"WWW-Authenticate": "Bearer"},
         )
 
-    result = await db.execute(select(User).where(User.id == int(user_id)))
-    user = result.scalar_one_or_none()
+    user = await user_cache.get_principal(int(user_id), db)
 
     if not user:
         raise HTTPException(
@@ -61,7 +63,7 @@ async def get_current_user(
             headers={"WWW-Authenticate": "Bearer"},
         )
 
-    if user.status != "active":
+    if not user.is_active:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="User account is not active",
@@ -73,7 +75,7 @@ async def get_current_user(
 async def get_current_user_optional(
     authorization: Annotated[Optional[str], Header()] = None,
     db: AsyncSession = Depends(get_db)
-) -> Optional[User]:
+) -> Optional[AuthenticatedUser]:
     """Get the current user if authenticated, None otherwise."""
     if not authorization or not authorization.startswith("Bearer "):
         return None
@@ -88,14 +90,9 @@ def require_permission(permission_code: str):
     """Dependency factory for requiring a specific permission."""
 
     async def check_permission(
-        current_user: User = Depends(get_current_user)
-    ) -> User:
-        user_permissions = set()
-        for role in current_user.roles:
-            for perm in role.permissions:
-                user_permissions.add(perm.code)
-
-        if permission_code not in user_permissions and "admin" not in [r.name for r in current_user.roles]:
+        current_user: AuthenticatedUser = Depends(get_current_user)
+    ) -> AuthenticatedUser:
+        if not current_user.has_permission(permission_code):
             raise HTTPException(
                 status_code=status.HTTP_403_FORBIDDEN,
                 detail=f"Permission '{permission_code}' required",
@@ -107,6 +104,6 @@ def require_permission(permission_code: str):
 
 
 # Common dependency annotations
-CurrentUser = Annotated[User, Depends(get_current_user)]
-OptionalUser = Annotated[Optional[User], Depends(get_current_user_optional)]
+CurrentUser = Annotated[AuthenticatedUser, Depends(get_current_user)]
+OptionalUser = Annotated[Optional[AuthenticatedUser], Depends(get_current_user_optional)]
 DbSession = Annotated[AsyncSession, Depends(get_db)]
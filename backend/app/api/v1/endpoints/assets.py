@@ -1,25 +1,56 @@
 """Asset management API endpoints."""
 
-from typing import Optional
+from typing import Literal, Optional
 
 from fastapi import APIRouter, HTTPException, Query, status
-from sqlalchemy import func, select
+from fastapi.responses import StreamingResponse
+from sqlalchemy import select
 from sqlalchemy.orm import selectinload
 
 from app.api.v1.deps import CurrentUser, DbSession
+from app.api.v1.pagination import count_cache_key, count_rows, paginate_keyset
+from app.core.config import get_settings
+from app.core.responses import TrustedRoute
 from app.models.asset import Asset, AssetRelation
+from app.models.document import Document
 from app.models.project import Project
 from app.schemas.asset import (
     AssetCreate,
     AssetGraphResponse,
+    AssetIdentificationTask,
+    AssetImportRequest,
+    AssetImportResponse,
     AssetRelationCreate,
     AssetRelationResponse,
     AssetResponse,
     AssetUpdate,
+    AttackPathResponse,
+    GraphViewResponse,
+    ImpactRangeResponse,
 )
 from app.schemas.common import PaginatedResponse, ResponseModel
+from app.services.asset_import import AssetImportService
+from app.services.export_service import EXPORT_FORMATS, asset_export_query, check_format, export_rows
+from app.services.graph_layout import graph_layouts
+from app.services.graph_sync import get_synced_graph_backend
+from app.tasks.asset_identification import get_identification, start_identification
 
-router = APIRouter(prefix="/projects/{project_id}/assets", tags=["Assets"])
+settings = get_settings()
+
+router = APIRouter(prefix="/projects/{project_id}/assets", tags=["Assets"], route_class=TrustedRoute)
+
+
+def _asset_filters(project_id: int, category: Optional[str], confirmed: Optional[bool]) -> list:
+    """WHERE clauses shared by the asset list and export."""
+    filters = [Asset.project_id == project_id]
+
+    if category:
+        filters.append(Asset.category == category)
+
+    if confirmed is not None:
+        filters.append(Asset.is_confirmed == confirmed)
+
+    return filters
 
 
 @router.get("", response_model=ResponseModel[PaginatedResponse[AssetResponse]])
@@ -31,24 +62,43 @@ async def list_assets(
     page_size: int = Query(20, ge=1, le=100),
     category: Optional[str] = None,
     confirmed: Optional[bool] = None,
+    cursor: Optional[str] = Query(
+        None,
+        description="Keyset cursor; pass an empty value to start cursor pagination",
+    ),
+    include_total: bool = Query(False, description="Return a cached total in cursor mode"),
 ):
-    """List all assets in a project."""
-    query = select(Asset).where(Asset.project_id == project_id)
+    """List all assets in a project.
 
-    if category:
-        query = query.where(Asset.category == category)
-
-    if confirmed is not None:
-        query = query.where(Asset.is_confirmed == confirmed)
+    Supports offset pagination (``page``) or keyset pagination (``cursor``)
+    ordered by ``(asset_id, id)``.
+    """
+    filters = _asset_filters(project_id, category, confirmed)
 
-    # Get total count
-    count_query = select(func.count()).select_from(query.subquery())
-    total = (await db.execute(count_query)).scalar() or 0
+    query = select(Asset).where(*filters)
 
-    # Get paginated results
-    query = query.order_by(Asset.asset_id).offset((page - 1) * page_size).limit(page_size)
-    result = await db.execute(query)
-    assets = result.scalars().all()
+    next_cursor = None
+    if cursor is not None:
+        assets, next_cursor = await paginate_keyset(
+            db, query, [Asset.asset_id, Asset.id], cursor, page_size
+        )
+        total = None
+        if include_total:
+            total = await count_rows(
+                db, Asset, filters,
+                cache_key=count_cache_key(
+                    "assets", project_id, category=category, confirmed=confirmed
+                ),
+            )
+    else:
+        total = await count_rows(db, Asset, filters)
+        query = (
+            query.order_by(Asset.asset_id, Asset.id)
+            .offset((page - 1) * page_size)
+            .limit(page_size)
+        )
+        result = await db.execute(query)
+        assets = result.scalars().all()
 
     items = [AssetResponse.model_validate(a) for a in assets]
 
@@ -58,6 +108,7 @@ async def list_assets(
             total=total,
             page=page,
             page_size=page_size,
+            next_cursor=next_cursor,
         )
     )
 
@@ -103,6 +154,115 @@ async def create_asset(
     return ResponseModel(data=AssetResponse.model_validate(asset))
 
 
+@router.get("/export")
+async def export_assets(
+    project_id: int,
+    current_user: CurrentUser,
+    format: str = Query("csv", pattern="^(csv|ndjson|parquet)$"),
+    category: Optional[str] = None,
+    confirmed: Optional[bool] = None,
+):
+    """Stream all matching assets as CSV, NDJSON or Parquet."""
+    check_format(format)
+    query = asset_export_query(_asset_filters(project_id, category, confirmed))
+    return StreamingResponse(
+        export_rows(query, format),
+        media_type=EXPORT_FORMATS[format],
+        headers={"Content-Disposition": f'attachment; filename="project-{project_id}-assets.{format}"'},
+    )
+
+
+@router.get("/graph", response_model=ResponseModel[AssetGraphResponse])
+async def get_asset_graph(
+    project_id: int,
+    current_user: CurrentUser,
+    db: DbSession,
+):
+    """Get asset relationship graph."""
+    graph = await get_synced_graph_backend(db)
+
+    return ResponseModel(
+        data=AssetGraphResponse(**await graph.get_graph(project_id))
+    )
+
+
+@router.get("/graph/view", response_model=ResponseModel[GraphViewResponse])
+async def get_asset_graph_view(
+    project_id: int,
+    current_user: CurrentUser,
+    db: DbSession,
+    algorithm: Literal["force", "hierarchical"] = "force",
+    level: Optional[Literal["category", "subcategory", "node"]] = Query(
+        None, description="Level of detail; chosen from max_items when omitted",
+    ),
+    x0: Optional[float] = None,
+    y0: Optional[float] = None,
+    x1: Optional[float] = None,
+    y1: Optional[float] = None,
+    max_items: int = Query(settings.GRAPH_VIEW_MAX_ITEMS, ge=1, le=5000),
+):
+    """Get the laid-out asset graph within a viewport.
+
+    Returns category or subcategory clusters until at most ``max_items``
+    assets are visible, then the assets themselves. Layouts are computed
+    server-side and cached until the graph changes.
+    """
+    graph = await get_synced_graph_backend(db)
+    layout = await graph_layouts.get(project_id, await graph.get_graph(project_id), algorithm)
+
+    return ResponseModel(
+        data=GraphViewResponse(
+            algorithm=algorithm,
+            **layout.view(x0, y0, x1, y1, level=level, max_items=max_items),
+        )
+    )
+
+
+@router.get("/graph/attack-paths", response_model=ResponseModel[AttackPathResponse])
+async def get_attack_paths(
+    project_id: int,
+    current_user: CurrentUser,
+    db: DbSession,
+    target_id: int = Query(..., description="Target asset ID"),
+    k: int = Query(3, ge=1, le=20),
+    weighted: bool = Query(False, description="Weight paths by threat feasibility"),
+):
+    """Get the k shortest attack paths from Interface/External assets to a target."""
+    graph = await get_synced_graph_backend(db)
+    result = await graph.attack_paths(project_id, target_id, k=k, weighted=weighted)
+    if result is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Asset not found",
+        )
+
+    return ResponseModel(
+        data=AttackPathResponse(weighted=weighted, **result)
+    )
+
+
+@router.get("/graph/impact", response_model=ResponseModel[ImpactRangeResponse])
+async def get_impact_range(
+    project_id: int,
+    current_user: CurrentUser,
+    db: DbSession,
+    asset_id: int = Query(..., description="Compromised asset ID"),
+    max_depth: Optional[int] = Query(None, ge=1),
+):
+    """Get the assets reachable from a compromised asset."""
+    graph = await get_synced_graph_backend(db)
+    result = await graph.impact(project_id, asset_id, max_depth=max_depth)
+    if result is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Asset not found",
+        )
+
+    return ResponseModel(
+        data=ImpactRangeResponse(**result)
+    )
+
+
 @router.get("/{asset_id}", response_model=ResponseModel[AssetResponse])
 async def get_asset(
     project_id: int,
@@ -217,55 +377,6 @@ async def confirm_asset(
     return ResponseModel(message="Asset confirmed successfully")
 
 
-@router.get("/graph", response_model=ResponseModel[AssetGraphResponse])
-async def get_asset_graph(
-    project_id: int,
-    current_user: CurrentUser,
-    db: DbSession,
-):
-    """Get asset relationship graph."""
-    # Get all assets
-    result = await db.execute(
-        select(Asset).where(Asset.project_id == project_id)
-    )
-    assets = result.scalars().all()
-
-    # Get all relations
-    result = await db.execute(
-        select(AssetRelation)
-        .options(
-            selectinload(AssetRelation.source_asset),
-            selectinload(AssetRelation.target_asset),
-        )
-        .where(AssetRelation.project_id == project_id)
-    )
-    relations = result.scalars().all()
-
-    nodes = [
-        {
-            "id": str(a.id),
-            "name": a.name,
-            "category": a.category,
-            "subcategory": a.subcategory,
-        }
-        for a in assets
-    ]
-
-    edges = [
-        {
-            "source": str(r.source_asset_id),
-            "target": str(r.target_asset_id),
-            "type": r.relation_type,
-            "protocol": r.protocol,
-        }
-        for r in relations
-    ]
-
-    return ResponseModel(
-        data=AssetGraphResponse(nodes=nodes, edges=edges)
-    )
-
-
 @router.post("/relations", response_model=ResponseModel[AssetRelationResponse])
 async def create_asset_relation(
     project_id: int,
@@ -308,16 +419,83 @@ async def create_asset_relation(
     )
 
 
-@router.post("/identify", response_model=ResponseModel)
+@router.post("/import", response_model=ResponseModel[AssetImportResponse])
+async def import_assets(
+    project_id: int,
+    import_data: AssetImportRequest,
+    current_user: CurrentUser,
+    db: DbSession,
+):
+    """Import assets from a parsed asset-list spreadsheet.
+
+    Tables whose header matches the 资产列表 layout are mapped onto assets
+    and upserted by asset ID in one transaction. Rejected rows are listed
+    in ``errors``; the other rows are still imported.
+    """
+    service = AssetImportService(db)
+    result = await service.import_document(
+        project_id,
+        import_data.document_id,
+        update_existing=import_data.update_existing,
+    )
+
+    return ResponseModel(data=AssetImportResponse(**result))
+
+
+@router.post("/identify", response_model=ResponseModel[AssetIdentificationTask])
 async def identify_assets(
     project_id: int,
     current_user: CurrentUser,
     db: DbSession,
     document_id: Optional[int] = None,
 ):
-    """AI-based asset identification from documents."""
-    # TODO: Implement AI-based asset identification
+    """Start AI-based asset identification from documents.
+
+    Each document is parsed and identified as a stream (see
+    ``AssetPipeline``): identification of the first chapters starts while
+    later pages are still being parsed. Without ``document_id`` every
+    project document not parsed yet (or whose parse failed) is processed,
+    one after the other. New assets are added as AI-generated. The work
+    runs in the background; poll ``/identify/{task_id}`` for its status.
+    """
+    if document_id is None:
+        result = await db.execute(
+            select(Document.id)
+            .where(Document.project_id == project_id, Document.parse_status.in_(("pending", "failed")))
+            .order_by(Document.id)
+        )
+        document_ids = result.scalars().all()
+    else:
+        exists = await db.scalar(
+            select(Document.id).where(Document.id == document_id, Document.project_id == project_id)
+        )
+        if exists is None:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Document not found",
+            )
+        document_ids = [document_id]
+
+    task = await start_identification(project_id, document_ids)
+
     return ResponseModel(
         message="Asset identification started",
-        data={"task_id": "placeholder-task-id"}
+        data=AssetIdentificationTask(**task),
     )
+
+
+@router.get("/identify/{task_id}", response_model=ResponseModel[AssetIdentificationTask])
+async def get_identification_task(
+    project_id: int,
+    task_id: str,
+    current_user: CurrentUser,
+):
+    """Get the status and results of an asset identification task."""
+    task = await get_identification(task_id)
+    if task is None or task["project_id"] != project_id:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Identification task not found",
+        )
+
+    return ResponseModel(data=AssetIdentificationTask(**task))
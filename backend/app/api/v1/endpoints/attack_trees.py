@@ -0,0 +1,84 @@
+"""Attack tree API endpoints."""
+
+from typing import List
+
+from fastapi import APIRouter, HTTPException, Query, status
+from fastapi.responses import Response
+
+from app.api.v1.deps import CurrentUser, DbSession
+from app.core.responses import TrustedRoute
+from app.schemas.attack_tree import AttackTreeResponse, AttackTreeSummary
+from app.schemas.common import ResponseModel
+from app.services.attack_tree import AttackTree, attack_trees, render_png, render_svg
+from app.services.parsers.base import run_in_parse_pool
+from app.services.risk_methodology import risk_methodologies
+
+router = APIRouter(prefix="/projects/{project_id}/attack-trees", tags=["Attack Trees"], route_class=TrustedRoute)
+
+
+async def _get_tree(db, project_id: int, tree_id: str) -> AttackTree:
+    for tree in await attack_trees.get(db, project_id):
+        if tree.tree_id == tree_id:
+            return tree
+    raise HTTPException(
+        status_code=status.HTTP_404_NOT_FOUND,
+        detail="Attack tree not found",
+    )
+
+
+@router.get("", response_model=ResponseModel[List[AttackTreeSummary]])
+async def list_attack_trees(
+    project_id: int,
+    current_user: CurrentUser,
+    db: DbSession,
+):
+    """List the attack trees of a project, one per damage scenario."""
+    trees = await attack_trees.get(db, project_id)
+    engine = await risk_methodologies.get_engine(db, project_id)
+    labels = list(engine.feasibility_labels)
+
+    return ResponseModel(
+        data=[
+            AttackTreeSummary(
+                tree_id=tree.tree_id,
+                title=tree.title,
+                threat_count=tree.threat_count,
+                node_count=len(tree.nodes),
+                feasibility=tree.root.feasibility,
+                feasibility_label=(
+                    labels[tree.root.feasibility] if tree.root.feasibility is not None else None
+                ),
+            )
+            for tree in trees
+        ]
+    )
+
+
+@router.get("/{tree_id}", response_model=ResponseModel[AttackTreeResponse])
+async def get_attack_tree(
+    project_id: int,
+    tree_id: str,
+    current_user: CurrentUser,
+    db: DbSession,
+):
+    """Get an evaluated attack tree with all nodes."""
+    tree = await _get_tree(db, project_id, tree_id)
+    engine = await risk_methodologies.get_engine(db, project_id)
+
+    return ResponseModel(data=AttackTreeResponse(**tree.to_dict(list(engine.feasibility_labels))))
+
+
+@router.get("/{tree_id}/render")
+async def render_attack_tree(
+    project_id: int,
+    tree_id: str,
+    current_user: CurrentUser,
+    db: DbSession,
+    format: str = Query("svg", pattern="^(svg|png)$"),
+):
+    """Render an attack tree as an SVG or PNG image."""
+    tree = await _get_tree(db, project_id, tree_id)
+
+    if format == "png":
+        return Response(content=await run_in_parse_pool(render_png, tree), media_type="image/png")
+    return Response(content=await run_in_parse_pool(render_svg, tree), media_type="image/svg+xml")
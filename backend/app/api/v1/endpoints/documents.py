@@ -2,18 +2,34 @@
 
 import os
 import uuid
-from typing import Optional
+from typing import Literal, Optional
 
 from fastapi import APIRouter, File, Form, HTTPException, Query, UploadFile, status
 
 from app.api.v1.deps import CurrentUser, DbSession
+from app.api.v1.pagination import count_cache_key, count_rows, paginate_keyset
 from app.core.config import get_settings
+from app.core.responses import TrustedRoute
 from app.models.document import Document
 from app.models.project import Project
 from app.schemas.common import PaginatedResponse, ResponseModel
-from app.schemas.document import DocumentResponse, DocumentUpdate
-
-router = APIRouter(prefix="/projects/{project_id}/documents", tags=["Documents"])
+from app.schemas.document import (
+    DocumentResponse,
+    DocumentUpdate,
+    ParseResultPage,
+    ParseResultSummary,
+)
+from app.services.parse_result_store import (
+    load_section,
+    release_parse_blobs,
+    save_parse_result,
+    section_counts,
+    summarize,
+    track_parse_blobs,
+)
+from app.services.search_index import index_parsed_document, remove_indexed_document
+
+router = APIRouter(prefix="/projects/{project_id}/documents", tags=["Documents"], route_class=TrustedRoute)
 
 settings = get_settings()
 
@@ -37,28 +53,52 @@ async def list_documents(
     page: int = Query(1, ge=1),
     page_size: int = Query(20, ge=1, le=100),
     category: Optional[str] = None,
+    cursor: Optional[str] = Query(
+        None,
+        description="Keyset cursor; pass an empty value to start cursor pagination",
+    ),
+    include_total: bool = Query(False, description="Return a cached total in cursor mode"),
 ):
-    """List all documents in a project."""
-    from sqlalchemy import func, select
+    """List all documents in a project.
+
+    Supports offset pagination (``page``) or keyset pagination (``cursor``)
+    ordered by ``(created_at, id)`` descending.
+    """
+    from sqlalchemy import select
     from sqlalchemy.orm import selectinload
 
+    filters = [Document.project_id == project_id]
+
+    if category:
+        filters.append(Document.category == category)
+
     query = (
         select(Document)
         .options(selectinload(Document.uploader))
-        .where(Document.project_id == project_id)
+        .where(*filters)
     )
 
-    if category:
-        query = query.where(Document.category == category)
-
-    # Get total count
-    count_query = select(func.count()).select_from(query.subquery())
-    total = (await db.execute(count_query)).scalar() or 0
-
-    # Get paginated results
-    query = query.order_by(Document.created_at.desc()).offset((page - 1) * page_size).limit(page_size)
-    result = await db.execute(query)
-    documents = result.scalars().all()
+    next_cursor = None
+    if cursor is not None:
+        documents, next_cursor = await paginate_keyset(
+            db, query, [Document.created_at, Document.id], cursor, page_size,
+            descending=True,
+        )
+        total = None
+        if include_total:
+            total = await count_rows(
+                db, Document, filters,
+                cache_key=count_cache_key("documents", project_id, category=category),
+            )
+    else:
+        total = await count_rows(db, Document, filters)
+        query = (
+            query.order_by(Document.created_at.desc(), Document.id.desc())
+            .offset((page - 1) * page_size)
+            .limit(page_size)
+        )
+        result = await db.execute(query)
+        documents = result.scalars().all()
 
     items = [
         DocumentResponse(
@@ -85,6 +125,7 @@ async def list_documents(
             total=total,
             page=page,
             page_size=page_size,
+            next_cursor=next_cursor,
         )
     )
 
@@ -203,8 +244,10 @@ async def delete_document(
     except Exception:
         pass
 
+    await release_parse_blobs(db, document_id)
     await db.delete(document)
     await db.commit()
+    await remove_indexed_document(document_id)
 
     return ResponseModel(message="Document deleted successfully")
 
@@ -240,46 +283,88 @@ async def parse_document(
     # TODO: Trigger async parsing task
     # For now, just mark as completed
     document.parse_status = "completed"
-    document.parse_result = {
+    document.parse_result = await save_parse_result({
         "text_blocks": ["Document content will be parsed here"],
         "tables": [],
         "images": [],
         "metadata": {"pages": 1},
-    }
+    })
+    await track_parse_blobs(db, document.id, document.parse_result)
     await db.commit()
+    await index_parsed_document(db, document.id)
 
     return ResponseModel(message="Document parsing started")
 
 
-@router.get("/{document_id}/parse-result", response_model=ResponseModel)
-async def get_parse_result(
-    project_id: int,
-    document_id: int,
-    current_user: CurrentUser,
-    db: DbSession,
-):
-    """Get document parse result."""
+async def _parse_result_row(db, project_id: int, document_id: int):
+    """Load a document's parse status and result manifest, nothing else."""
     from sqlalchemy import select
 
     result = await db.execute(
-        select(Document).where(
+        select(
+            Document.id,
+            Document.parse_status,
+            Document.parse_error,
+            Document.parse_result,
+        ).where(
             Document.id == document_id,
             Document.project_id == project_id,
         )
     )
-    document = result.scalar_one_or_none()
+    row = result.one_or_none()
 
-    if not document:
+    if not row:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Document not found",
         )
+    return row
+
+
+@router.get("/{document_id}/parse-result", response_model=ResponseModel)
+async def get_parse_result(
+    project_id: int,
+    document_id: int,
+    current_user: CurrentUser,
+    db: DbSession,
+):
+    """Get document parse status, metadata and section sizes.
+
+    Content is fetched by range from ``/parse-result/{section}``.
+    """
+    row = await _parse_result_row(db, project_id, document_id)
+    summary = summarize(row.parse_result)
 
     return ResponseModel(
         data={
-            "document_id": document.id,
-            "status": document.parse_status,
-            "result": document.parse_result,
-            "error": document.parse_error,
+            "document_id": row.id,
+            "status": row.parse_status,
+            "result": ParseResultSummary(**summary) if summary else None,
+            "error": row.parse_error,
         }
     )
+
+
+@router.get("/{document_id}/parse-result/{section}", response_model=ResponseModel[ParseResultPage])
+async def get_parse_result_items(
+    project_id: int,
+    document_id: int,
+    section: Literal["text_blocks", "tables", "blocks", "images"],
+    current_user: CurrentUser,
+    db: DbSession,
+    offset: int = Query(0, ge=0),
+    limit: int = Query(50, ge=1, le=500),
+):
+    """Get a range of text blocks, tables, blocks or images of a parse result."""
+    row = await _parse_result_row(db, project_id, document_id)
+
+    return ResponseModel(
+        data=ParseResultPage(
+            document_id=row.id,
+            section=section,
+            offset=offset,
+            limit=limit,
+            total=section_counts(row.parse_result)[section],
+            items=await load_section(row.parse_result, section, offset, limit),
+        )
+    )
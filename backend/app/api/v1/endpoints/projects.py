@@ -7,6 +7,9 @@ from sqlalchemy import func, select
 from sqlalchemy.orm import selectinload
 
 from app.api.v1.deps import CurrentUser, DbSession
+from app.api.v1.pagination import count_cache_key, count_rows, paginate_keyset
+from app.core.exceptions import ValidationError
+from app.core.responses import TrustedRoute
 from app.models.project import Project, ProjectConfig, ProjectMember, ProjectVersion
 from app.models.asset import Asset
 from app.models.threat import ThreatScenario
@@ -24,8 +27,14 @@ from app.schemas.project import (
     ProjectVersionCreate,
     ProjectVersionResponse,
 )
+from app.services.risk_engine import RiskRecomputeService
+from app.services.risk_methodology import (
+    load_methodology,
+    methodology_fingerprint,
+    risk_methodologies,
+)
 
-router = APIRouter(prefix="/projects", tags=["Projects"])
+router = APIRouter(prefix="/projects", tags=["Projects"], route_class=TrustedRoute)
 
 
 @router.get("", response_model=ResponseModel[PaginatedResponse[ProjectListResponse]])
@@ -36,31 +45,58 @@ async def list_projects(
     page_size: int = Query(20, ge=1, le=100),
     status: Optional[str] = None,
     search: Optional[str] = None,
+    cursor: Optional[str] = Query(
+        None,
+        description="Keyset cursor; pass an empty value to start cursor pagination",
+    ),
+    include_total: bool = Query(False, description="Return a cached total in cursor mode"),
 ):
-    """List all projects accessible by the current user."""
-    query = (
-        select(Project)
-        .options(selectinload(Project.owner))
-        .where(
-            (Project.owner_id == current_user.id) |
-            (Project.members.any(ProjectMember.user_id == current_user.id))
-        )
-    )
+    """List all projects accessible by the current user.
+
+    Supports offset pagination (``page``) or keyset pagination (``cursor``)
+    ordered by last activity (``updated_at``, or ``created_at`` if never
+    updated) and ``id``, descending.
+    """
+    filters = [
+        (Project.owner_id == current_user.id) |
+        (Project.members.any(ProjectMember.user_id == current_user.id))
+    ]
 
     if status:
-        query = query.where(Project.status == status)
+        filters.append(Project.status == status)
 
     if search:
-        query = query.where(Project.name.contains(search))
+        filters.append(Project.name.contains(search))
 
-    # Get total count
-    count_query = select(func.count()).select_from(query.subquery())
-    total = (await db.execute(count_query)).scalar() or 0
+    query = (
+        select(Project)
+        .options(selectinload(Project.owner))
+        .where(*filters)
+    )
 
-    # Get paginated results
-    query = query.order_by(Project.updated_at.desc()).offset((page - 1) * page_size).limit(page_size)
-    result = await db.execute(query)
-    projects = result.scalars().all()
+    next_cursor = None
+    if cursor is not None:
+        projects, next_cursor = await paginate_keyset(
+            db, query, [Project.activity_at, Project.id], cursor, page_size,
+            descending=True,
+        )
+        total = None
+        if include_total:
+            total = await count_rows(
+                db, Project, filters,
+                cache_key=count_cache_key(
+                    "projects", current_user.id, status=status, search=search
+                ),
+            )
+    else:
+        total = await count_rows(db, Project, filters)
+        query = (
+            query.order_by(Project.activity_at.desc(), Project.id.desc())
+            .offset((page - 1) * page_size)
+            .limit(page_size)
+        )
+        result = await db.execute(query)
+        projects = result.scalars().all()
 
     items = [
         ProjectListResponse(
@@ -81,6 +117,7 @@ async def list_projects(
             total=total,
             page=page,
             page_size=page_size,
+            next_cursor=next_cursor,
         )
     )
 
@@ -339,6 +376,7 @@ async def delete_project(
 
     await db.delete(project)
     await db.commit()
+    await risk_methodologies.invalidate(project_id)
 
     return ResponseModel(message="Project deleted successfully")
 
@@ -363,12 +401,34 @@ async def update_project_config(
         )
 
     update_data = config_data.model_dump(exclude_unset=True)
+
+    methodology_changed = False
+    if "config_json" in update_data:
+        new_methodology = load_methodology(update_data["config_json"])
+        try:
+            old_fingerprint = methodology_fingerprint(load_methodology(config.config_json))
+        except ValidationError:
+            # The stored definition is invalid; replacing it is the fix
+            old_fingerprint = None
+        methodology_changed = old_fingerprint != methodology_fingerprint(new_methodology)
+
     for field, value in update_data.items():
         setattr(config, field, value)
 
     await db.commit()
 
-    return ResponseModel(message="Project config updated successfully")
+    if not methodology_changed:
+        return ResponseModel(message="Project config updated successfully")
+
+    # Switching methodology re-rates every threat of the project
+    await risk_methodologies.invalidate(project_id)
+    engine = await risk_methodologies.get_engine(db, project_id)
+    updated = await RiskRecomputeService(db, engine).recompute(project_id, force=True)
+
+    return ResponseModel(
+        message="Project config updated successfully",
+        data={"risk_recomputed": updated},
+    )
 
 
 @router.post("/{project_id}/versions", response_model=ResponseModel[ProjectVersionResponse])
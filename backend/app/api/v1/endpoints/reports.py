@@ -8,12 +8,13 @@ from sqlalchemy import func, select
 from sqlalchemy.orm import selectinload
 
 from app.api.v1.deps import CurrentUser, DbSession
+from app.core.responses import TrustedRoute
 from app.models.project import Project
 from app.models.report import Report
 from app.schemas.common import PaginatedResponse, ResponseModel
 from app.schemas.report import ReportGenerateRequest, ReportResponse
 
-router = APIRouter(prefix="/projects/{project_id}/reports", tags=["Reports"])
+router = APIRouter(prefix="/projects/{project_id}/reports", tags=["Reports"], route_class=TrustedRoute)
 
 
 @router.get("", response_model=ResponseModel[PaginatedResponse[ReportResponse]])
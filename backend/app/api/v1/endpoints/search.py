@@ -0,0 +1,33 @@
+"""Project full-text search API endpoints."""
+
+from typing import List, Literal, Optional
+
+from fastapi import APIRouter, Query
+
+from app.api.v1.deps import CurrentUser
+from app.clients.search import get_search_backend
+from app.core.responses import TrustedRoute
+from app.schemas.common import ResponseModel
+from app.schemas.search import SearchResponse
+
+router = APIRouter(prefix="/projects/{project_id}/search", tags=["Search"], route_class=TrustedRoute)
+
+
+@router.get("", response_model=ResponseModel[SearchResponse])
+async def search_project(
+    project_id: int,
+    current_user: CurrentUser,
+    q: str = Query(..., min_length=1, max_length=200, description="Words to find; all must match"),
+    kind: Optional[List[Literal["document", "threat"]]] = Query(None, description="Restrict to these kinds"),
+    limit: int = Query(20, ge=1, le=100),
+    offset: int = Query(0, ge=0, le=1000),
+):
+    """Search parsed document text, threat descriptions and damage scenarios.
+
+    Chinese text matches by substring; hits carry an HTML snippet with the
+    matches highlighted. The index is kept current by the background change
+    log task, so recent writes show up after a few seconds.
+    """
+    result = await get_search_backend().search(project_id, q, kinds=kind, limit=limit, offset=offset)
+
+    return ResponseModel(data=SearchResponse(query=q, **result))
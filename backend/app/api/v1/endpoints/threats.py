@@ -3,10 +3,13 @@
 from typing import Optional
 
 from fastapi import APIRouter, HTTPException, Query, status
-from sqlalchemy import func, select
+from fastapi.responses import StreamingResponse
+from sqlalchemy import select
 from sqlalchemy.orm import selectinload
 
 from app.api.v1.deps import CurrentUser, DbSession
+from app.api.v1.pagination import count_cache_key, count_rows, paginate_keyset
+from app.core.responses import ORJSONResponse, TrustedRoute, envelope, paginated
 from app.models.asset import Asset
 from app.models.threat import SecurityMitigation, ThreatScenario
 from app.schemas.common import PaginatedResponse, ResponseModel
@@ -15,13 +18,48 @@ from app.schemas.threat import (
     MitigationResponse,
     MitigationUpdate,
     RiskMatrixResponse,
+    ThreatBulkCreate,
+    ThreatBulkCreateResponse,
     ThreatCreate,
     ThreatResponse,
     ThreatUpdate,
 )
-from app.services.risk_calculator import RiskCalculator
+from app.services.export_service import (
+    EXPORT_FORMATS,
+    check_format,
+    export_rows,
+    threat_export_query,
+)
+from app.services.risk_engine import RiskRecomputeService
+from app.services.risk_methodology import risk_methodologies
+from app.services.threat_service import ThreatService
+
+router = APIRouter(prefix="/projects/{project_id}/threats", tags=["Threats"], route_class=TrustedRoute)
+
+
+def _threat_filters(
+    project_id: int,
+    asset_id: Optional[int],
+    stride_type: Optional[str],
+    risk_level: Optional[int],
+    confirmed: Optional[bool],
+) -> list:
+    """WHERE clauses shared by the threat list and export."""
+    filters = [ThreatScenario.project_id == project_id]
+
+    if asset_id:
+        filters.append(ThreatScenario.asset_id == asset_id)
+
+    if stride_type:
+        filters.append(ThreatScenario.stride_type == stride_type)
+
+    if risk_level is not None:
+        filters.append(ThreatScenario.risk_level == risk_level)
+
+    if confirmed is not None:
+        filters.append(ThreatScenario.is_confirmed == confirmed)
 
-router = APIRouter(prefix="/projects/{project_id}/threats", tags=["Threats"])
+    return filters
 
 
 @router.get("", response_model=ResponseModel[PaginatedResponse[ThreatResponse]])
@@ -35,84 +73,52 @@ async def list_threats(
     stride_type: Optional[str] = None,
     risk_level: Optional[int] = None,
     confirmed: Optional[bool] = None,
+    cursor: Optional[str] = Query(
+        None,
+        description="Keyset cursor; pass an empty value to start cursor pagination",
+    ),
+    include_total: bool = Query(False, description="Return a cached total in cursor mode"),
 ):
-    """List all threats in a project."""
-    query = (
-        select(ThreatScenario)
-        .options(
-            selectinload(ThreatScenario.asset),
-            selectinload(ThreatScenario.mitigations),
+    """List all threats in a project.
+
+    Supports offset pagination (``page``) or keyset pagination (``cursor``)
+    ordered by ``(threat_id, id)``, whose latency is flat for deep pages.
+    Rows are read as columns and encoded straight to JSON; the response
+    model only documents the shape.
+    """
+    filters = _threat_filters(project_id, asset_id, stride_type, risk_level, confirmed)
+
+    service = ThreatService(db)
+    query = service.list_query(filters)
+
+    next_cursor = None
+    if cursor is not None:
+        rows, next_cursor = await paginate_keyset(
+            db, query, [ThreatScenario.threat_id, ThreatScenario.id], cursor, page_size,
+            scalars=False,
         )
-        .where(ThreatScenario.project_id == project_id)
-    )
-
-    if asset_id:
-        query = query.where(ThreatScenario.asset_id == asset_id)
-
-    if stride_type:
-        query = query.where(ThreatScenario.stride_type == stride_type)
-
-    if risk_level is not None:
-        query = query.where(ThreatScenario.risk_level == risk_level)
-
-    if confirmed is not None:
-        query = query.where(ThreatScenario.is_confirmed == confirmed)
-
-    # Get total count
-    count_query = select(func.count()).select_from(query.subquery())
-    total = (await db.execute(count_query)).scalar() or 0
-
-    # Get paginated results
-    query = query.order_by(ThreatScenario.threat_id).offset((page - 1) * page_size).limit(page_size)
-    result = await db.execute(query)
-    threats = result.scalars().all()
-
-    items = [
-        ThreatResponse(
-            id=t.id,
-            project_id=t.project_id,
-            version_id=t.version_id,
-            asset_id=t.asset_id,
-            asset_name=t.asset.name if t.asset else None,
-            threat_id=t.threat_id,
-            security_attribute=t.security_attribute,
-            stride_type=t.stride_type,
-            threat_description=t.threat_description,
-            damage_scenario=t.damage_scenario,
-            attack_path=t.attack_path,
-            source_reference=t.source_reference,
-            wp29_mapping=t.wp29_mapping,
-            attack_vector=t.attack_vector,
-            attack_complexity=t.attack_complexity,
-            privileges_required=t.privileges_required,
-            user_interaction=t.user_interaction,
-            attack_feasibility=t.attack_feasibility,
-            attack_feasibility_value=t.attack_feasibility_value,
-            impact_safety=t.impact_safety,
-            impact_financial=t.impact_financial,
-            impact_operational=t.impact_operational,
-            impact_privacy=t.impact_privacy,
-            impact_level=t.impact_level,
-            impact_level_value=t.impact_level_value,
-            risk_level=t.risk_level,
-            risk_level_label=t.risk_level_label,
-            treatment_decision=t.treatment_decision,
-            is_ai_generated=t.is_ai_generated,
-            is_confirmed=t.is_confirmed,
-            created_at=t.created_at,
-            updated_at=t.updated_at,
-            mitigations=[MitigationResponse.model_validate(m) for m in t.mitigations],
+        total = None
+        if include_total:
+            total = await count_rows(
+                db, ThreatScenario, filters,
+                cache_key=count_cache_key(
+                    "threats", project_id, asset_id=asset_id, stride_type=stride_type,
+                    risk_level=risk_level, confirmed=confirmed,
+                ),
+            )
+    else:
+        total = await count_rows(db, ThreatScenario, filters)
+        query = (
+            query.order_by(ThreatScenario.threat_id, ThreatScenario.id)
+            .offset((page - 1) * page_size)
+            .limit(page_size)
         )
-        for t in threats
-    ]
+        rows = (await db.execute(query)).all()
 
-    return ResponseModel(
-        data=PaginatedResponse(
-            items=items,
-            total=total,
-            page=page,
-            page_size=page_size,
-        )
+    items = await service.list_items(rows)
+
+    return ORJSONResponse(
+        envelope(paginated(items, total, page, page_size, next_cursor))
     )
 
 
@@ -145,7 +151,8 @@ async def create_threat(
     )
 
     # Calculate risk
-    threat = RiskCalculator.calculate_and_update_threat(threat)
+    engine = await risk_methodologies.get_engine(db, project_id)
+    threat = engine.apply(threat)
 
     db.add(threat)
     await db.commit()
@@ -169,6 +176,12 @@ async def create_threat(
             user_interaction=threat.user_interaction,
             attack_feasibility=threat.attack_feasibility,
             attack_feasibility_value=threat.attack_feasibility_value,
+            elapsed_time=threat.elapsed_time,
+            specialist_expertise=threat.specialist_expertise,
+            knowledge_of_item=threat.knowledge_of_item,
+            window_of_opportunity=threat.window_of_opportunity,
+            equipment=threat.equipment,
+            attack_potential=threat.attack_potential,
             impact_safety=threat.impact_safety,
             impact_financial=threat.impact_financial,
             impact_operational=threat.impact_operational,
@@ -186,6 +199,111 @@ async def create_threat(
     )
 
 
+@router.post("/bulk", response_model=ResponseModel[ThreatBulkCreateResponse])
+async def bulk_create_threats(
+    project_id: int,
+    bulk_data: ThreatBulkCreate,
+    current_user: CurrentUser,
+    db: DbSession,
+):
+    """Create many threats and their mitigations in one transaction.
+
+    Intended for persisting AI analysis output and spreadsheet imports.
+    """
+    service = ThreatService(db)
+    result = await service.bulk_create(
+        project_id,
+        bulk_data.threats,
+        is_ai_generated=bulk_data.is_ai_generated,
+    )
+
+    return ResponseModel(data=ThreatBulkCreateResponse(**result))
+
+
+@router.post("/recompute-risk", response_model=ResponseModel)
+async def recompute_risk(
+    project_id: int,
+    current_user: CurrentUser,
+    db: DbSession,
+):
+    """Recompute risk metrics for every threat in the project.
+
+    Use after the risk matrix or feasibility thresholds change.
+    """
+    engine = await risk_methodologies.get_engine(db, project_id)
+    service = RiskRecomputeService(db, engine)
+    updated = await service.recompute(project_id)
+
+    return ResponseModel(message="Risk recomputed successfully", data={"updated": updated})
+
+
+@router.get("/risk-matrix", response_model=ResponseModel[RiskMatrixResponse])
+async def get_risk_matrix(
+    project_id: int,
+    current_user: CurrentUser,
+    db: DbSession,
+):
+    """Get risk matrix for the project."""
+    result = await db.execute(
+        select(ThreatScenario).where(ThreatScenario.project_id == project_id)
+    )
+    threats = result.scalars().all()
+
+    # Initialize matrix (feasibility x impact) sized by the project methodology
+    engine = await risk_methodologies.get_engine(db, project_id)
+    rows, cols = engine.shape
+    matrix = [[0] * cols for _ in range(rows)]
+    threat_counts = {level: 0 for level in sorted(engine.methodology.risk_labels)}
+
+    for t in threats:
+        if t.attack_feasibility_value is not None and t.impact_level_value is not None:
+            feas_idx = min(t.attack_feasibility_value, rows - 1)
+            impact_idx = min(t.impact_level_value, cols - 1)
+            matrix[feas_idx][impact_idx] += 1
+
+        if t.risk_level:
+            if t.risk_level in threat_counts:
+                threat_counts[t.risk_level] += 1
+
+    threshold = engine.methodology.high_risk_threshold
+    high_risk_count = sum(count for level, count in threat_counts.items() if level >= threshold)
+
+    return ResponseModel(
+        data=RiskMatrixResponse(
+            matrix=matrix,
+            threat_counts=threat_counts,
+            total_threats=len(threats),
+            high_risk_count=high_risk_count,
+        )
+    )
+
+
+@router.get("/export")
+async def export_threats(
+    project_id: int,
+    current_user: CurrentUser,
+    format: str = Query("csv", pattern="^(csv|ndjson|parquet)$"),
+    asset_id: Optional[int] = None,
+    stride_type: Optional[str] = None,
+    risk_level: Optional[int] = None,
+    confirmed: Optional[bool] = None,
+):
+    """Stream all matching threats as CSV, NDJSON or Parquet.
+
+    Each row carries the threat's asset and its first mitigation, like the
+    report's TARA result sheet. Takes the same filters as the list.
+    """
+    check_format(format)
+    query = threat_export_query(
+        _threat_filters(project_id, asset_id, stride_type, risk_level, confirmed)
+    )
+    return StreamingResponse(
+        export_rows(query, format),
+        media_type=EXPORT_FORMATS[format],
+        headers={"Content-Disposition": f'attachment; filename="project-{project_id}-threats.{format}"'},
+    )
+
+
 @router.get("/{threat_id}", response_model=ResponseModel[ThreatResponse])
 async def get_threat(
     project_id: int,
@@ -233,6 +351,12 @@ async def get_threat(
             user_interaction=threat.user_interaction,
             attack_feasibility=threat.attack_feasibility,
             attack_feasibility_value=threat.attack_feasibility_value,
+            elapsed_time=threat.elapsed_time,
+            specialist_expertise=threat.specialist_expertise,
+            knowledge_of_item=threat.knowledge_of_item,
+            window_of_opportunity=threat.window_of_opportunity,
+            equipment=threat.equipment,
+            attack_potential=threat.attack_potential,
             impact_safety=threat.impact_safety,
             impact_financial=threat.impact_financial,
             impact_operational=threat.impact_operational,
@@ -281,7 +405,8 @@ async def update_threat(
         setattr(threat, field, value)
 
     # Recalculate risk
-    threat = RiskCalculator.calculate_and_update_threat(threat)
+    engine = await risk_methodologies.get_engine(db, project_id)
+    threat = engine.apply(threat)
 
     await db.commit()
     await db.refresh(threat)
@@ -304,6 +429,12 @@ async def update_threat(
             user_interaction=threat.user_interaction,
             attack_feasibility=threat.attack_feasibility,
             attack_feasibility_value=threat.attack_feasibility_value,
+            elapsed_time=threat.elapsed_time,
+            specialist_expertise=threat.specialist_expertise,
+            knowledge_of_item=threat.knowledge_of_item,
+            window_of_opportunity=threat.window_of_opportunity,
+            equipment=threat.equipment,
+            attack_potential=threat.attack_potential,
             impact_safety=threat.impact_safety,
             impact_financial=threat.impact_financial,
             impact_operational=threat.impact_operational,
@@ -384,44 +515,6 @@ async def add_mitigation(
     return ResponseModel(data=MitigationResponse.model_validate(mitigation))
 
 
-@router.get("/risk-matrix", response_model=ResponseModel[RiskMatrixResponse])
-async def get_risk_matrix(
-    project_id: int,
-    current_user: CurrentUser,
-    db: DbSession,
-):
-    """Get risk matrix for the project."""
-    result = await db.execute(
-        select(ThreatScenario).where(ThreatScenario.project_id == project_id)
-    )
-    threats = result.scalars().all()
-
-    # Initialize 4x4 matrix (feasibility x impact)
-    matrix = [[0] * 4 for _ in range(4)]
-    threat_counts = {1: 0, 2: 0, 3: 0, 4: 0, 5: 0}
-
-    for t in threats:
-        if t.attack_feasibility_value is not None and t.impact_level_value is not None:
-            feas_idx = min(t.attack_feasibility_value, 3)
-            impact_idx = min(t.impact_level_value, 3)
-            matrix[feas_idx][impact_idx] += 1
-
-        if t.risk_level:
-            if t.risk_level in threat_counts:
-                threat_counts[t.risk_level] += 1
-
-    high_risk_count = threat_counts.get(4, 0) + threat_counts.get(5, 0)
-
-    return ResponseModel(
-        data=RiskMatrixResponse(
-            matrix=matrix,
-            threat_counts=threat_counts,
-            total_threats=len(threats),
-            high_risk_count=high_risk_count,
-        )
-    )
-
-
 @router.post("/analyze", response_model=ResponseModel)
 async def analyze_threats(
     project_id: int,
@@ -0,0 +1,128 @@
+"""Pagination helpers for list endpoints.
+
+Offset pagination (``page``/``page_size``) gets slower the deeper the page,
+and counting the full filtered result costs a scan on every request. List
+endpoints therefore also support keyset (cursor) pagination ordered on
+indexed keys, with an opt-in total served from a short-lived count cache.
+"""
+
+import base64
+import hashlib
+import json
+from datetime import datetime
+from typing import Any, Optional, Sequence
+
+from fastapi import HTTPException, status
+from sqlalchemy import DateTime, Select, func, select, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import get_settings
+from app.services.cache_service import cache_service
+from app.utils.ttl_cache import TTLCache
+
+settings = get_settings()
+
+_count_cache: TTLCache[int] = TTLCache(
+    max_entries=4096,
+    ttl_seconds=settings.LIST_COUNT_CACHE_TTL_SECONDS,
+)
+
+
+def encode_cursor(values: Sequence[Any]) -> str:
+    """Encode keyset values as an opaque URL-safe cursor."""
+    payload = [v.isoformat() if isinstance(v, datetime) else v for v in values]
+    raw = json.dumps(payload, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str, columns: Sequence[Any]) -> list[Any]:
+    """Decode a cursor produced by :func:`encode_cursor` for ``columns``."""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+        if not isinstance(values, list) or len(values) != len(columns):
+            raise ValueError("cursor arity mismatch")
+        return [
+            datetime.fromisoformat(v) if isinstance(col.type, DateTime) and v is not None else v
+            for col, v in zip(columns, values)
+        ]
+    except (ValueError, TypeError, UnicodeError) as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Invalid cursor: {e}",
+        )
+
+
+async def paginate_keyset(
+    db: AsyncSession,
+    query: Select,
+    order_by: Sequence[Any],
+    cursor: str,
+    page_size: int,
+    descending: bool = False,
+    scalars: bool = True,
+) -> tuple[list[Any], Optional[str]]:
+    """Fetch one keyset page of ``query`` ordered by ``order_by``.
+
+    ``order_by`` must end with a unique column (normally the primary key) so
+    the ordering is total. An empty ``cursor`` starts from the first row.
+    Entity queries return objects; pass ``scalars=False`` for column queries
+    to get rows, which must include the ``order_by`` columns.
+
+    Returns:
+        Tuple of (rows, next_cursor); ``next_cursor`` is None on the last page
+    """
+    if cursor:
+        values = decode_cursor(cursor, order_by)
+        keys = tuple_(*order_by)
+        query = query.where(keys < tuple_(*values) if descending else keys > tuple_(*values))
+
+    ordering = [col.desc() if descending else col.asc() for col in order_by]
+    result = await db.execute(query.order_by(*ordering).limit(page_size + 1))
+    rows = list(result.scalars().all() if scalars else result.all())
+
+    next_cursor = None
+    if len(rows) > page_size:
+        rows = rows[:page_size]
+        next_cursor = encode_cursor([getattr(rows[-1], col.key) for col in order_by])
+
+    return rows, next_cursor
+
+
+async def count_rows(
+    db: AsyncSession,
+    model: Any,
+    filters: Sequence[Any],
+    cache_key: Optional[str] = None,
+) -> int:
+    """Count rows of ``model`` matching ``filters``.
+
+    The count is issued directly against the table instead of wrapping the
+    full entity query in a subquery. With ``cache_key`` the result is served
+    from a short-lived process/Redis cache, so totals may lag recent writes
+    by up to ``LIST_COUNT_CACHE_TTL_SECONDS``.
+    """
+    count_query = select(func.count()).select_from(model).where(*filters)
+
+    if cache_key is None:
+        return (await db.execute(count_query)).scalar() or 0
+
+    total = _count_cache.get(cache_key)
+    if total is not None:
+        return total
+
+    total = await cache_service.get(cache_key)
+    if total is None:
+        total = (await db.execute(count_query)).scalar() or 0
+        await cache_service.set(cache_key, total, expire=settings.LIST_COUNT_CACHE_TTL_SECONDS)
+
+    _count_cache.set(cache_key, total)
+    return total
+
+
+def count_cache_key(resource: str, scope: Any, **params: Any) -> str:
+    """Build a count cache key for ``resource`` within ``scope`` and filter ``params``."""
+    digest = hashlib.sha1(
+        json.dumps(params, sort_keys=True, default=str).encode("utf-8")
+    ).hexdigest()[:16]
+    return f"count:{resource}:{scope}:{digest}"
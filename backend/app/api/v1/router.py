@@ -2,7 +2,7 @@
 
 from fastapi import APIRouter
 
-from app.api.v1.endpoints import auth, projects, documents, assets, threats, reports, knowledge
+from app.api.v1.endpoints import auth, projects, documents, assets, threats, attack_trees, reports, knowledge, search
 
 api_router = APIRouter()
 
@@ -12,5 +12,7 @@ api_router.include_router(projects.router)
 api_router.include_router(documents.router)
 api_router.include_router(assets.router)
 api_router.include_router(threats.router)
+api_router.include_router(attack_trees.router)
 api_router.include_router(reports.router)
 api_router.include_router(knowledge.router)
+api_router.include_router(search.router)
@@ -1 +1,24 @@
 """Graph database clients package."""
+
+from functools import lru_cache
+
+from app.clients.graph.base import GraphBackend
+from app.clients.graph.memory import InMemoryGraphBackend
+from app.core.config import get_settings
+
+
+@lru_cache()
+def get_graph_backend() -> GraphBackend:
+    """Return the configured graph backend (``GRAPH_BACKEND``)."""
+    backend = get_settings().GRAPH_BACKEND
+    if backend == "neo4j":
+        # Imported lazily so the driver is only needed when Neo4j is used
+        from app.clients.graph.neo4j_client import Neo4jGraphBackend
+
+        return Neo4jGraphBackend()
+    if backend == "memory":
+        return InMemoryGraphBackend()
+    raise ValueError(f"Unknown GRAPH_BACKEND: {backend}")
+
+
+__all__ = ["GraphBackend", "InMemoryGraphBackend", "get_graph_backend"]
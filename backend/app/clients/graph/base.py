@@ -0,0 +1,107 @@
+"""Graph backend interface."""
+
+from abc import ABC, abstractmethod
+from typing import Any, Dict, Iterator, Optional, Sequence
+
+# Rows passed to the upsert methods:
+#   asset:    id, project_id, asset_id, name, category, subcategory
+#   relation: id, project_id, source, target, type, protocol
+#   threat:   id, project_id, asset_id, threat_id, stride_type, risk_level,
+#             attack_feasibility_value, damage_scenario
+Row = Dict[str, Any]
+
+
+def chunked(rows: Sequence[Any], size: int) -> Iterator[Sequence[Any]]:
+    """Yield consecutive slices of at most ``size`` rows."""
+    for start in range(0, len(rows), size):
+        yield rows[start:start + size]
+
+
+class GraphBackend(ABC):
+    """Mirror of project asset graphs that serves graph queries.
+
+    Writes are idempotent upserts/deletes keyed by database primary key, so
+    replaying part of the change log is harmless. Query results use the
+    asset graph API shapes (string node ids).
+    """
+
+    async def ensure_schema(self) -> None:
+        """Create constraints and indexes the backend needs."""
+        return None
+
+    async def close(self) -> None:
+        """Release connections."""
+        return None
+
+    @abstractmethod
+    async def get_checkpoint(self) -> Optional[int]:
+        """Return the last applied change log id, or None if never synced."""
+
+    @abstractmethod
+    async def set_checkpoint(self, change_id: int) -> None:
+        """Record the last applied change log id."""
+
+    @abstractmethod
+    async def upsert_assets(self, rows: Sequence[Row]) -> None:
+        """Insert or update asset nodes."""
+
+    @abstractmethod
+    async def upsert_relations(self, rows: Sequence[Row]) -> None:
+        """Insert or update relation edges; endpoints must already exist."""
+
+    @abstractmethod
+    async def upsert_threats(self, rows: Sequence[Row]) -> None:
+        """Insert or update threat nodes attached to their assets."""
+
+    @abstractmethod
+    async def delete_assets(self, ids: Sequence[int]) -> None:
+        """Delete asset nodes with their relations and threats."""
+
+    @abstractmethod
+    async def delete_relations(self, ids: Sequence[int]) -> None:
+        """Delete relation edges."""
+
+    @abstractmethod
+    async def delete_threats(self, ids: Sequence[int]) -> None:
+        """Delete threat nodes."""
+
+    @abstractmethod
+    async def delete_project(self, project_id: int) -> None:
+        """Delete everything mirrored for a project."""
+
+    @abstractmethod
+    async def get_graph(self, project_id: int) -> Row:
+        """Return ``{"nodes": [...], "edges": [...]}`` for a project."""
+
+    @abstractmethod
+    async def attack_paths(
+        self,
+        project_id: int,
+        target_id: int,
+        k: int = 3,
+        weighted: bool = False,
+    ) -> Optional[Row]:
+        """Return ``{"target": node, "paths": [{cost, hops, nodes}]}`` for
+        the k cheapest paths from an entry point, or None if the target is
+        unknown.
+
+        Paths cost one per hop, or with ``weighted`` ``4 - f`` for each
+        asset entered, where ``f`` is the highest feasibility value of the
+        threats against it (unrated assets count as 0).
+        """
+
+    @abstractmethod
+    async def impact(
+        self,
+        project_id: int,
+        asset_id: int,
+        max_depth: Optional[int] = None,
+    ) -> Optional[Row]:
+        """Return ``{"source": node, "assets": [node + depth]}`` for the
+        assets reachable from an asset, or None if it is unknown."""
+
+
+def graph_node(asset_id: int, name: str, category: str, subcategory: Optional[str]) -> Row:
+    """Build an API graph node."""
+    return {"id": str(asset_id), "name": name, "category": category, "subcategory": subcategory}
+
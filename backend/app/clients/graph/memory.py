@@ -0,0 +1,206 @@
+"""In-process graph backend."""
+
+from collections import defaultdict
+from typing import Dict, Optional, Sequence, Tuple
+
+import numpy as np
+
+from app.clients.graph.base import GraphBackend, Row
+from app.services.asset_graph import AssetGraph
+
+# Larger relation batches rebuild the project's CSR arrays instead of
+# inserting edge by edge
+INCREMENTAL_LIMIT = 256
+
+
+class InMemoryGraphBackend(GraphBackend):
+    """Graph backend holding the mirror in process memory.
+
+    Used by tests and single-node deployments. Each project's graph is
+    compiled to an ``AssetGraph`` on first query and then updated in place
+    by relation writes.
+    """
+
+    def __init__(self):
+        self._checkpoint: Optional[int] = None
+        # project_id -> entity id -> row
+        self._assets: Dict[int, Dict[int, Row]] = defaultdict(dict)
+        self._relations: Dict[int, Dict[int, Row]] = defaultdict(dict)
+        self._threats: Dict[int, Dict[int, Row]] = defaultdict(dict)
+        # entity id -> project_id, for deletes by id
+        self._owners: Dict[Tuple[str, int], int] = {}
+        self._graphs: Dict[int, AssetGraph] = {}
+
+    async def get_checkpoint(self) -> Optional[int]:
+        return self._checkpoint
+
+    async def set_checkpoint(self, change_id: int) -> None:
+        self._checkpoint = change_id
+
+    def _store(self, kind: str, table: Dict[int, Dict[int, Row]], row: Row) -> Optional[Row]:
+        """Store a row and return the previous version, if any."""
+        key = (kind, row["id"])
+        previous_project = self._owners.get(key)
+        previous = None
+        if previous_project is not None:
+            previous = table[previous_project].pop(row["id"], None)
+        table[row["project_id"]][row["id"]] = row
+        self._owners[key] = row["project_id"]
+        return previous
+
+    def _discard(self, kind: str, table: Dict[int, Dict[int, Row]], entity_id: int) -> Optional[Row]:
+        project_id = self._owners.pop((kind, entity_id), None)
+        if project_id is None:
+            return None
+        return table[project_id].pop(entity_id, None)
+
+    async def upsert_assets(self, rows: Sequence[Row]) -> None:
+        for row in rows:
+            previous = self._store("asset", self._assets, row)
+            if previous is not None and previous["project_id"] != row["project_id"]:
+                self._graphs.pop(previous["project_id"], None)
+            graph = self._graphs.get(row["project_id"])
+            if graph is not None:
+                graph.add_asset(row["id"], row["name"], row["category"], row["subcategory"])
+
+    async def upsert_relations(self, rows: Sequence[Row]) -> None:
+        incremental = len(rows) <= INCREMENTAL_LIMIT
+        for row in rows:
+            previous = self._store("relation", self._relations, row)
+            if previous is not None and previous["project_id"] != row["project_id"]:
+                self._graphs.pop(previous["project_id"], None)
+            graph = self._graphs.get(row["project_id"])
+            if graph is None:
+                continue
+            if not incremental:
+                del self._graphs[row["project_id"]]
+                continue
+            if previous is not None:
+                graph.remove_relation(row["id"])
+            if not graph.add_relation(row["id"], row["source"], row["target"], row["type"], row["protocol"]):
+                del self._graphs[row["project_id"]]
+
+    async def upsert_threats(self, rows: Sequence[Row]) -> None:
+        for row in rows:
+            previous = self._store("threat", self._threats, row)
+            self._threats_changed(row["project_id"])
+            if previous is not None:
+                self._threats_changed(previous["project_id"])
+
+    def _threats_changed(self, project_id: int) -> None:
+        graph = self._graphs.get(project_id)
+        if graph is not None:
+            graph.node_feasibility = None
+
+    async def delete_assets(self, ids: Sequence[int]) -> None:
+        deleted: Dict[int, set] = defaultdict(set)
+        for asset_id in ids:
+            row = self._discard("asset", self._assets, asset_id)
+            if row is not None:
+                deleted[row["project_id"]].add(asset_id)
+                self._graphs.pop(row["project_id"], None)
+        for project_id, assets in deleted.items():
+            await self.delete_relations([
+                row["id"]
+                for row in self._relations.get(project_id, {}).values()
+                if row["source"] in assets or row["target"] in assets
+            ])
+            await self.delete_threats([
+                row["id"]
+                for row in self._threats.get(project_id, {}).values()
+                if row["asset_id"] in assets
+            ])
+
+    async def delete_relations(self, ids: Sequence[int]) -> None:
+        for relation_id in ids:
+            row = self._discard("relation", self._relations, relation_id)
+            if row is not None and row["project_id"] in self._graphs:
+                self._graphs[row["project_id"]].remove_relation(relation_id)
+
+    async def delete_threats(self, ids: Sequence[int]) -> None:
+        for threat_id in ids:
+            row = self._discard("threat", self._threats, threat_id)
+            if row is not None:
+                self._threats_changed(row["project_id"])
+
+    async def delete_project(self, project_id: int) -> None:
+        for kind, table in (("asset", self._assets), ("relation", self._relations), ("threat", self._threats)):
+            for entity_id in table.pop(project_id, {}):
+                self._owners.pop((kind, entity_id), None)
+        self._graphs.pop(project_id, None)
+
+    def _graph(self, project_id: int, with_feasibility: bool = False) -> AssetGraph:
+        graph = self._graphs.get(project_id)
+        if graph is None:
+            assets = sorted(self._assets.get(project_id, {}).values(), key=lambda row: row["id"])
+            relations = sorted(self._relations.get(project_id, {}).values(), key=lambda row: row["id"])
+            graph = AssetGraph.build(
+                project_id,
+                [(row["id"], row["name"], row["category"], row["subcategory"]) for row in assets],
+                [(row["id"], row["source"], row["target"], row["type"], row["protocol"]) for row in relations],
+            )
+            self._graphs[project_id] = graph
+
+        if with_feasibility and graph.node_feasibility is None:
+            feasibility = np.full(graph.node_count, -1, dtype=np.int16)
+            for row in self._threats.get(project_id, {}).values():
+                node = graph.index.get(row["asset_id"])
+                value = row["attack_feasibility_value"]
+                if node is not None and value is not None and value > feasibility[node]:
+                    feasibility[node] = value
+            graph.node_feasibility = feasibility
+        return graph
+
+    async def get_graph(self, project_id: int) -> Row:
+        graph = self._graph(project_id)
+        return {
+            "nodes": [graph.node(i) for i in range(graph.node_count)],
+            "edges": [
+                {
+                    "source": str(graph.asset_ids[u]),
+                    "target": str(graph.asset_ids[v]),
+                    "type": graph.relation_types[e],
+                    "protocol": graph.protocols[e],
+                }
+                for u, v, e in graph.edges()
+            ],
+        }
+
+    async def attack_paths(
+        self,
+        project_id: int,
+        target_id: int,
+        k: int = 3,
+        weighted: bool = False,
+    ) -> Optional[Row]:
+        graph = self._graph(project_id, with_feasibility=weighted)
+        if target_id not in graph.index:
+            return None
+        return {
+            "target": graph.node(graph.index[target_id]),
+            "paths": [
+                {
+                    "cost": path.cost,
+                    "hops": len(path.nodes) - 1,
+                    "nodes": [graph.node(i) for i in path.nodes],
+                }
+                for path in graph.attack_paths(target_id, k=k, weighted=weighted)
+            ],
+        }
+
+    async def impact(
+        self,
+        project_id: int,
+        asset_id: int,
+        max_depth: Optional[int] = None,
+    ) -> Optional[Row]:
+        graph = self._graph(project_id)
+        if asset_id not in graph.index:
+            return None
+        return {
+            "source": graph.node(graph.index[asset_id]),
+            "assets": [
+                {**graph.node(i), "depth": depth}
+                for i, depth in graph.reachable(asset_id, max_depth=max_depth)
+            ],
+        }
@@ -0,0 +1,312 @@
+"""Neo4j graph backend."""
+
+from typing import Any, Dict, List, Optional, Sequence
+
+import numpy as np
+from neo4j import AsyncGraphDatabase
+
+from app.clients.graph.base import GraphBackend, Row, chunked, graph_node
+from app.core.config import get_settings
+from app.services.asset_graph import AssetGraph
+from app.services.attack_tree import ENTRY_CATEGORIES
+from app.services.parsers.base import run_in_parse_pool
+
+settings = get_settings()
+
+SYNC_STATE_NAME = "tara"
+
+SCHEMA_STATEMENTS = [
+    "CREATE CONSTRAINT asset_id IF NOT EXISTS FOR (a:Asset) REQUIRE a.id IS UNIQUE",
+    "CREATE CONSTRAINT threat_id IF NOT EXISTS FOR (t:Threat) REQUIRE t.id IS UNIQUE",
+    "CREATE INDEX asset_project IF NOT EXISTS FOR (a:Asset) ON (a.project_id)",
+    "CREATE INDEX relates_id IF NOT EXISTS FOR ()-[r:RELATES]-() ON (r.id)",
+]
+
+UPSERT_ASSETS = """
+UNWIND $rows AS row
+MERGE (a:Asset {id: row.id})
+SET a.project_id = row.project_id, a.asset_id = row.asset_id, a.name = row.name,
+    a.category = row.category, a.subcategory = row.subcategory
+"""
+
+# A relation whose endpoints changed is dropped first so MERGE recreates it
+UPSERT_RELATIONS = """
+UNWIND $rows AS row
+OPTIONAL MATCH (:Asset)-[old:RELATES {id: row.id}]->(:Asset)
+FOREACH (_ IN CASE WHEN startNode(old).id <> row.source OR endNode(old).id <> row.target
+                   THEN [1] ELSE [] END | DELETE old)
+WITH row
+MATCH (s:Asset {id: row.source}), (t:Asset {id: row.target})
+MERGE (s)-[r:RELATES {id: row.id}]->(t)
+SET r.project_id = row.project_id, r.type = row.type, r.protocol = row.protocol
+"""
+
+UPSERT_THREATS = """
+UNWIND $rows AS row
+MERGE (t:Threat {id: row.id})
+SET t.project_id = row.project_id, t.asset_id = row.asset_id, t.threat_id = row.threat_id,
+    t.stride_type = row.stride_type, t.risk_level = row.risk_level,
+    t.feasibility = row.attack_feasibility_value, t.damage_scenario = row.damage_scenario
+WITH t, row
+OPTIONAL MATCH (t)-[old:TARGETS]->(previous:Asset)
+WHERE previous.id <> row.asset_id
+DELETE old
+WITH t, row
+MATCH (a:Asset {id: row.asset_id})
+MERGE (t)-[:TARGETS]->(a)
+"""
+
+# Highest threat feasibility per asset, used by weighted path queries
+REFRESH_FEASIBILITY = """
+UNWIND $ids AS id
+MATCH (a:Asset {id: id})
+OPTIONAL MATCH (t:Threat)-[:TARGETS]->(a)
+WITH a, max(t.feasibility) AS feasibility
+SET a.max_feasibility = feasibility
+"""
+
+
+class Neo4jGraphBackend(GraphBackend):
+    """Graph backend mirroring projects into Neo4j.
+
+    Assets and threats are ``:Asset``/``:Threat`` nodes keyed by database
+    id, relations are ``:RELATES`` edges and threats point at their asset
+    with ``:TARGETS``. Writes run as batched ``UNWIND ... MERGE`` statements,
+    ``NEO4J_BATCH_SIZE`` rows per transaction.
+    """
+
+    def __init__(
+        self,
+        uri: Optional[str] = None,
+        user: Optional[str] = None,
+        password: Optional[str] = None,
+        database: Optional[str] = None,
+        batch_size: Optional[int] = None,
+    ):
+        self.driver = AsyncGraphDatabase.driver(
+            uri or settings.NEO4J_URI,
+            auth=(user or settings.NEO4J_USER, password or settings.NEO4J_PASSWORD),
+        )
+        self.database = database or settings.NEO4J_DATABASE
+        self.batch_size = batch_size or settings.NEO4J_BATCH_SIZE
+
+    async def close(self) -> None:
+        await self.driver.close()
+
+    async def _write(self, query: str, rows: Sequence[Any], key: str = "rows") -> None:
+        """Run an UNWIND statement over ``rows`` in batched transactions."""
+        async with self.driver.session(database=self.database) as session:
+            for chunk in chunked(list(rows), self.batch_size):
+                await session.execute_write(self._run, query, {key: list(chunk)})
+
+    async def _read(self, query: str, **params: Any) -> List[Dict[str, Any]]:
+        async with self.driver.session(database=self.database) as session:
+            return await session.execute_read(self._fetch, query, params)
+
+    @staticmethod
+    async def _run(tx, query: str, params: Dict[str, Any]) -> None:
+        result = await tx.run(query, params)
+        await result.consume()
+
+    @staticmethod
+    async def _fetch(tx, query: str, params: Dict[str, Any]) -> List[Dict[str, Any]]:
+        result = await tx.run(query, params)
+        return await result.data()
+
+    async def ensure_schema(self) -> None:
+        async with self.driver.session(database=self.database) as session:
+            for statement in SCHEMA_STATEMENTS:
+                result = await session.run(statement)
+                await result.consume()
+
+    async def get_checkpoint(self) -> Optional[int]:
+        records = await self._read(
+            "MATCH (s:GraphSyncState {name: $name}) RETURN s.checkpoint AS checkpoint",
+            name=SYNC_STATE_NAME,
+        )
+        return records[0]["checkpoint"] if records else None
+
+    async def set_checkpoint(self, change_id: int) -> None:
+        await self._write(
+            "UNWIND $rows AS row MERGE (s:GraphSyncState {name: row.name}) SET s.checkpoint = row.checkpoint",
+            [{"name": SYNC_STATE_NAME, "checkpoint": change_id}],
+        )
+
+    async def upsert_assets(self, rows: Sequence[Row]) -> None:
+        await self._write(UPSERT_ASSETS, rows)
+
+    async def upsert_relations(self, rows: Sequence[Row]) -> None:
+        await self._write(UPSERT_RELATIONS, rows)
+
+    async def upsert_threats(self, rows: Sequence[Row]) -> None:
+        previous = await self._read(
+            "UNWIND $ids AS id MATCH (:Threat {id: id})-[:TARGETS]->(a:Asset) RETURN DISTINCT a.id AS id",
+            ids=[row["id"] for row in rows],
+        )
+        await self._write(UPSERT_THREATS, rows)
+        asset_ids = {row["asset_id"] for row in rows} | {record["id"] for record in previous}
+        await self._write(REFRESH_FEASIBILITY, sorted(asset_ids), key="ids")
+
+    async def delete_assets(self, ids: Sequence[int]) -> None:
+        await self._write(
+            "UNWIND $ids AS id MATCH (a:Asset {id: id}) "
+            "OPTIONAL MATCH (t:Threat)-[:TARGETS]->(a) DETACH DELETE t, a",
+            ids, key="ids",
+        )
+
+    async def delete_relations(self, ids: Sequence[int]) -> None:
+        await self._write(
+            "UNWIND $ids AS id MATCH (:Asset)-[r:RELATES {id: id}]->(:Asset) DELETE r",
+            ids, key="ids",
+        )
+
+    async def delete_threats(self, ids: Sequence[int]) -> None:
+        affected = await self._read(
+            "UNWIND $ids AS id MATCH (:Threat {id: id})-[:TARGETS]->(a:Asset) RETURN DISTINCT a.id AS id",
+            ids=list(ids),
+        )
+        await self._write("UNWIND $ids AS id MATCH (t:Threat {id: id}) DETACH DELETE t", ids, key="ids")
+        await self._write(REFRESH_FEASIBILITY, [record["id"] for record in affected], key="ids")
+
+    async def delete_project(self, project_id: int) -> None:
+        async with self.driver.session(database=self.database) as session:
+            for label in ("Threat", "Asset"):
+                # Delete in batches so large projects do not build one huge transaction
+                result = await session.run(
+                    f"MATCH (n:{label} {{project_id: $project_id}}) "
+                    "CALL { WITH n DETACH DELETE n } IN TRANSACTIONS OF $batch ROWS",
+                    project_id=project_id, batch=self.batch_size,
+                )
+                await result.consume()
+
+    async def get_graph(self, project_id: int) -> Row:
+        nodes = await self._read(
+            "MATCH (a:Asset {project_id: $project_id}) "
+            "RETURN a.id AS asset_id, a.name AS name, a.category AS category, a.subcategory AS subcategory "
+            "ORDER BY a.id",
+            project_id=project_id,
+        )
+        edges = await self._read(
+            "MATCH (s:Asset {project_id: $project_id})-[r:RELATES]->(t:Asset) "
+            "RETURN s.id AS source, t.id AS target, r.type AS type, r.protocol AS protocol "
+            "ORDER BY s.id, r.id",
+            project_id=project_id,
+        )
+        return {
+            "nodes": [graph_node(**record) for record in nodes],
+            "edges": [{**record, "source": str(record["source"]), "target": str(record["target"])} for record in edges],
+        }
+
+    async def _node(self, project_id: int, asset_id: int) -> Optional[Row]:
+        records = await self._read(
+            "MATCH (a:Asset {id: $id, project_id: $project_id}) "
+            "RETURN a.id AS asset_id, a.name AS name, a.category AS category, a.subcategory AS subcategory",
+            id=asset_id, project_id=project_id,
+        )
+        return graph_node(**records[0]) if records else None
+
+    async def attack_paths(
+        self,
+        project_id: int,
+        target_id: int,
+        k: int = 3,
+        weighted: bool = False,
+    ) -> Optional[Row]:
+        target = await self._node(project_id, target_id)
+        if target is None:
+            return None
+        if weighted:
+            return {"target": target, "paths": await self._weighted_paths(project_id, target_id, k)}
+
+        # Only the k shortest paths per entry point are expanded, instead of
+        # every path up to the length limit.
+        # Path selectors and bounds cannot be parameters; both are ints
+        records = await self._read(
+            f"""
+            MATCH p = SHORTEST {int(k)}
+                (e:Asset WHERE e.project_id = $project_id AND e.category IN $entries)
+                (()-[:RELATES]->()){{0,{int(settings.GRAPH_MAX_PATH_LENGTH)}}}
+                (t:Asset {{id: $target}})
+            WHERE all(n IN nodes(p) WHERE single(m IN nodes(p) WHERE m = n))
+            RETURN [n IN nodes(p) | {{asset_id: n.id, name: n.name, category: n.category,
+                    subcategory: n.subcategory}}] AS nodes, toFloat(length(p)) AS cost
+            ORDER BY cost
+            LIMIT $k
+            """,
+            target=target_id, project_id=project_id, entries=sorted(ENTRY_CATEGORIES), k=k,
+        )
+        return {
+            "target": target,
+            "paths": [
+                {
+                    "cost": record["cost"],
+                    "hops": len(record["nodes"]) - 1,
+                    "nodes": [graph_node(**node) for node in record["nodes"]],
+                }
+                for record in records
+            ],
+        }
+
+    async def _weighted_paths(self, project_id: int, target_id: int, k: int) -> List[Row]:
+        """The k lowest-cost paths by feasibility.
+
+        Hop-bounded ``SHORTEST`` matches are not the cheapest once hops
+        are weighted, and APOC's Dijkstra finds a single path, so the
+        project's graph is loaded and searched like the in-memory backend.
+        """
+        assets = await self._read(
+            "MATCH (a:Asset {project_id: $project_id}) "
+            "RETURN a.id AS id, a.name AS name, a.category AS category, a.subcategory AS subcategory, "
+            "a.max_feasibility AS feasibility ORDER BY a.id",
+            project_id=project_id,
+        )
+        relations = await self._read(
+            "MATCH (s:Asset {project_id: $project_id})-[r:RELATES]->(t:Asset) "
+            "RETURN r.id AS id, s.id AS source, t.id AS target, r.type AS type, r.protocol AS protocol "
+            "ORDER BY r.id",
+            project_id=project_id,
+        )
+        graph = AssetGraph.build(
+            project_id,
+            [(row["id"], row["name"], row["category"], row["subcategory"]) for row in assets],
+            [(row["id"], row["source"], row["target"], row["type"], row["protocol"]) for row in relations],
+        )
+        graph.node_feasibility = np.array(
+            [-1 if row["feasibility"] is None else row["feasibility"] for row in assets], dtype=np.int16,
+        )
+        paths = await run_in_parse_pool(graph.attack_paths, target_id, k, True)
+        return [
+            {"cost": path.cost, "hops": len(path.nodes) - 1, "nodes": [graph.node(i) for i in path.nodes]}
+            for path in paths
+        ]
+
+    async def impact(
+        self,
+        project_id: int,
+        asset_id: int,
+        max_depth: Optional[int] = None,
+    ) -> Optional[Row]:
+        source = await self._node(project_id, asset_id)
+        if source is None:
+            return None
+
+        # Breadth-first spanning tree: each asset once, at its shortest depth
+        records = await self._read(
+            """
+            MATCH (s:Asset {id: $id})
+            CALL apoc.path.spanningTree(s, {relationshipFilter: 'RELATES>', minLevel: 1, maxLevel: $max_depth})
+            YIELD path
+            WITH last(nodes(path)) AS a, length(path) AS depth
+            RETURN a.id AS id, a.name AS name, a.category AS category, a.subcategory AS subcategory, depth
+            ORDER BY depth, id
+            """,
+            id=asset_id, max_depth=-1 if max_depth is None else max_depth,
+        )
+        return {
+            "source": source,
+            "assets": [
+                {**graph_node(record["id"], record["name"], record["category"], record["subcategory"]),
+                 "depth": record["depth"]}
+                for record in records
+            ],
+        }
@@ -0,0 +1,24 @@
+"""Search backend clients package."""
+
+from functools import lru_cache
+
+from app.clients.search.base import SearchBackend
+from app.clients.search.sqlite import SQLiteSearchBackend
+from app.core.config import get_settings
+
+
+@lru_cache()
+def get_search_backend() -> SearchBackend:
+    """Return the configured search backend (``SEARCH_BACKEND``)."""
+    backend = get_settings().SEARCH_BACKEND
+    if backend == "elasticsearch":
+        # Imported lazily so the client is only needed when Elasticsearch is used
+        from app.clients.search.elasticsearch_client import ElasticsearchSearchBackend
+
+        return ElasticsearchSearchBackend()
+    if backend == "sqlite":
+        return SQLiteSearchBackend()
+    raise ValueError(f"Unknown SEARCH_BACKEND: {backend}")
+
+
+__all__ = ["SQLiteSearchBackend", "SearchBackend", "get_search_backend"]
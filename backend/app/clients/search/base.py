@@ -0,0 +1,69 @@
+"""Search backend interface."""
+
+from abc import ABC, abstractmethod
+from typing import Any, Dict, Optional, Sequence
+
+# Entries passed to ``upsert``:
+#   key, project_id, kind ("document" or "threat"), entity_id,
+#   position (text block index for documents, 0 for threats), title, body
+# Hits returned by ``search``:
+#   kind, entity_id, position, title, score, snippet (HTML, matches in <mark>)
+Row = Dict[str, Any]
+
+KINDS = ("document", "threat")
+
+
+class SearchBackend(ABC):
+    """Full-text index over project documents and threats.
+
+    Entries are keyed by ``key``, so upserting an entry again replaces it.
+    Document entries are passages of the parsed text; a document is
+    re-indexed by deleting its entries and upserting the new passages.
+    """
+
+    async def ensure_schema(self) -> None:
+        """Create the tables or indexes the backend needs."""
+        return None
+
+    async def close(self) -> None:
+        """Release connections."""
+        return None
+
+    @property
+    @abstractmethod
+    def lock_name(self) -> str:
+        """Name of the lock shared by every worker syncing this index."""
+
+    @abstractmethod
+    async def get_checkpoint(self) -> Optional[int]:
+        """Return the last applied change log id, or None if never synced."""
+
+    @abstractmethod
+    async def set_checkpoint(self, change_id: int) -> None:
+        """Record the last applied change log id."""
+
+    @abstractmethod
+    async def upsert(self, rows: Sequence[Row]) -> None:
+        """Insert or replace entries."""
+
+    @abstractmethod
+    async def delete(self, kind: str, entity_ids: Sequence[int]) -> None:
+        """Delete every entry of the given entities."""
+
+    @abstractmethod
+    async def delete_project(self, project_id: int) -> None:
+        """Delete every entry of a project."""
+
+    @abstractmethod
+    async def search(
+        self,
+        project_id: int,
+        query: str,
+        kinds: Optional[Sequence[str]] = None,
+        limit: int = 20,
+        offset: int = 0,
+    ) -> Dict[str, Any]:
+        """Search a project, best matches first.
+
+        Every query word must match. Returns ``{"total": int, "hits": [...]}``.
+        """
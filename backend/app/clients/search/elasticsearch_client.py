@@ -0,0 +1,150 @@
+"""Elasticsearch search backend."""
+
+from typing import Any, Dict, Optional, Sequence
+
+from elasticsearch import AsyncElasticsearch, NotFoundError
+from elasticsearch.helpers import async_bulk
+
+from app.clients.search.base import KINDS, Row, SearchBackend
+from app.clients.search.text import highlight
+from app.core.config import get_settings
+
+settings = get_settings()
+
+# Standard tokenizer plus CJK bigrams, as the local backend tokenizes;
+# unigrams are kept so one-character queries match too
+INDEX_SETTINGS = {
+    "analysis": {
+        "filter": {
+            "tara_cjk_bigram": {"type": "cjk_bigram", "output_unigrams": True},
+        },
+        "analyzer": {
+            "tara_text": {
+                "type": "custom",
+                "tokenizer": "standard",
+                "filter": ["cjk_width", "lowercase", "tara_cjk_bigram"],
+            },
+        },
+    },
+}
+
+MAPPINGS = {
+    "properties": {
+        "project_id": {"type": "integer"},
+        "kind": {"type": "keyword"},
+        "entity_id": {"type": "integer"},
+        "position": {"type": "integer"},
+        "title": {"type": "text", "analyzer": "tara_text"},
+        "body": {"type": "text", "analyzer": "tara_text"},
+    },
+}
+
+
+class ElasticsearchSearchBackend(SearchBackend):
+    """Search backend on Elasticsearch.
+
+    Entries are documents of ``{SEARCH_INDEX_PREFIX}-entries`` keyed by
+    entry key; the sync checkpoint lives in ``{SEARCH_INDEX_PREFIX}-state``.
+    Every query word is a phrase query over title and body, so CJK words
+    match as contiguous bigrams like in the local backend.
+    """
+
+    def __init__(self, hosts: Optional[str] = None, prefix: Optional[str] = None):
+        self.client = AsyncElasticsearch(hosts or settings.ELASTICSEARCH_HOST)
+        prefix = prefix or settings.SEARCH_INDEX_PREFIX
+        self.index = f"{prefix}-entries"
+        self.state_index = f"{prefix}-state"
+
+    @property
+    def lock_name(self) -> str:
+        return f"search-sync:{self.state_index}"
+
+    async def ensure_schema(self) -> None:
+        if not await self.client.indices.exists(index=self.index):
+            await self.client.indices.create(index=self.index, settings=INDEX_SETTINGS, mappings=MAPPINGS)
+        if not await self.client.indices.exists(index=self.state_index):
+            await self.client.indices.create(index=self.state_index)
+
+    async def close(self) -> None:
+        await self.client.close()
+
+    async def get_checkpoint(self) -> Optional[int]:
+        try:
+            document = await self.client.get(index=self.state_index, id="checkpoint")
+        except NotFoundError:
+            return None
+        return document["_source"]["value"]
+
+    async def set_checkpoint(self, change_id: int) -> None:
+        await self.client.index(index=self.state_index, id="checkpoint", document={"value": change_id})
+
+    async def upsert(self, rows: Sequence[Row]) -> None:
+        actions = (
+            {
+                "_index": self.index,
+                "_id": row["key"],
+                "_source": {field: row[field] for field in MAPPINGS["properties"]},
+            }
+            for row in rows
+        )
+        await async_bulk(self.client, actions, chunk_size=settings.SEARCH_BATCH_SIZE, refresh="wait_for")
+
+    async def delete(self, kind: str, entity_ids: Sequence[int]) -> None:
+        await self.client.delete_by_query(
+            index=self.index,
+            query={"bool": {"filter": [{"term": {"kind": kind}}, {"terms": {"entity_id": list(entity_ids)}}]}},
+            refresh=True,
+            conflicts="proceed",
+        )
+
+    async def delete_project(self, project_id: int) -> None:
+        await self.client.delete_by_query(
+            index=self.index,
+            query={"term": {"project_id": project_id}},
+            refresh=True,
+            conflicts="proceed",
+        )
+
+    async def search(
+        self,
+        project_id: int,
+        query: str,
+        kinds: Optional[Sequence[str]] = None,
+        limit: int = 20,
+        offset: int = 0,
+    ) -> Dict[str, Any]:
+        words = query.split()
+        if not words:
+            return {"total": 0, "hits": []}
+        response = await self.client.search(
+            index=self.index,
+            query={
+                "bool": {
+                    "filter": [
+                        {"term": {"project_id": project_id}},
+                        {"terms": {"kind": list(kinds or KINDS)}},
+                    ],
+                    "must": [
+                        {"multi_match": {"query": word, "type": "phrase", "fields": ["title^5", "body"]}}
+                        for word in words
+                    ],
+                },
+            },
+            from_=offset,
+            size=limit,
+            source_includes=["kind", "entity_id", "position", "title", "body"],
+        )
+        return {
+            "total": response["hits"]["total"]["value"],
+            "hits": [
+                {
+                    "kind": hit["_source"]["kind"],
+                    "entity_id": hit["_source"]["entity_id"],
+                    "position": hit["_source"]["position"],
+                    "title": hit["_source"]["title"],
+                    "score": round(hit["_score"], 4),
+                    "snippet": highlight(hit["_source"]["body"], query, settings.SEARCH_SNIPPET_CHARS),
+                }
+                for hit in response["hits"]["hits"]
+            ],
+        }
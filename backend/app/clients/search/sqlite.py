@@ -0,0 +1,228 @@
+"""SQLite FTS5 search backend."""
+
+import asyncio
+import os
+import socket
+import sqlite3
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Sequence, TypeVar
+
+from app.clients.search.base import KINDS, Row, SearchBackend
+from app.clients.search.text import highlight, is_single_character, query_phrases, tokenize
+from app.core.config import get_settings
+
+settings = get_settings()
+
+T = TypeVar("T")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS search_entries (
+    id INTEGER PRIMARY KEY,
+    key TEXT NOT NULL UNIQUE,
+    project_id INTEGER NOT NULL,
+    kind TEXT NOT NULL,
+    entity_id INTEGER NOT NULL,
+    position INTEGER NOT NULL,
+    title TEXT NOT NULL,
+    body TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS ix_search_entries_entity ON search_entries (kind, entity_id);
+CREATE INDEX IF NOT EXISTS ix_search_entries_project ON search_entries (project_id);
+CREATE VIRTUAL TABLE IF NOT EXISTS search_fts USING fts5(scope, title, body, tokenize = 'unicode61');
+CREATE TABLE IF NOT EXISTS search_state (name TEXT PRIMARY KEY, value INTEGER);
+"""
+
+# bm25 column weights for (scope, title, body)
+RANK = "bm25(search_fts, 0.0, 5.0, 1.0)"
+
+
+def _match_expression(project_id: int, query: str, kinds: Sequence[str]) -> Optional[str]:
+    """FTS5 query: the project and kind scope tokens, then every query word.
+
+    Tokens are only letters, digits and CJK characters, so quoting is safe.
+    """
+    phrases = query_phrases(query)
+    if not phrases:
+        return None
+    terms = []
+    for phrase in phrases:
+        if is_single_character(phrase):
+            terms.append(f'"{phrase[0]}"*')
+        else:
+            terms.append('"' + " ".join(phrase) + '"')
+    scope = f'{{scope}}: "p{project_id}" AND {{scope}}: (' + " OR ".join(f'"{kind}"' for kind in kinds) + ")"
+    return f"{scope} AND {{title body}}: (" + " AND ".join(terms) + ")"
+
+
+class SQLiteSearchBackend(SearchBackend):
+    """Search backend on a local SQLite FTS5 index.
+
+    Text is tokenized in Python (CJK bigrams, see ``text``) and stored
+    space-separated in the FTS table, next to a plain table holding the
+    original passages for snippets. The project id and entry kind are
+    indexed as scope tokens, so filtering by project uses the full-text
+    index. Queries matching more than ``SEARCH_RANK_WINDOW`` entries rank
+    only the newest of them. Used by tests and single-node deployments;
+    one connection is driven by a single worker thread.
+    """
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = path or settings.SEARCH_SQLITE_PATH
+        self._connection: Optional[sqlite3.Connection] = None
+        self._executor: Optional[ThreadPoolExecutor] = None
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._connection is None:
+            if self.path != ":memory:":
+                os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+            self._connection = sqlite3.connect(self.path, check_same_thread=False)
+            self._connection.execute("PRAGMA journal_mode = WAL")
+            self._connection.execute("PRAGMA synchronous = NORMAL")
+            self._connection.executescript(SCHEMA)
+        return self._connection
+
+    async def _run(self, func: Callable[..., T], *args: Any) -> T:
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="search-sqlite")
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, func, *args)
+
+    @property
+    def lock_name(self) -> str:
+        # Workers on one host share the file; other hosts have their own
+        return f"search-sync:{socket.gethostname()}:{os.path.abspath(self.path)}"
+
+    async def ensure_schema(self) -> None:
+        await self._run(self._connect)
+
+    async def close(self) -> None:
+        if self._connection is not None:
+            await self._run(self._connection.close)
+            self._connection = None
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+            self._executor = None
+
+    async def get_checkpoint(self) -> Optional[int]:
+        def read() -> Optional[int]:
+            row = self._connect().execute(
+                "SELECT value FROM search_state WHERE name = 'checkpoint'"
+            ).fetchone()
+            return None if row is None else row[0]
+
+        return await self._run(read)
+
+    async def set_checkpoint(self, change_id: int) -> None:
+        def write() -> None:
+            with self._connect() as connection:
+                connection.execute(
+                    "INSERT OR REPLACE INTO search_state (name, value) VALUES ('checkpoint', ?)",
+                    (change_id,),
+                )
+
+        await self._run(write)
+
+    def _delete_ids(self, connection: sqlite3.Connection, ids: List[int]) -> None:
+        for start in range(0, len(ids), 500):
+            chunk = ids[start:start + 500]
+            marks = ",".join("?" * len(chunk))
+            connection.execute(f"DELETE FROM search_fts WHERE rowid IN ({marks})", chunk)
+            connection.execute(f"DELETE FROM search_entries WHERE id IN ({marks})", chunk)
+
+    async def upsert(self, rows: Sequence[Row]) -> None:
+        def write() -> None:
+            with self._connect() as connection:
+                for row in rows:
+                    existing = connection.execute(
+                        "SELECT id FROM search_entries WHERE key = ?", (row["key"],)
+                    ).fetchone()
+                    if existing is not None:
+                        self._delete_ids(connection, [existing[0]])
+                    cursor = connection.execute(
+                        "INSERT INTO search_entries (key, project_id, kind, entity_id, position, title, body) "
+                        "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                        (row["key"], row["project_id"], row["kind"], row["entity_id"],
+                         row["position"], row["title"], row["body"]),
+                    )
+                    connection.execute(
+                        "INSERT INTO search_fts (rowid, scope, title, body) VALUES (?, ?, ?, ?)",
+                        (cursor.lastrowid, f"p{row['project_id']} {row['kind']}",
+                         " ".join(tokenize(row["title"])), " ".join(tokenize(row["body"]))),
+                    )
+
+        await self._run(write)
+
+    async def delete(self, kind: str, entity_ids: Sequence[int]) -> None:
+        def write() -> None:
+            with self._connect() as connection:
+                ids = []
+                for start in range(0, len(entity_ids), 500):
+                    chunk = list(entity_ids[start:start + 500])
+                    marks = ",".join("?" * len(chunk))
+                    ids.extend(row[0] for row in connection.execute(
+                        f"SELECT id FROM search_entries WHERE kind = ? AND entity_id IN ({marks})",
+                        [kind, *chunk],
+                    ))
+                self._delete_ids(connection, ids)
+
+        await self._run(write)
+
+    async def delete_project(self, project_id: int) -> None:
+        def write() -> None:
+            with self._connect() as connection:
+                ids = [row[0] for row in connection.execute(
+                    "SELECT id FROM search_entries WHERE project_id = ?", (project_id,)
+                )]
+                self._delete_ids(connection, ids)
+
+        await self._run(write)
+
+    async def search(
+        self,
+        project_id: int,
+        query: str,
+        kinds: Optional[Sequence[str]] = None,
+        limit: int = 20,
+        offset: int = 0,
+    ) -> Dict[str, Any]:
+        expression = _match_expression(project_id, query, kinds or KINDS)
+        if expression is None:
+            return {"total": 0, "hits": []}
+
+        def read() -> Dict[str, Any]:
+            connection = self._connect()
+            total = connection.execute(
+                "SELECT count(*) FROM search_fts WHERE search_fts MATCH ?", (expression,)
+            ).fetchone()[0]
+            # Very broad queries rank only the newest matches, bounding the bm25 work
+            floor = 0
+            if total > settings.SEARCH_RANK_WINDOW:
+                floor = connection.execute(
+                    "SELECT rowid FROM search_fts WHERE search_fts MATCH ? "
+                    "ORDER BY rowid DESC LIMIT 1 OFFSET ?",
+                    (expression, settings.SEARCH_RANK_WINDOW - 1),
+                ).fetchone()[0]
+            rows = connection.execute(
+                "SELECT e.kind, e.entity_id, e.position, e.title, e.body, ranked.score "
+                f"FROM (SELECT rowid, {RANK} AS score FROM search_fts "
+                "WHERE search_fts MATCH ? AND rowid >= ? ORDER BY score LIMIT ? OFFSET ?) AS ranked "
+                "JOIN search_entries e ON e.id = ranked.rowid ORDER BY ranked.score",
+                (expression, floor, limit, offset),
+            ).fetchall()
+            return {
+                "total": total,
+                "hits": [
+                    {
+                        "kind": kind,
+                        "entity_id": entity_id,
+                        "position": position,
+                        "title": title,
+                        # bm25 is lower for better matches
+                        "score": round(-score, 4),
+                        "snippet": highlight(body, query, settings.SEARCH_SNIPPET_CHARS),
+                    }
+                    for kind, entity_id, position, title, body, score in rows
+                ],
+            }
+
+        return await self._run(read)
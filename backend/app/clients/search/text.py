@@ -0,0 +1,100 @@
+"""Tokenization, passages and highlighting shared by the search backends.
+
+Chinese (and other CJK) text has no word boundaries, so CJK runs are
+indexed as overlapping character bigrams, the scheme of Elasticsearch's
+``cjk_bigram`` filter: "网关认证" becomes "网关 关认 认证". A query word is
+matched as a phrase of its bigrams, which finds exactly the documents
+containing it as a substring. Latin words and numbers are lowercased
+words. No dictionary or segmenter is needed.
+"""
+
+import html
+import re
+from typing import List
+
+_CJK = "぀-ヿ㐀-䶿一-鿿豈-﫿가-힯"
+_TOKEN = re.compile(f"([{_CJK}]+)|([0-9A-Za-zÀ-ɏ]+)")
+
+
+def tokenize(text: str, query: bool = False) -> List[str]:
+    """Split text into index tokens.
+
+    When indexing, each CJK run of two or more characters also ends with
+    its last character as a unigram, so a one-character query (matched as
+    a prefix) finds it at any position.
+    """
+    tokens: List[str] = []
+    for match in _TOKEN.finditer(text):
+        run = match.group(1)
+        if run is None:
+            tokens.append(match.group(2).lower())
+        elif len(run) == 1:
+            tokens.append(run)
+        else:
+            tokens.extend(run[i:i + 2] for i in range(len(run) - 1))
+            if not query:
+                tokens.append(run[-1])
+    return tokens
+
+
+def query_phrases(query: str) -> List[List[str]]:
+    """Tokens of each whitespace-separated query word; all must match."""
+    phrases = [tokenize(word, query=True) for word in query.split()]
+    return [phrase for phrase in phrases if phrase]
+
+
+def is_single_character(phrase: List[str]) -> bool:
+    """True for a one-character CJK query word, matched as a token prefix."""
+    return len(phrase) == 1 and len(phrase[0]) == 1 and _TOKEN.fullmatch(phrase[0]).group(1) is not None
+
+
+def split_passages(text: str, max_chars: int) -> List[str]:
+    """Split text into passages of at most ``max_chars``, at line breaks where possible."""
+    passages: List[str] = []
+    current = ""
+    for line in text.splitlines():
+        line = line.strip()
+        if not line:
+            continue
+        while len(line) > max_chars:
+            if current:
+                passages.append(current)
+                current = ""
+            passages.append(line[:max_chars])
+            line = line[max_chars:]
+        if current and len(current) + len(line) + 1 > max_chars:
+            passages.append(current)
+            current = ""
+        current = f"{current}\n{line}" if current else line
+    if current:
+        passages.append(current)
+    return passages
+
+
+def highlight(text: str, query: str, width: int = 160) -> str:
+    """HTML snippet of ``text`` around the first query match, matches in ``<mark>``.
+
+    Query words are matched case-insensitively as substrings, falling
+    back to their Latin sub-words ("CAN-FD" also marks "CAN FD").
+    """
+    terms = set()
+    for word in query.split():
+        terms.add(word)
+        terms.update(part for part in re.split(f"[^0-9A-Za-zÀ-ɏ{_CJK}]+", word) if part)
+    if not terms:
+        return html.escape(text[:width])
+    pattern = re.compile("|".join(re.escape(term) for term in sorted(terms, key=len, reverse=True)), re.IGNORECASE)
+
+    first = pattern.search(text)
+    start = 0 if first is None else max(0, min(first.start() - width // 4, len(text) - width))
+    end = min(len(text), start + width)
+
+    parts = ["…" if start > 0 else ""]
+    position = start
+    for match in pattern.finditer(text, start, end):
+        parts.append(html.escape(text[position:match.start()]))
+        parts.append(f"<mark>{html.escape(match.group())}</mark>")
+        position = match.end()
+    parts.append(html.escape(text[position:end]))
+    parts.append("…" if end < len(text) else "")
+    return "".join(parts)
@@ -1 +1,25 @@
 """Storage service clients package."""
+
+from functools import lru_cache
+
+from app.clients.storage.base import BlobStore
+from app.clients.storage.local import LocalBlobStore
+from app.core.config import get_settings
+
+
+@lru_cache()
+def get_blob_store() -> BlobStore:
+    """Return the configured blob store (``BLOB_BACKEND``)."""
+    settings = get_settings()
+    backend = settings.BLOB_BACKEND
+    if backend == "minio":
+        # Imported lazily so the client is only needed when MinIO is used
+        from app.clients.storage.minio_client import MinioBlobStore
+
+        return MinioBlobStore()
+    if backend == "local":
+        return LocalBlobStore(settings.BLOB_STORAGE_DIR)
+    raise ValueError(f"Unknown BLOB_BACKEND: {backend}")
+
+
+__all__ = ["BlobStore", "LocalBlobStore", "get_blob_store"]
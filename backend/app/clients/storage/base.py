@@ -0,0 +1,39 @@
+"""Blob storage interface."""
+
+from abc import ABC, abstractmethod
+from typing import Optional
+
+
+class BlobStore(ABC):
+    """Flat key/value store for binary objects such as extracted images.
+
+    Methods are synchronous so parsers can call them from parse worker
+    threads. Keys are content-addressed by callers, so ``put`` of an
+    existing key only refreshes its write time: the sweep of unreferenced
+    blobs keeps recently written ones, which a running parse may still
+    reference.
+    """
+
+    @abstractmethod
+    def exists(self, key: str) -> bool:
+        """Return True if an object is stored under ``key``."""
+
+    @abstractmethod
+    def put(self, key: str, data: bytes, content_type: str = "application/octet-stream") -> None:
+        """Store ``data`` under ``key``, or refresh the write time if it is already stored."""
+
+    @abstractmethod
+    def written_at(self, key: str) -> Optional[float]:
+        """Return when ``key`` was last written (epoch seconds), or None if missing."""
+
+    @abstractmethod
+    def get(self, key: str) -> bytes:
+        """Return the object stored under ``key``.
+
+        Raises:
+            KeyError: If there is no such object
+        """
+
+    @abstractmethod
+    def delete(self, key: str) -> None:
+        """Delete the object stored under ``key``, if any."""
@@ -0,0 +1,64 @@
+"""Blob store backed by MinIO (or any S3-compatible service)."""
+
+import io
+from typing import Optional
+
+from minio import Minio
+from minio.error import S3Error
+
+from app.clients.storage.base import BlobStore
+from app.core.config import get_settings
+
+settings = get_settings()
+
+# Prefix for blobs within the document bucket
+BLOB_PREFIX = "blobs/"
+
+
+class MinioBlobStore(BlobStore):
+    """Stores objects under ``blobs/`` in ``MINIO_BUCKET``."""
+
+    def __init__(self):
+        self.client = Minio(
+            settings.MINIO_ENDPOINT,
+            access_key=settings.MINIO_ACCESS_KEY,
+            secret_key=settings.MINIO_SECRET_KEY,
+            secure=settings.MINIO_SECURE,
+        )
+        self.bucket = settings.MINIO_BUCKET
+
+    def exists(self, key: str) -> bool:
+        return self.written_at(key) is not None
+
+    def written_at(self, key: str) -> Optional[float]:
+        try:
+            stat = self.client.stat_object(self.bucket, BLOB_PREFIX + key)
+        except S3Error as e:
+            if e.code in ("NoSuchKey", "NoSuchObject"):
+                return None
+            raise
+        return stat.last_modified.timestamp()
+
+    def put(self, key: str, data: bytes, content_type: str = "application/octet-stream") -> None:
+        # Objects cannot be touched, so existing ones are rewritten to
+        # refresh their write time
+        self.client.put_object(
+            self.bucket, BLOB_PREFIX + key, io.BytesIO(data), len(data), content_type=content_type
+        )
+
+    def get(self, key: str) -> bytes:
+        try:
+            response = self.client.get_object(self.bucket, BLOB_PREFIX + key)
+        except S3Error as e:
+            if e.code in ("NoSuchKey", "NoSuchObject"):
+                raise KeyError(key) from None
+            raise
+        try:
+            return response.read()
+        finally:
+            response.close()
+            response.release_conn()
+
+    def delete(self, key: str) -> None:
+        # Removing a missing object succeeds
+        self.client.remove_object(self.bucket, BLOB_PREFIX + key)
@@ -30,10 +30,34 @@ class Settings(BaseSettings):
     # Redis
     REDIS_URL: str = "redis://localhost:6380/0"
 
+    # Authenticated user cache
+    USER_CACHE_TTL_SECONDS: int = 300
+    USER_CACHE_LOCAL_TTL_SECONDS: int = 30
+    USER_CACHE_MAX_ENTRIES: int = 10000
+
+    # List endpoints
+    LIST_COUNT_CACHE_TTL_SECONDS: int = 60
+    EXPORT_BATCH_SIZE: int = 2000  # rows fetched per server-side cursor batch
+
+    # Risk methodology (per-project compiled lookup tables)
+    RISK_METHODOLOGY_CACHE_TTL_SECONDS: int = 30
+
     # Neo4j
     NEO4J_URI: str = "bolt://localhost:7687"
     NEO4J_USER: str = "neo4j"
     NEO4J_PASSWORD: str = "neo4jpass"
+    NEO4J_DATABASE: Optional[str] = None
+    NEO4J_BATCH_SIZE: int = 5000  # rows per UNWIND transaction
+
+    # Graph queries: "memory" (in-process mirror) or "neo4j"
+    GRAPH_BACKEND: str = "memory"
+    GRAPH_SYNC_BATCH_SIZE: int = 5000  # change log rows replayed per batch
+    CHANGE_LOG_GAP_SECONDS: int = 300  # longest a writing transaction may take to commit its change log rows
+    CHANGE_LOG_RETENTION_SECONDS: int = 24 * 3600  # applied change log rows are pruned after this
+    CHANGE_LOG_SYNC_INTERVAL_SECONDS: int = 5  # background replay into the graph and search backends
+    GRAPH_MAX_PATH_LENGTH: int = 8
+    GRAPH_LAYOUT_CACHE_TTL_SECONDS: int = 3600
+    GRAPH_VIEW_MAX_ITEMS: int = 500  # items returned per viewport before aggregating
 
     # Milvus
     MILVUS_HOST: str = "localhost"
@@ -42,6 +66,16 @@ class Settings(BaseSettings):
     # Elasticsearch
     ELASTICSEARCH_HOST: str = "http://localhost:9200"
 
+    # Full-text search over documents and threats: "sqlite" (local FTS5) or "elasticsearch"
+    SEARCH_BACKEND: str = "sqlite"
+    SEARCH_SQLITE_PATH: str = "/tmp/tara-documents/search.db"
+    SEARCH_INDEX_PREFIX: str = "tara-search"
+    SEARCH_BATCH_SIZE: int = 1000  # entries and change log rows per batch
+    SEARCH_PASSAGE_CHARS: int = 800  # document text is indexed in passages of this size
+    SEARCH_SNIPPET_CHARS: int = 160
+    SEARCH_RANK_WINDOW: int = 5000  # local backend: broader queries rank only the newest matches
+    SEARCH_SYNC_LOCK_SECONDS: int = 600  # one worker at a time syncs an index; a lost holder expires
+
     # MinIO
     MINIO_ENDPOINT: str = "localhost:9000"
     MINIO_ACCESS_KEY: str = "minioadmin"
@@ -49,6 +83,15 @@ class Settings(BaseSettings):
     MINIO_BUCKET: str = "tara-documents"
     MINIO_SECURE: bool = False
 
+    # Blob storage for parse artifacts such as extracted images; "local" is
+    # only shared by workers on one host
+    BLOB_BACKEND: str = "minio"  # local | minio
+    BLOB_STORAGE_DIR: str = "/tmp/tara-documents/blobs"
+    # Blobs no document references are deleted this long after release, so
+    # reads of a replaced parse result can finish
+    PARSE_BLOB_GRACE_SECONDS: int = 3600
+    PARSE_BLOB_SWEEP_INTERVAL_SECONDS: int = 600
+
     # Kafka
     KAFKA_BOOTSTRAP_SERVERS: str = "localhost:9092"
 
@@ -58,17 +101,66 @@ class Settings(BaseSettings):
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 60
     REFRESH_TOKEN_EXPIRE_DAYS: int = 7
 
+    # Password hashing
+    BCRYPT_ROUNDS: int = 12
+    PASSWORD_HASH_WORKERS: int = 4
+    PASSWORD_HASH_MAX_PENDING: int = 64
+
     # Qwen API
     QWEN_API_KEY: Optional[str] = None
     QWEN_BASE_URL: str = "https://dashscope.aliyuncs.com/compatible-mode/v1"
 
+    # Vision preprocessing (architecture diagrams)
+    VISION_MAX_PIXELS: int = 1280 * 28 * 28  # pixels per image sent; more is downscaled by the model anyway
+    VISION_PATCH_SIZE: int = 28  # sent sizes are multiples of the model's patch size
+    VISION_TILE_MIN_PIXELS: int = 4 * 1280 * 28 * 28  # larger diagrams are split into tiles
+    VISION_MAX_TILES: int = 6
+    VISION_TILE_OVERLAP: float = 0.1  # fraction of a tile shared with its neighbours
+    VISION_JPEG_QUALITY: int = 85
+    VISION_MAX_CONCURRENCY: int = 4  # parallel vision calls per diagram
+    VISION_CACHE_TTL_SECONDS: int = 7 * 24 * 3600
+
+    # Asset identification pipeline (parse -> chunk -> identify -> dedupe -> persist)
+    IDENTIFY_CHUNK_CHARS: int = 8000  # text per identification call; the prompt keeps 10000
+    IDENTIFY_CHAPTER_LEVEL: int = 1  # headings up to this level start a new chunk
+    IDENTIFY_CONCURRENCY: int = 3  # parallel identification calls per document
+    IDENTIFY_QUEUE_SIZE: int = 4  # items buffered between stages before upstream waits
+    IDENTIFY_TASK_TTL_SECONDS: int = 24 * 3600  # identification task statuses are kept this long
+
     # File Upload
     MAX_UPLOAD_SIZE: int = 50 * 1024 * 1024  # 50MB
     ALLOWED_EXTENSIONS: list[str] = [
-        ".doc", ".docx", ".pdf", ".xlsx", ".xls",
+        ".doc", ".docx", ".pdf", ".xlsx", ".xls", ".csv",
         ".ppt", ".pptx", ".png", ".jpg", ".jpeg"
     ]
 
+    # Document parsing
+    PARSE_WORKERS: int = 4  # threads for blocking parse work, e.g. one slide each
+    PARSER_WARMUP: bool = False  # load every parser at startup, for processes that parse
+    IMAGE_MIN_DIMENSION: int = 32  # extracted images narrower or shorter than this (px) are dropped
+    PDF_STREAM_PAGES: int = 10  # pages per fragment when a PDF is parsed as a stream
+
+    # Parse results: zstd segments in blob storage, a manifest in the documents row
+    PARSE_RESULT_SEGMENT_BYTES: int = 256 * 1024  # uncompressed JSON per stored segment
+    PARSE_RESULT_ZSTD_LEVEL: int = 3
+
+    # PDF table detection: "off", "fast" (only pages with ruling lines) or "full"
+    PDF_TABLE_MODE: str = "fast"
+    PDF_TABLE_MODE_BY_CATEGORY: dict[str, str] = {
+        "communication_matrix": "full",
+        "interface_definition": "full",
+        "asset_list": "full",
+    }
+
+    # Spreadsheet parsing
+    EXCEL_PREVIEW_ROWS: int = 10  # rows per sheet copied into the searchable text block
+    EXCEL_MAX_ROWS_PER_SHEET: Optional[int] = None  # rows kept per sheet table; None keeps all
+
+    # Attack trees
+    ATTACK_TREE_FONT_PATH: Optional[str] = None  # TrueType font with CJK glyphs for PNG output
+    ATTACK_TREE_MAX_PNG_WIDTH: int = 8000
+    ATTACK_TREE_CACHE_TTL_SECONDS: int = 3600  # built trees are also rebuilt after project changes
+
 
 @lru_cache()
 def get_settings() -> Settings:
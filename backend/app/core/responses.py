@@ -0,0 +1,119 @@
+"""JSON response classes and the trusted route class."""
+
+import functools
+import inspect
+import time
+from decimal import Decimal
+from typing import Any, Callable, Optional
+
+import orjson
+from fastapi.responses import JSONResponse
+from fastapi.routing import APIRoute
+from pydantic import BaseModel
+from pydantic_core import PydanticSerializationError
+
+# Route options that filter the response model output; routes using them
+# always take FastAPI's validating path
+RESPONSE_MODEL_OPTIONS = (
+    "response_model_include",
+    "response_model_exclude",
+    "response_model_exclude_unset",
+    "response_model_exclude_defaults",
+    "response_model_exclude_none",
+)
+
+
+def _default(obj: Any) -> Any:
+    """Serialize types orjson does not handle natively."""
+    if isinstance(obj, Decimal):
+        # Pydantic's JSON mode also keeps decimals as strings, without rounding
+        return str(obj)
+    if isinstance(obj, BaseModel):
+        return obj.model_dump(mode="json")
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+class ORJSONResponse(JSONResponse):
+    """JSON response encoded with orjson.
+
+    Returning an instance from an endpoint skips FastAPI's response-model
+    validation and ``jsonable_encoder``, so content must already match the
+    declared ``response_model``. datetimes are encoded as ISO 8601 like
+    Pydantic does. A model passed as content is serialized by Pydantic
+    directly to JSON.
+    """
+
+    def render(self, content: Any) -> bytes:
+        if isinstance(content, BaseModel):
+            return content.__pydantic_serializer__.to_json(content, by_alias=True)
+        return orjson.dumps(
+            content,
+            default=_default,
+            option=orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_UTC_Z,
+        )
+
+
+def _trusted(endpoint: Callable[..., Any], status_code: Optional[int]) -> Callable[..., Any]:
+    @functools.wraps(endpoint)
+    async def call(*args: Any, **kwargs: Any) -> Any:
+        result = await endpoint(*args, **kwargs)
+        if isinstance(result, BaseModel):
+            try:
+                return ORJSONResponse(result, status_code=status_code or 200)
+            except PydanticSerializationError:
+                # e.g. ORM objects in ``data``; validation converts them
+                pass
+        return result
+
+    call.__trusted__ = True
+    return call
+
+
+class TrustedRoute(APIRoute):
+    """Route whose endpoints return fully built response models.
+
+    A model returned by the endpoint was validated when it was constructed,
+    so it is serialized straight to JSON instead of being dumped and
+    re-validated against ``response_model``. The response model still
+    drives the OpenAPI schema, but it no longer filters the output: the
+    endpoint must build the declared schema types. Other return values,
+    and models that cannot be serialized as is, take FastAPI's normal path.
+    Headers set on an injected ``Response`` are not applied to bypassed
+    responses.
+    """
+
+    def __init__(self, path: str, endpoint: Callable[..., Any], **kwargs: Any):
+        if (
+            inspect.iscoroutinefunction(endpoint)
+            and not getattr(endpoint, "__trusted__", False)
+            and not any(kwargs.get(option) for option in RESPONSE_MODEL_OPTIONS)
+        ):
+            endpoint = _trusted(endpoint, kwargs.get("status_code"))
+        super().__init__(path, endpoint, **kwargs)
+
+
+def envelope(data: Any = None, message: str = "success", code: int = 0) -> dict[str, Any]:
+    """Build the standard ``ResponseModel`` envelope as a plain dict."""
+    return {
+        "code": code,
+        "message": message,
+        "data": data,
+        "timestamp": int(time.time() * 1000),
+    }
+
+
+def paginated(
+    items: list[Any],
+    total: Optional[int],
+    page: int,
+    page_size: int,
+    next_cursor: Optional[str] = None,
+) -> dict[str, Any]:
+    """Build a ``PaginatedResponse`` payload as a plain dict."""
+    return {
+        "items": items,
+        "total": total,
+        "page": page,
+        "page_size": page_size,
+        "next_cursor": next_cursor,
+    }
@@ -1,7 +1,10 @@
 """Security utilities for authentication and authorization."""
 
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta, timezone
-from typing import Any, Optional
+from typing import Any, Callable, Optional, TypeVar
 
 import bcrypt
 from jose import JWTError, jwt
@@ -10,6 +13,8 @@ from app.core.config import get_settings
 
 settings = get_settings()
 
+T = TypeVar("T")
+
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     """Verify a plain password against a hashed password."""
@@ -23,10 +28,104 @@ def get_password_hash(password: str) -> str:
     """Hash a password using bcrypt."""
     return bcrypt.hashpw(
         password.encode('utf-8'),
-        bcrypt.gensalt()
+        bcrypt.gensalt(rounds=settings.BCRYPT_ROUNDS)
     ).decode('utf-8')
 
 
+class PasswordHashExecutor:
+    """Bounded thread pool for bcrypt work.
+
+    bcrypt is deliberately slow (~100-300ms per call) and releases the GIL, so
+    running it on a dedicated pool keeps the event loop responsive during login
+    bursts. At most ``max_pending`` operations are queued or running; further
+    callers wait for a slot instead of growing the queue without bound.
+    """
+
+    def __init__(self, max_workers: int, max_pending: int):
+        self.max_workers = max_workers
+        self.max_pending = max_pending
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._slots: Optional[asyncio.Semaphore] = None
+        self.pending = 0
+        self.running = 0
+        self.completed = 0
+        # ``running`` is updated from the worker threads
+        self._running_lock = threading.Lock()
+        self.peak_pending = 0
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(
+                max_workers=self.max_workers,
+                thread_name_prefix="password-hash",
+            )
+        return self._executor
+
+    def _get_slots(self) -> asyncio.Semaphore:
+        if self._slots is None:
+            self._slots = asyncio.Semaphore(self.max_pending)
+        return self._slots
+
+    def _run(self, func: Callable[..., T], *args: Any) -> T:
+        with self._running_lock:
+            self.running += 1
+        try:
+            return func(*args)
+        finally:
+            with self._running_lock:
+                self.running -= 1
+
+    async def run(self, func: Callable[..., T], *args: Any) -> T:
+        """Run ``func(*args)`` on the pool once a queue slot is available."""
+        async with self._get_slots():
+            self.pending += 1
+            self.peak_pending = max(self.peak_pending, self.pending)
+            try:
+                loop = asyncio.get_running_loop()
+                return await loop.run_in_executor(self._get_executor(), self._run, func, *args)
+            finally:
+                self.pending -= 1
+                self.completed += 1
+
+    def stats(self) -> dict[str, int]:
+        """Return queue depth and throughput counters."""
+        with self._running_lock:
+            running = self.running
+        return {
+            "workers": self.max_workers,
+            "max_pending": self.max_pending,
+            "pending": self.pending,
+            "queued": max(self.pending - running, 0),
+            "running": running,
+            "peak_pending": self.peak_pending,
+            "completed": self.completed,
+        }
+
+    def shutdown(self) -> None:
+        """Shut down the worker threads."""
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+            self._executor = None
+        self._slots = None
+
+
+# Global password hashing pool
+password_hasher = PasswordHashExecutor(
+    max_workers=settings.PASSWORD_HASH_WORKERS,
+    max_pending=settings.PASSWORD_HASH_MAX_PENDING,
+)
+
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    """Verify a password on the password hashing pool."""
+    return await password_hasher.run(verify_password, plain_password, hashed_password)
+
+
+async def get_password_hash_async(password: str) -> str:
+    """Hash a password on the password hashing pool."""
+    return await password_hasher.run(get_password_hash, password)
+
+
 def create_access_token(
     data: dict[str, Any],
     expires_delta: Optional[timedelta] = None
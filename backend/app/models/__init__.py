@@ -2,12 +2,13 @@
 
 from app.models.user import User, Role, Permission, UserRole, RolePermission
 from app.models.project import Project, ProjectVersion, ProjectMember, ProjectConfig
-from app.models.document import Document
+from app.models.document import Document, DocumentBlob
 from app.models.asset import Asset, AssetRelation
 from app.models.threat import ThreatScenario, SecurityMitigation
 from app.models.report import Report
 from app.models.knowledge import KbWp29Threat, KbAttackPattern, KbSecurityRequirement
 from app.models.audit import AuditLog
+from app.models.graph import GraphChange
 
 __all__ = [
     "User",
@@ -20,6 +21,7 @@ __all__ = [
     "ProjectMember",
     "ProjectConfig",
     "Document",
+    "DocumentBlob",
     "Asset",
     "AssetRelation",
     "ThreatScenario",
@@ -29,4 +31,5 @@ __all__ = [
     "KbAttackPattern",
     "KbSecurityRequirement",
     "AuditLog",
+    "GraphChange",
 ]
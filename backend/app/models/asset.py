@@ -2,7 +2,7 @@
 
 from typing import TYPE_CHECKING, List, Optional
 
-from sqlalchemy import Boolean, ForeignKey, String, Text
+from sqlalchemy import Boolean, ForeignKey, Index, String, Text
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from app.core.database import Base
@@ -75,6 +75,10 @@ class Asset(Base, TimestampMixin):
     )
 
     __table_args__ = (
+        # Keyset pagination and the filter combinations used by list_assets
+        Index("ix_asset_project_asset_id", "project_id", "asset_id", "id"),
+        Index("ix_asset_project_category", "project_id", "category", "asset_id", "id"),
+        Index("ix_asset_project_confirmed", "project_id", "is_confirmed", "asset_id", "id"),
         {"mysql_charset": "utf8mb4"},
     )
 
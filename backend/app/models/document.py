@@ -1,8 +1,9 @@
 """Document management models."""
 
+from datetime import datetime
 from typing import TYPE_CHECKING, Optional
 
-from sqlalchemy import BigInteger, Enum, ForeignKey, JSON, String, Text
+from sqlalchemy import BigInteger, DateTime, Enum, ForeignKey, Index, Integer, JSON, String, Text
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from app.core.database import Base
@@ -54,7 +55,9 @@ class Document(Base, TimestampMixin):
         nullable=False,
         index=True
     )
-    parse_result: Mapped[Optional[dict]] = mapped_column(JSON, nullable=True)
+    # Manifest of the segments in blob storage (see parse_result_store); only
+    # loaded when accessed, so document queries never carry it
+    parse_result: Mapped[Optional[dict]] = mapped_column(JSON, nullable=True, deferred=True)
     parse_error: Mapped[Optional[str]] = mapped_column(Text, nullable=True)
     uploaded_by: Mapped[int] = mapped_column(
         ForeignKey("users.id"),
@@ -65,3 +68,28 @@ class Document(Base, TimestampMixin):
     project: Mapped["Project"] = relationship("Project", back_populates="documents")
     version: Mapped[Optional["ProjectVersion"]] = relationship("ProjectVersion")
     uploader: Mapped["User"] = relationship("User")
+
+    __table_args__ = (
+        # Keyset pagination for list_documents (newest first)
+        Index("ix_document_project_created", "project_id", "created_at", "id"),
+    )
+
+
+class DocumentBlob(Base):
+    """Blob referenced by a document's parse result.
+
+    Segments and extracted images are stored once per content hash and may
+    be shared by documents, so a blob is deleted only when no document
+    references it any more (see ``parse_result_store.sweep_parse_blobs``).
+    A re-parse or delete releases the document's references; ``document_id``
+    has no foreign key, so references of documents deleted with their
+    project are kept until the sweep releases them.
+    """
+
+    __tablename__ = "document_blobs"
+
+    id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
+    document_id: Mapped[int] = mapped_column(Integer, nullable=False, index=True)
+    blob_key: Mapped[str] = mapped_column(String(100), nullable=False, index=True)
+    # Set when the reference is dropped; NULL while the parse result is current
+    released_at: Mapped[Optional[datetime]] = mapped_column(DateTime, nullable=True, index=True)
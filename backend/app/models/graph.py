@@ -0,0 +1,32 @@
+"""Graph synchronisation models."""
+
+from datetime import datetime
+from typing import Optional
+
+from sqlalchemy import DateTime, Integer, String, func
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.core.database import Base
+
+
+class GraphChange(Base):
+    """Change log entry for mirroring assets, relations and threats into
+    the graph backend.
+
+    Rows are written in the same transaction as the change they describe
+    and replayed in id order by the graph sync service; the search index
+    replays the threat and project entries the same way. ``entity_id`` is
+    empty for ``resync`` entries, which reload every row of the entity type
+    in the project (or in all projects when ``project_id`` is empty too).
+    ``log``/``pruned`` entries mark the id through which applied entries
+    were pruned (see ``change_log``).
+    """
+
+    __tablename__ = "graph_changes"
+
+    id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
+    project_id: Mapped[Optional[int]] = mapped_column(Integer, nullable=True, index=True)
+    entity_type: Mapped[str] = mapped_column(String(20), nullable=False)  # asset/relation/threat/project/log
+    entity_id: Mapped[Optional[int]] = mapped_column(Integer, nullable=True)
+    op: Mapped[str] = mapped_column(String(10), nullable=False)  # upsert/delete/resync/pruned
+    created_at: Mapped[datetime] = mapped_column(DateTime, default=func.now(), nullable=False)
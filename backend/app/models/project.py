@@ -3,8 +3,8 @@
 from datetime import datetime
 from typing import TYPE_CHECKING, List, Optional
 
-from sqlalchemy import DateTime, Enum, ForeignKey, JSON, String, Text
-from sqlalchemy.orm import Mapped, mapped_column, relationship
+from sqlalchemy import DateTime, Enum, ForeignKey, Index, JSON, String, Text, func
+from sqlalchemy.orm import Mapped, column_property, mapped_column, relationship
 
 from app.core.database import Base
 from app.models.base import TimestampMixin
@@ -82,6 +82,17 @@ class Project(Base, TimestampMixin):
     )
 
 
+# Last activity, for list_projects' keyset (most recently updated first):
+# updated_at is nullable, and NULL rows would drop out of a keyset on it
+Project.activity_at = column_property(
+    func.coalesce(Project.__table__.c.updated_at, Project.__table__.c.created_at)
+)
+Index(
+    "ix_project_activity",
+    func.coalesce(Project.__table__.c.updated_at, Project.__table__.c.created_at),
+    Project.__table__.c.id,
+)
+
 class ProjectVersion(Base, TimestampMixin):
     """Project version model."""
 
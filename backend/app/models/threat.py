@@ -2,7 +2,7 @@
 
 from typing import TYPE_CHECKING, List, Optional
 
-from sqlalchemy import Boolean, Enum, ForeignKey, Integer, String, Text
+from sqlalchemy import Boolean, Enum, ForeignKey, Index, Integer, String, Text
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from app.core.database import Base
@@ -62,11 +62,32 @@ class ThreatScenario(Base, TimestampMixin):
         Enum("Required", "None", name="user_interaction"),
         nullable=True
     )
-    attack_feasibility: Mapped[Optional[str]] = mapped_column(
-        Enum("High", "Medium", "Low", "Very Low", name="attack_feasibility"),
+    # Level labels come from the project's risk methodology
+    attack_feasibility: Mapped[Optional[str]] = mapped_column(String(50), nullable=True)
+    attack_feasibility_value: Mapped[Optional[int]] = mapped_column(Integer, nullable=True)
+
+    # Attack potential (ISO 21434 Annex G), alternative feasibility rating
+    elapsed_time: Mapped[Optional[str]] = mapped_column(
+        Enum("<=1 day", "<=1 week", "<=1 month", "<=6 months", ">6 months", name="elapsed_time"),
         nullable=True
     )
-    attack_feasibility_value: Mapped[Optional[int]] = mapped_column(Integer, nullable=True)
+    specialist_expertise: Mapped[Optional[str]] = mapped_column(
+        Enum("Layman", "Proficient", "Expert", "Multiple experts", name="specialist_expertise"),
+        nullable=True
+    )
+    knowledge_of_item: Mapped[Optional[str]] = mapped_column(
+        Enum("Public", "Restricted", "Confidential", "Strictly confidential", name="knowledge_of_item"),
+        nullable=True
+    )
+    window_of_opportunity: Mapped[Optional[str]] = mapped_column(
+        Enum("Unlimited", "Easy", "Moderate", "Difficult", name="window_of_opportunity"),
+        nullable=True
+    )
+    equipment: Mapped[Optional[str]] = mapped_column(
+        Enum("Standard", "Specialized", "Bespoke", "Multiple bespoke", name="equipment"),
+        nullable=True
+    )
+    attack_potential: Mapped[Optional[int]] = mapped_column(Integer, nullable=True)
 
     # Impact analysis
     impact_safety: Mapped[Optional[str]] = mapped_column(
@@ -85,10 +106,7 @@ class ThreatScenario(Base, TimestampMixin):
         Enum("P0", "P1", "P2", "P3", name="impact_privacy"),
         nullable=True
     )
-    impact_level: Mapped[Optional[str]] = mapped_column(
-        Enum("Negligible", "Moderate", "Major", "Severe", name="impact_level"),
-        nullable=True
-    )
+    impact_level: Mapped[Optional[str]] = mapped_column(String(50), nullable=True)
     impact_level_value: Mapped[Optional[int]] = mapped_column(Integer, nullable=True)
 
     # Risk assessment
@@ -115,6 +133,15 @@ class ThreatScenario(Base, TimestampMixin):
         cascade="all, delete-orphan"
     )
 
+    __table_args__ = (
+        # Keyset pagination and the filter combinations used by list_threats
+        Index("ix_threat_project_threat_id", "project_id", "threat_id", "id"),
+        Index("ix_threat_project_asset", "project_id", "asset_id", "threat_id", "id"),
+        Index("ix_threat_project_stride", "project_id", "stride_type", "threat_id", "id"),
+        Index("ix_threat_project_risk", "project_id", "risk_level", "threat_id", "id"),
+        Index("ix_threat_project_confirmed", "project_id", "is_confirmed", "threat_id", "id"),
+    )
+
 
 class SecurityMitigation(Base, TimestampMixin):
     """Security mitigation model."""
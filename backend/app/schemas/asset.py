@@ -85,6 +85,76 @@ class AssetResponse(BaseModel):
     updated_at: Optional[datetime] = None
 
 
+class AssetImportRequest(BaseModel):
+    """Schema for importing assets from a parsed asset-list document."""
+
+    document_id: int
+    update_existing: bool = Field(True, description="Update assets whose asset ID already exists")
+
+
+class AssetImportError(BaseModel):
+    """Schema for a rejected import row."""
+
+    table: int
+    row: int
+    message: str
+
+
+class AssetImportResponse(BaseModel):
+    """Schema for asset import result."""
+
+    created: int = 0
+    updated: int = 0
+    skipped: int = 0
+    errors: List[AssetImportError] = Field(default_factory=list)
+
+
+class PipelineStageMetrics(BaseModel):
+    """Counters of one stage of the identification pipeline."""
+
+    name: str
+    workers: int
+    processed: int
+    emitted: int
+    busy_seconds: float
+    elapsed_seconds: float
+    throughput: float = Field(..., description="Items processed per second")
+    max_queue_depth: int
+    mean_queue_depth: float
+
+
+class AssetIdentificationResult(BaseModel):
+    """Schema for the identification result of one document."""
+
+    document_id: int
+    identified: int = 0
+    created: int = 0
+    skipped: int = 0
+    errors: List[str] = Field(default_factory=list)
+    elapsed_seconds: float
+    stages: List[PipelineStageMetrics] = Field(default_factory=list)
+
+
+class AssetIdentificationResponse(BaseModel):
+    """Schema for asset identification result."""
+
+    created: int = 0
+    documents: List[AssetIdentificationResult] = Field(default_factory=list)
+
+
+class AssetIdentificationTask(BaseModel):
+    """Schema for a background asset identification task."""
+
+    task_id: str
+    project_id: int
+    status: str = Field(..., description="pending, running, completed or failed")
+    document_ids: List[int] = Field(default_factory=list)
+    result: Optional[AssetIdentificationResponse] = Field(
+        None, description="Results of the documents done so far"
+    )
+    error: Optional[str] = None
+
+
 class AssetRelationCreate(BaseModel):
     """Schema for creating an asset relation."""
 
@@ -134,3 +204,82 @@ class AssetGraphResponse(BaseModel):
 
     nodes: List[AssetGraphNode] = Field(default_factory=list)
     edges: List[AssetGraphEdge] = Field(default_factory=list)
+
+
+class AttackPath(BaseModel):
+    """Schema for a path from an entry point to a target asset."""
+
+    cost: float
+    hops: int
+    nodes: List[AssetGraphNode] = Field(default_factory=list)
+
+
+class AttackPathResponse(BaseModel):
+    """Schema for attack path query response."""
+
+    target: AssetGraphNode
+    weighted: bool
+    paths: List[AttackPath] = Field(default_factory=list)
+
+
+class ImpactedAsset(AssetGraphNode):
+    """Schema for an asset within the impact range of another."""
+
+    depth: int
+
+
+class ImpactRangeResponse(BaseModel):
+    """Schema for impact range query response."""
+
+    source: AssetGraphNode
+    assets: List[ImpactedAsset] = Field(default_factory=list)
+
+
+class GraphLayoutNode(AssetGraphNode):
+    """Schema for a positioned asset graph node."""
+
+    x: float
+    y: float
+
+
+class GraphBounds(BaseModel):
+    """Schema for a layout bounding box."""
+
+    x0: float
+    y0: float
+    x1: float
+    y1: float
+
+
+class GraphCluster(BaseModel):
+    """Schema for an aggregated category/subcategory cluster."""
+
+    id: str
+    category: str
+    subcategory: Optional[str] = None
+    count: int
+    x: float
+    y: float
+    radius: float
+
+
+class GraphViewEdge(BaseModel):
+    """Schema for an edge between nodes or clusters."""
+
+    source: str
+    target: str
+    count: int = 1
+    type: Optional[str] = None
+    protocol: Optional[str] = None
+
+
+class GraphViewResponse(BaseModel):
+    """Schema for a level-of-detail graph viewport response."""
+
+    algorithm: str
+    level: str
+    bounds: GraphBounds
+    truncated: bool = False
+    clusters: List[GraphCluster] = Field(default_factory=list)
+    nodes: List[GraphLayoutNode] = Field(default_factory=list)
+    edges: List[GraphViewEdge] = Field(default_factory=list)
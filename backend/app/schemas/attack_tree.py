@@ -0,0 +1,41 @@
+"""Attack tree Pydantic schemas."""
+
+from typing import List, Optional
+
+from pydantic import BaseModel, Field
+
+
+class AttackTreeNodeResponse(BaseModel):
+    """Schema for one attack tree node."""
+
+    index: int
+    label: str
+    gate: str
+    children: List[int] = Field(default_factory=list)
+    feasibility: Optional[int] = None
+    feasibility_label: Optional[str] = None
+    threat_id: Optional[int] = None
+    asset_id: Optional[int] = None
+
+
+class AttackTreeSummary(BaseModel):
+    """Schema for an attack tree in list responses."""
+
+    tree_id: str
+    title: str
+    threat_count: int = 0
+    node_count: int = 0
+    feasibility: Optional[int] = None
+    feasibility_label: Optional[str] = None
+
+
+class AttackTreeResponse(BaseModel):
+    """Schema for a full attack tree."""
+
+    tree_id: str
+    title: str
+    threat_count: int = 0
+    feasibility: Optional[int] = None
+    feasibility_label: Optional[str] = None
+    root: Optional[int] = None
+    nodes: List[AttackTreeNodeResponse] = Field(default_factory=list)
@@ -24,9 +24,16 @@ class PaginatedResponse(BaseModel, Generic[T]):
     """Paginated response model."""
 
     items: List[T] = Field(default_factory=list, description="List of items")
-    total: int = Field(default=0, description="Total count")
+    total: Optional[int] = Field(
+        default=0,
+        description="Total count (null in cursor mode unless include_total is set)"
+    )
     page: int = Field(default=1, description="Current page")
     page_size: int = Field(default=20, description="Page size")
+    next_cursor: Optional[str] = Field(
+        default=None,
+        description="Cursor for the next page in cursor mode, null on the last page"
+    )
 
 
 class Token(BaseModel):
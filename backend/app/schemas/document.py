@@ -49,8 +49,28 @@ class DocumentParseResult(BaseModel):
 
     text_blocks: List[str] = Field(default_factory=list)
     tables: List[List[List[str]]] = Field(default_factory=list)
-    images: List[str] = Field(default_factory=list)
+    images: List[Dict[str, Any]] = Field(default_factory=list)
     metadata: Dict[str, Any] = Field(default_factory=dict)
+    blocks: List[Dict[str, Any]] = Field(default_factory=list)
+
+
+class ParseResultSummary(BaseModel):
+    """Metadata and section sizes of a stored parse result."""
+
+    metadata: Dict[str, Any] = Field(default_factory=dict)
+    image_urls: List[str] = Field(default_factory=list)
+    counts: Dict[str, int] = Field(default_factory=dict)
+
+
+class ParseResultPage(BaseModel):
+    """A range of one parse result section."""
+
+    document_id: int
+    section: str
+    offset: int
+    limit: int
+    total: int
+    items: List[Any] = Field(default_factory=list)
 
 
 class ParsedContentResponse(BaseModel):
@@ -1,9 +1,9 @@
 """Project-related Pydantic schemas."""
 
 from datetime import datetime
-from typing import List, Optional
+from typing import Dict, List, Literal, Optional
 
-from pydantic import BaseModel, ConfigDict, Field
+from pydantic import BaseModel, ConfigDict, Field, model_validator
 
 
 class ProjectBase(BaseModel):
@@ -37,6 +37,94 @@ class ProjectConfigUpdate(BaseModel):
     config_json: Optional[dict] = None
 
 
+# Threat columns rated by each feasibility model, in table axis order
+CVSS_FACTORS = ("attack_vector", "attack_complexity", "privileges_required", "user_interaction")
+ATTACK_POTENTIAL_FACTORS = (
+    "elapsed_time",
+    "specialist_expertise",
+    "knowledge_of_item",
+    "window_of_opportunity",
+    "equipment",
+)
+FEASIBILITY_FACTORS = {"cvss": CVSS_FACTORS, "attack_potential": ATTACK_POTENTIAL_FACTORS}
+
+
+class FeasibilityDefinition(BaseModel):
+    """Attack feasibility rating: factor scores summed and banded into levels."""
+
+    # "cvss" rates attack vector/complexity/privileges/interaction,
+    # "attack_potential" the ISO 21434 Annex G factors
+    model: Literal["cvss", "attack_potential"] = "cvss"
+    # Parameter name -> label -> score; labels are the threat column values
+    # (e.g. "Network"), unknown labels score 0
+    factors: Dict[str, Dict[str, int]]
+    # Inclusive upper bound of the summed score for each band, ascending;
+    # sums above the last bound fall into the last band
+    thresholds: List[int] = Field(..., min_length=1)
+    # Label of each band
+    labels: List[str] = Field(..., min_length=1)
+    # Feasibility level (risk matrix row) of each band; defaults to the band
+    # index, i.e. a higher score means a more feasible attack
+    levels: Optional[List[int]] = None
+
+    @model_validator(mode="after")
+    def check_levels(self) -> "FeasibilityDefinition":
+        expected = FEASIBILITY_FACTORS[self.model]
+        if set(self.factors) != set(expected):
+            raise ValueError(f"{self.model} feasibility factors must be exactly {', '.join(expected)}")
+        if len(self.thresholds) != len(self.labels):
+            raise ValueError("feasibility thresholds and labels must have the same length")
+        if self.thresholds != sorted(self.thresholds):
+            raise ValueError("feasibility thresholds must be ascending")
+        if self.levels is not None and sorted(self.levels) != list(range(len(self.labels))):
+            raise ValueError("feasibility levels must be a permutation of the band indexes")
+        return self
+
+    @property
+    def band_levels(self) -> List[int]:
+        return self.levels if self.levels is not None else list(range(len(self.labels)))
+
+
+class ImpactDefinition(BaseModel):
+    """Impact rating: each dimension label (e.g. "S2") maps to a level, the max wins."""
+
+    values: Dict[str, int]
+    labels: List[str] = Field(..., min_length=1)
+
+    @model_validator(mode="after")
+    def check_values(self) -> "ImpactDefinition":
+        for label, level in self.values.items():
+            if not 0 <= level < len(self.labels):
+                raise ValueError(f"impact level of {label!r} out of range")
+        return self
+
+
+class RiskMethodology(BaseModel):
+    """Risk methodology stored under ``config_json["risk_methodology"]``."""
+
+    name: str = "default"
+    feasibility: FeasibilityDefinition
+    impact: ImpactDefinition
+    # risk_matrix[feasibility level][impact level] -> risk level
+    risk_matrix: List[List[int]]
+    risk_labels: Dict[int, str]
+    # Lowest risk level counted as high risk; by default the top two levels
+    high_risk_level: Optional[int] = None
+
+    @model_validator(mode="after")
+    def check_matrix(self) -> "RiskMethodology":
+        rows, cols = len(self.feasibility.labels), len(self.impact.labels)
+        if len(self.risk_matrix) != rows or any(len(row) != cols for row in self.risk_matrix):
+            raise ValueError(f"risk_matrix must be {rows}x{cols} (feasibility x impact levels)")
+        return self
+
+    @property
+    def high_risk_threshold(self) -> int:
+        if self.high_risk_level is not None:
+            return self.high_risk_level
+        return max(max(row) for row in self.risk_matrix) - 1
+
+
 class ProjectResponse(BaseModel):
     """Schema for project response."""
 
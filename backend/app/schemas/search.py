@@ -0,0 +1,24 @@
+"""Full-text search schemas."""
+
+from typing import List
+
+from pydantic import BaseModel, Field
+
+
+class SearchHit(BaseModel):
+    """One matching document passage or threat."""
+
+    kind: str = Field(..., description="document or threat")
+    entity_id: int = Field(..., description="Document or threat scenario ID")
+    position: int = Field(0, description="Text block index within the document's parse result")
+    title: str
+    score: float
+    snippet: str = Field(..., description="HTML-escaped excerpt with matches in <mark> tags")
+
+
+class SearchResponse(BaseModel):
+    """Search results, best matches first."""
+
+    query: str
+    total: int
+    hits: List[SearchHit] = Field(default_factory=list)
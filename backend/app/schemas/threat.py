@@ -30,6 +30,13 @@ class ThreatCreate(ThreatBase):
     privileges_required: Optional[str] = None
     user_interaction: Optional[str] = None
 
+    # Attack potential (ISO 21434 Annex G)
+    elapsed_time: Optional[str] = None
+    specialist_expertise: Optional[str] = None
+    knowledge_of_item: Optional[str] = None
+    window_of_opportunity: Optional[str] = None
+    equipment: Optional[str] = None
+
     # Impact
     impact_safety: Optional[str] = None
     impact_financial: Optional[str] = None
@@ -55,6 +62,13 @@ class ThreatUpdate(BaseModel):
     privileges_required: Optional[str] = None
     user_interaction: Optional[str] = None
 
+    # Attack potential (ISO 21434 Annex G)
+    elapsed_time: Optional[str] = None
+    specialist_expertise: Optional[str] = None
+    knowledge_of_item: Optional[str] = None
+    window_of_opportunity: Optional[str] = None
+    equipment: Optional[str] = None
+
     # Impact
     impact_safety: Optional[str] = None
     impact_financial: Optional[str] = None
@@ -99,6 +113,26 @@ class MitigationResponse(BaseModel):
     updated_at: Optional[datetime] = None
 
 
+class ThreatBulkItem(ThreatCreate):
+    """Schema for one threat in a bulk create request."""
+
+    mitigations: List[MitigationCreate] = Field(default_factory=list)
+
+
+class ThreatBulkCreate(BaseModel):
+    """Schema for creating many threats and their mitigations at once."""
+
+    threats: List[ThreatBulkItem] = Field(..., min_length=1, max_length=10000)
+    is_ai_generated: bool = False
+
+
+class ThreatBulkCreateResponse(BaseModel):
+    """Schema for bulk create result."""
+
+    created: int = 0
+    mitigations_created: int = 0
+
+
 class ThreatResponse(BaseModel):
     """Schema for threat response."""
 
@@ -126,6 +160,14 @@ class ThreatResponse(BaseModel):
     attack_feasibility: Optional[str] = None
     attack_feasibility_value: Optional[int] = None
 
+    # Attack potential (ISO 21434 Annex G)
+    elapsed_time: Optional[str] = None
+    specialist_expertise: Optional[str] = None
+    knowledge_of_item: Optional[str] = None
+    window_of_opportunity: Optional[str] = None
+    equipment: Optional[str] = None
+    attack_potential: Optional[int] = None
+
     # Impact
     impact_safety: Optional[str] = None
     impact_financial: Optional[str] = None
@@ -0,0 +1,365 @@
+"""In-process asset graph engine.
+
+Each project's assets and relations are held as a compressed sparse row
+(CSR) adjacency: ``indptr``/``indices`` integer arrays indexed by a dense
+node number. Snapshots support incremental relation and asset updates, so
+the in-memory graph backend keeps them current from the change log and
+attack-path (KG-102) and impact range (KG-103) queries never reload the
+project.
+
+Path costs come from threat feasibility: entering an asset costs
+``FEASIBILITY_LEVELS - f`` where ``f`` is the highest feasibility value of
+the threats against it, so easier targets make cheaper paths. Assets
+without rated threats cost as much as a Very Low rating.
+"""
+
+import heapq
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Set, Tuple
+
+import numpy as np
+
+from app.services.attack_tree import ENTRY_CATEGORIES
+
+# Number of feasibility levels (0=Very Low .. 3=High)
+FEASIBILITY_LEVELS = 4
+
+
+@dataclass
+class GraphPath:
+    """A path through the asset graph as dense node numbers."""
+
+    cost: float
+    nodes: List[int]
+
+    def __lt__(self, other: "GraphPath") -> bool:
+        return (self.cost, len(self.nodes), self.nodes) < (other.cost, len(other.nodes), other.nodes)
+
+
+@dataclass
+class AssetGraph:
+    """CSR snapshot of one project's asset graph."""
+
+    project_id: int
+    asset_ids: List[int]
+    names: List[str]
+    categories: List[str]
+    subcategories: List[Optional[str]]
+    indptr: np.ndarray
+    indices: np.ndarray
+    relation_ids: np.ndarray
+    relation_types: List[str]
+    protocols: List[Optional[str]]
+    # Highest threat feasibility per node, -1 when unrated; None until loaded
+    node_feasibility: Optional[np.ndarray] = None
+    index: Dict[int, int] = field(default_factory=dict)
+    _lists: Optional[Tuple[List[int], List[int]]] = None
+    _reverse: Optional[Tuple[np.ndarray, np.ndarray]] = None
+
+    def __post_init__(self):
+        self.index = {asset_id: i for i, asset_id in enumerate(self.asset_ids)}
+
+    @classmethod
+    def build(
+        cls,
+        project_id: int,
+        assets: Iterable[Sequence[Any]],
+        relations: Iterable[Sequence[Any]],
+    ) -> "AssetGraph":
+        """Build from ``(id, name, category, subcategory)`` asset rows and
+        ``(id, source_asset_id, target_asset_id, relation_type, protocol)``
+        relation rows."""
+        assets = list(assets)
+        index = {row[0]: i for i, row in enumerate(assets)}
+        edges = [row for row in relations if row[1] in index and row[2] in index]
+
+        sources = np.fromiter((index[row[1]] for row in edges), dtype=np.int64, count=len(edges))
+        order = np.argsort(sources, kind="stable")
+        indptr = np.zeros(len(assets) + 1, dtype=np.int64)
+        np.cumsum(np.bincount(sources, minlength=len(assets)), out=indptr[1:])
+        ordered = [edges[i] for i in order.tolist()]
+
+        return cls(
+            project_id=project_id,
+            asset_ids=[row[0] for row in assets],
+            names=[row[1] for row in assets],
+            categories=[row[2] for row in assets],
+            subcategories=[row[3] for row in assets],
+            indptr=indptr,
+            indices=np.fromiter((index[row[2]] for row in ordered), dtype=np.int32, count=len(ordered)),
+            relation_ids=np.fromiter((row[0] for row in ordered), dtype=np.int64, count=len(ordered)),
+            relation_types=[row[3] for row in ordered],
+            protocols=[row[4] for row in ordered],
+        )
+
+    @property
+    def node_count(self) -> int:
+        return len(self.asset_ids)
+
+    @property
+    def edge_count(self) -> int:
+        return len(self.indices)
+
+    def node(self, i: int) -> Dict[str, Any]:
+        return {
+            "id": str(self.asset_ids[i]),
+            "name": self.names[i],
+            "category": self.categories[i],
+            "subcategory": self.subcategories[i],
+        }
+
+    def edges(self) -> Iterable[Tuple[int, int, int]]:
+        """Yield ``(source node, target node, edge position)`` triples."""
+        indptr = self.indptr.tolist()
+        indices = self.indices.tolist()
+        for u in range(self.node_count):
+            for e in range(indptr[u], indptr[u + 1]):
+                yield u, indices[e], e
+
+    def entry_nodes(self) -> List[int]:
+        return [i for i, category in enumerate(self.categories) if category in ENTRY_CATEGORIES]
+
+    # Incremental updates
+
+    def _changed(self) -> None:
+        self._lists = None
+        self._reverse = None
+
+    def add_asset(self, asset_id: int, name: str, category: str, subcategory: Optional[str]) -> None:
+        if asset_id in self.index:
+            i = self.index[asset_id]
+            self.names[i], self.categories[i], self.subcategories[i] = name, category, subcategory
+            return
+        self.index[asset_id] = len(self.asset_ids)
+        self.asset_ids.append(asset_id)
+        self.names.append(name)
+        self.categories.append(category)
+        self.subcategories.append(subcategory)
+        self.indptr = np.append(self.indptr, self.indptr[-1])
+        if self.node_feasibility is not None:
+            self.node_feasibility = np.append(self.node_feasibility, -1)
+        self._changed()
+
+    def add_relation(
+        self,
+        relation_id: int,
+        source_asset_id: int,
+        target_asset_id: int,
+        relation_type: str,
+        protocol: Optional[str],
+    ) -> bool:
+        """Insert an edge; returns False if an endpoint is unknown."""
+        if source_asset_id not in self.index or target_asset_id not in self.index:
+            return False
+        if np.any(self.relation_ids == relation_id):
+            return True
+        u = self.index[source_asset_id]
+        position = int(self.indptr[u + 1])
+        self.indices = np.insert(self.indices, position, self.index[target_asset_id])
+        self.relation_ids = np.insert(self.relation_ids, position, relation_id)
+        self.relation_types.insert(position, relation_type)
+        self.protocols.insert(position, protocol)
+        self.indptr[u + 1:] += 1
+        self._changed()
+        return True
+
+    def remove_relation(self, relation_id: int) -> None:
+        positions = np.flatnonzero(self.relation_ids == relation_id)
+        if not len(positions):
+            return
+        position = int(positions[0])
+        u = int(np.searchsorted(self.indptr, position, side="right")) - 1
+        self.indices = np.delete(self.indices, position)
+        self.relation_ids = np.delete(self.relation_ids, position)
+        del self.relation_types[position]
+        del self.protocols[position]
+        self.indptr[u + 1:] -= 1
+        self._changed()
+
+    # Queries
+
+    def _adjacency(self) -> Tuple[List[int], List[int]]:
+        if self._lists is None:
+            self._lists = (self.indptr.tolist(), self.indices.tolist())
+        return self._lists
+
+    def _reversed(self) -> Tuple[np.ndarray, np.ndarray]:
+        if self._reverse is None:
+            sources = np.repeat(np.arange(self.node_count), np.diff(self.indptr))
+            order = np.argsort(self.indices, kind="stable")
+            indptr = np.zeros(self.node_count + 1, dtype=np.int64)
+            np.cumsum(np.bincount(self.indices, minlength=self.node_count), out=indptr[1:])
+            self._reverse = (indptr, sources[order].astype(np.int32))
+        return self._reverse
+
+    def node_costs(self, weighted: bool) -> List[float]:
+        """Cost of entering each node: 1 per hop, or feasibility-based."""
+        if not weighted or self.node_feasibility is None:
+            return [1.0] * self.node_count
+        feasibility = np.maximum(self.node_feasibility, 0)
+        return (FEASIBILITY_LEVELS - feasibility).astype(float).tolist()
+
+    def reachable(
+        self,
+        asset_id: int,
+        max_depth: Optional[int] = None,
+        reverse: bool = False,
+    ) -> List[Tuple[int, int]]:
+        """Breadth-first reachability from an asset.
+
+        Follows relations forward (blast radius of a compromised asset) or,
+        with ``reverse``, backward (which assets can reach it). Each level is
+        expanded with vectorized CSR gathers.
+
+        Returns:
+            List of (node, depth) pairs excluding the start, by depth
+        """
+        start = self.index[asset_id]
+        indptr, indices = self._reversed() if reverse else (self.indptr, self.indices)
+
+        depth = np.full(self.node_count, -1, dtype=np.int32)
+        depth[start] = 0
+        frontier = np.array([start], dtype=np.int64)
+        level = 0
+        while len(frontier) and (max_depth is None or level < max_depth):
+            starts = indptr[frontier]
+            counts = indptr[frontier + 1] - starts
+            total = int(counts.sum())
+            if not total:
+                break
+            offsets = np.repeat(starts - np.cumsum(counts) + counts, counts) + np.arange(total)
+            neighbors = np.unique(indices[offsets])
+            frontier = neighbors[depth[neighbors] < 0]
+            level += 1
+            depth[frontier] = level
+
+        found = np.flatnonzero(depth > 0)
+        found = found[np.argsort(depth[found], kind="stable")]
+        return list(zip(found.tolist(), depth[found].tolist()))
+
+    def distances_to(self, target: int, costs: List[float]) -> List[float]:
+        """Cost of the cheapest path from every node to ``target``.
+
+        Dijkstra over the reverse CSR; unreachable nodes get infinity.
+        """
+        indptr, indices = (a.tolist() for a in self._reversed())
+        inf = float("inf")
+        dist = [inf] * self.node_count
+        dist[target] = 0.0
+        heap = [(0.0, target)]
+        while heap:
+            cost, v = heapq.heappop(heap)
+            if cost > dist[v]:
+                continue
+            step = cost + costs[v]
+            for e in range(indptr[v], indptr[v + 1]):
+                u = indices[e]
+                if step < dist[u]:
+                    dist[u] = step
+                    heapq.heappush(heap, (step, u))
+        return dist
+
+    def _search(
+        self,
+        sources: Dict[int, float],
+        target: int,
+        costs: List[float],
+        remaining: List[float],
+        banned_nodes: Set[int],
+        banned_edges: Set[Tuple[int, int]],
+    ) -> Optional[GraphPath]:
+        """A* guided by exact distances to the target.
+
+        Banning nodes or edges only lengthens paths, so ``remaining`` stays
+        an admissible and consistent heuristic and each spur search only
+        expands nodes near the cheapest surviving route.
+        """
+        indptr, indices = self._adjacency()
+        inf = float("inf")
+        best: Dict[int, float] = {}
+        prev: Dict[int, int] = {}
+        closed: Set[int] = set()
+        heap = []
+        for node, cost in sources.items():
+            if node not in banned_nodes and remaining[node] < inf:
+                best[node] = cost
+                heap.append((cost + remaining[node], cost, node))
+        heapq.heapify(heap)
+
+        while heap:
+            _, cost, u = heapq.heappop(heap)
+            if u in closed:
+                continue
+            closed.add(u)
+            if u == target:
+                path = [u]
+                while path[-1] in prev:
+                    path.append(prev[path[-1]])
+                return GraphPath(cost=cost, nodes=path[::-1])
+            for e in range(indptr[u], indptr[u + 1]):
+                v = indices[e]
+                if v in closed or v in banned_nodes or remaining[v] == inf or (u, v) in banned_edges:
+                    continue
+                candidate = cost + costs[v]
+                if candidate < best.get(v, inf):
+                    best[v] = candidate
+                    prev[v] = u
+                    heapq.heappush(heap, (candidate + remaining[v], candidate, v))
+        return None
+
+    def attack_paths(self, target_asset_id: int, k: int = 3, weighted: bool = False) -> List[GraphPath]:
+        """K shortest loopless paths from any entry point to an asset (Yen).
+
+        Entry points are Interface/External assets. Paths cost one per hop,
+        or with ``weighted`` the feasibility-based cost of each asset
+        entered after the entry point.
+        """
+        target = self.index[target_asset_id]
+        entries = self.entry_nodes()
+        if not entries:
+            return []
+        costs = self.node_costs(weighted)
+        remaining = self.distances_to(target, costs)
+        sources = {node: 0.0 for node in entries}
+
+        first = self._search(sources, target, costs, remaining, set(), set())
+        if first is None:
+            return []
+        found = [first]
+        seen = {tuple(first.nodes)}
+        candidates: List[GraphPath] = []
+
+        while len(found) < k:
+            previous = found[-1].nodes
+            for i in range(len(previous)):
+                root = previous[:i]
+                root_cost = sum(costs[v] for v in root[1:])
+                banned_nodes = set(root)
+                banned_edges = {
+                    (path.nodes[i - 1], path.nodes[i])
+                    for path in found
+                    if i > 0 and len(path.nodes) > i and path.nodes[:i] == root
+                }
+                if i == 0:
+                    # Spur at the virtual source: try entry points not yet used first
+                    used = {path.nodes[0] for path in found}
+                    spur_sources = {node: 0.0 for node in entries if node not in used}
+                else:
+                    spur_sources = {root[-1]: 0.0}
+                    banned_nodes.discard(root[-1])
+
+                spur = self._search(spur_sources, target, costs, remaining, banned_nodes, banned_edges)
+                if spur is None:
+                    continue
+                nodes = root[:-1] + spur.nodes if i > 0 else spur.nodes
+                if tuple(nodes) in seen:
+                    continue
+                seen.add(tuple(nodes))
+                heapq.heappush(candidates, GraphPath(cost=root_cost + spur.cost, nodes=nodes))
+
+            if not candidates:
+                break
+            found.append(heapq.heappop(candidates))
+
+        return found
+
@@ -1,5 +1,7 @@
 """AI-powered asset identification service."""
 
+import asyncio
+import hashlib
 import json
 from typing import Any, Dict, List, Optional
 
@@ -8,8 +10,30 @@ from app.clients.ai.prompts.asset_identification import (
     ASSET_IDENTIFICATION_PROMPT,
     ASSET_IDENTIFICATION_FROM_ARCHITECTURE_PROMPT,
 )
+from app.core.config import get_settings
 from app.core.exceptions import AIServiceError
 from app.schemas.asset import AssetCreate
+from app.services.parsers.base import run_in_parse_pool
+from app.services.vision_preprocess import (
+    VisionImage,
+    VisionInput,
+    merge_architecture_results,
+    prepare_vision_input,
+    vision_cache,
+)
+
+settings = get_settings()
+
+ARCHITECTURE_MODEL = "qwen-vl-max"
+
+# Part of the cache key, so prompt changes invalidate cached results
+_ARCHITECTURE_PROMPT_VERSION = hashlib.sha256(
+    ASSET_IDENTIFICATION_FROM_ARCHITECTURE_PROMPT.encode()
+).hexdigest()[:8]
+
+TILE_PROMPT_SUFFIX = """
+注意：这是一张大型架构图的局部区域（第 {index}/{count} 块，与相邻区域有少量重叠），
+请只识别该区域内可见的资产和关系。"""
 
 
 class AssetIdentifier:
@@ -72,40 +96,71 @@ class AssetIdentifier:
     async def identify_from_architecture(
         self,
         image_bytes: bytes,
+        project_id: int,
         mime_type: str = "image/png"
     ) -> Dict[str, Any]:
         """Identify assets and relations from an architecture diagram.
-        
+
+        The image is decoded once and re-encoded at the model's working
+        resolution; large diagrams are also analysed tile by tile, in
+        parallel, and the results merged. Results are cached per project
+        by image content.
+
         Args:
             image_bytes: Image file content
-            mime_type: MIME type of the image
-            
+            project_id: Project the diagram belongs to; scopes the cache
+            mime_type: Unused; the format is read from the content
+
         Returns:
             Dict with 'assets' and 'relations' lists
         """
-        client = await self._get_client()
-
-        # Convert image to data URL
-        image_url = client.image_to_data_url(image_bytes, mime_type)
-
         try:
-            response = await client.vision_completion(
-                image_url=image_url,
-                prompt=ASSET_IDENTIFICATION_FROM_ARCHITECTURE_PROMPT,
-                model="qwen-vl-max",
-                temperature=0.3,
-            )
-
-            # Parse response
-            result = self._parse_json_response(response)
-
-            assets = [self._create_asset(a) for a in result.get("assets", [])]
-            relations = result.get("relations", [])
-
-            return {"assets": assets, "relations": relations}
-
+            vision_input = await run_in_parse_pool(prepare_vision_input, image_bytes)
         except Exception as e:
-            raise AIServiceError(f"Architecture analysis failed: {str(e)}")
+            raise AIServiceError(f"Architecture analysis failed: unreadable image: {str(e)}")
+
+        cache_key = vision_cache.key(
+            "architecture", f"{ARCHITECTURE_MODEL}.{_ARCHITECTURE_PROMPT_VERSION}",
+            project_id, vision_input.digest,
+        )
+        result = await vision_cache.get(cache_key)
+        if result is None:
+            try:
+                result = await self._analyse_architecture(vision_input)
+            except Exception as e:
+                raise AIServiceError(f"Architecture analysis failed: {str(e)}")
+            await vision_cache.set(cache_key, result)
+
+        assets = [self._create_asset(a) for a in result.get("assets", [])]
+        return {"assets": assets, "relations": result.get("relations", [])}
+
+    async def _analyse_architecture(self, vision_input: VisionInput) -> Dict[str, Any]:
+        """Run the overview and tile calls concurrently and merge them."""
+        client = await self._get_client()
+        slots = asyncio.Semaphore(settings.VISION_MAX_CONCURRENCY)
+        count = len(vision_input.tiles)
+
+        async def analyse(image: VisionImage, prompt: str) -> Dict[str, Any]:
+            async with slots:
+                response = await client.vision_completion(
+                    image_url=image.data_url(),
+                    prompt=prompt,
+                    model=ARCHITECTURE_MODEL,
+                    temperature=0.3,
+                )
+            return self._parse_json_response(response)
+
+        results = await asyncio.gather(
+            analyse(vision_input.overview, ASSET_IDENTIFICATION_FROM_ARCHITECTURE_PROMPT),
+            *(
+                analyse(tile, ASSET_IDENTIFICATION_FROM_ARCHITECTURE_PROMPT
+                        + TILE_PROMPT_SUFFIX.format(index=index, count=count))
+                for index, tile in enumerate(vision_input.tiles, 1)
+            ),
+        )
+        if not count:
+            return {"assets": results[0].get("assets", []), "relations": results[0].get("relations", [])}
+        return merge_architecture_results(results)
 
     async def identify_from_parsed_content(
         self,
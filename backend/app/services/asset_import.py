@@ -0,0 +1,239 @@
+"""Deterministic asset import from parsed asset-list tables.
+
+Spreadsheets laid out like the report's 资产列表 sheet are recognised by
+their header row, mapped onto ``AssetCreate`` and upserted by ``asset_id``
+with one duplicate-check query and batched INSERT/UPDATE statements in a
+single transaction, without any AI call.
+"""
+
+import re
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from pydantic import ValidationError as PydanticValidationError
+from sqlalchemy import insert, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.exceptions import NotFoundError, ValidationError
+from app.models.asset import Asset
+from app.models.document import Document
+from app.schemas.asset import AssetCreate
+from app.services.graph_sync import record_changes
+from app.services.parse_result_store import load_section
+
+# Rows per INSERT/UPDATE round trip
+IMPORT_CHUNK_SIZE = 1000
+
+# Rows searched for the header, to skip titles above the table
+HEADER_SCAN_ROWS = 10
+
+# Accepted header spellings per AssetCreate field, compared after _normalize
+HEADER_ALIASES: Dict[str, Tuple[str, ...]] = {
+    "asset_id": ("资产id", "资产编号", "编号", "id", "assetid"),
+    "name": ("资产名称", "名称", "name", "assetname"),
+    "category": ("分类", "资产分类", "类别", "category"),
+    "subcategory": ("细分类", "子分类", "subcategory"),
+    "description": ("描述", "资产描述", "description"),
+    "remarks": ("备注", "remarks", "remark"),
+    "authenticity": ("真实性", "authenticity"),
+    "integrity": ("完整性", "integrity"),
+    "non_repudiation": ("不可抵赖性", "抗抵赖性", "nonrepudiation"),
+    "confidentiality": ("机密性", "confidentiality"),
+    "availability": ("可用性", "availability"),
+    "authorization": ("权限", "授权", "authorization"),
+}
+REQUIRED_FIELDS = ("asset_id", "name", "category")
+SECURITY_FIELDS = (
+    "authenticity", "integrity", "non_repudiation",
+    "confidentiality", "availability", "authorization",
+)
+
+_ALIAS_FIELDS = {alias: name for name, aliases in HEADER_ALIASES.items() for alias in aliases}
+_TRUE_VALUES = {"√", "✓", "✔", "y", "yes", "true", "1", "是", "x", "●"}
+_HEADER_NOISE = re.compile(r"[\s_\-()（）*:：/]+")
+
+
+def _normalize(header: str) -> str:
+    return _HEADER_NOISE.sub("", header).lower()
+
+
+def detect_header(table: Sequence[Sequence[str]]) -> Optional[Tuple[int, Dict[int, str]]]:
+    """Find an asset-list header row.
+
+    Returns:
+        ``(row index, {column index: AssetCreate field})``, or None if no
+        row among the first ``HEADER_SCAN_ROWS`` names all required fields
+    """
+    for index, row in enumerate(table[:HEADER_SCAN_ROWS]):
+        columns: Dict[int, str] = {}
+        for col, cell in enumerate(row):
+            name = _ALIAS_FIELDS.get(_normalize(cell or ""))
+            if name is not None and name not in columns.values():
+                columns[col] = name
+        if all(name in columns.values() for name in REQUIRED_FIELDS):
+            return index, columns
+    return None
+
+
+@dataclass
+class AssetImportRows:
+    """Assets read from a document, with the rows that were rejected."""
+
+    assets: List[AssetCreate] = field(default_factory=list)
+    errors: List[Dict[str, Any]] = field(default_factory=list)
+    tables: int = 0
+
+
+def read_asset_tables(
+    tables: Sequence[Sequence[Sequence[str]]],
+    source_document_id: Optional[int] = None,
+) -> AssetImportRows:
+    """Map the asset-list tables among ``tables`` onto ``AssetCreate``.
+
+    Tables without a recognised header are ignored. Blank rows are
+    skipped; invalid rows and repeated asset IDs are reported in
+    ``errors`` with 1-based table and row numbers.
+    """
+    rows = AssetImportRows()
+    seen: Dict[str, Tuple[int, int]] = {}
+    for table_no, table in enumerate(tables, 1):
+        header = detect_header(table)
+        if header is None:
+            continue
+        rows.tables += 1
+        header_index, columns = header
+        for row_no, row in enumerate(table[header_index + 1:], header_index + 2):
+            values = {
+                name: (row[col] if col < len(row) else "").strip()
+                for col, name in columns.items()
+            }
+            if not any(values.values()):
+                continue
+            data: Dict[str, Any] = {
+                name: value or None for name, value in values.items() if name not in SECURITY_FIELDS
+            }
+            for name in SECURITY_FIELDS:
+                if name in values:
+                    data[name] = values[name].lower() in _TRUE_VALUES
+            try:
+                asset = AssetCreate(**data, source_document_id=source_document_id)
+            except PydanticValidationError as e:
+                rows.errors.append({
+                    "table": table_no,
+                    "row": row_no,
+                    "message": "; ".join(
+                        f"{'.'.join(map(str, err['loc']))}: {err['msg']}" for err in e.errors()
+                    ),
+                })
+                continue
+            if asset.asset_id in seen:
+                first_table, first_row = seen[asset.asset_id]
+                rows.errors.append({
+                    "table": table_no,
+                    "row": row_no,
+                    "message": f"Duplicate asset ID {asset.asset_id} "
+                               f"(first in table {first_table}, row {first_row})",
+                })
+                continue
+            seen[asset.asset_id] = (table_no, row_no)
+            rows.assets.append(asset)
+    return rows
+
+
+def _chunks(rows: Sequence[Any], size: int = IMPORT_CHUNK_SIZE):
+    for start in range(0, len(rows), size):
+        yield rows[start:start + size]
+
+
+class AssetImportService:
+    """Service for importing structured asset lists."""
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def import_document(
+        self,
+        project_id: int,
+        document_id: int,
+        update_existing: bool = True,
+    ) -> Dict[str, Any]:
+        """Import the asset-list tables of a parsed project document.
+
+        Raises:
+            NotFoundError: If the document is not in the project
+            ValidationError: If it is not parsed or has no asset-list table
+        """
+        result = await self.db.execute(
+            select(Document.parse_status, Document.parse_result).where(
+                Document.id == document_id,
+                Document.project_id == project_id,
+            )
+        )
+        document = result.one_or_none()
+        if document is None:
+            raise NotFoundError(f"Document {document_id} not found in project {project_id}")
+        if document.parse_status != "completed" or not document.parse_result:
+            raise ValidationError("Document has not been parsed")
+
+        tables = await load_section(document.parse_result, "tables")
+        rows = read_asset_tables(tables, document_id)
+        if not rows.tables:
+            raise ValidationError("No asset list table found in the document")
+
+        counts = await self.upsert(project_id, rows.assets, update_existing=update_existing)
+        return {**counts, "errors": rows.errors}
+
+    async def upsert(
+        self,
+        project_id: int,
+        assets: Sequence[AssetCreate],
+        update_existing: bool = True,
+        ai_generated: bool = False,
+    ) -> Dict[str, int]:
+        """Insert new assets and update existing ones, keyed by ``asset_id``.
+
+        Existing asset IDs are looked up with one query; all writes are
+        multi-row statements committed together. Updates only write the
+        fields set on each ``AssetCreate``. Assets are marked as
+        AI-generated or not by ``ai_generated``.
+
+        Returns:
+            Dict with ``created``, ``updated`` and ``skipped`` counts
+        """
+        if not assets:
+            return {"created": 0, "updated": 0, "skipped": 0}
+
+        result = await self.db.execute(
+            select(Asset.asset_id, Asset.id).where(
+                Asset.project_id == project_id,
+                Asset.asset_id.in_([asset.asset_id for asset in assets]),
+            )
+        )
+        existing = dict(result.all())
+
+        new_rows: List[Dict[str, Any]] = []
+        update_rows: List[Dict[str, Any]] = []
+        for asset in assets:
+            if asset.asset_id not in existing:
+                new_rows.append({**asset.model_dump(), "is_ai_generated": ai_generated, "project_id": project_id})
+            elif update_existing:
+                # Only fields that were given, e.g. the table's columns;
+                # the rest of the stored asset is left as it is
+                row = asset.model_dump(exclude_unset=True)
+                update_rows.append({**row, "is_ai_generated": ai_generated, "id": existing[asset.asset_id]})
+
+        for chunk in _chunks(new_rows):
+            await self.db.execute(insert(Asset), list(chunk))
+        for chunk in _chunks(update_rows):
+            # ORM bulk UPDATE by primary key, one executemany per chunk
+            await self.db.execute(update(Asset), list(chunk))
+
+        if new_rows or update_rows:
+            await record_changes(self.db, "asset", project_id=project_id)
+        await self.db.commit()
+
+        return {
+            "created": len(new_rows),
+            "updated": len(update_rows),
+            "skipped": len(assets) - len(new_rows) - len(update_rows),
+        }
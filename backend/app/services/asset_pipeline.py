@@ -0,0 +1,399 @@
+"""Streaming pipeline from a document to identified assets.
+
+Parsing a document and identifying its assets used to run back to back:
+the whole file was parsed and stored before the first identification
+call. ``AssetPipeline`` runs them as stages connected by bounded queues::
+
+    parse -> chunk -> identify -> dedupe -> persist
+
+The parser hands out fragments (page batches for PDFs, see
+``BaseParser.iter_parse``), the chunk stage cuts them into prompt-sized
+texts at chapter headings, several identification calls run at once, and
+assets are deduplicated and written as their chunk's result arrives. A
+full queue makes the stage before it wait, so at most ``IDENTIFY_QUEUE_SIZE``
+items are buffered per stage however far parsing is ahead of the model.
+End-to-end time tends to the slower of parsing and identification rather
+than their sum. The merged parse result is stored as by
+``DocumentService.parse_document`` when the parse stage finishes.
+"""
+
+import asyncio
+import logging
+import time
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, Iterator, List, Optional, Set, Tuple
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.clients.search.text import split_passages
+from app.core.config import get_settings
+from app.core.exceptions import AIServiceError, DocumentParseError
+from app.models.asset import Asset
+from app.schemas.asset import AssetCreate
+from app.services.asset_import import AssetImportService
+from app.services.document_service import DocumentService
+from app.services.parsers import ParsedContent
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+STAGES = ("parse", "chunk", "identify", "dedupe", "persist")
+
+# End of stream marker passed down the queues
+_DONE = object()
+
+
+@dataclass
+class StageMetrics:
+    """Counters of one pipeline stage.
+
+    The depth of the stage's input queue is sampled each time an item is
+    put on it; a maximum at the queue size means the stage was the
+    bottleneck and held up the stages before it.
+    """
+
+    name: str
+    workers: int = 1
+    processed: int = 0
+    emitted: int = 0
+    busy_seconds: float = 0.0
+    max_queue_depth: int = 0
+    queue_depth_total: int = 0
+    queue_samples: int = 0
+    started: Optional[float] = None
+    finished: Optional[float] = None
+
+    def sample_queue(self, depth: int) -> None:
+        self.max_queue_depth = max(self.max_queue_depth, depth)
+        self.queue_depth_total += depth
+        self.queue_samples += 1
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert to dictionary, with throughput in items per second."""
+        elapsed = (self.finished or time.perf_counter()) - (self.started or time.perf_counter())
+        return {
+            "name": self.name,
+            "workers": self.workers,
+            "processed": self.processed,
+            "emitted": self.emitted,
+            "busy_seconds": round(self.busy_seconds, 3),
+            "elapsed_seconds": round(elapsed, 3),
+            "throughput": round(self.processed / elapsed, 2) if elapsed > 0 else 0.0,
+            "max_queue_depth": self.max_queue_depth,
+            "mean_queue_depth": round(self.queue_depth_total / self.queue_samples, 2) if self.queue_samples else 0.0,
+        }
+
+
+def fragment_pieces(fragment: ParsedContent) -> Iterator[Tuple[Optional[int], str]]:
+    """Text pieces of a parse fragment in document order.
+
+    Yields:
+        ``(heading_level, text)``; the level is None for body text
+    """
+    if fragment.blocks:
+        for block in fragment.blocks:
+            if block["type"] == "heading":
+                yield block["level"], block["text"]
+            elif block["type"] == "table":
+                yield None, "\n".join(" | ".join(row) for row in fragment.tables[block["table"]])
+            elif block["type"] == "slide":
+                yield None, "\n".join(filter(None, (block.get("title"), block.get("text"), block.get("notes"))))
+            else:
+                yield None, block.get("text", "")
+        return
+    for text in fragment.text_blocks:
+        yield None, text
+    for table in fragment.tables:
+        yield None, "\n".join(" | ".join(str(cell) for cell in row) for row in table)
+
+
+def _name_key(name: str) -> str:
+    """Asset name compared when deduplicating: no whitespace, casefolded."""
+    return "".join(name.split()).casefold()
+
+
+class AssetPipeline:
+    """Parse a document and identify its assets as a staged stream.
+
+    One instance runs one document. The database session is used by the
+    persist stage and, once, by the parse stage to store the parse result;
+    a lock keeps those apart.
+    """
+
+    def __init__(
+        self,
+        db: AsyncSession,
+        identifier: Optional[Any] = None,
+        queue_size: Optional[int] = None,
+        concurrency: Optional[int] = None,
+        chunk_chars: Optional[int] = None,
+    ):
+        """Initialize the pipeline.
+
+        Args:
+            db: Database session
+            identifier: Object with ``identify_from_text``; an
+                ``AssetIdentifier`` is created if not given
+            queue_size: Items buffered between stages
+            concurrency: Parallel identification calls
+            chunk_chars: Maximum characters per identification call
+        """
+        self.db = db
+        self._identifier = identifier
+        self.queue_size = queue_size or settings.IDENTIFY_QUEUE_SIZE
+        self.concurrency = concurrency or settings.IDENTIFY_CONCURRENCY
+        self.chunk_chars = chunk_chars or settings.IDENTIFY_CHUNK_CHARS
+        self.metrics = {name: StageMetrics(name) for name in STAGES}
+        self.metrics["identify"].workers = self.concurrency
+        self.errors: List[str] = []
+        self._db_lock = asyncio.Lock()
+        self._project_id: Optional[int] = None
+        self._document_id: Optional[int] = None
+        self._counts = {"identified": 0, "created": 0, "skipped": 0}
+        # Chunk being filled, and its size in characters
+        self._chunk: List[str] = []
+        self._chunk_size = 0
+        # Normalized names and asset IDs in the project or handed to the
+        # persist stage
+        self._seen_names: Set[str] = set()
+        self._seen_ids: Set[str] = set()
+
+    async def run(self, project_id: int, document_id: int) -> Dict[str, Any]:
+        """Parse a project document and persist the assets identified in it.
+
+        Assets are inserted as AI-generated and attributed to the document.
+        Assets named like one already in the project are dropped; an asset
+        ID taken in the project gets a suffix (see ``_dedupe``). A failed
+        identification call is reported in ``errors`` and does not stop
+        the other chunks.
+
+        Returns:
+            Dict with ``document_id``, ``identified``, ``created``,
+            ``skipped``, ``errors``, ``elapsed_seconds`` and per-stage
+            ``stages`` metrics
+
+        Raises:
+            NotFoundError: If the document is not in the project
+            DocumentParseError: If parsing fails
+        """
+        owns_identifier = self._identifier is None
+        if owns_identifier:
+            # Imported here: the identifier pulls in the vision stack
+            from app.services.asset_identifier import AssetIdentifier
+
+            self._identifier = AssetIdentifier()
+
+        documents = DocumentService(self.db)
+        document = await documents.start_parse(document_id, project_id)
+        self._project_id = project_id
+        self._document_id = document_id
+        await self._load_existing()
+
+        queues = [asyncio.Queue(maxsize=self.queue_size) for _ in STAGES[1:]]
+        started = time.perf_counter()
+        try:
+            await self._gather(
+                self._parse(documents, document, queues[0]),
+                self._stage("chunk", queues[0], queues[1], self._split, flush=self._flush_chunk),
+                self._stage("identify", queues[1], queues[2], self._identify, workers=self.concurrency),
+                self._stage("dedupe", queues[2], queues[3], self._dedupe),
+                self._stage("persist", queues[3], None, self._persist),
+            )
+        finally:
+            if owns_identifier:
+                await self._identifier.close()
+                self._identifier = None
+
+        result = {
+            "document_id": document_id,
+            **self._counts,
+            "errors": self.errors,
+            "elapsed_seconds": round(time.perf_counter() - started, 3),
+            "stages": [self.metrics[name].to_dict() for name in STAGES],
+        }
+        logger.info(
+            f"Asset pipeline for document {document_id}: {result['created']} assets in "
+            f"{result['elapsed_seconds']}s; "
+            + ", ".join(f"{stage['name']} {stage['processed']} ({stage['max_queue_depth']} max queued)"
+                        for stage in result["stages"])
+        )
+        return result
+
+    async def _load_existing(self) -> None:
+        """Seed deduplication with the project's assets, in one query."""
+        result = await self.db.execute(
+            select(Asset.asset_id, Asset.name).where(Asset.project_id == self._project_id)
+        )
+        for asset_id, name in result.all():
+            self._seen_ids.add(asset_id)
+            self._seen_names.add(_name_key(name))
+
+    async def _gather(self, *stages: Awaitable[None]) -> None:
+        """Run the stages; the first failure cancels the others."""
+        tasks = [asyncio.ensure_future(stage) for stage in stages]
+        try:
+            await asyncio.gather(*tasks)
+        except BaseException:
+            for task in tasks:
+                # Stages cancelled along with the gather are cleaning up;
+                # a second cancel would interrupt that
+                if not task.cancelling():
+                    task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            raise
+
+    async def _emit(self, queue: asyncio.Queue, stage: str, item: Any) -> None:
+        """Put an item for ``stage``, waiting while its queue is full."""
+        await queue.put(item)
+        self.metrics[stage].sample_queue(queue.qsize())
+
+    async def _parse(self, documents: DocumentService, document: Any, outbox: asyncio.Queue) -> None:
+        metrics = self.metrics["parse"]
+        metrics.started = time.perf_counter()
+        content = ParsedContent()
+        try:
+            parser, file_path = documents.get_parser(document)
+            fragments = parser.iter_parse(file_path, category=document.category)
+            while True:
+                began = time.perf_counter()
+                try:
+                    fragment = await anext(fragments)
+                except StopAsyncIteration:
+                    break
+                metrics.busy_seconds += time.perf_counter() - began
+                metrics.processed += 1
+                content.extend(fragment)
+                await self._emit(outbox, "chunk", fragment)
+                metrics.emitted += 1
+            async with self._db_lock:
+                await documents.complete_parse(document, content)
+        except asyncio.CancelledError:
+            # Another stage failed or the task was cancelled: the document
+            # must not stay marked as parsing
+            await self._fail_parse(documents, document, DocumentParseError("Parsing was cancelled"))
+            raise
+        except Exception as e:
+            await self._fail_parse(documents, document, e)
+            raise DocumentParseError(str(e))
+        metrics.finished = time.perf_counter()
+        await outbox.put(_DONE)
+
+    async def _fail_parse(self, documents: DocumentService, document: Any, error: Exception) -> None:
+        """Mark the parse failed without hiding the error that stopped it.
+
+        A cancelled persist stage may have left its transaction half done;
+        it is rolled back first.
+        """
+        try:
+            async with self._db_lock:
+                await self.db.rollback()
+                await documents.fail_parse(document, error)
+        except Exception as e:
+            logger.warning(f"Marking the parse of document {self._document_id} failed: {e}")
+
+    async def _stage(
+        self,
+        name: str,
+        inbox: asyncio.Queue,
+        outbox: Optional[asyncio.Queue],
+        handle: Callable[[Any], Awaitable[List[Any]]],
+        workers: int = 1,
+        flush: Optional[Callable[[], List[Any]]] = None,
+    ) -> None:
+        """Run ``handle`` on every item of ``inbox`` and pass its outputs on."""
+        metrics = self.metrics[name]
+        metrics.started = time.perf_counter()
+        downstream = STAGES[STAGES.index(name) + 1] if outbox is not None else None
+
+        async def forward(outputs: List[Any]) -> None:
+            for output in outputs:
+                await self._emit(outbox, downstream, output)
+                metrics.emitted += 1
+
+        async def work() -> None:
+            while True:
+                item = await inbox.get()
+                if item is _DONE:
+                    # Leave the marker for the other workers of the stage
+                    inbox.put_nowait(_DONE)
+                    return
+                began = time.perf_counter()
+                outputs = await handle(item)
+                metrics.busy_seconds += time.perf_counter() - began
+                metrics.processed += 1
+                if outbox is not None:
+                    await forward(outputs)
+
+        await asyncio.gather(*(work() for _ in range(workers)))
+        if flush is not None:
+            await forward(flush())
+        metrics.finished = time.perf_counter()
+        if outbox is not None:
+            await outbox.put(_DONE)
+
+    async def _split(self, fragment: ParsedContent) -> List[str]:
+        """Add a fragment to the current chunk; return the chunks it completes.
+
+        A chunk ends before a heading up to ``IDENTIFY_CHAPTER_LEVEL`` or
+        when the next piece would not fit; longer pieces are split.
+        """
+        chunks: List[str] = []
+        for level, text in fragment_pieces(fragment):
+            text = text.strip()
+            if not text:
+                continue
+            if level is not None and level <= settings.IDENTIFY_CHAPTER_LEVEL:
+                chunks.extend(self._flush_chunk())
+            for passage in split_passages(text, self.chunk_chars):
+                if self._chunk_size + len(passage) > self.chunk_chars:
+                    chunks.extend(self._flush_chunk())
+                self._chunk.append(passage)
+                self._chunk_size += len(passage) + 2
+        return chunks
+
+    def _flush_chunk(self) -> List[str]:
+        chunk = "\n\n".join(self._chunk)
+        self._chunk, self._chunk_size = [], 0
+        return [chunk] if chunk else []
+
+    async def _identify(self, chunk: str) -> List[List[AssetCreate]]:
+        try:
+            assets = await self._identifier.identify_from_text(chunk)
+        except AIServiceError as e:
+            logger.warning(f"Asset identification of a chunk of document {self._document_id} failed: {e}")
+            self.errors.append(str(e))
+            return []
+        self._counts["identified"] += len(assets)
+        return [assets] if assets else []
+
+    async def _dedupe(self, assets: List[AssetCreate]) -> List[List[AssetCreate]]:
+        """Drop assets named like one already seen; give colliding IDs a suffix.
+
+        Chunks are identified independently, so the model numbers assets
+        from scratch in each and may repeat an ID, also one the project
+        already has, for a different asset.
+        """
+        unique: List[AssetCreate] = []
+        for asset in assets:
+            name = _name_key(asset.name)
+            if not name or name in self._seen_names:
+                continue
+            self._seen_names.add(name)
+            asset_id = asset.asset_id or "AST"
+            candidate, suffix = asset_id, 1
+            while candidate in self._seen_ids:
+                suffix += 1
+                candidate = f"{asset_id}-{suffix}"
+            self._seen_ids.add(candidate)
+            unique.append(asset.model_copy(update={"asset_id": candidate, "source_document_id": self._document_id}))
+        return [unique] if unique else []
+
+    async def _persist(self, assets: List[AssetCreate]) -> List[Any]:
+        async with self._db_lock:
+            counts = await AssetImportService(self.db).upsert(
+                self._project_id, assets, update_existing=False, ai_generated=True
+            )
+        self._counts["created"] += counts["created"]
+        self._counts["skipped"] += counts["skipped"]
+        return []
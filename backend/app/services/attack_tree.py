@@ -0,0 +1,501 @@
+"""Attack tree generation, evaluation and rendering.
+
+One attack tree is built per damage scenario. The root is an OR over the
+threats that lead to the scenario; each threat is an AND of "reach the
+target asset" and its attack path. Reaching an asset is an OR over entry
+access (for Interface/External assets) and the relations along shortest
+paths from entry points, so the reach subtree of an asset is shared by
+every threat against it and the tree is a DAG.
+
+Nodes are appended children-first, so node order is a topological order:
+evaluation and layout are single linear passes over the node list.
+
+Building and rendering run on the parse worker pool. Built trees are cached
+per project until the project's change log position moves.
+"""
+
+import hashlib
+import io
+import re
+from collections import defaultdict, deque
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+from xml.sax.saxutils import escape
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import get_settings
+from app.models.asset import Asset, AssetRelation
+from app.models.threat import ThreatScenario
+from app.services.change_log import project_version
+from app.services.parsers.base import run_in_parse_pool
+from app.utils.ttl_cache import TTLCache
+
+settings = get_settings()
+
+GATE_AND = "AND"
+GATE_OR = "OR"
+GATE_LEAF = "LEAF"
+
+# Asset categories an attacker can access directly
+ENTRY_CATEGORIES = frozenset({"Interface", "External"})
+
+# Alternatives in an attack path are separated by new lines, ";" or "|";
+# steps within an alternative by arrows
+_ALTERNATIVE_SPLIT = re.compile(r"\s*(?:\n+|[;；|])\s*")
+_STEP_SPLIT = re.compile(r"\s*(?:->|=>|→|⇒)\s*")
+_STEP_PREFIX = re.compile(r"^(?:\(?\d+[.)、:：]|[-*•])\s*")
+
+# Fill colors by aggregated feasibility value (0=Very Low .. 3=High)
+FEASIBILITY_COLORS = {0: "#92D050", 1: "#FFFF00", 2: "#FFC000", 3: "#FF0000"}
+UNRATED_COLOR = "#D9D9D9"
+
+# Layout geometry in pixels
+NODE_WIDTH = 180
+NODE_HEIGHT = 48
+H_GAP = 16
+V_GAP = 56
+PADDING = 20
+LABEL_CHARS = 22
+
+
+def parse_attack_path(attack_path: Optional[str]) -> List[List[str]]:
+    """Split an attack path text into alternatives of ordered steps."""
+    if not attack_path:
+        return []
+    alternatives = []
+    for alternative in _ALTERNATIVE_SPLIT.split(attack_path.strip()):
+        steps = [_STEP_PREFIX.sub("", step).strip() for step in _STEP_SPLIT.split(alternative)]
+        steps = [step for step in steps if step]
+        if steps:
+            alternatives.append(steps)
+    return alternatives
+
+
+def feasibility_label(
+    value: Optional[int],
+    labels: Optional[Sequence[Optional[str]]],
+) -> Optional[str]:
+    """Label of a feasibility level, given labels indexed by level."""
+    if value is None or labels is None or value >= len(labels):
+        return None
+    return labels[value]
+
+
+def scenario_id(title: str) -> str:
+    """Stable identifier of the tree for a damage scenario."""
+    return hashlib.sha1(title.encode("utf-8")).hexdigest()[:12]
+
+
+@dataclass
+class AttackTreeNode:
+    """A gate or leaf of an attack tree."""
+
+    index: int
+    label: str
+    gate: str
+    children: List[int] = field(default_factory=list)
+    # Leaf rating on input; aggregated rating after AttackTree.evaluate()
+    feasibility: Optional[int] = None
+    threat_id: Optional[int] = None
+    asset_id: Optional[int] = None
+
+
+class AttackTree:
+    """An AND/OR attack tree stored as a children-first node list."""
+
+    def __init__(self, tree_id: str, title: str):
+        self.tree_id = tree_id
+        self.title = title
+        self.nodes: List[AttackTreeNode] = []
+        self.threat_count = 0
+
+    @property
+    def root(self) -> AttackTreeNode:
+        return self.nodes[-1]
+
+    def add(
+        self,
+        label: str,
+        gate: str,
+        children: Sequence[int] = (),
+        feasibility: Optional[int] = None,
+        threat_id: Optional[int] = None,
+        asset_id: Optional[int] = None,
+    ) -> int:
+        """Append a node whose children already exist and return its index."""
+        index = len(self.nodes)
+        self.nodes.append(AttackTreeNode(
+            index=index,
+            label=label,
+            gate=gate,
+            children=list(children),
+            feasibility=feasibility,
+            threat_id=threat_id,
+            asset_id=asset_id,
+        ))
+        return index
+
+    def evaluate(self) -> Optional[int]:
+        """Aggregate feasibility bottom-up and return the root's rating.
+
+        An AND gate is as feasible as its hardest rated child (min), an OR
+        gate as its easiest (max); unrated children do not constrain. Each
+        node is visited once, so shared subtrees are computed once.
+        """
+        ratings: List[Optional[int]] = []
+        for node in self.nodes:
+            if node.gate != GATE_LEAF:
+                rated = [ratings[c] for c in node.children if ratings[c] is not None]
+                if rated:
+                    node.feasibility = min(rated) if node.gate == GATE_AND else max(rated)
+                else:
+                    node.feasibility = None
+            ratings.append(node.feasibility)
+        return ratings[-1] if ratings else None
+
+    def depths(self) -> List[int]:
+        """Longest distance of every node from the root."""
+        depth = [0] * len(self.nodes)
+        for node in reversed(self.nodes):
+            for child in node.children:
+                depth[child] = max(depth[child], depth[node.index] + 1)
+        return depth
+
+    def to_dict(self, feasibility_labels: Optional[Sequence[Optional[str]]] = None) -> Dict[str, Any]:
+        def label(value: Optional[int]) -> Optional[str]:
+            return feasibility_label(value, feasibility_labels)
+
+        return {
+            "tree_id": self.tree_id,
+            "title": self.title,
+            "threat_count": self.threat_count,
+            "feasibility": self.root.feasibility if self.nodes else None,
+            "feasibility_label": label(self.root.feasibility) if self.nodes else None,
+            "root": self.root.index if self.nodes else None,
+            "nodes": [
+                {
+                    "index": node.index,
+                    "label": node.label,
+                    "gate": node.gate,
+                    "children": node.children,
+                    "feasibility": node.feasibility,
+                    "feasibility_label": label(node.feasibility),
+                    "threat_id": node.threat_id,
+                    "asset_id": node.asset_id,
+                }
+                for node in self.nodes
+            ],
+        }
+
+
+class AttackTreeBuilder:
+    """Build attack trees for a project's damage scenarios."""
+
+    def __init__(
+        self,
+        assets: Iterable[Any],
+        relations: Iterable[Any],
+        threats: Iterable[Any],
+        entry_categories: frozenset[str] = ENTRY_CATEGORIES,
+    ):
+        self.assets = {asset.id: asset for asset in assets}
+        self.threats = list(threats)
+        self.entries = {
+            asset_id for asset_id, asset in self.assets.items()
+            if asset.category in entry_categories
+        }
+
+        self.incoming: Dict[int, List[Any]] = defaultdict(list)
+        outgoing: Dict[int, List[int]] = defaultdict(list)
+        for relation in relations:
+            if relation.source_asset_id in self.assets and relation.target_asset_id in self.assets:
+                self.incoming[relation.target_asset_id].append(relation)
+                outgoing[relation.source_asset_id].append(relation.target_asset_id)
+
+        # Hop distance from the nearest entry point (BFS over relations)
+        self.distance: Dict[int, int] = {asset_id: 0 for asset_id in self.entries}
+        queue = deque(self.entries)
+        while queue:
+            current = queue.popleft()
+            for target in outgoing[current]:
+                if target not in self.distance:
+                    self.distance[target] = self.distance[current] + 1
+                    queue.append(target)
+
+    def build_all(self) -> List[AttackTree]:
+        """Build one tree per damage scenario, in order of first appearance."""
+        scenarios: Dict[str, List[Any]] = {}
+        for threat in self.threats:
+            title = (threat.damage_scenario or threat.threat_description or "").strip()
+            scenarios.setdefault(title, []).append(threat)
+        return [self.build(title, threats) for title, threats in scenarios.items()]
+
+    def build(self, title: str, threats: Sequence[Any]) -> AttackTree:
+        """Build and evaluate the tree of one damage scenario."""
+        tree = AttackTree(scenario_id(title), title)
+        reach_memo: Dict[int, int] = {}
+        children = [self._threat_node(tree, threat, reach_memo) for threat in threats]
+        tree.add(title, GATE_OR, children)
+        tree.threat_count = len(threats)
+        tree.evaluate()
+        return tree
+
+    def _threat_node(self, tree: AttackTree, threat: Any, reach_memo: Dict[int, int]) -> int:
+        feasibility = threat.attack_feasibility_value
+        children = []
+        if threat.asset_id in self.assets:
+            children.append(self._reach(tree, threat.asset_id, reach_memo))
+
+        paths = []
+        for steps in parse_attack_path(threat.attack_path):
+            leaves = [
+                tree.add(step, GATE_LEAF, feasibility=feasibility, threat_id=threat.id)
+                for step in steps
+            ]
+            paths.append(leaves[0] if len(leaves) == 1 else tree.add("Attack path", GATE_AND, leaves))
+        if not paths:
+            paths.append(tree.add(
+                threat.threat_description, GATE_LEAF, feasibility=feasibility, threat_id=threat.id
+            ))
+        children.append(paths[0] if len(paths) == 1 else tree.add("Alternative paths", GATE_OR, paths))
+
+        return tree.add(
+            f"{threat.threat_id}: {threat.threat_description}",
+            GATE_AND,
+            children,
+            threat_id=threat.id,
+        )
+
+    def _reach(self, tree: AttackTree, asset_id: int, memo: Dict[int, int]) -> int:
+        """Node for reaching ``asset_id``, built once per tree.
+
+        Only relations along shortest paths from entry points are expanded,
+        which keeps the subtree acyclic. Iterative post-order avoids
+        recursion limits on long relation chains.
+        """
+        stack = [(asset_id, False)]
+        while stack:
+            current, expanded = stack.pop()
+            if current in memo:
+                continue
+            predecessors = self._predecessors(current)
+            if not expanded:
+                stack.append((current, True))
+                stack.extend((relation.source_asset_id, False) for relation in predecessors)
+                continue
+
+            asset = self.assets[current]
+            options = []
+            if current in self.entries or not predecessors:
+                options.append(tree.add(f"Access {asset.name}", GATE_LEAF, asset_id=current))
+            for relation in predecessors:
+                source = self.assets[relation.source_asset_id]
+                via = f" [{relation.protocol}]" if relation.protocol else ""
+                hop = tree.add(f"{source.name} → {asset.name}{via}", GATE_LEAF, asset_id=current)
+                options.append(tree.add(
+                    f"Via {source.name}",
+                    GATE_AND,
+                    [memo[relation.source_asset_id], hop],
+                    asset_id=current,
+                ))
+            if len(options) == 1:
+                memo[current] = options[0]
+            else:
+                memo[current] = tree.add(f"Reach {asset.name}", GATE_OR, options, asset_id=current)
+        return memo[asset_id]
+
+    def _predecessors(self, asset_id: int) -> List[Any]:
+        distance = self.distance.get(asset_id)
+        if not distance:
+            return []
+        return [
+            relation for relation in self.incoming[asset_id]
+            if self.distance.get(relation.source_asset_id) == distance - 1
+        ]
+
+
+async def load_attack_trees(db: AsyncSession, project_id: int) -> List[AttackTree]:
+    """Build and evaluate all attack trees of a project."""
+    assets = (await db.execute(
+        select(Asset).where(Asset.project_id == project_id)
+    )).scalars().all()
+    relations = (await db.execute(
+        select(AssetRelation).where(AssetRelation.project_id == project_id)
+    )).scalars().all()
+    threats = (await db.execute(
+        select(ThreatScenario)
+        .where(ThreatScenario.project_id == project_id)
+        .order_by(ThreatScenario.threat_id, ThreatScenario.id)
+    )).scalars().all()
+    return await run_in_parse_pool(build_attack_trees, assets, relations, threats)
+
+
+def build_attack_trees(
+    assets: Iterable[Any],
+    relations: Iterable[Any],
+    threats: Iterable[Any],
+) -> List[AttackTree]:
+    """Build and evaluate the attack trees of loaded rows (blocking)."""
+    return AttackTreeBuilder(assets, relations, threats).build_all()
+
+
+def layout(tree: AttackTree) -> Tuple[List[Tuple[int, int]], int, int]:
+    """Layered top-down layout.
+
+    Returns:
+        Tuple of (top-left position per node, width, height)
+    """
+    depth = tree.depths()
+    layers: Dict[int, List[int]] = defaultdict(list)
+    # Reverse node order puts parents before children within each layer
+    for node in reversed(tree.nodes):
+        layers[depth[node.index]].append(node.index)
+
+    widest = max((len(layer) for layer in layers.values()), default=0)
+    width = 2 * PADDING + widest * NODE_WIDTH + max(widest - 1, 0) * H_GAP
+    height = 2 * PADDING + len(layers) * NODE_HEIGHT + max(len(layers) - 1, 0) * V_GAP
+
+    positions = [(0, 0)] * len(tree.nodes)
+    for level, layer in layers.items():
+        layer_width = len(layer) * NODE_WIDTH + (len(layer) - 1) * H_GAP
+        x = (width - layer_width) // 2
+        y = PADDING + level * (NODE_HEIGHT + V_GAP)
+        for index in layer:
+            positions[index] = (x, y)
+            x += NODE_WIDTH + H_GAP
+    return positions, width, height
+
+
+def _short(text: str, limit: int = LABEL_CHARS) -> str:
+    return text if len(text) <= limit else text[:limit - 1] + "…"
+
+
+def render_svg(tree: AttackTree) -> str:
+    """Render an evaluated tree as an SVG document."""
+    positions, width, height = layout(tree)
+    parts = [
+        f'<svg xmlns="http://www.w3.org/2000/svg" width="{width}" height="{height}" '
+        f'viewBox="0 0 {width} {height}" font-family="sans-serif" font-size="12">',
+        '<g stroke="#595959" stroke-width="1">',
+    ]
+    for node in tree.nodes:
+        x, y = positions[node.index]
+        for child in node.children:
+            cx, cy = positions[child]
+            parts.append(
+                f'<line x1="{x + NODE_WIDTH // 2}" y1="{y + NODE_HEIGHT}" '
+                f'x2="{cx + NODE_WIDTH // 2}" y2="{cy}"/>'
+            )
+    parts.append("</g>")
+
+    for node in tree.nodes:
+        x, y = positions[node.index]
+        fill = FEASIBILITY_COLORS.get(node.feasibility, UNRATED_COLOR)
+        rx = 4 if node.gate == GATE_LEAF else 12
+        parts.append(
+            f'<g><title>{escape(node.label)}</title>'
+            f'<rect x="{x}" y="{y}" width="{NODE_WIDTH}" height="{NODE_HEIGHT}" rx="{rx}" '
+            f'fill="{fill}" stroke="#404040"/>'
+            f'<text x="{x + 6}" y="{y + 18}">{escape(_short(node.label))}</text>'
+        )
+        if node.gate != GATE_LEAF:
+            parts.append(
+                f'<text x="{x + NODE_WIDTH - 6}" y="{y + NODE_HEIGHT - 8}" text-anchor="end" '
+                f'font-weight="bold">{node.gate}</text>'
+            )
+        parts.append("</g>")
+
+    parts.append("</svg>")
+    return "".join(parts)
+
+
+def render_png(tree: AttackTree, max_width: Optional[int] = None) -> bytes:
+    """Render an evaluated tree as PNG bytes.
+
+    Chinese labels need ``ATTACK_TREE_FONT_PATH`` to point at a CJK font.
+    Trees wider than ``max_width`` are drawn scaled down to fit, so very
+    wide trees never allocate a full-size canvas; use the SVG for detail.
+    """
+    from PIL import Image, ImageDraw, ImageFont
+
+    positions, width, height = layout(tree)
+    max_width = max_width or settings.ATTACK_TREE_MAX_PNG_WIDTH
+    scale = min(1.0, max_width / width) if width else 1.0
+
+    def sx(value: float) -> int:
+        return int(value * scale)
+
+    # Labels shrunk below legibility are skipped; they dominate drawing time
+    font_size = int(12 * scale)
+    draw_labels = font_size >= 6
+    if not draw_labels:
+        font = None
+    elif settings.ATTACK_TREE_FONT_PATH:
+        font = ImageFont.truetype(settings.ATTACK_TREE_FONT_PATH, font_size)
+    else:
+        font = ImageFont.load_default(font_size)
+
+    image = Image.new("RGB", (max(sx(width), 1), max(sx(height), 1)), "white")
+    draw = ImageDraw.Draw(image)
+    for node in tree.nodes:
+        x, y = positions[node.index]
+        for child in node.children:
+            cx, cy = positions[child]
+            draw.line(
+                [(sx(x + NODE_WIDTH / 2), sx(y + NODE_HEIGHT)), (sx(cx + NODE_WIDTH / 2), sx(cy))],
+                fill="#595959",
+            )
+    for node in tree.nodes:
+        x, y = positions[node.index]
+        draw.rounded_rectangle(
+            [sx(x), sx(y), sx(x + NODE_WIDTH), sx(y + NODE_HEIGHT)],
+            radius=max(sx(4 if node.gate == GATE_LEAF else 12), 1),
+            fill=FEASIBILITY_COLORS.get(node.feasibility, UNRATED_COLOR),
+            outline="#404040",
+        )
+        if not draw_labels:
+            continue
+        draw.text((sx(x + 6), sx(y + 8)), _short(node.label), fill="black", font=font)
+        if node.gate != GATE_LEAF:
+            draw.text(
+                (sx(x + NODE_WIDTH - 34), sx(y + NODE_HEIGHT - 18)), node.gate, fill="black", font=font
+            )
+
+    buffer = io.BytesIO()
+    image.save(buffer, format="PNG")
+    return buffer.getvalue()
+
+
+class AttackTreeCache:
+    """Per-project cache of built attack trees.
+
+    Entries are stamped with the project's change log position, so trees
+    are rebuilt only after its assets, relations or threats change. Cached
+    trees are shared between requests and must not be modified.
+    """
+
+    def __init__(self, ttl_seconds: Optional[float] = None, max_entries: int = 256):
+        self._trees: TTLCache[Tuple[Tuple[int, Optional[int]], List[AttackTree]]] = TTLCache(
+            max_entries=max_entries,
+            ttl_seconds=ttl_seconds or settings.ATTACK_TREE_CACHE_TTL_SECONDS,
+        )
+
+    async def get(self, db: AsyncSession, project_id: int) -> List[AttackTree]:
+        """Return the project's attack trees, building them if stale."""
+        # Read the position first, so a change committed while building
+        # leaves the entry stamped older and rebuilt on next use
+        version = await project_version(db, project_id)
+        cached = self._trees.get(project_id)
+        if cached is not None and cached[0] == version:
+            return cached[1]
+        trees = await load_attack_trees(db, project_id)
+        self._trees.set(project_id, (version, trees))
+        return trees
+
+    def clear(self) -> None:
+        self._trees.clear()
+
+
+attack_trees = AttackTreeCache()
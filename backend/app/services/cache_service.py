@@ -20,11 +20,8 @@ class CacheService:
     async def get_client(self) -> redis.Redis:
         """Get or create Redis client."""
         if self._client is None:
-            self._client = redis.Redis(
-                host=settings.REDIS_HOST,
-                port=settings.REDIS_PORT,
-                db=settings.REDIS_DB,
-                password=settings.REDIS_PASSWORD if hasattr(settings, 'REDIS_PASSWORD') and settings.REDIS_PASSWORD else None,
+            self._client = redis.from_url(
+                settings.REDIS_URL,
                 decode_responses=True,
             )
         return self._client
@@ -46,6 +43,15 @@ class CacheService:
         except Exception:
             return None
     
+    async def get_many(self, keys: list[str]) -> list[Optional[Any]]:
+        """Get several values from cache in one round trip."""
+        client = await self.get_client()
+        try:
+            values = await client.mget(keys)
+            return [json.loads(value) if value else None for value in values]
+        except Exception:
+            return [None] * len(keys)
+    
     async def set(
         self,
         key: str,
@@ -88,6 +94,18 @@ class CacheService:
         except Exception:
             pass
     
+    async def acquire_lock(self, key: str, expire: int) -> bool:
+        """Take a lock shared by all workers for up to ``expire`` seconds.
+
+        Returns True when taken, or when Redis is unavailable so a single
+        node keeps working.
+        """
+        client = await self.get_client()
+        try:
+            return bool(await client.set(key, "1", nx=True, ex=expire))
+        except Exception:
+            return True
+
     # Cache key generators
     @staticmethod
     def project_key(project_id: int) -> str:
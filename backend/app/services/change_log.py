@@ -0,0 +1,178 @@
+"""Reading and pruning the ``graph_changes`` log.
+
+A log entry gets its id when it is inserted but becomes visible only when
+its transaction commits, so a long transaction can commit a lower id after
+higher ones were read. Consumers (the graph mirror and the search index)
+therefore keep a low-water checkpoint: every id at or below it has been
+applied. Above it, ``ChangeLogCursor`` applies whatever is visible and
+remembers those ids, and the checkpoint only moves past a missing id once
+the entries after it are ``CHANGE_LOG_GAP_SECONDS`` old: by then the
+transaction holding it has rolled back (or auto-increment skipped it).
+
+Applied entries are pruned after ``CHANGE_LOG_RETENTION_SECONDS``. Pruning
+logs a ``pruned`` marker; a consumer whose checkpoint is below the marked
+id missed entries and reloads from the database.
+"""
+
+import asyncio
+from datetime import datetime, timedelta
+from typing import Any, Awaitable, Callable, Iterable, Optional, Sequence, Set, Tuple
+
+from sqlalchemy import delete, func, insert, or_, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import get_settings
+from app.models.graph import GraphChange
+
+settings = get_settings()
+
+LOG_COLUMNS = (
+    GraphChange.id,
+    GraphChange.project_id,
+    GraphChange.entity_type,
+    GraphChange.entity_id,
+    GraphChange.op,
+)
+
+
+class ChangeLogPruned(Exception):
+    """Entries past a consumer's checkpoint were pruned; it must reload."""
+
+
+async def _cutoff(db: AsyncSession, seconds: int) -> datetime:
+    """Database time ``seconds`` ago, comparable with ``created_at``."""
+    return await db.scalar(select(func.now())) - timedelta(seconds=seconds)
+
+
+class ChangeLogCursor:
+    """A consumer's position in the change log.
+
+    The checkpoint itself lives in the consumer's backend, shared by every
+    worker; the ids applied above it are remembered in-process, so entries
+    waiting behind a gap are not applied again by this worker. Replaying
+    them elsewhere is harmless as applying is idempotent.
+    """
+
+    def __init__(self, batch_size: int, entity_types: Optional[Iterable[str]] = None):
+        self.batch_size = batch_size
+        self.entity_types = None if entity_types is None else set(entity_types)
+        self.applied: Set[int] = set()
+        self.lock = asyncio.Lock()
+
+    async def replay(
+        self,
+        db: AsyncSession,
+        checkpoint: int,
+        apply: Callable[[Sequence[Any]], Awaitable[None]],
+    ) -> Tuple[int, int]:
+        """Apply visible entries past ``checkpoint`` in id order.
+
+        ``apply`` receives ``(id, project_id, entity_type, entity_id, op)``
+        rows of the consumer's entity types.
+
+        Returns:
+            Number of entries applied and the new checkpoint
+
+        Raises:
+            ChangeLogPruned: entries past ``checkpoint`` were pruned
+        """
+        cutoff = await _cutoff(db, settings.CHANGE_LOG_GAP_SECONDS)
+        watermark = last_id = checkpoint
+        waiting = False
+        applied = 0
+        while True:
+            result = await db.execute(
+                select(*LOG_COLUMNS, GraphChange.created_at)
+                .where(GraphChange.id > last_id)
+                .order_by(GraphChange.id)
+                .limit(self.batch_size)
+            )
+            rows = result.all()
+            if not rows:
+                break
+            pending = []
+            for row in rows:
+                if row.op == "pruned" and row.entity_id > checkpoint:
+                    raise ChangeLogPruned(f"change log pruned through {row.entity_id}")
+                # A recent gap may still be filled by a late commit
+                waiting = waiting or (row.id > last_id + 1 and row.created_at > cutoff)
+                if not waiting:
+                    watermark = row.id
+                last_id = row.id
+                if row.id in self.applied or row.op == "pruned":
+                    continue
+                if self.entity_types is None or row.entity_type in self.entity_types:
+                    pending.append(tuple(row)[:5])
+            if pending:
+                await apply(pending)
+                applied += len(pending)
+            self.applied.update(row.id for row in rows)
+        self.applied = {change_id for change_id in self.applied if change_id > watermark}
+        return applied, watermark
+
+    async def start(self, db: AsyncSession) -> int:
+        """Position the cursor for a full load that starts now.
+
+        Entries older than the gap window, and entries already visible, are
+        covered by the load; only those committed later are replayed.
+
+        Returns:
+            The checkpoint to store once the load has finished
+        """
+        cutoff = await _cutoff(db, settings.CHANGE_LOG_GAP_SECONDS)
+        head = await db.scalar(select(func.max(GraphChange.id)).where(GraphChange.created_at < cutoff))
+        pruned = await db.scalar(select(func.max(GraphChange.entity_id)).where(GraphChange.op == "pruned"))
+        self.applied = set()
+        _, watermark = await self.replay(db, max(head or 0, pruned or 0), _skip)
+        return watermark
+
+
+async def project_version(db: AsyncSession, project_id: int) -> Tuple[int, Optional[int]]:
+    """Position of a project in the change log, for caches of derived data.
+
+    Changes whenever an entry for the project (or all projects) commits,
+    including late commits below the highest id, or is pruned.
+    """
+    result = await db.execute(
+        select(func.count(GraphChange.id), func.max(GraphChange.id))
+        .where(or_(GraphChange.project_id == project_id, GraphChange.project_id.is_(None)))
+    )
+    count, head = result.one()
+    return count, head
+
+
+async def _skip(changes: Sequence[Any]) -> None:
+    """Entries visible before a full load need no replay."""
+
+
+async def prune_change_log(db: AsyncSession, checkpoints: Iterable[Optional[int]]) -> int:
+    """Delete entries every consumer has applied and that are past retention.
+
+    ``checkpoints`` are the consumers' checkpoints; a consumer without one
+    reloads fully anyway. Consumers in other processes that fall behind the
+    retention period reload when they see the marker.
+
+    Returns:
+        Id through which the log was pruned (0 if nothing was)
+    """
+    known = [checkpoint for checkpoint in checkpoints if checkpoint is not None]
+    if not known:
+        return 0
+    cutoff = await _cutoff(db, settings.CHANGE_LOG_RETENTION_SECONDS)
+    expired = await db.scalar(select(func.max(GraphChange.id)).where(GraphChange.created_at < cutoff))
+    through = min(min(known), expired or 0)
+    if through <= 0:
+        return 0
+    last_pruned = await db.scalar(select(func.max(GraphChange.entity_id)).where(GraphChange.op == "pruned"))
+    if last_pruned is not None and last_pruned >= through:
+        return 0
+    # The marker goes first, so no consumer can miss entries unnoticed
+    await db.execute(insert(GraphChange), [{"entity_type": "log", "entity_id": through, "op": "pruned"}])
+    await db.commit()
+    low = await db.scalar(select(func.min(GraphChange.id)))
+    while low <= through:
+        high = min(low + settings.GRAPH_SYNC_BATCH_SIZE - 1, through)
+        await db.execute(delete(GraphChange).where(GraphChange.id.between(low, high)))
+        await db.commit()
+        low = high + 1
+    return through
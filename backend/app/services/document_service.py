@@ -1,13 +1,20 @@
 """Document processing service."""
 
 import os
-from typing import Optional
+from typing import Any, List, Optional, Tuple
 
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.exceptions import DocumentParseError, NotFoundError
 from app.models.document import Document
-from app.services.parsers import ParserFactory, ParsedContent
+from app.services.parse_result_store import (
+    load_section,
+    save_parse_result,
+    summarize,
+    track_parse_blobs,
+)
+from app.services.parsers import BaseParser, ParserFactory, ParsedContent
+from app.services.search_index import index_parsed_document
 
 
 class DocumentService:
@@ -29,12 +36,34 @@ class DocumentService:
             NotFoundError: If document not found
             DocumentParseError: If parsing fails
         """
+        document = await self.start_parse(document_id)
+
+        try:
+            parser, file_path = self.get_parser(document)
+
+            # Parse document
+            content = await parser.parse(file_path, category=document.category)
+
+            await self.complete_parse(document, content)
+            return content
+
+        except Exception as e:
+            await self.fail_parse(document, e)
+            raise DocumentParseError(str(e))
+
+    async def start_parse(self, document_id: int, project_id: Optional[int] = None) -> Document:
+        """Load a document and mark it as parsing.
+
+        Raises:
+            NotFoundError: If the document is not found (in the project)
+        """
         from sqlalchemy import select
 
         # Get document
-        result = await self.db.execute(
-            select(Document).where(Document.id == document_id)
-        )
+        query = select(Document).where(Document.id == document_id)
+        if project_id is not None:
+            query = query.where(Document.project_id == project_id)
+        result = await self.db.execute(query)
         document = result.scalar_one_or_none()
 
         if not document:
@@ -43,55 +72,73 @@ class DocumentService:
         # Update status to parsing
         document.parse_status = "parsing"
         await self.db.commit()
+        return document
 
-        try:
-            # Get file path
-            file_path = f"/tmp/tara-documents/{document.storage_path}"
+    def get_parser(self, document: Document) -> Tuple[BaseParser, str]:
+        """Return the parser for a document and the path of its file.
 
-            if not os.path.exists(file_path):
-                raise DocumentParseError(f"Document file not found: {document.storage_path}")
+        Raises:
+            DocumentParseError: If the file is missing or its type unsupported
+        """
+        file_path = f"/tmp/tara-documents/{document.storage_path}"
 
-            # Get appropriate parser
-            parser = ParserFactory.get_parser(document.file_type)
+        if not os.path.exists(file_path):
+            raise DocumentParseError(f"Document file not found: {document.storage_path}")
 
-            if not parser:
-                raise DocumentParseError(f"No parser available for file type: {document.file_type}")
+        # Get appropriate parser
+        parser = ParserFactory.get_parser(document.file_type)
 
-            # Parse document
-            content = await parser.parse(file_path)
+        if not parser:
+            raise DocumentParseError(f"No parser available for file type: {document.file_type}")
 
-            # Update document with results
-            document.parse_status = "completed"
-            document.parse_result = content.to_dict()
-            document.parse_error = None
-            await self.db.commit()
+        return parser, file_path
 
-            return content
+    async def complete_parse(self, document: Document, content: ParsedContent) -> None:
+        """Store a parse result, mark the document parsed and index it."""
+        # Update document with results
+        document.parse_status = "completed"
+        document.parse_result = await save_parse_result(content.to_dict())
+        document.parse_error = None
+        await track_parse_blobs(self.db, document.id, document.parse_result)
+        await self.db.commit()
+        await index_parsed_document(self.db, document.id)
 
-        except Exception as e:
-            # Update document with error
-            document.parse_status = "failed"
-            document.parse_error = str(e)
-            await self.db.commit()
-            raise DocumentParseError(str(e))
+    async def fail_parse(self, document: Document, error: Exception) -> None:
+        """Mark a document's parse as failed."""
+        # Update document with error
+        document.parse_status = "failed"
+        document.parse_error = str(error)
+        await self.db.commit()
 
     async def get_parse_result(self, document_id: int) -> Optional[dict]:
-        """Get the parse result for a document.
+        """Get the metadata and section sizes of a document's parse result.
         
         Args:
             document_id: ID of the document
             
         Returns:
-            Parse result dictionary or None
+            Dict with ``metadata``, ``image_urls`` and per-section
+            ``counts``, or None if not parsed
         """
+        return summarize(await self._load_manifest(document_id))
+
+    async def get_parse_items(
+        self,
+        document_id: int,
+        section: str,
+        offset: int = 0,
+        limit: Optional[int] = None,
+    ) -> List[Any]:
+        """Get a range of one section (text blocks, tables, blocks or images).
+        
+        Only the stored segments overlapping the range are read.
+        """
+        return await load_section(await self._load_manifest(document_id), section, offset, limit)
+
+    async def _load_manifest(self, document_id: int) -> Optional[dict]:
         from sqlalchemy import select
 
         result = await self.db.execute(
-            select(Document).where(Document.id == document_id)
+            select(Document.parse_result).where(Document.id == document_id)
         )
-        document = result.scalar_one_or_none()
-
-        if not document:
-            return None
-
-        return document.parse_result
+        return result.scalar_one_or_none()
@@ -0,0 +1,224 @@
+"""Streaming exports of project threats and assets.
+
+Rows are read through a server-side cursor in ``EXPORT_BATCH_SIZE``
+batches and encoded batch by batch, so memory stays flat whatever the
+project size. The body is streamed after the endpoint has returned and
+its request session has been closed, so the rows are read through a
+session of the stream's own. CSV and NDJSON are encoded here; Parquet needs the optional
+``pyarrow`` package (the ``export`` extra) and writes one row group per batch.
+"""
+
+import csv
+import importlib.util
+import io
+from datetime import datetime
+from typing import Any, AsyncIterator, List, Sequence
+
+import orjson
+from sqlalchemy import Select, func, select
+
+from app.core.config import get_settings
+from app.core.database import async_session_factory
+from app.core.exceptions import InvalidParameterError
+from app.models.asset import Asset
+from app.models.threat import SecurityMitigation, ThreatScenario
+
+settings = get_settings()
+
+EXPORT_FORMATS = {
+    "csv": "text/csv; charset=utf-8",
+    "ndjson": "application/x-ndjson",
+    "parquet": "application/vnd.apache.parquet",
+}
+
+# Lowest-id mitigation of each threat, as in the report's TARA result sheet
+_first_mitigation = (
+    select(func.min(SecurityMitigation.id))
+    .where(SecurityMitigation.threat_id == ThreatScenario.id)
+    .correlate(ThreatScenario)
+    .scalar_subquery()
+)
+
+# Result sheet columns, in sheet order, plus the attack potential factors
+# used when the project rates feasibility by attack potential
+THREAT_EXPORT_COLUMNS = [
+    ThreatScenario.id,
+    Asset.asset_id.label("asset_code"),
+    Asset.name.label("asset_name"),
+    Asset.subcategory.label("asset_subcategory"),
+    Asset.category.label("asset_category"),
+    ThreatScenario.threat_id,
+    ThreatScenario.security_attribute,
+    ThreatScenario.stride_type,
+    ThreatScenario.threat_description,
+    ThreatScenario.damage_scenario,
+    ThreatScenario.attack_path,
+    ThreatScenario.source_reference,
+    ThreatScenario.wp29_mapping,
+    ThreatScenario.attack_vector,
+    ThreatScenario.attack_complexity,
+    ThreatScenario.privileges_required,
+    ThreatScenario.user_interaction,
+    ThreatScenario.elapsed_time,
+    ThreatScenario.specialist_expertise,
+    ThreatScenario.knowledge_of_item,
+    ThreatScenario.window_of_opportunity,
+    ThreatScenario.equipment,
+    ThreatScenario.attack_potential,
+    ThreatScenario.attack_feasibility,
+    ThreatScenario.attack_feasibility_value,
+    ThreatScenario.impact_safety,
+    ThreatScenario.impact_financial,
+    ThreatScenario.impact_operational,
+    ThreatScenario.impact_privacy,
+    ThreatScenario.impact_level,
+    ThreatScenario.impact_level_value,
+    ThreatScenario.risk_level,
+    ThreatScenario.risk_level_label,
+    ThreatScenario.treatment_decision,
+    ThreatScenario.is_ai_generated,
+    ThreatScenario.is_confirmed,
+    SecurityMitigation.security_goal,
+    SecurityMitigation.security_requirement,
+    SecurityMitigation.wp29_control_mapping,
+    ThreatScenario.created_at,
+    ThreatScenario.updated_at,
+]
+
+ASSET_EXPORT_COLUMNS = [
+    Asset.id,
+    Asset.asset_id,
+    Asset.name,
+    Asset.category,
+    Asset.subcategory,
+    Asset.description,
+    Asset.remarks,
+    Asset.authenticity,
+    Asset.integrity,
+    Asset.non_repudiation,
+    Asset.confidentiality,
+    Asset.availability,
+    Asset.authorization,
+    Asset.is_ai_generated,
+    Asset.is_confirmed,
+    Asset.source_document_id,
+    Asset.created_at,
+    Asset.updated_at,
+]
+
+
+def threat_export_query(filters: Sequence[Any]) -> Select:
+    """Threat rows joined with their asset and first mitigation."""
+    return (
+        select(*THREAT_EXPORT_COLUMNS)
+        .outerjoin(Asset, Asset.id == ThreatScenario.asset_id)
+        .outerjoin(SecurityMitigation, SecurityMitigation.id == _first_mitigation)
+        .where(*filters)
+        .order_by(ThreatScenario.threat_id, ThreatScenario.id)
+    )
+
+
+def asset_export_query(filters: Sequence[Any]) -> Select:
+    """Asset rows in list order."""
+    return select(*ASSET_EXPORT_COLUMNS).where(*filters).order_by(Asset.asset_id, Asset.id)
+
+
+def check_format(export_format: str) -> None:
+    """Reject formats this deployment cannot produce, before streaming starts.
+
+    Raises:
+        InvalidParameterError: For unknown formats, or Parquet without pyarrow
+    """
+    if export_format not in EXPORT_FORMATS:
+        raise InvalidParameterError(f"Unsupported export format: {export_format}")
+    if export_format == "parquet" and importlib.util.find_spec("pyarrow") is None:
+        raise InvalidParameterError(
+            "Parquet export requires the pyarrow package (install the export extra)"
+        )
+
+
+async def _batches(query: Select) -> AsyncIterator[Sequence[Any]]:
+    """Yield result rows in batches from a server-side cursor."""
+    batch_size = settings.EXPORT_BATCH_SIZE
+    async with async_session_factory() as db:
+        result = await db.stream(query.execution_options(yield_per=batch_size))
+        try:
+            async for batch in result.partitions(batch_size):
+                yield batch
+        finally:
+            await result.close()
+
+
+async def _csv(columns: List[str], batches: AsyncIterator[Sequence[Any]]) -> AsyncIterator[bytes]:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    # BOM so spreadsheet tools detect UTF-8 (names are often Chinese)
+    buffer.write("﻿")
+    writer.writerow(columns)
+    async for batch in batches:
+        writer.writerows(
+            ["" if value is None else value.isoformat() if isinstance(value, datetime) else value
+             for value in row]
+            for row in batch
+        )
+        yield buffer.getvalue().encode()
+        buffer.seek(0)
+        buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue().encode()
+
+
+async def _ndjson(columns: List[str], batches: AsyncIterator[Sequence[Any]]) -> AsyncIterator[bytes]:
+    async for batch in batches:
+        yield b"".join(orjson.dumps(dict(zip(columns, row))) + b"\n" for row in batch)
+
+
+def _arrow_schema(query: Select):
+    import pyarrow as pa
+
+    types = {int: pa.int64(), bool: pa.bool_(), float: pa.float64(), datetime: pa.timestamp("us")}
+    fields = []
+    for column in query.selected_columns:
+        try:
+            python_type = column.type.python_type
+        except NotImplementedError:
+            python_type = str
+        fields.append(pa.field(column.name, types.get(python_type, pa.string())))
+    return pa.schema(fields)
+
+
+async def _parquet(query: Select, batches: AsyncIterator[Sequence[Any]]) -> AsyncIterator[bytes]:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    schema = _arrow_schema(query)
+    sink = io.BytesIO()
+    writer = pq.ParquetWriter(sink, schema, compression="zstd")
+    try:
+        async for batch in batches:
+            columns = list(zip(*batch))
+            writer.write_batch(pa.RecordBatch.from_arrays(
+                [pa.array(values, type=field.type) for values, field in zip(columns, schema)],
+                schema=schema,
+            ))
+            yield sink.getvalue()
+            sink.seek(0)
+            sink.truncate()
+    finally:
+        writer.close()
+    yield sink.getvalue()
+
+
+def export_rows(query: Select, export_format: str) -> AsyncIterator[bytes]:
+    """Encode the rows of ``query`` as a stream of ``export_format`` chunks.
+
+    Call ``check_format`` first; the query is executed lazily, in a session
+    opened when the stream is consumed and closed when it ends.
+    """
+    columns = [column.name for column in query.selected_columns]
+    batches = _batches(query)
+    if export_format == "csv":
+        return _csv(columns, batches)
+    if export_format == "ndjson":
+        return _ndjson(columns, batches)
+    return _parquet(query, batches)
@@ -0,0 +1,496 @@
+"""Server-side asset graph layout and level-of-detail views.
+
+Layouts are computed with NumPy and cached per project, keyed by a
+fingerprint of the graph so they are only recomputed after the graph
+changes. The view API answers viewport queries with aggregated
+category/subcategory clusters until few enough assets are visible to
+return them individually, which keeps payloads and client render time
+bounded for platform projects with thousands of assets.
+
+Two algorithms are available:
+
+* ``force``: Fruchterman-Reingold on the subcategory cluster graph, then
+  inside each cluster starting from a spiral in BFS order. Clusters larger
+  than ``INNER_FORCE_MAX_NODES`` keep the spiral, so the cost stays near
+  linear in the number of assets.
+* ``hierarchical``: one column per category (entry points first), grouped
+  by subcategory and ordered by the barycenter of already placed neighbors.
+"""
+
+import hashlib
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from app.core.config import get_settings
+from app.services.parsers.base import run_in_parse_pool
+from app.utils.ttl_cache import TTLCache
+
+settings = get_settings()
+
+LAYOUT_ALGORITHMS = ("force", "hierarchical")
+
+# Column order of the hierarchical layout; other categories follow by name
+CATEGORY_ORDER = ["External", "Interface", "Hardware", "Software", "Data"]
+
+FORCE_ITERATIONS = 60
+INNER_FORCE_ITERATIONS = 20
+INNER_FORCE_MAX_NODES = 250
+NODE_SPACING = 1.0
+GRAVITY = 0.5
+# Pairwise repulsion is computed this many rows at a time to bound memory
+REPULSION_BLOCK = 256
+
+
+def graph_fingerprint(graph: Dict[str, Any]) -> str:
+    """Hash of the graph structure and node grouping."""
+    digest = hashlib.sha1()
+    for node in graph["nodes"]:
+        digest.update(f"{node['id']}\x1f{node['category']}\x1f{node['subcategory']}\x1e".encode())
+    digest.update(b"\x1d")
+    for edge in graph["edges"]:
+        digest.update(f"{edge['source']}\x1f{edge['target']}\x1e".encode())
+    return digest.hexdigest()
+
+
+def force_directed(
+    n: int,
+    sources: np.ndarray,
+    targets: np.ndarray,
+    sizes: Optional[np.ndarray] = None,
+    initial: Optional[np.ndarray] = None,
+    iterations: int = FORCE_ITERATIONS,
+    seed: int = 0,
+) -> np.ndarray:
+    """Fruchterman-Reingold layout of ``n`` nodes.
+
+    Positions are complex numbers internally, so each repulsion block is a
+    handful of vectorized operations. ``sizes`` gives node radii;
+    repulsion then acts on the gap between discs so large clusters keep
+    their distance. ``initial`` positions start the layout close to done
+    with a lower temperature. Returns an ``(n, 2)`` array.
+    """
+    if n <= 1:
+        return np.zeros((n, 2))
+
+    radii = None if sizes is None else np.asarray(sizes, dtype=float)
+    k = NODE_SPACING + (0.0 if radii is None else 2 * float(radii.mean()))
+    if initial is None:
+        pos = np.random.default_rng(seed).uniform(-1.0, 1.0, size=(n, 2)) @ [1, 1j] * k * np.sqrt(n)
+        temperature = k * np.sqrt(n)
+    else:
+        pos = initial @ np.array([1, 1j])
+        temperature = k / 2
+    cooling = 0.01 ** (1.0 / max(iterations, 1))
+    mask = sources != targets
+    sources, targets = sources[mask], targets[mask]
+
+    for _ in range(iterations):
+        disp = np.zeros(n, dtype=complex)
+        for start in range(0, n, REPULSION_BLOCK):
+            stop = min(start + REPULSION_BLOCK, n)
+            delta = pos[start:stop, None] - pos[None, :]
+            dist = np.abs(delta)
+            np.fill_diagonal(dist[:, start:stop], np.inf)
+            if radii is None:
+                push = k * k / np.maximum(dist * dist, 1e-4)
+            else:
+                gap = np.maximum(dist - radii[start:stop, None] - radii[None, :], 0.01)
+                push = k * k / (gap * dist)
+            disp[start:stop] += (delta * push).sum(1)
+
+        if len(sources):
+            delta = pos[sources] - pos[targets]
+            force = delta * (np.abs(delta) / k)
+            disp -= np.bincount(sources, weights=force.real, minlength=n) + 1j * np.bincount(
+                sources, weights=force.imag, minlength=n
+            )
+            disp += np.bincount(targets, weights=force.real, minlength=n) + 1j * np.bincount(
+                targets, weights=force.imag, minlength=n
+            )
+
+        # Gravity keeps loosely connected nodes from drifting to the rim
+        disp -= pos * np.abs(pos) * GRAVITY / k
+
+        length = np.maximum(np.abs(disp), 1e-9)
+        pos += disp / length * np.minimum(length, temperature)
+        temperature *= cooling
+
+    pos -= pos.mean()
+    return np.column_stack([pos.real, pos.imag])
+
+
+def spiral(n: int) -> np.ndarray:
+    """Phyllotaxis spiral; consecutive indices end up close together."""
+    index = np.arange(n)
+    radius = NODE_SPACING * 0.6 * np.sqrt(index)
+    angle = index * np.pi * (3 - np.sqrt(5))
+    return np.column_stack([radius * np.cos(angle), radius * np.sin(angle)])
+
+
+def bfs_order(n: int, sources: np.ndarray, targets: np.ndarray) -> np.ndarray:
+    """Undirected BFS order starting from the highest-degree nodes."""
+    neighbors: List[List[int]] = [[] for _ in range(n)]
+    for u, v in zip(sources.tolist(), targets.tolist()):
+        neighbors[u].append(v)
+        neighbors[v].append(u)
+    degree = np.array([len(items) for items in neighbors])
+    seen = np.zeros(n, dtype=bool)
+    order: List[int] = []
+    for start in np.argsort(-degree, kind="stable").tolist():
+        if seen[start]:
+            continue
+        seen[start] = True
+        queue = [start]
+        for u in queue:
+            order.append(u)
+            for v in neighbors[u]:
+                if not seen[v]:
+                    seen[v] = True
+                    queue.append(v)
+    return np.array(order, dtype=np.int64)
+
+
+def _separate(centers: np.ndarray, radii: np.ndarray, rounds: int = 50) -> np.ndarray:
+    """Push overlapping discs apart.
+
+    Only pairs close enough in x to overlap are compared (sort and sweep),
+    so a round costs O(C log C) plus the candidate pairs, not O(C^2).
+    """
+    centers = centers.copy()
+    n = len(centers)
+    if n < 2:
+        return centers
+    reach = float(radii.max()) + NODE_SPACING
+    for _ in range(rounds):
+        order = np.argsort(centers[:, 0], kind="stable")
+        xs = centers[order, 0]
+        end = np.searchsorted(xs, xs + radii[order] + reach, side="left")
+        counts = np.maximum(end - np.arange(n) - 1, 0)
+        first = np.repeat(np.arange(n), counts)
+        second = first + 1 + np.arange(len(first)) - np.repeat(np.cumsum(counts) - counts, counts)
+        a, b = order[first], order[second]
+
+        delta = centers[a] - centers[b]
+        dist = np.maximum(np.sqrt((delta ** 2).sum(-1)), 1e-9)
+        overlap = radii[a] + radii[b] + NODE_SPACING - dist
+        hit = overlap > 0
+        if not hit.any():
+            break
+        a, b = a[hit], b[hit]
+        push = delta[hit] / dist[hit, None] * overlap[hit, None] / 2
+        for axis in range(2):
+            centers[:, axis] += np.bincount(a, weights=push[:, axis], minlength=n)
+            centers[:, axis] -= np.bincount(b, weights=push[:, axis], minlength=n)
+    return centers
+
+
+@dataclass
+class GraphLayout:
+    """Positions of one project's assets plus cluster aggregates."""
+
+    algorithm: str
+    fingerprint: str
+    nodes: List[Dict[str, Any]]
+    positions: np.ndarray
+    sources: np.ndarray
+    targets: np.ndarray
+    edge_types: List[str]
+    edge_protocols: List[Optional[str]]
+    # Per level: node -> cluster index, cluster keys
+    memberships: Dict[str, Tuple[np.ndarray, List[Tuple[str, Optional[str]]]]] = field(default_factory=dict)
+    _clusters: Dict[str, Dict[str, np.ndarray]] = field(default_factory=dict)
+
+    @property
+    def node_count(self) -> int:
+        return len(self.nodes)
+
+    def bounds(self) -> Dict[str, float]:
+        if not self.node_count:
+            return {"x0": 0.0, "y0": 0.0, "x1": 0.0, "y1": 0.0}
+        low, high = self.positions.min(axis=0), self.positions.max(axis=0)
+        return {"x0": float(low[0]), "y0": float(low[1]), "x1": float(high[0]), "y1": float(high[1])}
+
+    def clusters(self, level: str) -> Dict[str, np.ndarray]:
+        """Centroid, radius and size of each cluster at ``level``."""
+        if level not in self._clusters:
+            labels, keys = self.memberships[level]
+            count = np.bincount(labels, minlength=len(keys))
+            safe = np.maximum(count, 1)
+            x = np.bincount(labels, weights=self.positions[:, 0], minlength=len(keys)) / safe
+            y = np.bincount(labels, weights=self.positions[:, 1], minlength=len(keys)) / safe
+            dist = np.sqrt((self.positions[:, 0] - x[labels]) ** 2 + (self.positions[:, 1] - y[labels]) ** 2)
+            radius = np.zeros(len(keys))
+            np.maximum.at(radius, labels, dist)
+            self._clusters[level] = {"x": x, "y": y, "radius": radius + NODE_SPACING / 2, "count": count}
+        return self._clusters[level]
+
+    def _cluster_edges(self, level: str, visible: np.ndarray) -> List[Dict[str, Any]]:
+        labels, keys = self.memberships[level]
+        source, target = labels[self.sources], labels[self.targets]
+        keep = (source != target) & visible[source] & visible[target]
+        pairs, counts = np.unique(
+            source[keep].astype(np.int64) * len(keys) + target[keep], return_counts=True,
+        )
+        return [
+            {"source": _cluster_id(level, keys[p // len(keys)]), "target": _cluster_id(level, keys[p % len(keys)]),
+             "count": int(c)}
+            for p, c in zip(pairs.tolist(), counts.tolist())
+        ]
+
+    def view(
+        self,
+        x0: Optional[float] = None,
+        y0: Optional[float] = None,
+        x1: Optional[float] = None,
+        y1: Optional[float] = None,
+        level: Optional[str] = None,
+        max_items: int = 500,
+    ) -> Dict[str, Any]:
+        """Return the items visible in a viewport at a level of detail.
+
+        Without ``level`` the finest level with at most ``max_items``
+        visible items is used. Node views are capped at ``max_items``,
+        keeping the highest-degree assets.
+        """
+        bounds = self.bounds()
+        x0 = bounds["x0"] if x0 is None else x0
+        y0 = bounds["y0"] if y0 is None else y0
+        x1 = bounds["x1"] if x1 is None else x1
+        y1 = bounds["y1"] if y1 is None else y1
+
+        in_view = (
+            (self.positions[:, 0] >= x0) & (self.positions[:, 0] <= x1)
+            & (self.positions[:, 1] >= y0) & (self.positions[:, 1] <= y1)
+        )
+        visible_clusters = {}
+        for name in ("category", "subcategory"):
+            c = self.clusters(name)
+            visible_clusters[name] = (
+                (c["x"] + c["radius"] >= x0) & (c["x"] - c["radius"] <= x1)
+                & (c["y"] + c["radius"] >= y0) & (c["y"] - c["radius"] <= y1)
+                & (c["count"] > 0)
+            )
+
+        if level is None:
+            if int(in_view.sum()) <= max_items:
+                level = "node"
+            elif int(visible_clusters["subcategory"].sum()) <= max_items:
+                level = "subcategory"
+            else:
+                level = "category"
+
+        result: Dict[str, Any] = {
+            "level": level, "bounds": bounds, "truncated": False,
+            "clusters": [], "nodes": [], "edges": [],
+        }
+        if level == "node":
+            visible = np.flatnonzero(in_view)
+            if len(visible) > max_items:
+                degree = np.bincount(self.sources, minlength=self.node_count) + np.bincount(
+                    self.targets, minlength=self.node_count
+                )
+                visible = np.sort(visible[np.argsort(-degree[visible], kind="stable")[:max_items]])
+                result["truncated"] = True
+            shown = np.zeros(self.node_count, dtype=bool)
+            shown[visible] = True
+            result["nodes"] = [
+                {**self.nodes[i], "x": float(self.positions[i, 0]), "y": float(self.positions[i, 1])}
+                for i in visible.tolist()
+            ]
+            keep = np.flatnonzero(shown[self.sources] & shown[self.targets])
+            result["edges"] = [
+                {"source": self.nodes[self.sources[e]]["id"], "target": self.nodes[self.targets[e]]["id"],
+                 "count": 1, "type": self.edge_types[e], "protocol": self.edge_protocols[e]}
+                for e in keep.tolist()
+            ]
+            return result
+
+        c = self.clusters(level)
+        keys = self.memberships[level][1]
+        visible = visible_clusters[level]
+        result["clusters"] = [
+            {
+                "id": _cluster_id(level, keys[i]),
+                "category": keys[i][0],
+                "subcategory": keys[i][1],
+                "count": int(c["count"][i]),
+                "x": float(c["x"][i]),
+                "y": float(c["y"][i]),
+                "radius": float(c["radius"][i]),
+            }
+            for i in np.flatnonzero(visible).tolist()
+        ]
+        result["edges"] = self._cluster_edges(level, visible)
+        return result
+
+
+def _cluster_id(level: str, key: Tuple[str, Optional[str]]) -> str:
+    if level == "category":
+        return f"category:{key[0]}"
+    return f"subcategory:{key[0]}/{key[1] or ''}"
+
+
+def _group(values: Sequence[Any]) -> Tuple[np.ndarray, List[Any]]:
+    """Dense labels for hashable values, keys in first-seen order."""
+    index: Dict[Any, int] = {}
+    labels = np.fromiter((index.setdefault(v, len(index)) for v in values), dtype=np.int64, count=len(values))
+    return labels, list(index)
+
+
+def compute_layout(graph: Dict[str, Any], algorithm: str = "force", fingerprint: Optional[str] = None) -> GraphLayout:
+    """Lay out a graph in the ``get_graph`` shape."""
+    nodes = graph["nodes"]
+    index = {node["id"]: i for i, node in enumerate(nodes)}
+    edges = [edge for edge in graph["edges"] if edge["source"] in index and edge["target"] in index]
+    sources = np.fromiter((index[e["source"]] for e in edges), dtype=np.int64, count=len(edges))
+    targets = np.fromiter((index[e["target"]] for e in edges), dtype=np.int64, count=len(edges))
+
+    categories, category_keys = _group([node["category"] for node in nodes])
+    subcategories, subcategory_keys = _group([(node["category"], node["subcategory"]) for node in nodes])
+
+    if algorithm == "hierarchical":
+        positions = _hierarchical(nodes, subcategories, subcategory_keys, sources, targets)
+    else:
+        positions = _clustered_force(subcategories, len(subcategory_keys), sources, targets)
+
+    return GraphLayout(
+        algorithm=algorithm,
+        fingerprint=fingerprint or graph_fingerprint(graph),
+        nodes=[
+            {"id": n["id"], "name": n["name"], "category": n["category"], "subcategory": n["subcategory"]}
+            for n in nodes
+        ],
+        positions=positions,
+        sources=sources,
+        targets=targets,
+        edge_types=[e["type"] for e in edges],
+        edge_protocols=[e["protocol"] for e in edges],
+        memberships={
+            "category": (categories, [(key, None) for key in category_keys]),
+            "subcategory": (subcategories, subcategory_keys),
+        },
+    )
+
+
+def _clustered_force(
+    labels: np.ndarray,
+    cluster_count: int,
+    sources: np.ndarray,
+    targets: np.ndarray,
+) -> np.ndarray:
+    n = len(labels)
+    positions = np.zeros((n, 2))
+    if n == 0:
+        return positions
+
+    order = np.argsort(labels, kind="stable")
+    starts = np.searchsorted(labels[order], np.arange(cluster_count + 1))
+    local = np.empty(n, dtype=np.int64)
+    radii = np.zeros(cluster_count)
+    inner = labels[sources] == labels[targets]
+
+    for c in range(cluster_count):
+        members = order[starts[c]:starts[c + 1]]
+        local[members] = np.arange(len(members))
+        mask = inner & (labels[sources] == c)
+        s, t = local[sources[mask]], local[targets[mask]]
+        # A BFS-ordered spiral keeps neighbors close; small clusters are refined
+        pos = np.empty((len(members), 2))
+        pos[bfs_order(len(members), s, t)] = spiral(len(members))
+        if len(members) <= INNER_FORCE_MAX_NODES:
+            pos = force_directed(len(members), s, t, initial=pos, iterations=INNER_FORCE_ITERATIONS)
+        positions[members] = pos
+        radii[c] = float(np.sqrt((pos ** 2).sum(-1)).max()) if len(members) else 0.0
+
+    # Lay out the cluster graph, then shift each cluster to its center
+    cross = ~inner
+    pairs = np.unique(np.column_stack([labels[sources[cross]], labels[targets[cross]]]), axis=0) if cross.any() \
+        else np.zeros((0, 2), dtype=np.int64)
+    centers = force_directed(cluster_count, pairs[:, 0], pairs[:, 1], sizes=radii, seed=cluster_count)
+    centers = _separate(centers, radii)
+    return positions + centers[labels]
+
+
+def _hierarchical(
+    nodes: List[Dict[str, Any]],
+    labels: np.ndarray,
+    keys: List[Tuple[str, Optional[str]]],
+    sources: np.ndarray,
+    targets: np.ndarray,
+) -> np.ndarray:
+    n = len(nodes)
+    positions = np.zeros((n, 2))
+    rank = {category: i for i, category in enumerate(CATEGORY_ORDER)}
+    columns = sorted({key[0] for key in keys}, key=lambda c: (rank.get(c, len(rank)), c))
+    # Tall categories wrap into several columns to keep the aspect ratio sane
+    height = max(20.0, 2 * np.sqrt(n)) * NODE_SPACING
+
+    neighbors: List[List[int]] = [[] for _ in range(n)]
+    for u, v in zip(sources.tolist(), targets.tolist()):
+        neighbors[u].append(v)
+        neighbors[v].append(u)
+
+    placed = np.zeros(n, dtype=bool)
+    members_of: Dict[int, List[int]] = {}
+    for i, label in enumerate(labels.tolist()):
+        members_of.setdefault(label, []).append(i)
+
+    def barycenter(i: int) -> float:
+        ys = [positions[j, 1] for j in neighbors[i] if placed[j]]
+        return sum(ys) / len(ys) if ys else float("inf")
+
+    x = 0.0
+    for category in columns:
+        y = 0.0
+        groups = sorted(
+            (i for i, key in enumerate(keys) if key[0] == category),
+            key=lambda i: keys[i][1] or "",
+        )
+        for group in groups:
+            members = members_of.get(group, [])
+            members.sort(key=lambda i: (barycenter(i), nodes[i]["name"] or ""))
+            for i in members:
+                if y > height:
+                    x += 2 * NODE_SPACING
+                    y = 0.0
+                positions[i] = (x, y)
+                y += NODE_SPACING
+            placed[members] = True
+            y += 2 * NODE_SPACING
+        x += 8 * NODE_SPACING
+    return positions
+
+
+class GraphLayoutCache:
+    """Per-project cache of computed layouts."""
+
+    def __init__(self, ttl_seconds: Optional[float] = None, max_entries: int = 256):
+        self._layouts: TTLCache[GraphLayout] = TTLCache(
+            max_entries=max_entries,
+            ttl_seconds=ttl_seconds or settings.GRAPH_LAYOUT_CACHE_TTL_SECONDS,
+        )
+
+    async def get(self, project_id: int, graph: Dict[str, Any], algorithm: str = "force") -> GraphLayout:
+        """Return the cached layout, recomputing if the graph changed.
+
+        Fingerprinting and layout run on the parse worker pool.
+        """
+        fingerprint = await run_in_parse_pool(graph_fingerprint, graph)
+        key = (project_id, algorithm)
+        layout = self._layouts.get(key)
+        if layout is None or layout.fingerprint != fingerprint:
+            layout = await run_in_parse_pool(compute_layout, graph, algorithm, fingerprint)
+            self._layouts.set(key, layout)
+        return layout
+
+    def invalidate(self, project_id: int) -> None:
+        for algorithm in LAYOUT_ALGORITHMS:
+            self._layouts.pop((project_id, algorithm))
+
+    def clear(self) -> None:
+        self._layouts.clear()
+
+
+graph_layouts = GraphLayoutCache()
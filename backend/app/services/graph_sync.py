@@ -0,0 +1,217 @@
+"""Change-log driven synchronisation of the graph backend.
+
+Asset, relation, threat and project writes made through the ORM append
+``graph_changes`` rows inside the same transaction. ``GraphSyncService``
+replays the log from the backend's checkpoint (see ``change_log`` for how
+late-committing entries are caught): changes are coalesced per
+entity (last operation wins), current rows are loaded with one query per
+entity type and written to the backend in batches, so a sync costs
+O(changes) rather than a full reload. Bulk writes that bypass the ORM call
+``record_changes`` explicitly.
+"""
+
+import logging
+from itertools import chain
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Set, Tuple
+
+from sqlalchemy import event, insert, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.clients.graph import GraphBackend, get_graph_backend
+from app.clients.graph.base import chunked
+from app.core.config import get_settings
+from app.models.asset import Asset, AssetRelation
+from app.models.graph import GraphChange
+from app.models.project import Project
+from app.models.threat import ThreatScenario
+from app.services.change_log import ChangeLogCursor, ChangeLogPruned
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+ENTITY_TYPES = {
+    Asset: "asset",
+    AssetRelation: "relation",
+    ThreatScenario: "threat",
+}
+
+# Upserts run parents first so relation and threat endpoints exist
+UPSERT_ORDER = ("asset", "relation", "threat")
+DELETE_ORDER = ("threat", "relation", "asset")
+
+_cursors: Dict[int, ChangeLogCursor] = {}
+
+
+def _columns(entity_type: str) -> Tuple[Any, List[Tuple[str, Any]]]:
+    """Return the model and ``(row key, column)`` pairs mirrored for an entity type."""
+    if entity_type == "asset":
+        return Asset, [
+            ("id", Asset.id), ("project_id", Asset.project_id), ("asset_id", Asset.asset_id),
+            ("name", Asset.name), ("category", Asset.category), ("subcategory", Asset.subcategory),
+        ]
+    if entity_type == "relation":
+        return AssetRelation, [
+            ("id", AssetRelation.id), ("project_id", AssetRelation.project_id),
+            ("source", AssetRelation.source_asset_id), ("target", AssetRelation.target_asset_id),
+            ("type", AssetRelation.relation_type), ("protocol", AssetRelation.protocol),
+        ]
+    return ThreatScenario, [
+        ("id", ThreatScenario.id), ("project_id", ThreatScenario.project_id),
+        ("asset_id", ThreatScenario.asset_id), ("threat_id", ThreatScenario.threat_id),
+        ("stride_type", ThreatScenario.stride_type), ("risk_level", ThreatScenario.risk_level),
+        ("attack_feasibility_value", ThreatScenario.attack_feasibility_value),
+        ("damage_scenario", ThreatScenario.damage_scenario),
+    ]
+
+
+async def record_changes(
+    db: AsyncSession,
+    entity_type: str,
+    ids: Optional[Sequence[int]] = None,
+    project_id: Optional[int] = None,
+) -> None:
+    """Log upserts made without the ORM, e.g. multi-row INSERT/UPDATE.
+
+    Without ``ids`` a single ``resync`` entry is logged, reloading every
+    row of the entity type in the project (or all projects).
+    """
+    if ids is None:
+        rows = [{"project_id": project_id, "entity_type": entity_type, "entity_id": None, "op": "resync"}]
+    else:
+        rows = [
+            {"project_id": project_id, "entity_type": entity_type, "entity_id": entity_id, "op": "upsert"}
+            for entity_id in ids
+        ]
+    for chunk in chunked(rows, settings.GRAPH_SYNC_BATCH_SIZE):
+        await db.execute(insert(GraphChange), list(chunk))
+
+
+class GraphSyncService:
+    """Replay the graph change log into a graph backend."""
+
+    def __init__(self, db: AsyncSession, backend: Optional[GraphBackend] = None):
+        self.db = db
+        self.backend = backend or get_graph_backend()
+        self.batch_size = settings.GRAPH_SYNC_BATCH_SIZE
+
+    async def sync(self) -> int:
+        """Apply pending changes; performs a full load on first sync.
+
+        Returns:
+            Number of change log entries applied
+        """
+        cursor = _cursors.setdefault(id(self.backend), ChangeLogCursor(self.batch_size))
+        async with cursor.lock:
+            checkpoint = await self.backend.get_checkpoint()
+            if checkpoint is not None:
+                try:
+                    applied, checkpoint = await cursor.replay(self.db, checkpoint, self._apply)
+                    await self.backend.set_checkpoint(checkpoint)
+                    return applied
+                except ChangeLogPruned as e:
+                    logger.warning(f"Graph backend fell behind the change log ({e}); reloading")
+            await self.full_sync(cursor)
+            return 0
+
+    async def full_sync(self, cursor: Optional[ChangeLogCursor] = None) -> None:
+        """Load every project into the backend and continue from the log.
+
+        The log position is taken first (see ``ChangeLogCursor.start``), so
+        changes committed during the load are replayed by the next sync;
+        upserts are idempotent.
+        """
+        cursor = cursor or _cursors.setdefault(id(self.backend), ChangeLogCursor(self.batch_size))
+        checkpoint = await cursor.start(self.db)
+        for entity_type in UPSERT_ORDER:
+            await self._resync(entity_type, None)
+        await self.backend.set_checkpoint(checkpoint)
+
+    async def _apply(self, changes: Sequence[Any]) -> None:
+        latest: Dict[Tuple[str, int], str] = {}
+        resyncs: List[Tuple[str, Optional[int]]] = []
+        deleted_projects: List[int] = []
+        for _, project_id, entity_type, entity_id, op in changes:
+            if entity_type == "project":
+                deleted_projects.append(project_id)
+            elif op == "resync":
+                resyncs.append((entity_type, project_id))
+            else:
+                latest[(entity_type, entity_id)] = op
+
+        for project_id in deleted_projects:
+            await self.backend.delete_project(project_id)
+
+        for entity_type in UPSERT_ORDER:
+            ids = [entity_id for (kind, entity_id), op in latest.items() if kind == entity_type and op == "upsert"]
+            if ids:
+                await self._upsert(entity_type, await self._load(entity_type, ids=ids))
+            for kind, project_id in dict.fromkeys(resyncs):
+                if kind == entity_type:
+                    await self._resync(entity_type, project_id)
+
+        for entity_type in DELETE_ORDER:
+            ids = [entity_id for (kind, entity_id), op in latest.items() if kind == entity_type and op == "delete"]
+            if ids:
+                await getattr(self.backend, f"delete_{entity_type}s")(ids)
+
+    async def _upsert(self, entity_type: str, rows: List[Dict[str, Any]]) -> None:
+        if rows:
+            await getattr(self.backend, f"upsert_{entity_type}s")(rows)
+
+    async def _load(self, entity_type: str, ids: Iterable[int]) -> List[Dict[str, Any]]:
+        """Load current rows by id; rows deleted since are skipped."""
+        model, columns = _columns(entity_type)
+        rows: List[Dict[str, Any]] = []
+        for chunk in chunked(sorted(ids), self.batch_size):
+            result = await self.db.execute(
+                select(*(column for _, column in columns)).where(model.id.in_(chunk))
+            )
+            rows.extend(dict(zip((key for key, _ in columns), row)) for row in result.all())
+        return rows
+
+    async def _resync(self, entity_type: str, project_id: Optional[int]) -> None:
+        """Reload all rows of an entity type in id-keyset batches."""
+        model, columns = _columns(entity_type)
+        last_id = 0
+        while True:
+            query = select(*(column for _, column in columns)).where(model.id > last_id)
+            if project_id is not None:
+                query = query.where(model.project_id == project_id)
+            result = await self.db.execute(query.order_by(model.id).limit(self.batch_size))
+            rows = [dict(zip((key for key, _ in columns), row)) for row in result.all()]
+            if not rows:
+                break
+            await self._upsert(entity_type, rows)
+            last_id = rows[-1]["id"]
+
+
+async def get_synced_graph_backend(db: AsyncSession) -> GraphBackend:
+    """Return the configured backend after applying pending changes."""
+    backend = get_graph_backend()
+    await GraphSyncService(db, backend).sync()
+    return backend
+
+
+@event.listens_for(Session, "after_flush")
+def _record_graph_changes(session: Session, flush_context) -> None:
+    """Log graph-affecting ORM changes in the flushing transaction."""
+    rows: List[Dict[str, Any]] = []
+    seen: Set[Tuple[str, int]] = set()
+    for obj in chain(session.new, session.dirty):
+        entity_type = ENTITY_TYPES.get(type(obj))
+        if entity_type is None or (entity_type, obj.id) in seen:
+            continue
+        if obj in session.dirty and not session.is_modified(obj, include_collections=False):
+            continue
+        seen.add((entity_type, obj.id))
+        rows.append({"project_id": obj.project_id, "entity_type": entity_type, "entity_id": obj.id, "op": "upsert"})
+    for obj in session.deleted:
+        if isinstance(obj, Project):
+            rows.append({"project_id": obj.id, "entity_type": "project", "entity_id": obj.id, "op": "delete"})
+            continue
+        entity_type = ENTITY_TYPES.get(type(obj))
+        if entity_type is not None:
+            rows.append({"project_id": obj.project_id, "entity_type": entity_type, "entity_id": obj.id, "op": "delete"})
+    if rows:
+        session.connection().execute(insert(GraphChange), rows)
@@ -0,0 +1,272 @@
+"""Segmented, compressed storage of document parse results.
+
+A parse result (text, tables, blocks, image handles) can run to many
+megabytes, so it is not kept in the ``documents`` row. Each section is cut
+into segments of about ``PARSE_RESULT_SEGMENT_BYTES`` of JSON, compressed
+with zstd and stored in blob storage under its content hash. The row's
+deferred ``parse_result`` column holds only a manifest: metadata, item
+counts and segment keys. A page of a section decompresses just the
+segments it overlaps.
+
+Results stored inline before this format (the full dict in the row) are
+still read, as a single in-memory segment per section.
+
+The manifest also lists every blob the result references (segments and
+extracted images). ``document_blobs`` rows track those references per
+document; blobs left without one are deleted by ``sweep_parse_blobs``.
+Blobs are written while parsing, before their references are recorded,
+so the sweep also keeps blobs written within the grace period.
+"""
+
+import hashlib
+import time
+from datetime import timedelta
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+import orjson
+import zstandard
+from sqlalchemy import delete, func, insert, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.clients.storage import get_blob_store
+from app.core.config import get_settings
+from app.models.document import Document, DocumentBlob
+from app.services.parsers.base import run_in_parse_pool
+from app.utils.ttl_cache import TTLCache
+
+settings = get_settings()
+
+SECTIONS = ("text_blocks", "tables", "blocks", "images")
+MANIFEST_FORMAT = 1
+# Released keys examined per sweep round
+SWEEP_BATCH_SIZE = 1000
+
+# Decoded segments by key; keys are content hashes, so entries never go stale
+_segment_cache: TTLCache[List[Any]] = TTLCache(max_entries=64, ttl_seconds=600)
+
+
+def is_manifest(result: Optional[Dict[str, Any]]) -> bool:
+    """Return True if ``result`` is a segment manifest, not an inline result."""
+    return bool(result) and result.get("format") == MANIFEST_FORMAT and "segments" in result
+
+
+def _split(items: List[Any]) -> Iterator[Tuple[int, int, bytes]]:
+    """Encode items and group them into segments.
+
+    Yields:
+        ``(start, count, json)`` per segment; each item is encoded once
+    """
+    start, encoded, size = 0, [], 0
+    for item in items:
+        data = orjson.dumps(item)
+        if encoded and size + len(data) > settings.PARSE_RESULT_SEGMENT_BYTES:
+            yield start, len(encoded), b"[" + b",".join(encoded) + b"]"
+            start, encoded, size = start + len(encoded), [], 0
+        encoded.append(data)
+        size += len(data) + 1
+    if encoded:
+        yield start, len(encoded), b"[" + b",".join(encoded) + b"]"
+
+
+def write_parse_result(content: Dict[str, Any]) -> Dict[str, Any]:
+    """Store a parse result (``ParsedContent.to_dict()``) and return its manifest.
+
+    Runs synchronously; call it on the parse worker pool.
+    """
+    store = get_blob_store()
+    compressor = zstandard.ZstdCompressor(level=settings.PARSE_RESULT_ZSTD_LEVEL)
+    manifest: Dict[str, Any] = {
+        "format": MANIFEST_FORMAT,
+        "codec": "zstd",
+        "metadata": content.get("metadata") or {},
+        "image_urls": content.get("image_urls") or [],
+        "counts": {},
+        "segments": {},
+        "blobs": [],
+    }
+    blobs = {image["key"] for image in content.get("images") or [] if image.get("key")}
+    for section in SECTIONS:
+        items = content.get(section) or []
+        segments = []
+        for start, count, data in _split(items):
+            compressed = compressor.compress(data)
+            digest = hashlib.sha256(compressed).hexdigest()
+            key = f"parse-results/{digest[:2]}/{digest}"
+            store.put(key, compressed, content_type="application/zstd")
+            segments.append({"key": key, "start": start, "count": count, "size": len(compressed)})
+        manifest["counts"][section] = len(items)
+        manifest["segments"][section] = segments
+        blobs.update(segment["key"] for segment in segments)
+    manifest["blobs"] = sorted(blobs)
+    return manifest
+
+
+def _load_segment(key: str) -> List[Any]:
+    items = _segment_cache.get(key)
+    if items is None:
+        items = orjson.loads(zstandard.ZstdDecompressor().decompress(get_blob_store().get(key)))
+        _segment_cache.set(key, items)
+    return items
+
+
+def read_section(
+    result: Optional[Dict[str, Any]],
+    section: str,
+    offset: int = 0,
+    limit: Optional[int] = None,
+) -> List[Any]:
+    """Return items ``offset`` to ``offset + limit`` of a section.
+
+    Runs synchronously; call it on the parse worker pool. Returned items
+    may be shared with the segment cache and must not be modified.
+    """
+    if not result:
+        return []
+    stop = None if limit is None else offset + limit
+    if not is_manifest(result):
+        return list((result.get(section) or [])[offset:stop])
+
+    items: List[Any] = []
+    for segment in result["segments"].get(section, []):
+        start, end = segment["start"], segment["start"] + segment["count"]
+        if end <= offset or (stop is not None and start >= stop):
+            continue
+        chunk = _load_segment(segment["key"])
+        items.extend(chunk[max(offset - start, 0):None if stop is None else stop - start])
+    return items
+
+
+def section_counts(result: Optional[Dict[str, Any]]) -> Dict[str, int]:
+    """Number of items per section."""
+    if not result:
+        return {section: 0 for section in SECTIONS}
+    if is_manifest(result):
+        return {section: result["counts"].get(section, 0) for section in SECTIONS}
+    return {section: len(result.get(section) or []) for section in SECTIONS}
+
+
+def summarize(result: Optional[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+    """Metadata and section counts of a parse result, without its content."""
+    if not result:
+        return None
+    return {
+        "metadata": result.get("metadata") or {},
+        "image_urls": result.get("image_urls") or [],
+        "counts": section_counts(result),
+    }
+
+
+async def save_parse_result(content: Dict[str, Any]) -> Dict[str, Any]:
+    """Store a parse result off the event loop and return its manifest."""
+    return await run_in_parse_pool(write_parse_result, content)
+
+
+async def load_section(
+    result: Optional[Dict[str, Any]],
+    section: str,
+    offset: int = 0,
+    limit: Optional[int] = None,
+) -> List[Any]:
+    """Read a range of a section off the event loop."""
+    if not is_manifest(result):
+        return read_section(result, section, offset, limit)
+    return await run_in_parse_pool(read_section, result, section, offset, limit)
+
+
+def clear_segment_cache() -> None:
+    """Drop decoded segments held in process."""
+    _segment_cache.clear()
+
+
+async def track_parse_blobs(
+    db: AsyncSession,
+    document_id: int,
+    manifest: Optional[Dict[str, Any]],
+) -> None:
+    """Make ``manifest`` the document's referenced parse result.
+
+    References of the previous result are released. Call it in the
+    transaction that stores the manifest.
+    """
+    await release_parse_blobs(db, document_id)
+    keys = (manifest or {}).get("blobs") or []
+    if keys:
+        await db.execute(insert(DocumentBlob), [{"document_id": document_id, "blob_key": key} for key in keys])
+
+
+async def release_parse_blobs(db: AsyncSession, document_id: int) -> None:
+    """Release the blob references of a document's parse result."""
+    await db.execute(
+        update(DocumentBlob)
+        .where(DocumentBlob.document_id == document_id, DocumentBlob.released_at.is_(None))
+        .values(released_at=func.now())
+    )
+
+
+def _delete_blobs(keys: List[str], written_before: float) -> List[str]:
+    """Delete the blobs not written since ``written_before``; return the others."""
+    store = get_blob_store()
+    kept = []
+    for key in keys:
+        written_at = store.written_at(key)
+        if written_at is not None and written_at >= written_before:
+            kept.append(key)
+        else:
+            store.delete(key)
+    return kept
+
+
+async def sweep_parse_blobs(db: AsyncSession, grace_seconds: Optional[int] = None) -> int:
+    """Delete blobs released more than ``grace_seconds`` ago that no document references.
+
+    References of deleted documents are released first. A key referenced
+    again (e.g. the same image in another document) is kept, and so is a
+    key written within ``grace_seconds``, as a parse that has not finished
+    may use it; its released references stay for a later sweep.
+
+    Returns:
+        Number of blobs deleted
+    """
+    if grace_seconds is None:
+        grace_seconds = settings.PARSE_BLOB_GRACE_SECONDS
+    await db.execute(
+        update(DocumentBlob)
+        .where(
+            DocumentBlob.released_at.is_(None),
+            DocumentBlob.document_id.not_in(select(Document.id)),
+        )
+        .values(released_at=func.now())
+    )
+    await db.commit()
+
+    cutoff = await db.scalar(select(func.now())) - timedelta(seconds=grace_seconds)
+    written_before = time.time() - grace_seconds
+    deleted = 0
+    last_key = ""
+    while True:
+        keys = (await db.execute(
+            select(DocumentBlob.blob_key)
+            .where(DocumentBlob.released_at < cutoff, DocumentBlob.blob_key > last_key)
+            .distinct()
+            .order_by(DocumentBlob.blob_key)
+            .limit(SWEEP_BATCH_SIZE)
+        )).scalars().all()
+        if not keys:
+            return deleted
+        last_key = keys[-1]
+        live = set((await db.execute(
+            select(DocumentBlob.blob_key)
+            .where(DocumentBlob.blob_key.in_(keys), DocumentBlob.released_at.is_(None))
+        )).scalars().all())
+        orphaned = [key for key in keys if key not in live]
+        kept = set()
+        if orphaned:
+            kept = set(await run_in_parse_pool(_delete_blobs, orphaned, written_before))
+            deleted += len(orphaned) - len(kept)
+        done = [key for key in keys if key not in kept]
+        if done:
+            await db.execute(
+                delete(DocumentBlob)
+                .where(DocumentBlob.blob_key.in_(done), DocumentBlob.released_at < cutoff)
+            )
+        await db.commit()
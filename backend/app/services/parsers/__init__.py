@@ -1,16 +1,34 @@
-"""Document parsers package."""
+"""Document parsers package.
+
+Parsers are registered lazily; see ``ParserFactory``. The parser classes
+stay importable from here and are loaded on attribute access.
+"""
+
+import importlib
+from typing import Any
 
 from app.services.parsers.base import BaseParser, ParsedContent, ParserFactory
-from app.services.parsers.pdf_parser import PDFParser
-from app.services.parsers.word_parser import WordParser
-from app.services.parsers.excel_parser import ExcelParser
-from app.services.parsers.image_parser import ImageParser
+
+# Parser class -> (module, supported extensions); must match each
+# parser's ``supported_extensions``
+PARSERS = {
+    "PDFParser": ("app.services.parsers.pdf_parser", ["pdf"]),
+    "WordParser": ("app.services.parsers.word_parser", ["docx", "doc"]),
+    "ExcelParser": ("app.services.parsers.excel_parser", ["xlsx", "xls", "csv"]),
+    "PPTXParser": ("app.services.parsers.pptx_parser", ["pptx", "ppt"]),
+    "ImageParser": ("app.services.parsers.image_parser", ["png", "jpg", "jpeg", "gif", "webp", "bmp"]),
+}
 
 # Register parsers
-ParserFactory.register(PDFParser())
-ParserFactory.register(WordParser())
-ParserFactory.register(ExcelParser())
-ParserFactory.register(ImageParser())
+for _name, (_module, _extensions) in PARSERS.items():
+    ParserFactory.register_lazy(f"{_module}:{_name}", _extensions)
+
+
+def __getattr__(name: str) -> Any:
+    if name in PARSERS:
+        return getattr(importlib.import_module(PARSERS[name][0]), name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
 
 __all__ = [
     "BaseParser",
@@ -19,5 +37,6 @@ __all__ = [
     "PDFParser",
     "WordParser",
     "ExcelParser",
+    "PPTXParser",
     "ImageParser",
 ]
@@ -1,8 +1,120 @@
-"""Base parser interface and factory."""
+"""Base parser interface, factory and parse worker pool."""
 
+import asyncio
+import hashlib
+import importlib
+import io
+import mimetypes
+import threading
 from abc import ABC, abstractmethod
-from dataclasses import dataclass, field
-from typing import Any, Dict, List, Optional
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict, dataclass, field
+from typing import Any, AsyncIterator, Callable, Dict, List, Optional, Sequence, TypeVar
+
+from app.clients.storage import get_blob_store
+from app.core.config import get_settings
+
+settings = get_settings()
+
+T = TypeVar("T")
+
+_parse_executor: Optional[ThreadPoolExecutor] = None
+
+
+def get_parse_executor() -> ThreadPoolExecutor:
+    """Return the thread pool that blocking parse work runs on."""
+    global _parse_executor
+    if _parse_executor is None:
+        _parse_executor = ThreadPoolExecutor(
+            max_workers=settings.PARSE_WORKERS,
+            thread_name_prefix="document-parse",
+        )
+    return _parse_executor
+
+
+async def run_in_parse_pool(func: Callable[..., T], *args: Any) -> T:
+    """Run blocking ``func(*args)`` on the parse worker pool.
+
+    Jobs must not wait on other jobs of the pool; fan out from the event
+    loop instead, so a full pool cannot deadlock.
+    """
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(get_parse_executor(), func, *args)
+
+
+def shutdown_parse_executor() -> None:
+    """Shut down the parse worker threads."""
+    global _parse_executor
+    if _parse_executor is not None:
+        _parse_executor.shutdown(wait=False)
+        _parse_executor = None
+
+
+@dataclass(frozen=True)
+class ImageRef:
+    """Handle to an extracted image kept in blob storage.
+
+    Images are stored once per content hash, so the same logo in many
+    documents or pages shares one blob. ``load`` reads the bytes on demand.
+    """
+
+    key: str
+    digest: str
+    mime_type: str
+    size: int
+    width: Optional[int] = None
+    height: Optional[int] = None
+
+    def load(self) -> bytes:
+        """Read the image bytes from blob storage."""
+        return get_blob_store().get(self.key)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert to dictionary."""
+        return asdict(self)
+
+
+def store_image(
+    data: bytes,
+    mime_type: Optional[str] = None,
+    width: Optional[int] = None,
+    height: Optional[int] = None,
+    min_dimension: Optional[int] = None,
+) -> Optional[ImageRef]:
+    """Store an extracted image in blob storage, keyed by its SHA-256.
+
+    Missing type and size are read from the image header. Images with a
+    side below ``min_dimension`` pixels (default ``IMAGE_MIN_DIMENSION``)
+    are treated as decorative and not stored.
+
+    Returns:
+        The image handle, or None if the image was filtered out
+    """
+    if mime_type is None or width is None or height is None:
+        from PIL import Image
+
+        try:
+            with Image.open(io.BytesIO(data)) as image:
+                mime_type = mime_type or Image.MIME.get(image.format or "")
+                width, height = image.size
+        except Exception:
+            # Formats Pillow cannot read (EMF, JBIG2...) are kept as they are
+            pass
+    if min_dimension is None:
+        min_dimension = settings.IMAGE_MIN_DIMENSION
+    if width is not None and height is not None and min(width, height) < min_dimension:
+        return None
+
+    mime_type = mime_type or "application/octet-stream"
+    digest = hashlib.sha256(data).hexdigest()
+    key = f"images/{digest[:2]}/{digest}"
+    get_blob_store().put(key, data, content_type=mime_type)
+    return ImageRef(key=key, digest=digest, mime_type=mime_type, size=len(data), width=width, height=height)
+
+
+def image_mime_type(extension: str) -> Optional[str]:
+    """Guess an image MIME type from a file extension such as ``png``."""
+    return mimetypes.guess_type(f"image.{extension}")[0]
 
 
 @dataclass
@@ -11,18 +123,64 @@ class ParsedContent:
 
     text_blocks: List[str] = field(default_factory=list)
     tables: List[List[List[str]]] = field(default_factory=list)
-    images: List[bytes] = field(default_factory=list)
+    # Distinct images; bytes stay in blob storage until ``ImageRef.load``
+    images: List[ImageRef] = field(default_factory=list)
     image_urls: List[str] = field(default_factory=list)
     metadata: Dict[str, Any] = field(default_factory=dict)
+    # Headings, paragraphs and tables in document order, each with the
+    # heading texts of its section; tables refer to ``tables`` by index
+    blocks: List[Dict[str, Any]] = field(default_factory=list)
+    _image_index: Dict[str, int] = field(default_factory=dict, repr=False, compare=False)
+
+    def add_image_ref(self, image: ImageRef) -> int:
+        """Add an image unless one with the same content is present.
+
+        Returns:
+            Index of the image in ``images``
+        """
+        if image.digest not in self._image_index:
+            self._image_index[image.digest] = len(self.images)
+            self.images.append(image)
+        return self._image_index[image.digest]
+
+    def add_image(self, data: bytes, **kwargs: Any) -> Optional[int]:
+        """Store image bytes (see ``store_image``) and add the handle.
+
+        Returns:
+            Index of the image in ``images``, or None if it was filtered out
+        """
+        image = store_image(data, **kwargs)
+        return None if image is None else self.add_image_ref(image)
+
+    def extend(self, fragment: "ParsedContent") -> None:
+        """Append the next fragment of the same document (see ``iter_parse``).
+
+        Table and image indices in the fragment's blocks are renumbered to
+        this content; metadata keys of later fragments win.
+        """
+        table_offset = len(self.tables)
+        images = [self.add_image_ref(image) for image in fragment.images]
+        self.text_blocks.extend(fragment.text_blocks)
+        self.tables.extend(fragment.tables)
+        self.image_urls.extend(fragment.image_urls)
+        self.metadata.update(fragment.metadata)
+        for block in fragment.blocks:
+            block = dict(block)
+            if "table" in block:
+                block["table"] += table_offset
+            if "images" in block:
+                block["images"] = list(dict.fromkeys(images[index] for index in block["images"]))
+            self.blocks.append(block)
 
     def to_dict(self) -> Dict[str, Any]:
         """Convert to dictionary."""
         return {
             "text_blocks": self.text_blocks,
             "tables": self.tables,
-            "images": [f"<image:{len(img)} bytes>" for img in self.images],
+            "images": [image.to_dict() for image in self.images],
             "image_urls": self.image_urls,
             "metadata": self.metadata,
+            "blocks": self.blocks,
         }
 
 
@@ -40,17 +198,29 @@ class BaseParser(ABC):
         pass
 
     @abstractmethod
-    async def parse(self, file_path: str) -> ParsedContent:
+    async def parse(self, file_path: str, category: Optional[str] = None) -> ParsedContent:
         """Parse a document file.
         
         Args:
             file_path: Path to the document file
+            category: Document category, for parsers that tune extraction
+                per category
             
         Returns:
             ParsedContent object with extracted content
         """
         pass
 
+    async def iter_parse(self, file_path: str, category: Optional[str] = None) -> AsyncIterator[ParsedContent]:
+        """Parse a document as fragments in document order.
+
+        Merging the fragments with ``ParsedContent.extend`` gives the
+        ``parse`` result. Parsers that can hand out early parts of a file
+        before reading all of it override this; by default the whole
+        document is one fragment.
+        """
+        yield await self.parse(file_path, category)
+
     def supports(self, file_type: str) -> bool:
         """Check if this parser supports the given file type.
         
@@ -64,14 +234,48 @@ class BaseParser(ABC):
 
 
 class ParserFactory:
-    """Factory for getting appropriate document parser."""
+    """Factory for getting appropriate document parser.
+
+    Parsers are registered by extension, either as instances or lazily as
+    ``"module:Class"`` paths. A lazy parser's module, and with it PyMuPDF,
+    openpyxl, lxml or Pillow, is imported on first use, so processes that
+    never parse do not pay for those imports.
+    """
 
-    _parsers: List[BaseParser] = []
+    # extension -> parser instance, or "module:Class" path until first use
+    _parsers: Dict[str, Any] = {}
+    _lock = threading.Lock()
 
     @classmethod
     def register(cls, parser: BaseParser) -> None:
-        """Register a parser instance."""
-        cls._parsers.append(parser)
+        """Register a parser instance for its supported extensions."""
+        for extension in parser.supported_extensions:
+            cls._parsers[extension] = parser
+
+    @classmethod
+    def register_lazy(cls, path: str, extensions: Sequence[str]) -> None:
+        """Register a parser class by ``"module:Class"`` path.
+
+        Args:
+            path: Import path of the parser class
+            extensions: File extensions the parser supports
+        """
+        for extension in extensions:
+            cls._parsers[extension] = path
+
+    @classmethod
+    def _load(cls, extension: str) -> BaseParser:
+        """Import the lazily registered parser of ``extension``."""
+        with cls._lock:
+            path = cls._parsers[extension]
+            if isinstance(path, str):
+                module_name, class_name = path.split(":")
+                parser = getattr(importlib.import_module(module_name), class_name)()
+                # One instance serves every extension registered with the path
+                for other, registered in cls._parsers.items():
+                    if registered == path:
+                        cls._parsers[other] = parser
+            return cls._parsers[extension]
 
     @classmethod
     def get_parser(cls, file_type: str) -> Optional[BaseParser]:
@@ -84,18 +288,30 @@ class ParserFactory:
             Parser instance or None if no parser supports this type
         """
         file_type = file_type.lower().lstrip('.')
-        for parser in cls._parsers:
-            if parser.supports(file_type):
-                return parser
-        return None
+        parser = cls._parsers.get(file_type)
+        if isinstance(parser, str):
+            parser = cls._load(file_type)
+        return parser
+
+    @classmethod
+    def warm_up(cls) -> List[str]:
+        """Import and instantiate every lazily registered parser.
+
+        Called by processes that parse, so the first document does not
+        pay for the imports.
+
+        Returns:
+            Extensions whose parser was loaded by this call
+        """
+        loaded = [extension for extension, parser in cls._parsers.items() if isinstance(parser, str)]
+        for extension in loaded:
+            cls.get_parser(extension)
+        return loaded
 
     @classmethod
     def supported_types(cls) -> List[str]:
         """Get list of all supported file types."""
-        types = set()
-        for parser in cls._parsers:
-            types.update(parser.supported_extensions)
-        return list(types)
+        return list(cls._parsers)
 
     @classmethod
     def get_supported_extensions(cls) -> List[str]:
@@ -1,68 +1,169 @@
-"""Excel document parser using openpyxl."""
+"""Spreadsheet document parser.
 
-from typing import Any, List
+.xlsx workbooks are streamed with openpyxl in read-only mode, which reads
+rows from the sheet XML instead of building a cell object for every cell
+of the workbook. Legacy .xls workbooks are read with xlrd (optional, one
+sheet loaded at a time) and .csv files with the csv module. Either way
+rows are converted and added to ``ParsedContent`` one at a time.
+"""
+
+import csv
+import os
+import zipfile
+from typing import Any, Iterable, List, Optional
 
 from openpyxl import load_workbook
 
-from app.services.parsers.base import BaseParser, ParsedContent
+from app.core.config import get_settings
+from app.services.parsers.base import BaseParser, ParsedContent, run_in_parse_pool
+
+settings = get_settings()
+
+# Bytes read to guess a CSV file's encoding and delimiter
+CSV_SAMPLE_SIZE = 64 * 1024
 
 
 class ExcelParser(BaseParser):
-    """Parser for Excel documents."""
+    """Parser for Excel and CSV documents."""
+
+    def __init__(self, preview_rows: Optional[int] = None, max_rows: Optional[int] = None):
+        self.preview_rows = settings.EXCEL_PREVIEW_ROWS if preview_rows is None else preview_rows
+        self.max_rows = settings.EXCEL_MAX_ROWS_PER_SHEET if max_rows is None else max_rows
 
     @property
     def supported_extensions(self) -> list[str]:
         """Return list of supported file extensions."""
-        return ['xlsx', 'xls']
+        return ['xlsx', 'xls', 'csv']
+
+    async def parse(self, file_path: str, category: Optional[str] = None) -> ParsedContent:
+        """Parse a spreadsheet.
+
+        Reading runs on the parse worker pool; large sheets take a while.
 
-    async def parse(self, file_path: str) -> ParsedContent:
-        """Parse an Excel document.
-        
         Args:
-            file_path: Path to the Excel file
-            
+            file_path: Path to the .xlsx, .xls or .csv file
+
         Returns:
-            ParsedContent with extracted tables
+            ParsedContent with one table per non-empty sheet
         """
+        return await run_in_parse_pool(self._parse, file_path)
+
+    def _parse(self, file_path: str) -> ParsedContent:
         result = ParsedContent()
+        result.metadata = {"sheet_names": [], "sheet_count": 0, "row_counts": {}}
 
         try:
-            wb = load_workbook(file_path, data_only=True)
-
-            result.metadata = {
-                "sheet_names": wb.sheetnames,
-                "sheet_count": len(wb.sheetnames),
-            }
+            # Dispatch on content: .xls uploads are sometimes xlsx files
+            if zipfile.is_zipfile(file_path):
+                self._parse_xlsx(file_path, result)
+            elif file_path.lower().endswith(".csv"):
+                self._parse_csv(file_path, result)
+            else:
+                self._parse_xls(file_path, result)
+        except Exception as e:
+            result.metadata["error"] = str(e)
 
-            for sheet_name in wb.sheetnames:
-                ws = wb[sheet_name]
+        return result
 
-                # Extract sheet data as table
-                table_data = []
-                for row in ws.iter_rows(values_only=True):
-                    row_data = [self._cell_to_str(cell) for cell in row]
-                    # Skip completely empty rows
-                    if any(cell for cell in row_data):
-                        table_data.append(row_data)
+    def _parse_xlsx(self, file_path: str, result: ParsedContent) -> None:
+        wb = load_workbook(file_path, read_only=True, data_only=True)
+        try:
+            for ws in wb.worksheets:
+                # Dimensions recorded by some writers are wrong and would
+                # cut rows off; read until the sheet data ends instead
+                ws.reset_dimensions()
+                self._add_sheet(result, ws.title, ws.iter_rows(values_only=True))
+        finally:
+            wb.close()
 
-                if table_data:
-                    result.tables.append(table_data)
+    def _parse_xls(self, file_path: str, result: ParsedContent) -> None:
+        try:
+            import xlrd
+        except ImportError:
+            raise ValueError("Reading .xls files requires the xlrd package") from None
 
-                    # Also add as text block for searchability
-                    sheet_text = f"Sheet: {sheet_name}\n"
-                    for row in table_data[:10]:  # First 10 rows as preview
-                        sheet_text += " | ".join(row) + "\n"
-                    result.text_blocks.append(sheet_text)
+        book = xlrd.open_workbook(file_path, on_demand=True)
+        try:
+            for name in book.sheet_names():
+                sheet = book.sheet_by_name(name)
+                rows = (
+                    [
+                        xlrd.xldate_as_datetime(cell.value, book.datemode)
+                        if cell.ctype == xlrd.XL_CELL_DATE else cell.value
+                        for cell in row
+                    ]
+                    for row in sheet.get_rows()
+                )
+                self._add_sheet(result, name, rows)
+                book.unload_sheet(name)
+        finally:
+            book.release_resources()
+
+    def _parse_csv(self, file_path: str, result: ParsedContent) -> None:
+        with open(file_path, "rb") as f:
+            sample = f.read(CSV_SAMPLE_SIZE)
+        encoding = "utf-8-sig"
+        try:
+            sample.decode(encoding)
+        except UnicodeDecodeError as e:
+            # A multi-byte character cut by the sample boundary is still UTF-8
+            if e.start < len(sample) - 3:
+                encoding = "gb18030"
+        text = sample.decode(encoding, errors="ignore")
+        try:
+            dialect = csv.Sniffer().sniff(text, delimiters=",;\t|")
+        except csv.Error:
+            dialect = csv.excel
 
-            wb.close()
+        with open(file_path, newline="", encoding=encoding, errors="replace") as f:
+            name = os.path.splitext(os.path.basename(file_path))[0]
+            self._add_sheet(result, name, csv.reader(f, dialect))
 
-        except Exception as e:
-            result.metadata["error"] = str(e)
+    def _add_sheet(self, result: ParsedContent, name: str, rows: Iterable[Iterable[Any]]) -> None:
+        """Consume a sheet's rows into a table and a preview text block.
 
-        return result
+        Empty rows and trailing empty cells are dropped, then rows are
+        padded to the sheet's width. Rows past ``max_rows`` are counted
+        but not kept.
+        """
+        result.metadata["sheet_names"].append(name)
+        result.metadata["sheet_count"] += 1
+
+        table_data: List[List[str]] = []
+        count = 0
+        width = 0
+        for row in rows:
+            row_data = [self._cell_to_str(cell) for cell in row]
+            while row_data and not row_data[-1]:
+                row_data.pop()
+            if not row_data:
+                continue
+            count += 1
+            if self.max_rows is None or count <= self.max_rows:
+                table_data.append(row_data)
+                width = max(width, len(row_data))
+
+        result.metadata["row_counts"][name] = count
+        if count > len(table_data):
+            result.metadata.setdefault("truncated_sheets", []).append(name)
+        if not table_data:
+            return
+
+        for row_data in table_data:
+            row_data.extend([""] * (width - len(row_data)))
+        result.tables.append(table_data)
+
+        # Also add as text block for searchability
+        sheet_text = f"Sheet: {name}\n"
+        for row_data in table_data[:self.preview_rows]:
+            sheet_text += " | ".join(row_data) + "\n"
+        result.text_blocks.append(sheet_text)
 
     def _cell_to_str(self, cell: Any) -> str:
         """Convert a cell value to string."""
         if cell is None:
             return ""
+        if isinstance(cell, float) and cell.is_integer():
+            # Whole numbers read as floats (xlrd, formulas) print without .0
+            return str(int(cell))
         return str(cell).strip()
@@ -6,7 +6,11 @@ from typing import Optional
 
 from PIL import Image
 
-from app.services.parsers.base import BaseParser, ParsedContent
+from app.core.config import get_settings
+from app.services.parsers.base import BaseParser, ParsedContent, run_in_parse_pool
+from app.services.vision_preprocess import load_rgb, oriented_size, perceptual_hash
+
+settings = get_settings()
 
 
 class ImageParser(BaseParser):
@@ -17,7 +21,7 @@ class ImageParser(BaseParser):
         """Return list of supported file extensions."""
         return ['png', 'jpg', 'jpeg', 'gif', 'webp', 'bmp']
 
-    async def parse(self, file_path: str) -> ParsedContent:
+    async def parse(self, file_path: str, category: Optional[str] = None) -> ParsedContent:
         """Parse an image file.
         
         Args:
@@ -26,6 +30,9 @@ class ImageParser(BaseParser):
         Returns:
             ParsedContent with image data
         """
+        return await run_in_parse_pool(self._parse, file_path)
+
+    def _parse(self, file_path: str) -> ParsedContent:
         result = ParsedContent()
 
         try:
@@ -33,21 +40,32 @@ class ImageParser(BaseParser):
             with open(file_path, 'rb') as f:
                 image_bytes = f.read()
 
-            result.images.append(image_bytes)
-
-            # Get image metadata
-            img = Image.open(io.BytesIO(image_bytes))
-            result.metadata = {
-                "format": img.format,
-                "size": img.size,
-                "mode": img.mode,
-                "width": img.width,
-                "height": img.height,
-            }
-
-            # Convert to base64 for API calls
-            base64_image = base64.b64encode(image_bytes).decode('utf-8')
-            result.metadata["base64_preview"] = base64_image[:100] + "..."
+            # Get image metadata (reads the header only)
+            with Image.open(io.BytesIO(image_bytes)) as img:
+                result.metadata = {
+                    "format": img.format,
+                    "size": img.size,
+                    "mode": img.mode,
+                    "width": img.width,
+                    "height": img.height,
+                }
+                # The upload is the content itself, so it is never filtered out
+                result.add_image(
+                    image_bytes,
+                    mime_type=Image.MIME.get(img.format or ""),
+                    width=img.width,
+                    height=img.height,
+                    min_dimension=0,
+                )
+                size = oriented_size(img)
+
+            # Same decode and hash as vision preprocessing, so the hash
+            # identifies cached architecture results
+            image = load_rgb(image_bytes, settings.VISION_MAX_PIXELS)
+            result.metadata["phash"] = perceptual_hash(image, size)
+
+            # The first 75 bytes encode to the first 100 base64 characters
+            result.metadata["base64_preview"] = base64.b64encode(image_bytes[:75]).decode('utf-8') + "..."
 
         except Exception as e:
             result.metadata["error"] = str(e)
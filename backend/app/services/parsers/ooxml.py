@@ -0,0 +1,55 @@
+"""Helpers for reading Office Open XML packages (.docx, .pptx) directly."""
+
+import posixpath
+import zipfile
+from typing import Dict, Optional, Set, Tuple
+
+from lxml import etree
+
+REL = "{http://schemas.openxmlformats.org/package/2006/relationships}"
+DC = "{http://purl.org/dc/elements/1.1/}"
+DCTERMS = "{http://purl.org/dc/terms/}"
+R = "{http://schemas.openxmlformats.org/officeDocument/2006/relationships}"
+
+
+def read_core_properties(package: zipfile.ZipFile, names: Set[str]) -> Dict[str, str]:
+    """Read title, author and creation time from ``docProps/core.xml``."""
+    properties = {"title": "", "author": "", "created": ""}
+    if "docProps/core.xml" not in names:
+        return properties
+    root = etree.fromstring(package.read("docProps/core.xml"))
+    for key, tag in (("title", f"{DC}title"), ("author", f"{DC}creator"), ("created", f"{DCTERMS}created")):
+        element = root.find(tag)
+        if element is not None and element.text:
+            properties[key] = element.text.strip()
+    return properties
+
+
+def read_relationships(
+    package: zipfile.ZipFile,
+    names: Set[str],
+    part_name: str,
+) -> Dict[str, Tuple[str, Optional[str]]]:
+    """Read the relationships of a package part.
+
+    Returns:
+        ``{rId: (relationship type, target part name)}``; the part name is
+        None for external targets and targets missing from the package
+    """
+    directory, filename = posixpath.split(part_name)
+    rels_name = posixpath.join(directory, "_rels", f"{filename}.rels")
+    if rels_name not in names:
+        return {}
+    relationships = {}
+    for rel in etree.fromstring(package.read(rels_name)).iterfind(f"{REL}Relationship"):
+        target: Optional[str] = rel.get("Target", "")
+        if rel.get("TargetMode") == "External":
+            target = None
+        elif target.startswith("/"):
+            target = target[1:]
+        else:
+            target = posixpath.normpath(posixpath.join(directory, target))
+        if target not in names:
+            target = None
+        relationships[rel.get("Id")] = (rel.get("Type", "").rsplit("/", 1)[-1], target)
+    return relationships
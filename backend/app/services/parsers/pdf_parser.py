@@ -1,11 +1,82 @@
-"""PDF document parser using PyMuPDF."""
+"""PDF document parser using PyMuPDF.
 
-import io
-from typing import List
+Table detection (``page.find_tables()``) is by far the most expensive
+step per page. Its default "lines" strategy builds cells only from
+vector ruling lines and filled rectangles, so in "fast" mode pages
+without enough horizontal and vertical edges to form a cell are skipped
+without running it. "full" runs it on every page and "off" skips tables.
+The mode is set per document category, see ``table_mode``.
+
+``iter_parse`` hands out the document in batches of ``PDF_STREAM_PAGES``
+pages, so consumers can start on the first pages while later ones are
+still being read.
+"""
+
+from typing import Any, AsyncIterator, Dict, List, Optional
 
 import fitz  # PyMuPDF
 
-from app.services.parsers.base import BaseParser, ParsedContent
+from app.core.config import get_settings
+from app.services.parsers.base import (
+    BaseParser,
+    ParsedContent,
+    image_mime_type,
+    run_in_parse_pool,
+    store_image,
+)
+
+settings = get_settings()
+
+TABLE_MODES = ("off", "fast", "full")
+
+# Same as find_tables' edge_min_length: shorter edges are ignored there too
+_MIN_EDGE_LENGTH = 3.0
+# Tolerance for an edge to count as horizontal or vertical
+_AXIS_TOLERANCE = 1.0
+
+
+def table_mode(category: Optional[str] = None) -> str:
+    """Table detection mode for a document category.
+
+    Unknown modes fall back to "full", which never loses tables.
+    """
+    mode = settings.PDF_TABLE_MODE_BY_CATEGORY.get(category or "", settings.PDF_TABLE_MODE)
+    return mode if mode in TABLE_MODES else "full"
+
+
+def has_table_edges(page: fitz.Page) -> bool:
+    """Cheap check whether a page has the ruling a table needs.
+
+    Counts axis-aligned edges among the page's vector drawings: lines,
+    and the sides of rectangles and axis-aligned quads. A table needs at
+    least two horizontal and two vertical edges.
+    """
+    horizontal = vertical = 0
+    for path in page.get_cdrawings():
+        for item in path["items"]:
+            kind = item[0]
+            if kind == "l":
+                (x0, y0), (x1, y1) = item[1], item[2]
+                if abs(y1 - y0) <= _AXIS_TOLERANCE and abs(x1 - x0) >= _MIN_EDGE_LENGTH:
+                    horizontal += 1
+                elif abs(x1 - x0) <= _AXIS_TOLERANCE and abs(y1 - y0) >= _MIN_EDGE_LENGTH:
+                    vertical += 1
+                continue
+            if kind == "re":
+                x0, y0, x1, y1 = item[1]
+            elif kind == "qu":
+                (x0, y0), (ur_x, ur_y), (ll_x, ll_y), (x1, y1) = item[1]
+                if abs(ur_y - y0) > _AXIS_TOLERANCE or abs(ll_x - x0) > _AXIS_TOLERANCE:
+                    continue  # rotated quad, not usable as cell borders
+            else:
+                continue
+            if abs(x1 - x0) >= _MIN_EDGE_LENGTH:
+                horizontal += 2
+            if abs(y1 - y0) >= _MIN_EDGE_LENGTH:
+                vertical += 2
+        if horizontal >= 2 and vertical >= 2:
+            return True
+    return False
 
 
 class PDFParser(BaseParser):
@@ -16,39 +87,60 @@ class PDFParser(BaseParser):
         """Return list of supported file extensions."""
         return ['pdf']
 
-    async def parse(self, file_path: str) -> ParsedContent:
+    async def parse(self, file_path: str, category: Optional[str] = None) -> ParsedContent:
         """Parse a PDF document.
         
         Args:
             file_path: Path to the PDF file
+            category: Document category, selects the table detection mode
             
         Returns:
             ParsedContent with extracted text, tables, and images
         """
+        return await run_in_parse_pool(self._parse, file_path, table_mode(category))
+
+    async def iter_parse(self, file_path: str, category: Optional[str] = None) -> AsyncIterator[ParsedContent]:
+        """Parse a PDF document in batches of ``PDF_STREAM_PAGES`` pages.
+
+        The first fragment carries the document metadata; the last one the
+        total ``table_pages_scanned``.
+        """
+        mode = table_mode(category)
+        try:
+            doc = await run_in_parse_pool(fitz.open, file_path)
+        except Exception as e:
+            yield ParsedContent(metadata={"error": str(e)})
+            return
+
+        try:
+            metadata = self._metadata(doc, mode)
+            seen_xrefs: Dict[int, Optional[int]] = {}
+            table_pages = 0
+            page_count = len(doc)
+            for start in range(0, page_count or 1, settings.PDF_STREAM_PAGES):
+                fragment = ParsedContent(metadata=metadata if start == 0 else {})
+                stop = min(start + settings.PDF_STREAM_PAGES, page_count)
+                try:
+                    table_pages += await run_in_parse_pool(
+                        self._parse_pages, doc, range(start, stop), mode, seen_xrefs, fragment
+                    )
+                except Exception as e:
+                    fragment.metadata["error"] = str(e)
+                    yield fragment
+                    return
+                if stop == page_count:
+                    fragment.metadata["table_pages_scanned"] = table_pages
+                yield fragment
+        finally:
+            doc.close()
+
+    def _parse(self, file_path: str, mode: str = "full") -> ParsedContent:
         result = ParsedContent()
-        
+
         try:
             doc = fitz.open(file_path)
-            result.metadata = {
-                "page_count": len(doc),
-                "title": doc.metadata.get("title", ""),
-                "author": doc.metadata.get("author", ""),
-            }
-
-            for page_num, page in enumerate(doc):
-                # Extract text
-                text = page.get_text()
-                if text.strip():
-                    result.text_blocks.append(text)
-
-                # Extract tables
-                tables = self._extract_tables(page)
-                result.tables.extend(tables)
-
-                # Extract images
-                images = self._extract_images(doc, page)
-                result.images.extend(images)
-
+            result.metadata = self._metadata(doc, mode)
+            result.metadata["table_pages_scanned"] = self._parse_pages(doc, range(len(doc)), mode, {}, result)
             doc.close()
 
         except Exception as e:
@@ -56,6 +148,48 @@ class PDFParser(BaseParser):
 
         return result
 
+    def _metadata(self, doc: fitz.Document, mode: str) -> Dict[str, Any]:
+        return {
+            "page_count": len(doc),
+            "title": doc.metadata.get("title", ""),
+            "author": doc.metadata.get("author", ""),
+            "table_mode": mode,
+        }
+
+    def _parse_pages(
+        self,
+        doc: fitz.Document,
+        pages: range,
+        mode: str,
+        seen_xrefs: Dict[int, Optional[int]],
+        result: ParsedContent,
+    ) -> int:
+        """Extract text, tables and images of ``pages`` into ``result``.
+
+        Args:
+            seen_xrefs: Image xrefs already extracted, shared by all batches
+                of a document so repeated images are extracted once
+
+        Returns:
+            Number of pages find_tables() ran on
+        """
+        table_pages = 0
+        for page_num in pages:
+            page = doc[page_num]
+            # Extract text
+            text = page.get_text()
+            if text.strip():
+                result.text_blocks.append(text)
+
+            # Extract tables
+            if mode == "full" or (mode == "fast" and has_table_edges(page)):
+                table_pages += 1
+                result.tables.extend(self._extract_tables(page))
+
+            # Extract images
+            self._extract_images(doc, page, seen_xrefs, result)
+        return table_pages
+
     def _extract_tables(self, page: fitz.Page) -> List[List[List[str]]]:
         """Extract tables from a PDF page."""
         tables = []
@@ -70,18 +204,37 @@ class PDFParser(BaseParser):
             pass
         return tables
 
-    def _extract_images(self, doc: fitz.Document, page: fitz.Page) -> List[bytes]:
-        """Extract images from a PDF page."""
-        images = []
+    def _extract_images(
+        self,
+        doc: fitz.Document,
+        page: fitz.Page,
+        seen_xrefs: Dict[int, Optional[int]],
+        result: ParsedContent,
+    ) -> None:
+        """Extract the images of a PDF page not extracted before.
+
+        An image object repeated on many pages (logos, headers) shares one
+        xref and is extracted once; equal images under different xrefs are
+        merged by content hash. Small images are skipped before extraction,
+        using the dimensions listed for the page.
+        """
         try:
-            image_list = page.get_images()
-            for img_index, img in enumerate(image_list):
-                xref = img[0]
+            for img in page.get_images(full=True):
+                xref, width, height = img[0], img[2], img[3]
+                if xref in seen_xrefs:
+                    continue
+                seen_xrefs[xref] = None
+                if min(width, height) < settings.IMAGE_MIN_DIMENSION:
+                    continue
                 base_image = doc.extract_image(xref)
-                if base_image:
-                    image_bytes = base_image.get("image")
-                    if image_bytes:
-                        images.append(image_bytes)
+                if base_image and base_image.get("image"):
+                    image = store_image(
+                        base_image["image"],
+                        mime_type=image_mime_type(base_image.get("ext", "")),
+                        width=base_image.get("width", width),
+                        height=base_image.get("height", height),
+                    )
+                    if image is not None:
+                        seen_xrefs[xref] = result.add_image_ref(image)
         except Exception:
             pass
-        return images
@@ -0,0 +1,265 @@
+"""PowerPoint document parser.
+
+Slides are read straight from the package XML with lxml, one parse pool
+job per slide, and assembled in presentation order. Each slide yields
+a block with its title, text, speaker notes and image indices, followed
+by its table blocks, so asset identification can work slide by slide.
+Images used on several slides (logos, templates) are stored once, and
+small decorative images are dropped.
+"""
+
+import asyncio
+import zipfile
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from lxml import etree
+
+from app.services.parsers.base import BaseParser, ImageRef, ParsedContent, run_in_parse_pool, store_image
+from app.services.parsers.ooxml import R, read_core_properties, read_relationships
+
+_P = "{http://schemas.openxmlformats.org/presentationml/2006/main}"
+_A = "{http://schemas.openxmlformats.org/drawingml/2006/main}"
+
+_TITLE_PLACEHOLDERS = {"title", "ctrTitle"}
+# Placeholders holding slide furniture rather than content
+_SKIPPED_PLACEHOLDERS = {"dt", "ftr", "sldNum", "hdr", "sldImg"}
+_TRUE = {"1", "true"}
+
+
+@dataclass
+class _Slide:
+    """Content of one slide, before tables and images are numbered across the deck."""
+
+    title: str = ""
+    texts: List[str] = field(default_factory=list)
+    tables: List[List[List[str]]] = field(default_factory=list)
+    merged: List[List[List[int]]] = field(default_factory=list)
+    images: List[ImageRef] = field(default_factory=list)
+    notes: str = ""
+    hidden: bool = False
+
+
+def _paragraphs_text(container: etree._Element) -> str:
+    """Text of the ``a:p`` paragraphs under ``container``, one per line."""
+    lines = []
+    for paragraph in container.iter(f"{_A}p"):
+        parts = []
+        for element in paragraph.iter(f"{_A}t", f"{_A}br"):
+            parts.append("\n" if element.tag == f"{_A}br" else element.text or "")
+        line = "".join(parts).strip()
+        if line:
+            lines.append(line)
+    return "\n".join(lines)
+
+
+def _placeholder_type(shape: etree._Element) -> Optional[str]:
+    for ph in shape.iter(f"{_P}ph"):
+        return ph.get("type", "body")
+    return None
+
+
+class PPTXParser(BaseParser):
+    """Parser for PowerPoint documents."""
+
+    @property
+    def supported_extensions(self) -> list[str]:
+        """Return list of supported file extensions."""
+        return ['pptx', 'ppt']
+
+    async def parse(self, file_path: str, category: Optional[str] = None) -> ParsedContent:
+        """Parse a PowerPoint document.
+
+        Slides are extracted in parallel on the parse worker pool.
+
+        Args:
+            file_path: Path to the PowerPoint file
+
+        Returns:
+            ParsedContent with a text block per slide, plus slide and
+            table blocks
+        """
+        result = ParsedContent()
+
+        try:
+            package = await run_in_parse_pool(zipfile.ZipFile, file_path)
+        except zipfile.BadZipFile:
+            result.metadata["error"] = "Not a .pptx file (legacy .ppt is not supported)"
+            return result
+        except Exception as e:
+            result.metadata["error"] = str(e)
+            return result
+
+        try:
+            names = set(package.namelist())
+            result.metadata, slide_parts = await run_in_parse_pool(self._read_presentation, package, names)
+            result.metadata["slide_count"] = len(slide_parts)
+            # Image part -> stored image, shared by the slide jobs
+            images: Dict[str, Optional[ImageRef]] = {}
+            slides = await asyncio.gather(*(
+                run_in_parse_pool(self._read_slide, package, names, part, images) for part in slide_parts
+            ))
+            self._assemble(slides, result)
+        except Exception as e:
+            result.metadata["error"] = str(e)
+        finally:
+            package.close()
+
+        return result
+
+    def _read_presentation(
+        self, package: zipfile.ZipFile, names: Set[str]
+    ) -> Tuple[Dict[str, Any], List[str]]:
+        """Core properties and slide part names; runs on the parse worker pool."""
+        return read_core_properties(package, names), self._slide_parts(package, names)
+
+    def _slide_parts(self, package: zipfile.ZipFile, names: Set[str]) -> List[str]:
+        """Slide part names in presentation order."""
+        relationships = read_relationships(package, names, "ppt/presentation.xml")
+        root = etree.fromstring(package.read("ppt/presentation.xml"))
+        parts = []
+        for slide_id in root.iter(f"{_P}sldId"):
+            rel_type, target = relationships.get(slide_id.get(f"{R}id"), ("", None))
+            if rel_type == "slide" and target is not None:
+                parts.append(target)
+        return parts
+
+    def _read_slide(
+        self,
+        package: zipfile.ZipFile,
+        names: Set[str],
+        part_name: str,
+        images: Dict[str, Optional[ImageRef]],
+    ) -> _Slide:
+        """Extract one slide; runs on the parse worker pool."""
+        relationships = read_relationships(package, names, part_name)
+        root = etree.fromstring(package.read(part_name))
+        slide = _Slide(hidden=root.get("show") == "0")
+        slide_images: List[str] = []
+
+        tree = root.find(f"{_P}cSld/{_P}spTree")
+        if tree is not None:
+            self._read_shapes(tree, relationships, slide, slide_images)
+
+        for target in slide_images:
+            if target not in images:
+                images[target] = store_image(package.read(target))
+            if images[target] is not None:
+                slide.images.append(images[target])
+
+        for rel_type, target in relationships.values():
+            if rel_type == "notesSlide" and target is not None:
+                notes = etree.fromstring(package.read(target))
+                texts = [
+                    _paragraphs_text(shape) for shape in notes.iter(f"{_P}sp")
+                    if _placeholder_type(shape) == "body"
+                ]
+                slide.notes = "\n".join(filter(None, texts))
+        return slide
+
+    def _read_shapes(
+        self,
+        tree: etree._Element,
+        relationships: Dict[str, Any],
+        slide: _Slide,
+        slide_images: List[str],
+    ) -> None:
+        """Read shapes in z-order, descending into groups.
+
+        Picture part names are collected into ``slide_images``.
+        """
+        for shape in tree:
+            if shape.tag == f"{_P}grpSp":
+                self._read_shapes(shape, relationships, slide, slide_images)
+            elif shape.tag == f"{_P}sp":
+                placeholder = _placeholder_type(shape)
+                if placeholder in _SKIPPED_PLACEHOLDERS:
+                    continue
+                body = shape.find(f"{_P}txBody")
+                text = _paragraphs_text(body) if body is not None else ""
+                if not text:
+                    continue
+                if placeholder in _TITLE_PLACEHOLDERS and not slide.title:
+                    slide.title = text.replace("\n", " ")
+                else:
+                    slide.texts.append(text)
+            elif shape.tag == f"{_P}graphicFrame":
+                table = shape.find(f".//{_A}tbl")
+                if table is not None:
+                    rows, merged = self._extract_table(table)
+                    if rows:
+                        slide.tables.append(rows)
+                        slide.merged.append(merged)
+            elif shape.tag == f"{_P}pic":
+                blip = shape.find(f".//{_A}blip")
+                if blip is None:
+                    continue
+                rel_type, target = relationships.get(blip.get(f"{R}embed"), ("", None))
+                if rel_type == "image" and target is not None and target not in slide_images:
+                    slide_images.append(target)
+
+    def _extract_table(self, table: etree._Element):
+        """Extract a table's grid and its merged ranges.
+
+        Returns:
+            ``(rows, merged)`` where merged cells are empty except the
+            top-left one, and ``merged`` lists ``[row, col, rowspan,
+            colspan]`` for every span larger than one cell
+        """
+        rows: List[List[str]] = []
+        merged: List[List[int]] = []
+        for row_index, row in enumerate(table.iterfind(f"{_A}tr")):
+            cells = []
+            for col, cell in enumerate(row.iterfind(f"{_A}tc")):
+                if cell.get("hMerge") in _TRUE or cell.get("vMerge") in _TRUE:
+                    cells.append("")
+                    continue
+                body = cell.find(f"{_A}txBody")
+                cells.append(_paragraphs_text(body) if body is not None else "")
+                rowspan, colspan = int(cell.get("rowSpan", "1")), int(cell.get("gridSpan", "1"))
+                if rowspan > 1 or colspan > 1:
+                    merged.append([row_index, col, rowspan, colspan])
+            rows.append(cells)
+        if not any(any(cells) for cells in rows):
+            return [], []
+        return rows, merged
+
+    def _assemble(self, slides: List[_Slide], result: ParsedContent) -> None:
+        """Number tables and images across the deck and emit the blocks.
+
+        Each slide block is followed by one table block per slide table.
+        """
+        for number, slide in enumerate(slides, 1):
+            section = [slide.title] if slide.title else []
+            block: Dict[str, Any] = {
+                "type": "slide",
+                "slide": number,
+                "title": slide.title,
+                "text": "\n".join(slide.texts),
+                "notes": slide.notes,
+                "images": [],
+                "section": section,
+            }
+            if slide.hidden:
+                block["hidden"] = True
+            for image in slide.images:
+                index = result.add_image_ref(image)
+                if index not in block["images"]:
+                    block["images"].append(index)
+            result.blocks.append(block)
+
+            for rows, merged in zip(slide.tables, slide.merged):
+                table_block = {"type": "table", "table": len(result.tables), "slide": number, "section": section}
+                if merged:
+                    table_block["merged"] = merged
+                result.tables.append(rows)
+                result.blocks.append(table_block)
+
+            # Slide text for search and AI prompts, tables as rows
+            lines = [f"Slide {number}: {slide.title}" if slide.title else f"Slide {number}"]
+            lines.extend(slide.texts)
+            for rows in slide.tables:
+                lines.extend(" | ".join(cells) for cells in rows)
+            if slide.notes:
+                lines.append(f"Notes: {slide.notes}")
+            result.text_blocks.append("\n".join(lines))
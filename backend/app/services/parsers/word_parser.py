@@ -1,12 +1,41 @@
-"""Word document parser using python-docx."""
+"""Word document parser.
 
-import io
-from typing import List
+``word/document.xml`` is streamed with lxml's iterparse, and each
+top-level paragraph or table is converted and then freed as soon as its
+end tag is read. Blocks come out in document order. Headings are
+resolved through ``word/styles.xml`` and give every block its section
+path. Table cells are read straight from the XML: merged cells keep
+their text in the top-left grid cell only, and the spans are recorded.
+"""
 
-from docx import Document
-from docx.table import Table
+import re
+import zipfile
+from typing import Any, Dict, List, Optional
 
-from app.services.parsers.base import BaseParser, ParsedContent
+from lxml import etree
+
+from app.services.parsers.base import BaseParser, ParsedContent, run_in_parse_pool
+from app.services.parsers.ooxml import read_core_properties, read_relationships
+
+_W = "{http://schemas.openxmlformats.org/wordprocessingml/2006/main}"
+_MC = "{http://schemas.openxmlformats.org/markup-compatibility/2006}"
+
+W_P, W_TBL, W_TR, W_TC = f"{_W}p", f"{_W}tbl", f"{_W}tr", f"{_W}tc"
+W_VAL = f"{_W}val"
+
+# Run content that contributes to paragraph text
+_TEXT_TAGS = {f"{_W}t": None, f"{_W}tab": "\t", f"{_W}br": "\n", f"{_W}cr": "\n", f"{_W}noBreakHyphen": "-"}
+
+_HEADING_NAME = re.compile(r"^heading\s*(\d)$", re.IGNORECASE)
+
+# outlineLvl 9 marks body text
+_BODY_OUTLINE_LEVEL = 9
+
+
+def _val(element: Optional[etree._Element], default: Optional[str] = None) -> Optional[str]:
+    if element is None:
+        return default
+    return element.get(W_VAL, default)
 
 
 class WordParser(BaseParser):
@@ -17,66 +46,208 @@ class WordParser(BaseParser):
         """Return list of supported file extensions."""
         return ['docx', 'doc']
 
-    async def parse(self, file_path: str) -> ParsedContent:
+    async def parse(self, file_path: str, category: Optional[str] = None) -> ParsedContent:
         """Parse a Word document.
-        
+
         Args:
             file_path: Path to the Word file
-            
+
         Returns:
-            ParsedContent with extracted text, tables, and images
+            ParsedContent with extracted text, tables, images and blocks
+            in document order
         """
+        return await run_in_parse_pool(self._parse, file_path)
+
+    def _parse(self, file_path: str) -> ParsedContent:
         result = ParsedContent()
 
         try:
-            doc = Document(file_path)
-
-            # Extract document properties
-            result.metadata = {
-                "title": doc.core_properties.title or "",
-                "author": doc.core_properties.author or "",
-                "created": str(doc.core_properties.created) if doc.core_properties.created else "",
-            }
-
-            # Extract paragraphs
-            for para in doc.paragraphs:
-                text = para.text.strip()
-                if text:
-                    result.text_blocks.append(text)
-
-            # Extract tables
-            for table in doc.tables:
-                table_data = self._extract_table(table)
-                if table_data:
-                    result.tables.append(table_data)
-
-            # Extract images
-            images = self._extract_images(doc)
-            result.images.extend(images)
-
+            with zipfile.ZipFile(file_path) as package:
+                names = set(package.namelist())
+                result.metadata = read_core_properties(package, names)
+                heading_styles = self._read_heading_styles(package, names)
+                with package.open("word/document.xml") as document:
+                    self._read_body(document, heading_styles, result)
+                self._extract_images(package, names, result)
+        except zipfile.BadZipFile:
+            result.metadata["error"] = "Not a .docx file (legacy .doc is not supported)"
         except Exception as e:
             result.metadata["error"] = str(e)
 
         return result
 
-    def _extract_table(self, table: Table) -> List[List[str]]:
-        """Extract data from a Word table."""
-        table_data = []
-        for row in table.rows:
-            row_data = []
-            for cell in row.cells:
-                row_data.append(cell.text.strip())
-            table_data.append(row_data)
-        return table_data
-
-    def _extract_images(self, doc: Document) -> List[bytes]:
-        """Extract images from a Word document."""
-        images = []
+    def _read_heading_styles(self, package: zipfile.ZipFile, names: set) -> Dict[str, int]:
+        """Map paragraph style IDs to heading levels (1-based).
+
+        A style is a heading if it has an outline level or is named
+        "heading N", directly or through its ``basedOn`` chain.
+        """
+        if "word/styles.xml" not in names:
+            return {}
+        root = etree.fromstring(package.read("word/styles.xml"))
+
+        own: Dict[str, Optional[int]] = {}
+        based_on: Dict[str, str] = {}
+        for style in root.iterfind(f"{_W}style"):
+            if style.get(f"{_W}type") != "paragraph":
+                continue
+            style_id = style.get(f"{_W}styleId")
+            level = self._outline_level(style.find(f"{_W}pPr"))
+            if level is None:
+                match = _HEADING_NAME.match(_val(style.find(f"{_W}name"), ""))
+                level = int(match.group(1)) if match else None
+            own[style_id] = level
+            parent = _val(style.find(f"{_W}basedOn"))
+            if parent:
+                based_on[style_id] = parent
+
+        levels: Dict[str, int] = {}
+        for style_id in own:
+            seen = set()
+            current: Optional[str] = style_id
+            while current is not None and current not in seen:
+                seen.add(current)
+                if own.get(current) is not None:
+                    levels[style_id] = own[current]
+                    break
+                current = based_on.get(current)
+        return {style_id: level for style_id, level in levels.items() if level > 0}
+
+    def _outline_level(self, ppr: Optional[etree._Element]) -> Optional[int]:
+        """Heading level from a ``w:pPr``; 0 for explicit body text, None if unset."""
+        if ppr is None:
+            return None
+        value = _val(ppr.find(f"{_W}outlineLvl"))
+        if value is None or not value.isdigit():
+            return None
+        level = int(value)
+        return 0 if level >= _BODY_OUTLINE_LEVEL else level + 1
+
+    def _read_body(self, document, heading_styles: Dict[str, int], result: ParsedContent) -> None:
+        """Stream the body, emitting one block per top-level paragraph or table."""
+        section: List[Dict[str, Any]] = []
+        # Open w:p/w:tbl elements; 1 on an end event means top-level
+        depth = 0
+        for event, element in etree.iterparse(document, events=("start", "end"), tag=(W_P, W_TBL)):
+            if event == "start":
+                depth += 1
+                continue
+            depth -= 1
+            if depth:
+                continue
+
+            path = [heading["text"] for heading in section]
+            if element.tag == W_TBL:
+                table, merged = self._extract_table(element)
+                if table:
+                    block = {"type": "table", "table": len(result.tables), "section": path}
+                    if merged:
+                        block["merged"] = merged
+                    result.tables.append(table)
+                    result.blocks.append(block)
+            else:
+                text = self._paragraph_text(element).strip()
+                if text:
+                    level = self._heading_level(element, heading_styles)
+                    if level:
+                        while section and section[-1]["level"] >= level:
+                            section.pop()
+                        section.append({"level": level, "text": text})
+                        path = [heading["text"] for heading in section]
+                        result.blocks.append({"type": "heading", "level": level, "text": text, "section": path})
+                    else:
+                        result.blocks.append({"type": "paragraph", "text": text, "section": path})
+                    result.text_blocks.append(text)
+
+            # Free the converted element and everything read before it
+            element.clear()
+            while element.getprevious() is not None:
+                del element.getparent()[0]
+
+    def _heading_level(self, paragraph: etree._Element, heading_styles: Dict[str, int]) -> int:
+        ppr = paragraph.find(f"{_W}pPr")
+        level = self._outline_level(ppr)
+        if level is not None:
+            return level
+        if ppr is None:
+            return 0
+        return heading_styles.get(_val(ppr.find(f"{_W}pStyle")), 0)
+
+    def _paragraph_text(self, paragraph: etree._Element) -> str:
+        # mc:AlternateContent repeats text boxes in an mc:Fallback for older
+        # readers; drop it so the text is read once, from the mc:Choice
+        for fallback in list(paragraph.iter(f"{_MC}Fallback")):
+            fallback.getparent().remove(fallback)
+        parts = []
+        for element in paragraph.iter(*_TEXT_TAGS):
+            fixed = _TEXT_TAGS[element.tag]
+            parts.append(element.text or "" if fixed is None else fixed)
+        return "".join(parts)
+
+    def _extract_table(self, table: etree._Element):
+        """Extract a table's grid and its merged ranges.
+
+        Returns:
+            ``(rows, merged)`` where merged cells are empty except the
+            top-left one, and ``merged`` lists ``[row, col, rowspan,
+            colspan]`` for every span larger than one cell
+        """
+        rows: List[List[str]] = []
+        merged: List[List[int]] = []
+        # Column -> merged range still open downwards from a vMerge restart
+        vertical: Dict[int, List[int]] = {}
+        width = 0
+
+        for row in table.iterfind(W_TR):
+            row_index = len(rows)
+            trpr = row.find(f"{_W}trPr")
+            skip = int(_val(trpr.find(f"{_W}gridBefore"), "0")) if trpr is not None else 0
+            cells = [""] * skip
+            for cell in row.iterfind(W_TC):
+                col = len(cells)
+                tcpr = cell.find(f"{_W}tcPr")
+                span, vmerge = 1, None
+                if tcpr is not None:
+                    span = max(int(_val(tcpr.find(f"{_W}gridSpan"), "1")), 1)
+                    vmerge_element = tcpr.find(f"{_W}vMerge")
+                    if vmerge_element is not None:
+                        vmerge = _val(vmerge_element, "continue")
+
+                if vmerge == "continue" and col in vertical:
+                    vertical[col][2] += 1
+                    cells.extend([""] * span)
+                    continue
+
+                vertical.pop(col, None)
+                text = "\n".join(
+                    filter(None, (self._paragraph_text(p).strip() for p in cell.iter(W_P)))
+                )
+                cells.append(text)
+                cells.extend([""] * (span - 1))
+                merge = [row_index, col, 1, span]
+                if vmerge == "restart":
+                    vertical[col] = merge
+                    merged.append(merge)
+                elif span > 1:
+                    merged.append(merge)
+
+            # A vertical merge ends at the first row not continuing it
+            for col in [col for col, merge in vertical.items() if merge[0] + merge[2] <= row_index]:
+                del vertical[col]
+            rows.append(cells)
+            width = max(width, len(cells))
+
+        for cells in rows:
+            cells.extend([""] * (width - len(cells)))
+        if not any(any(cells) for cells in rows):
+            return [], []
+        return rows, [merge for merge in merged if merge[2] > 1 or merge[3] > 1]
+
+    def _extract_images(self, package: zipfile.ZipFile, names: set, result: ParsedContent) -> None:
+        """Store images referenced by the main document part."""
         try:
-            for rel in doc.part.rels.values():
-                if "image" in rel.target_ref:
-                    image_part = rel.target_part
-                    images.append(image_part.blob)
+            for rel_type, target in read_relationships(package, names, "word/document.xml").values():
+                if rel_type == "image" and target is not None:
+                    result.add_image(package.read(target))
         except Exception:
             pass
-        return images
@@ -3,35 +3,38 @@
 Generates Excel reports following the MY25EV_Platform_IVI_TARA_Report.xlsx format.
 """
 
+import io
 import os
 from datetime import datetime
-from typing import List, Optional
-
-from openpyxl import Workbook
-from openpyxl.drawing.image import Image as XLImage
-from openpyxl.styles import (
-    Alignment,
-    Border,
-    Font,
-    PatternFill,
-    Side,
-)
-from openpyxl.utils import get_column_letter
-
-from app.models.asset import Asset
+from typing import List, Optional, Sequence
+
+from app.models.asset import Asset, AssetRelation
 from app.models.project import Project, ProjectConfig
 from app.models.threat import SecurityMitigation, ThreatScenario
+from app.services.attack_tree import AttackTree, AttackTreeBuilder, feasibility_label, render_png
+from app.services.risk_methodology import risk_methodologies
 
 
 class TARAReportGenerator:
-    """Generator for TARA analysis reports in Excel format."""
+    """Generator for TARA analysis reports in Excel format.
+
+    openpyxl is imported when a generator is created, not with the module,
+    so importing the service does not load it.
+    """
 
     def __init__(self):
+        from openpyxl import Workbook
+
         self.wb = Workbook()
         self._setup_styles()
 
     def _setup_styles(self):
         """Setup common styles for the report."""
+        from openpyxl.styles import Alignment, Border, Font, PatternFill, Side
+
+        self.title_font = Font(bold=True, size=24)
+        self.section_font = Font(bold=True, size=14)
+        self.label_font = Font(bold=True)
         self.header_font = Font(bold=True, size=11, color="FFFFFF")
         self.header_fill = PatternFill(start_color="4472C4", end_color="4472C4", fill_type="solid")
         self.subheader_fill = PatternFill(start_color="B4C6E7", end_color="B4C6E7", fill_type="solid")
@@ -60,6 +63,8 @@ class TARAReportGenerator:
         assets: List[Asset],
         threats: List[ThreatScenario],
         output_dir: str,
+        relations: Optional[Sequence[AssetRelation]] = None,
+        feasibility_labels: Optional[Sequence[Optional[str]]] = None,
     ) -> str:
         """Generate a complete TARA report.
         
@@ -69,6 +74,9 @@ class TARAReportGenerator:
             assets: List of assets
             threats: List of threat scenarios
             output_dir: Directory to save the report
+            relations: Asset relations used to build attack trees
+            feasibility_labels: Feasibility labels by level of the project
+                methodology (the built-in ones by default)
             
         Returns:
             Path to the generated report file
@@ -77,7 +85,10 @@ class TARAReportGenerator:
         self._create_cover_sheet(project, config)
         self._create_definition_sheet(project, config)
         self._create_asset_sheet(assets)
-        self._create_attack_tree_sheet(project)
+        trees = AttackTreeBuilder(assets, relations or [], threats).build_all()
+        if feasibility_labels is None:
+            feasibility_labels = list(risk_methodologies.default_engine.feasibility_labels)
+        self._create_attack_tree_sheet(project, trees, feasibility_labels)
         self._create_tara_result_sheet(threats, assets)
 
         # Remove default sheet
@@ -101,8 +112,8 @@ class TARAReportGenerator:
         ws.merge_cells('A1:H3')
         title_cell = ws['A1']
         title_cell.value = "威胁分析与风险评估报告\nThreat Analysis and Risk Assessment Report"
-        title_cell.font = Font(bold=True, size=24)
-        title_cell.alignment = Alignment(horizontal='center', vertical='center', wrap_text=True)
+        title_cell.font = self.title_font
+        title_cell.alignment = self.center_align
 
         # Project info
         info_data = [
@@ -117,7 +128,7 @@ class TARAReportGenerator:
         ]
 
         for idx, (label, value) in enumerate(info_data, start=6):
-            ws.cell(row=idx, column=2, value=label).font = Font(bold=True)
+            ws.cell(row=idx, column=2, value=label).font = self.label_font
             ws.cell(row=idx, column=3, value=value)
 
         # Set column widths
@@ -132,27 +143,27 @@ class TARAReportGenerator:
         row = 1
 
         # Section 1: Functional Description
-        ws.cell(row=row, column=1, value="1. 功能描述").font = Font(bold=True, size=14)
+        ws.cell(row=row, column=1, value="1. 功能描述").font = self.section_font
         row += 1
         ws.cell(row=row, column=1, value=config.functional_description if config else "")
         ws.merge_cells(f'A{row}:H{row+3}')
         row += 5
 
         # Section 2: Project Boundary
-        ws.cell(row=row, column=1, value="2. 项目边界").font = Font(bold=True, size=14)
+        ws.cell(row=row, column=1, value="2. 项目边界").font = self.section_font
         row += 1
         ws.cell(row=row, column=1, value=config.item_boundary if config else "")
         ws.merge_cells(f'A{row}:H{row+3}')
         row += 5
 
         # Section 3: System Architecture
-        ws.cell(row=row, column=1, value="3. 系统架构图").font = Font(bold=True, size=14)
+        ws.cell(row=row, column=1, value="3. 系统架构图").font = self.section_font
         row += 1
         ws.cell(row=row, column=1, value="[系统架构图占位]")
         row += 10
 
         # Section 4: Assumptions
-        ws.cell(row=row, column=1, value="4. 相关假设").font = Font(bold=True, size=14)
+        ws.cell(row=row, column=1, value="4. 相关假设").font = self.section_font
         row += 1
 
         # Assumptions table header
@@ -166,7 +177,7 @@ class TARAReportGenerator:
 
         # Section 5: Terminology
         row += 3
-        ws.cell(row=row, column=1, value="5. 术语表").font = Font(bold=True, size=14)
+        ws.cell(row=row, column=1, value="5. 术语表").font = self.section_font
         row += 1
 
         terms = [
@@ -196,6 +207,8 @@ class TARAReportGenerator:
 
     def _create_asset_sheet(self, assets: List[Asset]):
         """Create the asset list sheet."""
+        from openpyxl.utils import get_column_letter
+
         ws = self.wb.create_sheet("资产列表", 2)
 
         # Headers
@@ -236,15 +249,50 @@ class TARAReportGenerator:
         for col, width in enumerate(widths, 1):
             ws.column_dimensions[get_column_letter(col)].width = width
 
-    def _create_attack_tree_sheet(self, project: Project):
+    def _create_attack_tree_sheet(
+        self,
+        project: Project,
+        trees: List[AttackTree],
+        feasibility_labels: Sequence[Optional[str]],
+    ):
         """Create the attack tree analysis sheet."""
+        from openpyxl.drawing.image import Image as XLImage
+
         ws = self.wb.create_sheet("攻击树分析", 3)
 
-        ws.cell(row=1, column=1, value="攻击树分析").font = Font(bold=True, size=14)
-        ws.cell(row=3, column=1, value="[攻击树图将在此处插入]")
+        ws.cell(row=1, column=1, value="攻击树分析").font = self.section_font
+        ws.column_dimensions["A"].width = 60
+        ws.column_dimensions["B"].width = 15
+        ws.column_dimensions["C"].width = 12
+
+        if not trees:
+            ws.cell(row=3, column=1, value="无攻击树（未识别到威胁场景）")
+            return
+
+        row = 3
+        for tree in trees:
+            headers = ["损害场景", "攻击可行性", "节点数"]
+            for col, header in enumerate(headers, 1):
+                cell = ws.cell(row=row, column=col, value=header)
+                cell.font = self.header_font
+                cell.fill = self.header_fill
+                cell.border = self.thin_border
+            label = feasibility_label(tree.root.feasibility, feasibility_labels)
+            values = [tree.title, label or "", len(tree.nodes)]
+            for col, value in enumerate(values, 1):
+                cell = ws.cell(row=row + 1, column=col, value=value)
+                cell.border = self.thin_border
+                cell.alignment = self.left_align
+
+            image = XLImage(io.BytesIO(render_png(tree)))
+            ws.add_image(image, f"A{row + 3}")
+            # Default row height is 20px; leave room for the picture
+            row += 3 + image.height // 20 + 2
 
     def _create_tara_result_sheet(self, threats: List[ThreatScenario], assets: List[Asset]):
         """Create the TARA analysis results sheet."""
+        from openpyxl.utils import get_column_letter
+
         ws = self.wb.create_sheet("TARA分析结果", 4)
 
         # Create asset lookup
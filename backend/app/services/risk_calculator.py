@@ -2,8 +2,6 @@
 
 from typing import Optional, Tuple
 
-from app.models.threat import ThreatScenario
-
 
 class RiskCalculator:
     """Risk calculation utilities for TARA analysis."""
@@ -75,6 +73,65 @@ class RiskCalculator:
         5: "严重",
     }
 
+    # Risk input columns: feasibility parameters, then impact dimensions
+    RISK_PARAMETERS = (
+        "attack_vector",
+        "attack_complexity",
+        "privileges_required",
+        "user_interaction",
+        "impact_safety",
+        "impact_financial",
+        "impact_operational",
+        "impact_privacy",
+    )
+
+    # Attack potential (ISO/SAE 21434 Annex G.2) factor ratings
+    ELAPSED_TIME_VALUES = {
+        "<=1 day": 0,
+        "<=1 week": 1,
+        "<=1 month": 4,
+        "<=6 months": 17,
+        ">6 months": 19,
+    }
+
+    SPECIALIST_EXPERTISE_VALUES = {
+        "Layman": 0,
+        "Proficient": 3,
+        "Expert": 6,
+        "Multiple experts": 8,
+    }
+
+    KNOWLEDGE_OF_ITEM_VALUES = {
+        "Public": 0,
+        "Restricted": 3,
+        "Confidential": 7,
+        "Strictly confidential": 11,
+    }
+
+    WINDOW_OF_OPPORTUNITY_VALUES = {
+        "Unlimited": 0,
+        "Easy": 1,
+        "Moderate": 4,
+        "Difficult": 10,
+    }
+
+    EQUIPMENT_VALUES = {
+        "Standard": 0,
+        "Specialized": 4,
+        "Bespoke": 7,
+        "Multiple bespoke": 9,
+    }
+
+    # Attack potential to feasibility: the higher the potential an attack
+    # needs, the less feasible it is
+    # 0-9: High, 10-13: Medium, 14-19: Low, 20+: Very Low
+    ATTACK_POTENTIAL_THRESHOLDS = [
+        (9, "High", 3),
+        (13, "Medium", 2),
+        (19, "Low", 1),
+        (24, "Very Low", 0),
+    ]
+
     @classmethod
     def calculate_feasibility(
         cls,
@@ -162,44 +219,6 @@ class RiskCalculator:
 
         return risk_level, risk_label
 
-    @classmethod
-    def calculate_and_update_threat(cls, threat: ThreatScenario) -> ThreatScenario:
-        """
-        Calculate all risk metrics and update the threat scenario.
-
-        Args:
-            threat: ThreatScenario object to update
-
-        Returns:
-            Updated ThreatScenario object
-        """
-        # Calculate feasibility
-        feas_value, feas_label = cls.calculate_feasibility(
-            threat.attack_vector,
-            threat.attack_complexity,
-            threat.privileges_required,
-            threat.user_interaction,
-        )
-        threat.attack_feasibility_value = feas_value
-        threat.attack_feasibility = feas_label
-
-        # Calculate impact
-        impact_value, impact_label = cls.calculate_impact(
-            threat.impact_safety,
-            threat.impact_financial,
-            threat.impact_operational,
-            threat.impact_privacy,
-        )
-        threat.impact_level_value = impact_value
-        threat.impact_level = impact_label
-
-        # Calculate risk level
-        risk_level, risk_label = cls.calculate_risk_level(feas_value, impact_value)
-        threat.risk_level = risk_level
-        threat.risk_level_label = risk_label
-
-        return threat
-
     @classmethod
     def suggest_treatment(cls, risk_level: Optional[int]) -> str:
         """
@@ -224,3 +243,4 @@ class RiskCalculator:
             return "Reduce"  # Must reduce
         else:
             return "Avoid"  # Critical - must avoid or strongly reduce
+
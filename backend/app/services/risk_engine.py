@@ -0,0 +1,366 @@
+"""Vectorized risk evaluation and bulk recomputation.
+
+``RiskCalculator`` evaluates one threat at a time with dict lookups against
+hard-coded class constants. ``BatchRiskEngine`` compiles a (possibly
+project-specific) risk methodology into integer lookup tables, so both
+single-threat and columnar evaluation are a few array indexes. When a
+methodology changes, ``RiskRecomputeService`` re-evaluates stored threats.
+"""
+
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, List, Mapping, MutableMapping, Optional, Sequence, Tuple
+
+import numpy as np
+from sqlalchemy import select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.threat import ThreatScenario
+from app.schemas.project import (
+    FEASIBILITY_FACTORS,
+    FeasibilityDefinition,
+    ImpactDefinition,
+    RiskMethodology,
+)
+from app.services.graph_sync import record_changes
+from app.services.risk_calculator import RiskCalculator
+
+# Code used for missing (NULL/empty) parameters and results
+MISSING = -1
+
+
+@dataclass
+class RiskArrays:
+    """Result of a batch evaluation; ``MISSING`` marks a NULL result."""
+
+    feasibility: np.ndarray
+    impact: np.ndarray
+    risk: np.ndarray
+    # Summed attack potential (attack potential model only)
+    potential: np.ndarray
+
+    def __len__(self) -> int:
+        return len(self.risk)
+
+    def select(self, mask: np.ndarray) -> "RiskArrays":
+        return RiskArrays(
+            feasibility=self.feasibility[mask],
+            impact=self.impact[mask],
+            risk=self.risk[mask],
+            potential=self.potential[mask],
+        )
+
+
+def default_feasibility(model: str = "cvss") -> FeasibilityDefinition:
+    """Built-in feasibility rating of ``model`` from ``RiskCalculator`` constants."""
+    calc = RiskCalculator
+    if model == "attack_potential":
+        thresholds = calc.ATTACK_POTENTIAL_THRESHOLDS
+        factor_values = [
+            calc.ELAPSED_TIME_VALUES,
+            calc.SPECIALIST_EXPERTISE_VALUES,
+            calc.KNOWLEDGE_OF_ITEM_VALUES,
+            calc.WINDOW_OF_OPPORTUNITY_VALUES,
+            calc.EQUIPMENT_VALUES,
+        ]
+    else:
+        thresholds = calc.FEASIBILITY_THRESHOLDS
+        factor_values = [
+            calc.ATTACK_VECTOR_VALUES,
+            calc.ATTACK_COMPLEXITY_VALUES,
+            calc.PRIVILEGES_REQUIRED_VALUES,
+            calc.USER_INTERACTION_VALUES,
+        ]
+    return FeasibilityDefinition(
+        model=model,
+        factors={
+            name: dict(values) for name, values in zip(FEASIBILITY_FACTORS[model], factor_values)
+        },
+        thresholds=[threshold for threshold, _, _ in thresholds],
+        labels=[label for _, label, _ in thresholds],
+        levels=[value for _, _, value in thresholds],
+    )
+
+
+def default_methodology(model: str = "cvss") -> RiskMethodology:
+    """The built-in methodology, expressed from ``RiskCalculator`` constants."""
+    calc = RiskCalculator
+    return RiskMethodology(
+        name="default",
+        feasibility=default_feasibility(model),
+        impact=ImpactDefinition(values=dict(calc.IMPACT_VALUES), labels=list(calc.IMPACT_LABELS)),
+        risk_matrix=[list(row) for row in calc.RISK_MATRIX],
+        risk_labels=dict(calc.RISK_LABELS),
+    )
+
+
+class BatchRiskEngine:
+    """Evaluate feasibility, impact and risk for many threats at once.
+
+    A methodology is compiled into dense integer tables: feasibility is a
+    lookup into a table over every combination of the feasibility factors
+    (4x2x3x2 for the default CVSS-like model, 5x4x4x4x4 for attack
+    potential, plus an unknown-label slot per axis), impact is the row-wise
+    max of the four impact levels, and risk is a lookup into the
+    feasibility x impact matrix. The default methodology reproduces
+    ``RiskCalculator`` exactly.
+    """
+
+    IMPACT_PARAMETERS = RiskCalculator.RISK_PARAMETERS[4:]
+
+    def __init__(self, methodology: Optional[RiskMethodology] = None):
+        self.methodology = methodology or default_methodology()
+        feasibility = self.methodology.feasibility
+        impact = self.methodology.impact
+
+        self.model = feasibility.model
+        self.feasibility_parameters: Tuple[str, ...] = FEASIBILITY_FACTORS[self.model]
+        # Input columns, feasibility factors first
+        self.parameters = self.feasibility_parameters + self.IMPACT_PARAMETERS
+
+        # Label -> code per factor; each axis has one extra trailing code
+        # for unknown labels, which score 0 like RiskCalculator's .get(v, 0)
+        self.vocabularies: Dict[str, Dict[str, int]] = {
+            name: {label: code for code, label in enumerate(feasibility.factors[name])}
+            for name in self.feasibility_parameters
+        }
+        self.vocabularies.update({name: impact.values for name in self.IMPACT_PARAMETERS})
+        self.unknown_codes = {
+            name: len(feasibility.factors[name]) for name in self.feasibility_parameters
+        }
+        self.unknown_codes.update({name: 0 for name in self.IMPACT_PARAMETERS})
+
+        self.score_table, self.feasibility_table = self._build_feasibility_tables()
+        self.risk_matrix = np.asarray(self.methodology.risk_matrix, dtype=np.int16)
+        self.feasibility_labels = np.empty(len(feasibility.labels) + 1, dtype=object)
+        for label, level in zip(feasibility.labels, feasibility.band_levels):
+            self.feasibility_labels[level] = label
+        self.impact_labels = np.array([*impact.labels, None], dtype=object)
+        self.risk_labels = self._risk_labels()
+
+    @property
+    def shape(self) -> Tuple[int, int]:
+        """Number of (feasibility, impact) levels."""
+        return self.risk_matrix.shape
+
+    def _build_feasibility_tables(self) -> Tuple[np.ndarray, np.ndarray]:
+        feasibility = self.methodology.feasibility
+        scores = [
+            np.array([*feasibility.factors[name].values(), 0], dtype=np.int32)
+            for name in self.feasibility_parameters
+        ]
+        total = sum(np.ix_(*scores))
+        bands = np.searchsorted(np.asarray(feasibility.thresholds), total, side="left")
+        bands = np.minimum(bands, len(feasibility.thresholds) - 1)
+        levels = np.asarray(feasibility.band_levels, dtype=np.int16)
+        return total.astype(np.int16), levels[bands]
+
+    def _risk_labels(self) -> np.ndarray:
+        # Index by risk level; the trailing slot (index MISSING) stays None
+        labels = np.empty(max(int(self.risk_matrix.max()), 0) + 2, dtype=object)
+        labels[:-1] = "未知"
+        labels[-1] = None
+        for level, label in self.methodology.risk_labels.items():
+            if 0 <= level < len(labels) - 1:
+                labels[level] = label
+        return labels
+
+    def encode(self, name: str, values: Iterable[Optional[str]]) -> np.ndarray:
+        """Map a column of labels to integer codes.
+
+        Missing (empty) labels map to ``MISSING``, mirroring the truthiness
+        checks of RiskCalculator.
+        """
+        vocabulary = self.vocabularies[name]
+        unknown = self.unknown_codes[name]
+        return np.fromiter(
+            (vocabulary.get(v, unknown) if v else MISSING for v in values),
+            dtype=np.int16,
+        )
+
+    def evaluate(self, codes: Mapping[str, np.ndarray]) -> RiskArrays:
+        """Evaluate encoded parameter columns (see :meth:`encode`)."""
+        feas_codes = [codes[name] for name in self.feasibility_parameters]
+        feas_missing = np.zeros(len(feas_codes[0]), dtype=bool)
+        for column in feas_codes:
+            feas_missing |= column < 0
+        index = tuple(np.where(feas_missing, 0, column) for column in feas_codes)
+        feasibility = np.where(feas_missing, MISSING, self.feasibility_table[index]).astype(np.int16)
+        if self.model == "attack_potential":
+            potential = np.where(feas_missing, MISSING, self.score_table[index]).astype(np.int16)
+        else:
+            potential = np.full(len(feasibility), MISSING, dtype=np.int16)
+
+        impact = np.max(
+            np.stack([codes[name] for name in self.IMPACT_PARAMETERS]), axis=0
+        ).astype(np.int16)
+
+        risk_missing = (feasibility < 0) | (impact < 0)
+        risk = self.risk_matrix[np.maximum(feasibility, 0), np.maximum(impact, 0)]
+        risk = np.where(risk_missing, MISSING, risk).astype(np.int16)
+
+        return RiskArrays(feasibility=feasibility, impact=impact, risk=risk, potential=potential)
+
+    def evaluate_columns(self, columns: Mapping[str, Sequence[Optional[str]]]) -> RiskArrays:
+        """Encode and evaluate raw label columns keyed by parameter name."""
+        return self.evaluate({name: self.encode(name, columns[name]) for name in self.parameters})
+
+    def evaluate_row(self, row: Mapping[str, Optional[str]]) -> Dict[str, Any]:
+        """Evaluate a single threat given as a mapping of parameter columns."""
+        codes = {}
+        for name in self.parameters:
+            value = row.get(name)
+            if value:
+                codes[name] = self.vocabularies[name].get(value, self.unknown_codes[name])
+            else:
+                codes[name] = MISSING
+
+        index = tuple(codes[name] for name in self.feasibility_parameters)
+        if min(index) < 0:
+            feasibility = potential = MISSING
+        else:
+            feasibility = int(self.feasibility_table[index])
+            potential = int(self.score_table[index]) if self.model == "attack_potential" else MISSING
+        impact = max(codes[name] for name in self.IMPACT_PARAMETERS)
+        if feasibility < 0 or impact < 0:
+            risk = MISSING
+        else:
+            risk = int(self.risk_matrix[feasibility, impact])
+        return self.to_fields(feasibility, impact, risk, potential)
+
+    def apply(self, threat: ThreatScenario) -> ThreatScenario:
+        """Calculate all risk metrics and update the threat scenario in place."""
+        fields = self.evaluate_row({name: getattr(threat, name) for name in self.parameters})
+        for name, value in fields.items():
+            setattr(threat, name, value)
+        return threat
+
+    def apply_batch(self, rows: Sequence[MutableMapping[str, Any]]) -> None:
+        """Calculate risk metrics for threat column dicts, updating them in place."""
+        if not rows:
+            return
+        result = self.evaluate_columns({
+            name: [row.get(name) for row in rows] for name in self.parameters
+        })
+        for row, outcome in zip(rows, zip(
+            result.feasibility.tolist(),
+            result.impact.tolist(),
+            result.risk.tolist(),
+            result.potential.tolist(),
+        )):
+            row.update(self.to_fields(*outcome))
+
+    def to_fields(
+        self,
+        feasibility: int,
+        impact: int,
+        risk: int,
+        potential: int = MISSING,
+    ) -> Dict[str, Any]:
+        """Convert one evaluated code tuple to threat columns."""
+        return {
+            "attack_feasibility_value": None if feasibility < 0 else int(feasibility),
+            "attack_feasibility": self.feasibility_labels[feasibility],
+            "attack_potential": None if potential < 0 else int(potential),
+            "impact_level_value": None if impact < 0 else int(impact),
+            "impact_level": self.impact_labels[impact],
+            "risk_level": None if risk < 0 else int(risk),
+            "risk_level_label": self.risk_labels[risk],
+        }
+
+
+class RiskRecomputeService:
+    """Recompute stored risk metrics for whole projects with bulk UPDATEs."""
+
+    # Threat rows read per round trip
+    READ_CHUNK_SIZE = 50000
+    # Primary keys per UPDATE ... WHERE id IN (...)
+    UPDATE_CHUNK_SIZE = 5000
+    # Stored numeric results compared to detect stale rows, in RiskArrays order
+    STORED_RESULTS = ("attack_feasibility_value", "impact_level_value", "risk_level", "attack_potential")
+
+    def __init__(self, db: AsyncSession, engine: Optional[BatchRiskEngine] = None):
+        self.db = db
+        self.engine = engine or BatchRiskEngine()
+
+    async def recompute(self, project_id: Optional[int] = None, force: bool = False) -> int:
+        """Recompute risk for all threats (optionally of one project).
+
+        Rows are read in primary-key order in chunks. Only rows whose stored
+        values differ from the recomputed ones are written, grouped by
+        outcome so each UPDATE sets constant values on a block of ids.
+        ``force`` writes every row, e.g. when level labels were renamed.
+
+        Returns:
+            Number of threats whose risk metrics changed
+        """
+        params = self.engine.parameters
+        columns = [
+            ThreatScenario.id,
+            *(getattr(ThreatScenario, name) for name in params),
+            *(getattr(ThreatScenario, name) for name in self.STORED_RESULTS),
+        ]
+        changed = 0
+        last_id = 0
+
+        while True:
+            query = select(*columns).where(ThreatScenario.id > last_id)
+            if project_id is not None:
+                query = query.where(ThreatScenario.project_id == project_id)
+            query = query.order_by(ThreatScenario.id).limit(self.READ_CHUNK_SIZE)
+
+            rows = (await self.db.execute(query)).all()
+            if not rows:
+                break
+            last_id = rows[-1][0]
+
+            changed += await self._recompute_rows(rows, force)
+
+        if changed:
+            await record_changes(self.db, "threat", project_id=project_id)
+        await self.db.commit()
+        return changed
+
+    async def _recompute_rows(self, rows: Sequence[Any], force: bool) -> int:
+        transposed = list(zip(*rows))
+        ids = np.asarray(transposed[0], dtype=np.int64)
+        params = self.engine.parameters
+        result = self.engine.evaluate_columns(
+            {name: transposed[i + 1] for i, name in enumerate(params)}
+        )
+
+        stored = [
+            np.fromiter((MISSING if v is None else v for v in column), dtype=np.int64)
+            for column in transposed[len(params) + 1:]
+        ]
+        dirty = (
+            force
+            | (stored[0] != result.feasibility)
+            | (stored[1] != result.impact)
+            | (stored[2] != result.risk)
+            | (stored[3] != result.potential)
+        )
+        if not dirty.any():
+            return 0
+
+        return await self.write_back(ids[dirty], result.select(dirty))
+
+    async def write_back(self, ids: np.ndarray, result: RiskArrays) -> int:
+        """Write evaluated metrics for ``ids`` using one UPDATE per outcome block."""
+        outcomes = np.stack(
+            [result.feasibility, result.impact, result.risk, result.potential], axis=1
+        )
+        unique, group = np.unique(outcomes, axis=0, return_inverse=True)
+        group = group.reshape(-1)
+
+        for index, outcome in enumerate(unique.tolist()):
+            fields = self.engine.to_fields(*outcome)
+            group_ids: List[int] = ids[group == index].tolist()
+            for start in range(0, len(group_ids), self.UPDATE_CHUNK_SIZE):
+                await self.db.execute(
+                    update(ThreatScenario)
+                    .where(ThreatScenario.id.in_(group_ids[start:start + self.UPDATE_CHUNK_SIZE]))
+                    .values(**fields)
+                    .execution_options(synchronize_session=False)
+                )
+
+        return len(ids)
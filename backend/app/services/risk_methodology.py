@@ -0,0 +1,136 @@
+"""Per-project risk methodologies.
+
+A project may replace the built-in risk methodology with its own definition
+stored under ``ProjectConfig.config_json["risk_methodology"]`` (for example a
+5x5 risk matrix). Definitions are compiled into a ``BatchRiskEngine`` once;
+compiled engines are shared by fingerprint and resolved per project through an
+in-process cache, so evaluating a threat never re-reads or re-compiles the
+methodology. A per-project version stamp in Redis, replaced on every change,
+tells the other workers that their cached methodology is stale.
+"""
+
+import hashlib
+import uuid
+from typing import Any, Optional, Tuple
+
+from pydantic import ValidationError as PydanticValidationError
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import get_settings
+from app.core.exceptions import ValidationError
+from app.models.project import ProjectConfig
+from app.schemas.project import FEASIBILITY_FACTORS, RiskMethodology
+from app.services.cache_service import cache_service
+from app.services.risk_engine import BatchRiskEngine, default_methodology
+from app.utils.ttl_cache import TTLCache
+
+settings = get_settings()
+
+# Key of the methodology definition inside ProjectConfig.config_json
+CONFIG_KEY = "risk_methodology"
+
+
+def load_methodology(config_json: Optional[dict]) -> RiskMethodology:
+    """Parse the methodology from a project's ``config_json``.
+
+    Returns the default methodology when none is configured.
+
+    Raises:
+        ValidationError: If the stored definition is invalid
+    """
+    definition = (config_json or {}).get(CONFIG_KEY)
+    if not definition:
+        return default_methodology()
+    try:
+        return RiskMethodology.model_validate(_with_defaults(definition))
+    except PydanticValidationError as e:
+        raise ValidationError("Invalid risk methodology", data=e.errors(include_url=False, include_context=False))
+
+
+def _with_defaults(definition: Any) -> Any:
+    """Fill sections omitted from a definition with the built-in ones.
+
+    ``{"feasibility": {"model": "attack_potential"}}`` selects the Annex G
+    rating with the default impact levels and risk matrix.
+    """
+    if not isinstance(definition, dict):
+        return definition
+    feasibility = definition.get("feasibility") or {}
+    if not isinstance(feasibility, dict):
+        return definition
+
+    model = feasibility.get("model", "cvss")
+    base = default_methodology(model).model_dump() if model in FEASIBILITY_FACTORS else {}
+    merged = {**base, **definition}
+    if base and "factors" not in feasibility:
+        merged["feasibility"] = {**base["feasibility"], **feasibility}
+    return merged
+
+
+def methodology_fingerprint(methodology: RiskMethodology) -> str:
+    """Stable digest identifying a methodology definition."""
+    return hashlib.sha1(methodology.model_dump_json().encode("utf-8")).hexdigest()
+
+
+class MethodologyCache:
+    """Project -> compiled risk engine cache."""
+
+    KEY_PREFIX = "risk-methodology:version"
+
+    def __init__(self, ttl_seconds: float = 30.0, max_entries: int = 4096):
+        # project_id -> (version stamp, methodology fingerprint); the TTL
+        # bounds staleness in other workers while Redis is unavailable
+        self._projects: TTLCache[Tuple[Optional[str], str]] = TTLCache(
+            max_entries=max_entries, ttl_seconds=ttl_seconds,
+        )
+        # fingerprint -> compiled engine; projects sharing a methodology share tables
+        self._engines: TTLCache[BatchRiskEngine] = TTLCache(max_entries=256, ttl_seconds=3600)
+        self.default_engine = BatchRiskEngine()
+        self._engines.set(methodology_fingerprint(self.default_engine.methodology), self.default_engine)
+
+    @classmethod
+    def version_key(cls, project_id: int) -> str:
+        return f"{cls.KEY_PREFIX}:{project_id}"
+
+    def compile(self, methodology: RiskMethodology) -> BatchRiskEngine:
+        """Return the compiled engine for ``methodology``, compiling at most once."""
+        fingerprint = methodology_fingerprint(methodology)
+        engine = self._engines.get(fingerprint)
+        if engine is None:
+            engine = BatchRiskEngine(methodology)
+            self._engines.set(fingerprint, engine)
+        return engine
+
+    async def get_engine(self, db: AsyncSession, project_id: int) -> BatchRiskEngine:
+        """Resolve the risk engine configured for a project."""
+        # Read the stamp before the config, so a change committed in between
+        # is stamped older than the cached entry and reloaded on next use
+        version = await cache_service.get(self.version_key(project_id))
+        cached = self._projects.get(project_id)
+        if cached is not None and cached[0] == version:
+            engine = self._engines.get(cached[1])
+            if engine is not None:
+                return engine
+
+        result = await db.execute(
+            select(ProjectConfig.config_json).where(ProjectConfig.project_id == project_id)
+        )
+        methodology = load_methodology(result.scalar_one_or_none())
+        engine = self.compile(methodology)
+        self._projects.set(project_id, (version, methodology_fingerprint(methodology)))
+        return engine
+
+    async def invalidate(self, project_id: int) -> None:
+        """Forget the methodology of a project in every worker."""
+        self._projects.pop(project_id)
+        await cache_service.set(self.version_key(project_id), uuid.uuid4().hex)
+
+    def clear(self) -> None:
+        self._projects.clear()
+
+    def stats(self) -> dict[str, Any]:
+        return {"projects": self._projects.stats(), "engines": self._engines.stats()}
+
+
+risk_methodologies = MethodologyCache(ttl_seconds=settings.RISK_METHODOLOGY_CACHE_TTL_SECONDS)
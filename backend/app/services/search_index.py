@@ -0,0 +1,201 @@
+"""Incremental indexing of documents and threats into the search backend.
+
+Threat writes already append ``graph_changes`` rows in their transaction
+(see ``graph_sync``); ``SearchIndexService`` replays the threat and
+project entries of that log from its own checkpoint (see ``change_log``),
+so keeping the index current costs O(changes). Documents are indexed when
+their parse completes, as passages of the parsed text, and removed when
+deleted. The first sync of an empty index loads every threat and parsed
+document. Syncs run in the background change log task, never in a search
+request.
+"""
+
+import logging
+from typing import Any, Dict, Iterable, List, Optional, Sequence
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.clients.graph.base import chunked
+from app.clients.search import SearchBackend, get_search_backend
+from app.clients.search.text import split_passages
+from app.core.config import get_settings
+from app.models.document import Document
+from app.models.threat import ThreatScenario
+from app.services.change_log import ChangeLogCursor, ChangeLogPruned
+from app.services.parse_result_store import load_section
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+THREAT_COLUMNS = (
+    ThreatScenario.id,
+    ThreatScenario.project_id,
+    ThreatScenario.threat_id,
+    ThreatScenario.threat_description,
+    ThreatScenario.damage_scenario,
+)
+
+_cursors: Dict[int, ChangeLogCursor] = {}
+
+
+def threat_entry(row: Any) -> Dict[str, Any]:
+    """Search entry of a threat row (``THREAT_COLUMNS``)."""
+    entity_id, project_id, threat_id, description, damage_scenario = row
+    return {
+        "key": f"threat:{entity_id}",
+        "project_id": project_id,
+        "kind": "threat",
+        "entity_id": entity_id,
+        "position": 0,
+        "title": threat_id,
+        "body": "\n".join(filter(None, (description, damage_scenario))),
+    }
+
+
+def document_entries(
+    document_id: int,
+    project_id: int,
+    name: str,
+    text_blocks: Sequence[str],
+) -> List[Dict[str, Any]]:
+    """Search entries of a document, one per passage of each text block."""
+    entries = []
+    for position, block in enumerate(text_blocks):
+        for part, passage in enumerate(split_passages(block, settings.SEARCH_PASSAGE_CHARS)):
+            entries.append({
+                "key": f"document:{document_id}:{position}:{part}",
+                "project_id": project_id,
+                "kind": "document",
+                "entity_id": document_id,
+                "position": position,
+                "title": name,
+                "body": passage,
+            })
+    return entries
+
+
+class SearchIndexService:
+    """Keep the search backend in step with documents and threats."""
+
+    def __init__(self, db: AsyncSession, backend: Optional[SearchBackend] = None):
+        self.db = db
+        self.backend = backend or get_search_backend()
+        self.batch_size = settings.SEARCH_BATCH_SIZE
+
+    async def sync(self) -> int:
+        """Apply pending threat and project changes; loads everything on first sync.
+
+        Returns:
+            Number of change log entries applied
+        """
+        cursor = _cursors.setdefault(
+            id(self.backend), ChangeLogCursor(self.batch_size, entity_types=("threat", "project")),
+        )
+        async with cursor.lock:
+            checkpoint = await self.backend.get_checkpoint()
+            if checkpoint is not None:
+                try:
+                    applied, checkpoint = await cursor.replay(self.db, checkpoint, self._apply)
+                    await self.backend.set_checkpoint(checkpoint)
+                    return applied
+                except ChangeLogPruned as e:
+                    logger.warning(f"Search index fell behind the change log ({e}); reloading")
+            await self.full_sync(cursor)
+            return 0
+
+    async def full_sync(self, cursor: ChangeLogCursor) -> None:
+        """Index every threat and parsed document and continue from the log."""
+        checkpoint = await cursor.start(self.db)
+        await self._resync_threats(None)
+        last_id = 0
+        while True:
+            result = await self.db.execute(
+                select(Document.id)
+                .where(Document.id > last_id, Document.parse_status == "completed")
+                .order_by(Document.id)
+                .limit(self.batch_size)
+            )
+            ids = result.scalars().all()
+            if not ids:
+                break
+            await self.index_documents(ids)
+            last_id = ids[-1]
+        await self.backend.set_checkpoint(checkpoint)
+
+    async def index_documents(self, document_ids: Iterable[int]) -> None:
+        """(Re-)index parsed documents; unparsed ones are removed from the index."""
+        document_ids = list(document_ids)
+        await self.backend.delete("document", document_ids)
+        result = await self.db.execute(
+            select(Document.id, Document.project_id, Document.original_name, Document.parse_result)
+            .where(Document.id.in_(document_ids), Document.parse_status == "completed")
+        )
+        for document_id, project_id, name, parse_result in result.all():
+            try:
+                text_blocks = await load_section(parse_result, "text_blocks")
+            except KeyError as e:
+                # A missing segment must not stop the other documents
+                logger.warning(f"Parse result of document {document_id} is incomplete: {e}")
+                continue
+            entries = document_entries(document_id, project_id, name, text_blocks)
+            for chunk in chunked(entries, self.batch_size):
+                await self.backend.upsert(chunk)
+
+    async def _apply(self, changes: Sequence[Any]) -> None:
+        latest: Dict[int, str] = {}
+        resyncs: List[Optional[int]] = []
+        for _, project_id, entity_type, entity_id, op in changes:
+            if entity_type == "project":
+                await self.backend.delete_project(project_id)
+            elif op == "resync":
+                resyncs.append(project_id)
+            else:
+                latest[entity_id] = op
+
+        upserts = [entity_id for entity_id, op in latest.items() if op == "upsert"]
+        for chunk in chunked(sorted(upserts), self.batch_size):
+            result = await self.db.execute(select(*THREAT_COLUMNS).where(ThreatScenario.id.in_(chunk)))
+            rows = [threat_entry(row) for row in result.all()]
+            if rows:
+                await self.backend.upsert(rows)
+        for project_id in dict.fromkeys(resyncs):
+            await self._resync_threats(project_id)
+
+        deletes = [entity_id for entity_id, op in latest.items() if op == "delete"]
+        if deletes:
+            await self.backend.delete("threat", deletes)
+
+    async def _resync_threats(self, project_id: Optional[int]) -> None:
+        """Re-index all threats of a project (or all projects) in id-keyset batches."""
+        last_id = 0
+        while True:
+            query = select(*THREAT_COLUMNS).where(ThreatScenario.id > last_id)
+            if project_id is not None:
+                query = query.where(ThreatScenario.project_id == project_id)
+            result = await self.db.execute(query.order_by(ThreatScenario.id).limit(self.batch_size))
+            rows = result.all()
+            if not rows:
+                break
+            await self.backend.upsert([threat_entry(row) for row in rows])
+            last_id = rows[-1][0]
+
+
+async def index_parsed_document(db: AsyncSession, document_id: int) -> None:
+    """Index a document after its parse completed.
+
+    Failures are logged, not raised: the parse itself succeeded, and the
+    next full sync or re-parse indexes the document.
+    """
+    try:
+        await SearchIndexService(db).index_documents([document_id])
+    except Exception as e:
+        logger.warning(f"Search indexing of document {document_id} failed: {e}")
+
+
+async def remove_indexed_document(document_id: int) -> None:
+    """Remove a deleted document from the index, logging failures."""
+    try:
+        await get_search_backend().delete("document", [document_id])
+    except Exception as e:
+        logger.warning(f"Removing document {document_id} from search failed: {e}")
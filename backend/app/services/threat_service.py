@@ -0,0 +1,174 @@
+"""Threat persistence service."""
+
+from collections import Counter, defaultdict
+from typing import Any, Dict, Iterator, List, Sequence
+
+from sqlalchemy import Select, insert, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.exceptions import NotFoundError
+from app.models.asset import Asset
+from app.models.threat import SecurityMitigation, ThreatScenario
+from app.schemas.threat import MitigationResponse, ThreatBulkItem, ThreatResponse
+from app.services.graph_sync import record_changes
+from app.services.risk_methodology import risk_methodologies
+
+# Rows per INSERT round trip
+BULK_CHUNK_SIZE = 1000
+
+# Columns of the list fast path, in ThreatResponse field order
+THREAT_LIST_COLUMNS = [
+    Asset.name.label("asset_name") if name == "asset_name" else getattr(ThreatScenario, name)
+    for name in ThreatResponse.model_fields
+    if name != "mitigations"
+]
+MITIGATION_LIST_COLUMNS = [getattr(SecurityMitigation, name) for name in MitigationResponse.model_fields]
+
+
+def _chunks(rows: Sequence[Any], size: int = BULK_CHUNK_SIZE) -> Iterator[Sequence[Any]]:
+    for start in range(0, len(rows), size):
+        yield rows[start:start + size]
+
+
+class ThreatService:
+    """Service for threat bulk writes and list reads."""
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    @staticmethod
+    def list_query(filters: Sequence[Any]) -> Select:
+        """Column query for threat list rows, joined with the asset name."""
+        return (
+            select(*THREAT_LIST_COLUMNS)
+            .outerjoin(Asset, Asset.id == ThreatScenario.asset_id)
+            .where(*filters)
+        )
+
+    async def list_items(self, rows: Sequence[Any]) -> List[Dict[str, Any]]:
+        """Turn ``list_query`` rows into ``ThreatResponse``-shaped dicts.
+
+        Mitigations of the whole page are loaded with one column query. No
+        ORM objects or Pydantic models are built, so the result should be
+        returned through ``ORJSONResponse``.
+        """
+        items = [row._asdict() for row in rows]
+        by_id: Dict[int, Dict[str, Any]] = {}
+        for item in items:
+            item["mitigations"] = []
+            by_id[item["id"]] = item
+
+        if by_id:
+            result = await self.db.execute(
+                select(*MITIGATION_LIST_COLUMNS)
+                .where(SecurityMitigation.threat_id.in_(list(by_id)))
+                .order_by(SecurityMitigation.threat_id, SecurityMitigation.id)
+            )
+            for row in result.all():
+                by_id[row.threat_id]["mitigations"].append(row._asdict())
+
+        return items
+
+    async def bulk_create(
+        self,
+        project_id: int,
+        items: Sequence[ThreatBulkItem],
+        is_ai_generated: bool = False,
+    ) -> Dict[str, int]:
+        """Create many threats and their mitigations in a single transaction.
+
+        Referenced assets are validated with one query, risk metrics are
+        computed for all rows in one pass, and rows are written with
+        multi-row INSERTs instead of one commit/refresh per threat.
+
+        Args:
+            project_id: Project the threats belong to
+            items: Threats to create, each with optional mitigations
+            is_ai_generated: Whether the threats come from AI analysis
+
+        Returns:
+            Dict with ``created`` and ``mitigations_created`` counts
+
+        Raises:
+            NotFoundError: If any referenced asset is not in the project
+        """
+        if not items:
+            return {"created": 0, "mitigations_created": 0}
+
+        await self._check_assets(project_id, {item.asset_id for item in items})
+
+        rows: List[Dict[str, Any]] = []
+        for item in items:
+            row = item.model_dump(exclude={"mitigations"})
+            row["project_id"] = project_id
+            row["is_ai_generated"] = is_ai_generated
+            row["is_confirmed"] = False
+            rows.append(row)
+        engine = await risk_methodologies.get_engine(self.db, project_id)
+        engine.apply_batch(rows)
+
+        threat_ids = await self._insert_threats(project_id, rows)
+
+        mitigation_rows = [
+            {"threat_id": threat_id, **mitigation.model_dump()}
+            for item, threat_id in zip(items, threat_ids)
+            for mitigation in item.mitigations
+        ]
+        for chunk in _chunks(mitigation_rows):
+            await self.db.execute(insert(SecurityMitigation), list(chunk))
+
+        await record_changes(self.db, "threat", threat_ids, project_id=project_id)
+
+        await self.db.commit()
+
+        return {"created": len(rows), "mitigations_created": len(mitigation_rows)}
+
+    async def _check_assets(self, project_id: int, asset_ids: set[int]) -> None:
+        result = await self.db.execute(
+            select(Asset.id).where(
+                Asset.project_id == project_id,
+                Asset.id.in_(asset_ids),
+            )
+        )
+        missing = sorted(asset_ids - set(result.scalars().all()))
+        if missing:
+            raise NotFoundError(f"Assets not found in project {project_id}: {missing}")
+
+    async def _insert_threats(self, project_id: int, rows: List[Dict[str, Any]]) -> List[int]:
+        """Insert threat rows with multi-row INSERTs and return their primary keys.
+
+        Backends with ordered executemany RETURNING (SQLite, MariaDB,
+        PostgreSQL) return the ids from the INSERTs. MySQL has no RETURNING:
+        the ids are read back with one ``(project_id, threat_id)`` index
+        query per chunk. A threat ID may repeat, in the batch or in the
+        project, so each row gets the newest ids of its threat ID, in row
+        order, as auto-increment assigns them.
+        """
+        connection = await self.db.connection()
+        if connection.dialect.insert_executemany_returning_sort_by_parameter_order:
+            ids: List[int] = []
+            for chunk in _chunks(rows):
+                result = await self.db.execute(
+                    insert(ThreatScenario).returning(
+                        ThreatScenario.id, sort_by_parameter_order=True
+                    ),
+                    list(chunk),
+                )
+                ids.extend(result.scalars().all())
+            return ids
+
+        for chunk in _chunks(rows):
+            await self.db.execute(insert(ThreatScenario), list(chunk))
+
+        wanted = Counter(row["threat_id"] for row in rows)
+        found: Dict[str, List[int]] = defaultdict(list)
+        for chunk in _chunks(list(wanted)):
+            result = await self.db.execute(
+                select(ThreatScenario.id, ThreatScenario.threat_id)
+                .where(ThreatScenario.project_id == project_id, ThreatScenario.threat_id.in_(chunk))
+                .order_by(ThreatScenario.id)
+            )
+            for threat_pk, threat_id in result.all():
+                found[threat_id].append(threat_pk)
+        new_ids = {threat_id: iter(found[threat_id][-count:]) for threat_id, count in wanted.items()}
+        return [next(new_ids[row["threat_id"]]) for row in rows]
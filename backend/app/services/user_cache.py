@@ -0,0 +1,283 @@
+"""Authenticated user (principal) cache.
+
+Resolving the current user used to cost a ``SELECT users`` on every request
+plus lazy loads of roles and permissions for permission checks. Principals are
+now resolved once and kept in an in-process TTL LRU, backed by Redis so other
+workers can reuse them. Entries are invalidated whenever users, roles or
+permissions are written through a session, by ORM flushes or by bulk
+``insert``/``update``/``delete`` statements.
+
+Both levels are stamped with the user's version and a global generation,
+kept in Redis. Invalidating a user deletes its Redis entry and then moves
+its version on; role and permission changes move the generation instead.
+Every worker drops stale local entries on the next lookup, and an entry
+loaded before the change but written back after it is ignored. Only
+changes to principal fields count, so recording a login leaves the caches
+alone. While Redis is unavailable the local TTL bounds how long other
+workers keep a stale principal.
+"""
+
+import asyncio
+import logging
+import uuid
+from dataclasses import asdict, dataclass
+from itertools import chain
+from typing import Any, Iterable, List, Optional, Tuple
+
+from sqlalchemy import event, inspect, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import ORMExecuteState, Session, selectinload
+
+from app.core.config import get_settings
+from app.models.user import Permission, Role, RolePermission, User, UserRole
+from app.services.cache_service import cache_service
+from app.utils.ttl_cache import TTLCache
+
+settings = get_settings()
+logger = logging.getLogger(__name__)
+
+# Sentinel meaning "every cached principal is stale" (role/permission changes)
+ALL_USERS = "*"
+
+
+@dataclass(frozen=True)
+class AuthenticatedUser:
+    """Immutable snapshot of a user with resolved roles and permissions."""
+
+    id: int
+    username: str
+    email: str
+    display_name: Optional[str]
+    status: str
+    roles: frozenset[str]
+    permissions: frozenset[str]
+
+    @property
+    def is_active(self) -> bool:
+        return self.status == "active"
+
+    def has_permission(self, permission_code: str) -> bool:
+        """Check a permission; the ``admin`` role implicitly holds all of them."""
+        return permission_code in self.permissions or "admin" in self.roles
+
+    @classmethod
+    def from_user(cls, user: User) -> "AuthenticatedUser":
+        """Build a principal from a user with roles and permissions loaded."""
+        return cls(
+            id=user.id,
+            username=user.username,
+            email=user.email,
+            display_name=user.display_name,
+            status=user.status,
+            roles=frozenset(role.name for role in user.roles),
+            permissions=frozenset(
+                perm.code for role in user.roles for perm in role.permissions
+            ),
+        )
+
+    def to_dict(self) -> dict[str, Any]:
+        data = asdict(self)
+        data["roles"] = sorted(self.roles)
+        data["permissions"] = sorted(self.permissions)
+        return data
+
+    @classmethod
+    def from_dict(cls, data: dict[str, Any]) -> "AuthenticatedUser":
+        return cls(
+            id=data["id"],
+            username=data["username"],
+            email=data["email"],
+            display_name=data.get("display_name"),
+            status=data["status"],
+            roles=frozenset(data.get("roles", [])),
+            permissions=frozenset(data.get("permissions", [])),
+        )
+
+
+class UserCache:
+    """Two-level (process + Redis) cache of authenticated principals."""
+
+    KEY_PREFIX = "auth:principal"
+    VERSION_PREFIX = "auth:principal-version"
+    GENERATION_KEY = "auth:principal-generation"
+
+    def __init__(
+        self,
+        max_entries: int = settings.USER_CACHE_MAX_ENTRIES,
+        local_ttl_seconds: int = settings.USER_CACHE_LOCAL_TTL_SECONDS,
+        redis_ttl_seconds: int = settings.USER_CACHE_TTL_SECONDS,
+    ):
+        # user_id -> ([generation, version], principal)
+        self._local: TTLCache[Tuple[List[Optional[str]], AuthenticatedUser]] = TTLCache(
+            max_entries=max_entries,
+            ttl_seconds=local_ttl_seconds,
+        )
+        self.redis_ttl_seconds = redis_ttl_seconds
+        self._pending_tasks: set[asyncio.Task] = set()
+
+    @classmethod
+    def redis_key(cls, user_id: int) -> str:
+        return f"{cls.KEY_PREFIX}:{user_id}"
+
+    @classmethod
+    def version_key(cls, user_id: int) -> str:
+        return f"{cls.VERSION_PREFIX}:{user_id}"
+
+    async def get_principal(
+        self,
+        user_id: int,
+        db: AsyncSession,
+    ) -> Optional[AuthenticatedUser]:
+        """Resolve a principal, hitting the database only on a full cache miss."""
+        # Read the stamp first, so a change committed while loading leaves
+        # the entry stamped older
+        stamp = await cache_service.get_many([self.GENERATION_KEY, self.version_key(user_id)])
+        cached = self._local.get(user_id)
+        if cached is not None and cached[0] == stamp:
+            return cached[1]
+
+        cached = await cache_service.get(self.redis_key(user_id))
+        # Entries cached by earlier releases hold the principal alone
+        if cached and "principal" in cached and cached.get("stamp") == stamp:
+            principal = AuthenticatedUser.from_dict(cached["principal"])
+            self._local.set(user_id, (stamp, principal))
+            return principal
+
+        principal = await self._load(user_id, db)
+        if principal is None:
+            return None
+
+        self._local.set(user_id, (stamp, principal))
+        await cache_service.set(
+            self.redis_key(user_id),
+            {"stamp": stamp, "principal": principal.to_dict()},
+            expire=self.redis_ttl_seconds,
+        )
+        return principal
+
+    async def _load(self, user_id: int, db: AsyncSession) -> Optional[AuthenticatedUser]:
+        result = await db.execute(
+            select(User)
+            .options(selectinload(User.roles).selectinload(Role.permissions))
+            .where(User.id == user_id)
+        )
+        user = result.scalar_one_or_none()
+        return AuthenticatedUser.from_user(user) if user else None
+
+    def invalidate(self, user_ids: Iterable[Any]) -> None:
+        """Drop cached principals; ``ALL_USERS`` clears every entry.
+
+        The local level is cleared synchronously. Redis deletion and the new
+        versions are scheduled on the running event loop so this can be
+        called from ORM events.
+        """
+        user_ids = set(user_ids)
+        if not user_ids:
+            return
+
+        if ALL_USERS in user_ids:
+            self._local.clear()
+        else:
+            for user_id in user_ids:
+                self._local.pop(user_id)
+        self._schedule(self._publish(user_ids))
+
+    async def _publish(self, user_ids: set) -> None:
+        """Delete the Redis entries, then tell other workers to drop theirs."""
+        if ALL_USERS in user_ids:
+            await cache_service.delete_pattern(f"{self.KEY_PREFIX}:*")
+            await cache_service.set(self.GENERATION_KEY, uuid.uuid4().hex)
+            return
+        for user_id in user_ids:
+            await cache_service.delete(self.redis_key(user_id))
+            # An expired version only makes entries stamped with it miss
+            await cache_service.set(
+                self.version_key(user_id), uuid.uuid4().hex, expire=self.redis_ttl_seconds,
+            )
+
+    def clear_local(self) -> None:
+        """Clear the in-process level only."""
+        self._local.clear()
+
+    def stats(self) -> dict[str, Any]:
+        return self._local.stats()
+
+    def _schedule(self, coro) -> None:
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            coro.close()
+            return
+
+        task = loop.create_task(coro)
+        self._pending_tasks.add(task)
+        task.add_done_callback(self._pending_tasks.discard)
+
+
+# Global user cache instance
+user_cache = UserCache()
+
+
+_PENDING_KEY = "user_cache_invalidations"
+
+# User attributes a principal depends on; the password hash is included so
+# a password change drops the cached principal too
+_PRINCIPAL_ATTRIBUTES = (
+    "username", "email", "display_name", "status", "password_hash", "roles",
+)
+
+
+def _principal_changed(user: User) -> bool:
+    attrs = inspect(user).attrs
+    return any(attrs[name].history.has_changes() for name in _PRINCIPAL_ATTRIBUTES)
+
+
+@event.listens_for(Session, "after_flush")
+def _collect_principal_changes(session: Session, flush_context) -> None:
+    """Record which principals are affected by the flushed changes."""
+    pending: set = session.info.setdefault(_PENDING_KEY, set())
+    for obj in chain(session.new, session.dirty, session.deleted):
+        if isinstance(obj, User):
+            if obj in session.dirty and not _principal_changed(obj):
+                continue
+            pending.add(obj.id)
+        elif isinstance(obj, UserRole):
+            pending.add(obj.user_id)
+        elif isinstance(obj, (Role, Permission, RolePermission)):
+            pending.add(ALL_USERS)
+
+
+# Tables whose bulk writes change principals; rows are not known, so any
+# write stales every principal
+_PRINCIPAL_TABLES = {
+    model.__table__ for model in (User, UserRole, Role, Permission, RolePermission)
+}
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _collect_bulk_principal_changes(orm_execute_state: ORMExecuteState) -> None:
+    """Record bulk statements on principal tables, which skip the flush."""
+    state = orm_execute_state
+    if not (state.is_insert or state.is_update or state.is_delete):
+        return
+    statement = state.statement
+    if statement.table not in _PRINCIPAL_TABLES:
+        return
+    if state.is_update and statement.table.name == User.__tablename__:
+        # e.g. recording logins in bulk
+        columns = {getattr(key, "key", key) for key in statement._values or ()}
+        if columns and columns.isdisjoint(_PRINCIPAL_ATTRIBUTES):
+            return
+    state.session.info.setdefault(_PENDING_KEY, set()).add(ALL_USERS)
+
+
+@event.listens_for(Session, "after_commit")
+def _apply_principal_changes(session: Session) -> None:
+    pending = session.info.pop(_PENDING_KEY, None)
+    if pending:
+        user_cache.invalidate(pending)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_principal_changes(session: Session) -> None:
+    session.info.pop(_PENDING_KEY, None)
@@ -0,0 +1,298 @@
+"""Image preprocessing for vision model calls.
+
+Architecture diagrams are decoded once and re-encoded (JPEG or PNG) at the
+resolution the vision model works at (``VISION_MAX_PIXELS``, sizes in
+multiples of the patch size), instead of sending the full-resolution
+file. Diagrams too large to read at that resolution are split into
+overlapping tiles, each analysed in its own call next to a downsized
+overview, and the results are merged. Results are cached per project by
+the SHA-256 of the decoded pixels, so re-uploads of a diagram skip the
+model; the perceptual hash is kept as a near-duplicate hint only, since
+revisions of a diagram can share it.
+"""
+
+import base64
+import hashlib
+import io
+import math
+import re
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from PIL import ExifTags, Image, ImageOps
+
+from app.core.config import get_settings
+from app.services.cache_service import cache_service
+from app.utils.ttl_cache import TTLCache
+
+settings = get_settings()
+
+# Side of the difference hash grid; the hash has HASH_SIZE**2 bits
+HASH_SIZE = 16
+# Brightness step (0-255) that counts as an edge, so compression noise in
+# flat areas does not flip bits
+HASH_THRESHOLD = 4
+
+Box = Tuple[int, int, int, int]
+
+
+@dataclass(frozen=True)
+class VisionImage:
+    """One encoded image to send to the vision model."""
+
+    data: bytes
+    box: Box  # region of the source image, in source pixels
+    size: Tuple[int, int]  # encoded width and height
+    mime_type: str = "image/jpeg"
+
+    def data_url(self) -> str:
+        """Encode as a base64 data URL."""
+        return f"data:{self.mime_type};base64,{base64.b64encode(self.data).decode('ascii')}"
+
+
+@dataclass(frozen=True)
+class VisionInput:
+    """A diagram prepared for the vision model."""
+
+    phash: str
+    digest: str  # SHA-256 of the decoded pixels
+    width: int
+    height: int
+    overview: VisionImage
+    tiles: List[VisionImage] = field(default_factory=list)
+
+    @property
+    def images(self) -> List[VisionImage]:
+        """Images to analyse: the overview, then any tiles."""
+        return [self.overview, *self.tiles]
+
+
+def fit_size(width: int, height: int, max_pixels: Optional[int] = None) -> Tuple[int, int]:
+    """Largest size within ``max_pixels`` keeping the aspect ratio.
+
+    Sides are rounded to multiples of ``VISION_PATCH_SIZE``; images are
+    never upscaled beyond that rounding.
+    """
+    max_pixels = max_pixels or settings.VISION_MAX_PIXELS
+    patch = settings.VISION_PATCH_SIZE
+    scale = min(1.0, math.sqrt(max_pixels / (width * height)))
+    fitted_width = max(patch, round(width * scale / patch) * patch)
+    fitted_height = max(patch, round(height * scale / patch) * patch)
+    if fitted_width * fitted_height > max_pixels:
+        fitted_width = max(patch, math.floor(width * scale / patch) * patch)
+        fitted_height = max(patch, math.floor(height * scale / patch) * patch)
+    return fitted_width, fitted_height
+
+
+def perceptual_hash(image: Image.Image, size: Optional[Tuple[int, int]] = None) -> str:
+    """Difference hash of an image, stable across re-encoding and resizing.
+
+    The aspect ratio (of ``size`` if given, else of the image) is appended,
+    since the hash grid itself ignores it.
+    """
+    width, height = size or image.size
+    small = image.convert("RGB").resize((HASH_SIZE + 1, HASH_SIZE), Image.Resampling.BOX).convert("L")
+    pixels = small.tobytes()
+    bits = 0
+    for y in range(HASH_SIZE):
+        row = pixels[y * (HASH_SIZE + 1):(y + 1) * (HASH_SIZE + 1)]
+        for x in range(HASH_SIZE):
+            bits = bits << 1 | (row[x + 1] - row[x] > HASH_THRESHOLD)
+    return f"{bits:0{HASH_SIZE * HASH_SIZE // 4}x}-{width / height:.2f}"
+
+
+def tile_boxes(width: int, height: int) -> List[Box]:
+    """Split an image into an overlapping grid of tiles.
+
+    The grid has about one tile per two ``VISION_MAX_PIXELS`` of source
+    image, at most ``VISION_MAX_TILES``, with cells shaped like the image.
+    """
+    count = min(math.ceil(width * height / (2 * settings.VISION_MAX_PIXELS)), settings.VISION_MAX_TILES)
+    cols = max(1, min(count, round(math.sqrt(count * width / height))))
+    rows = max(1, count // cols)
+    cell_width, cell_height = width / cols, height / rows
+    pad_x = cell_width * settings.VISION_TILE_OVERLAP / 2
+    pad_y = cell_height * settings.VISION_TILE_OVERLAP / 2
+    boxes = []
+    for row in range(rows):
+        for col in range(cols):
+            boxes.append((
+                max(0, int(col * cell_width - pad_x)),
+                max(0, int(row * cell_height - pad_y)),
+                min(width, math.ceil((col + 1) * cell_width + pad_x)),
+                min(height, math.ceil((row + 1) * cell_height + pad_y)),
+            ))
+    return boxes
+
+
+def _encode(image: Image.Image, box: Box) -> VisionImage:
+    """Resize to the model's resolution and encode as JPEG or PNG.
+
+    Flat-colour diagrams are often smaller, and sharper, as PNG; the
+    smaller encoding is sent.
+    """
+    size = fit_size(image.width, image.height)
+    if size != image.size:
+        # reducing_gap box-filters first, much faster on large sources
+        image = image.resize(size, Image.Resampling.LANCZOS, reducing_gap=2.0)
+    jpeg = io.BytesIO()
+    image.save(jpeg, format="JPEG", quality=settings.VISION_JPEG_QUALITY)
+    # Only flat-colour images can beat JPEG as PNG; skip the attempt for photos
+    if image.getcolors(256) is not None:
+        png = io.BytesIO()
+        image.save(png, format="PNG")
+        if png.tell() < jpeg.tell():
+            return VisionImage(data=png.getvalue(), box=box, size=size, mime_type="image/png")
+    return VisionImage(data=jpeg.getvalue(), box=box, size=size)
+
+
+def oriented_size(image: Image.Image) -> Tuple[int, int]:
+    """Image size after EXIF rotation, read from the header only."""
+    if image.getexif().get(ExifTags.Base.Orientation) in (5, 6, 7, 8):
+        return image.height, image.width
+    return image.size
+
+
+def load_rgb(image_bytes: bytes, max_pixels: Optional[int] = None) -> Image.Image:
+    """Decode an image as RGB, flattening transparency onto white.
+
+    With ``max_pixels``, JPEG sources are decoded at reduced scale when
+    that is enough for the requested size.
+    """
+    image = Image.open(io.BytesIO(image_bytes))
+    if max_pixels is not None:
+        image.draft("RGB", fit_size(image.width, image.height, max_pixels))
+    if image.getexif().get(ExifTags.Base.Orientation, 1) != 1:
+        image = ImageOps.exif_transpose(image)
+    if image.mode in ("RGBA", "LA", "P", "PA"):
+        image = image.convert("RGBA")
+        background = Image.new("RGB", image.size, "white")
+        background.paste(image, mask=image.getchannel("A"))
+        return background
+    return image.convert("RGB")
+
+
+def prepare_vision_input(image_bytes: bytes) -> VisionInput:
+    """Decode a diagram once and encode the images to send.
+
+    Runs synchronously; call it on the parse worker pool.
+    """
+    with Image.open(io.BytesIO(image_bytes)) as probe:
+        width, height = oriented_size(probe)
+    tiled = width * height > settings.VISION_TILE_MIN_PIXELS
+    # Without tiles the full resolution is never needed
+    image = load_rgb(image_bytes, None if tiled else settings.VISION_MAX_PIXELS)
+
+    phash = perceptual_hash(image, (width, height))
+    digest = hashlib.sha256(f"{image.width}x{image.height}:".encode() + image.tobytes()).hexdigest()
+    overview = _encode(image, (0, 0, width, height))
+    tiles = [_encode(image.crop(box), box) for box in tile_boxes(width, height)] if tiled else []
+    return VisionInput(
+        phash=phash, digest=digest, width=width, height=height, overview=overview, tiles=tiles,
+    )
+
+
+_ID_PATTERN = re.compile(r"^(.*?)(\d+)$")
+
+
+def _name_key(name: Any) -> str:
+    return re.sub(r"\s+", "", str(name or "")).casefold()
+
+
+def merge_architecture_results(results: Sequence[Dict[str, Any]]) -> Dict[str, Any]:
+    """Merge assets and relations found in the overview and tiles.
+
+    Assets are matched by name. A merged asset keeps its first asset ID
+    unless another asset already took it, in which case it gets the next
+    free number with the same prefix. Security attributes are combined,
+    and relations are re-pointed to the merged IDs and deduplicated.
+    """
+    assets: Dict[str, Dict[str, Any]] = {}
+    used_ids: Dict[str, str] = {}
+    relations: Dict[Tuple[str, str, str], Dict[str, Any]] = {}
+
+    for result in results:
+        id_map: Dict[str, str] = {}
+        for asset in result.get("assets", []):
+            key = _name_key(asset.get("name")) or _name_key(asset.get("asset_id"))
+            if not key:
+                continue
+            original_id = str(asset.get("asset_id") or "")
+            merged = assets.get(key)
+            if merged is None:
+                merged = dict(asset)
+                merged["asset_id"] = _free_id(original_id or "AST-001", used_ids)
+                used_ids[merged["asset_id"]] = key
+                assets[key] = merged
+            else:
+                for name, value in asset.items():
+                    if isinstance(value, bool):
+                        merged[name] = bool(merged.get(name)) or value
+                    elif value and not merged.get(name):
+                        merged[name] = value
+            if original_id:
+                id_map[original_id] = merged["asset_id"]
+
+        for relation in result.get("relations", []):
+            source = id_map.get(str(relation.get("source")), relation.get("source"))
+            target = id_map.get(str(relation.get("target")), relation.get("target"))
+            key = (str(source), str(target), str(relation.get("relation_type")))
+            if source and target and key not in relations:
+                relations[key] = {**relation, "source": source, "target": target}
+
+    return {"assets": list(assets.values()), "relations": list(relations.values())}
+
+
+def _free_id(asset_id: str, used_ids: Dict[str, str]) -> str:
+    if asset_id not in used_ids:
+        return asset_id
+    match = _ID_PATTERN.match(asset_id)
+    prefix, digits = (match.group(1), match.group(2)) if match else (f"{asset_id}-", "1")
+    number = int(digits)
+    while True:
+        number += 1
+        candidate = f"{prefix}{number:0{len(digits)}d}"
+        if candidate not in used_ids:
+            return candidate
+
+
+class VisionResultCache:
+    """Two-level (process + Redis) cache of vision results.
+
+    Entries are scoped by project and keyed by exact image content: a
+    result describes one project's diagram and must not be served for
+    another project's, or for a revised diagram that merely looks alike.
+    """
+
+    KEY_PREFIX = "vision"
+
+    def __init__(
+        self,
+        max_entries: int = 256,
+        ttl_seconds: int = settings.VISION_CACHE_TTL_SECONDS,
+    ):
+        self._local: TTLCache[Dict[str, Any]] = TTLCache(max_entries=max_entries, ttl_seconds=ttl_seconds)
+        self.ttl_seconds = ttl_seconds
+
+    @classmethod
+    def key(cls, kind: str, model: str, project_id: int, digest: str) -> str:
+        return f"{cls.KEY_PREFIX}:{kind}:{model}:{project_id}:{digest}"
+
+    async def get(self, key: str) -> Optional[Dict[str, Any]]:
+        value = self._local.get(key)
+        if value is None:
+            value = await cache_service.get(key)
+            if value is not None:
+                self._local.set(key, value)
+        return value
+
+    async def set(self, key: str, value: Dict[str, Any]) -> None:
+        self._local.set(key, value)
+        await cache_service.set(key, value, expire=self.ttl_seconds)
+
+    def clear_local(self) -> None:
+        """Clear the in-process level only."""
+        self._local.clear()
+
+
+vision_cache = VisionResultCache()
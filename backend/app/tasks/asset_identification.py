@@ -0,0 +1,93 @@
+"""Background asset identification tasks.
+
+``start_identification`` runs ``AssetPipeline`` for each document in a
+task with its own database session and returns at once. The task status
+(``pending``, ``running``, ``completed`` or ``failed``) and the results of
+the documents done so far are kept in Redis for ``IDENTIFY_TASK_TTL_SECONDS``,
+so any worker can answer a status request, and in-process for the worker
+running it.
+"""
+
+import asyncio
+import logging
+import uuid
+from typing import Any, Dict, List, Optional, Sequence
+
+from app.core.config import get_settings
+from app.core.database import async_session_factory
+from app.services.asset_pipeline import AssetPipeline
+from app.services.cache_service import cache_service
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+# Statuses kept in-process, oldest first
+LOCAL_STATUS_LIMIT = 1000
+
+_statuses: Dict[str, Dict[str, Any]] = {}
+_tasks: Dict[str, asyncio.Task] = {}
+
+
+def task_key(task_id: str) -> str:
+    """Redis key of a task's status."""
+    return f"task:identify-assets:{task_id}"
+
+
+async def _save(status: Dict[str, Any]) -> None:
+    _statuses.pop(status["task_id"], None)
+    _statuses[status["task_id"]] = status
+    while len(_statuses) > LOCAL_STATUS_LIMIT:
+        del _statuses[next(iter(_statuses))]
+    await cache_service.set(task_key(status["task_id"]), status, expire=settings.IDENTIFY_TASK_TTL_SECONDS)
+
+
+async def start_identification(project_id: int, document_ids: Sequence[int]) -> Dict[str, Any]:
+    """Start identifying the assets of project documents in the background.
+
+    Returns:
+        The initial task status
+    """
+    status = {
+        "task_id": uuid.uuid4().hex,
+        "project_id": project_id,
+        "status": "pending",
+        "document_ids": list(document_ids),
+        "result": None,
+        "error": None,
+    }
+    await _save(status)
+    task = asyncio.create_task(_run(dict(status)))
+    # The loop only keeps weak references to tasks
+    _tasks[status["task_id"]] = task
+    task.add_done_callback(lambda _: _tasks.pop(status["task_id"], None))
+    return status
+
+
+async def get_identification(task_id: str) -> Optional[Dict[str, Any]]:
+    """Return a task's status, or None if it is unknown or expired."""
+    status = _statuses.get(task_id)
+    if status is None:
+        status = await cache_service.get(task_key(task_id))
+    return status
+
+
+async def _run(status: Dict[str, Any]) -> None:
+    """Process the documents one after the other, saving progress after each."""
+    results: List[Dict[str, Any]] = []
+    status["status"] = "running"
+    await _save(status)
+    try:
+        async with async_session_factory() as db:
+            for document_id in status["document_ids"]:
+                results.append(await AssetPipeline(db).run(status["project_id"], document_id))
+                status["result"] = {"created": sum(item["created"] for item in results), "documents": results}
+                await _save(status)
+        status["status"] = "completed"
+    except asyncio.CancelledError:
+        status.update(status="failed", error="Asset identification was cancelled")
+        await _save(status)
+        raise
+    except Exception as e:
+        logger.exception(f"Asset identification task {status['task_id']} failed")
+        status.update(status="failed", error=str(e))
+    await _save(status)
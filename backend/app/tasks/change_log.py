@@ -0,0 +1,48 @@
+"""Background replay and pruning of the change log."""
+
+import asyncio
+import logging
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.clients.graph import get_graph_backend
+from app.clients.search import get_search_backend
+from app.core.database import async_session_factory
+from app.core.config import get_settings
+from app.services.cache_service import cache_service
+from app.services.change_log import prune_change_log
+from app.services.graph_sync import GraphSyncService
+from app.services.search_index import SearchIndexService
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+
+async def sync_change_log(db: AsyncSession) -> None:
+    """Bring the graph and search backends up to date and prune applied log entries.
+
+    The search index is shared by workers, so one of them syncs it at a
+    time; the others skip it this round.
+    """
+    await GraphSyncService(db).sync()
+    search = get_search_backend()
+    if await cache_service.acquire_lock(search.lock_name, settings.SEARCH_SYNC_LOCK_SECONDS):
+        try:
+            await SearchIndexService(db, search).sync()
+        finally:
+            await cache_service.delete(search.lock_name)
+    checkpoints = [await get_graph_backend().get_checkpoint(), await get_search_backend().get_checkpoint()]
+    through = await prune_change_log(db, checkpoints)
+    if through:
+        logger.info(f"Change log pruned through {through}")
+
+
+async def run_change_log_sync(interval: float) -> None:
+    """Run ``sync_change_log`` every ``interval`` seconds until cancelled."""
+    while True:
+        try:
+            async with async_session_factory() as db:
+                await sync_change_log(db)
+        except Exception as e:
+            logger.warning(f"Change log sync failed: {e}")
+        await asyncio.sleep(interval)
@@ -0,0 +1,31 @@
+"""Background deletion of parse result blobs no document references."""
+
+import asyncio
+import logging
+
+from app.core.config import get_settings
+from app.core.database import async_session_factory
+from app.services.cache_service import cache_service
+from app.services.parse_result_store import sweep_parse_blobs
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+LOCK_NAME = "parse-blob-sweep"
+
+
+async def run_parse_blob_sweep(interval: float) -> None:
+    """Run ``sweep_parse_blobs`` every ``interval`` seconds until cancelled.
+
+    Blob storage is shared, so one worker sweeps at a time.
+    """
+    while True:
+        try:
+            if await cache_service.acquire_lock(LOCK_NAME, int(interval)):
+                async with async_session_factory() as db:
+                    deleted = await sweep_parse_blobs(db)
+                if deleted:
+                    logger.info(f"Deleted {deleted} unreferenced parse result blobs")
+        except Exception as e:
+            logger.warning(f"Parse blob sweep failed: {e}")
+        await asyncio.sleep(interval)
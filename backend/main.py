@@ -1,20 +1,28 @@
 """FastAPI application entry point."""
 
+import asyncio
 import time
 import logging
 from contextlib import asynccontextmanager
 from datetime import datetime
 
 from fastapi import FastAPI, Request
+from fastapi.datastructures import Default
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.middleware.gzip import GZipMiddleware
-from fastapi.responses import JSONResponse
 from fastapi.openapi.utils import get_openapi
 
 from app.api.v1.router import api_router
+from app.clients.graph import get_graph_backend
+from app.clients.search import get_search_backend
 from app.core.config import get_settings
 from app.core.exceptions import BaseAPIException
 from app.core.middleware import SecurityHeadersMiddleware, RequestLoggingMiddleware
+from app.core.responses import ORJSONResponse
+from app.core.security import password_hasher
+from app.services.parsers.base import ParserFactory, run_in_parse_pool, shutdown_parse_executor
+from app.tasks.change_log import run_change_log_sync
+from app.tasks.parse_blobs import run_parse_blob_sweep
 
 settings = get_settings()
 
@@ -32,9 +40,29 @@ async def lifespan(app: FastAPI):
     # Startup
     logger.info(f"Starting {settings.APP_NAME} v{settings.APP_VERSION}")
     logger.info(f"Debug mode: {settings.DEBUG}")
+    try:
+        await get_graph_backend().ensure_schema()
+    except Exception as e:
+        logger.warning(f"Graph backend schema setup failed: {e}")
+    try:
+        await get_search_backend().ensure_schema()
+    except Exception as e:
+        logger.warning(f"Search backend schema setup failed: {e}")
+    if settings.PARSER_WARMUP:
+        # Parsers load lazily; workers that parse pay the imports before serving
+        loaded = await run_in_parse_pool(ParserFactory.warm_up)
+        logger.info(f"Parsers loaded for: {', '.join(loaded)}")
+    change_log_sync = asyncio.create_task(run_change_log_sync(settings.CHANGE_LOG_SYNC_INTERVAL_SECONDS))
+    blob_sweep = asyncio.create_task(run_parse_blob_sweep(settings.PARSE_BLOB_SWEEP_INTERVAL_SECONDS))
     yield
     # Shutdown
     logger.info(f"Shutting down {settings.APP_NAME}")
+    change_log_sync.cancel()
+    blob_sweep.cancel()
+    password_hasher.shutdown()
+    shutdown_parse_executor()
+    await get_graph_backend().close()
+    await get_search_backend().close()
 
 
 # OpenAPI schema customization
@@ -101,6 +129,9 @@ app = FastAPI(
     docs_url="/docs",
     redoc_url="/redoc",
     openapi_url="/openapi.json",
+    # As a Default, FastAPI versions that encode response models with
+    # pydantic-core keep doing so; orjson handles everything else
+    default_response_class=Default(ORJSONResponse),
     lifespan=lifespan,
 )
 
@@ -124,7 +155,7 @@ app.add_middleware(
 @app.exception_handler(BaseAPIException)
 async def api_exception_handler(request: Request, exc: BaseAPIException):
     """Handle custom API exceptions."""
-    return JSONResponse(
+    return ORJSONResponse(
         status_code=200,  # Always return 200 for business errors
         content={
             "code": exc.code,
@@ -138,7 +169,7 @@ async def api_exception_handler(request: Request, exc: BaseAPIException):
 @app.exception_handler(Exception)
 async def general_exception_handler(request: Request, exc: Exception):
     """Handle unexpected exceptions."""
-    return JSONResponse(
+    return ORJSONResponse(
         status_code=500,
         content={
             "code": 10001,
@@ -161,6 +192,7 @@ async def health_check():
         "status": "healthy",
         "version": settings.APP_VERSION,
         "timestamp": datetime.now().isoformat(),
+        "password_hashing": password_hasher.stats(),
     }
 
 
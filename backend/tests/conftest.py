@@ -11,6 +11,9 @@ import sys
 sys.path.insert(0, '.')
 
 from main import app
+from app.clients.search import get_search_backend
+from app.clients.storage import get_blob_store
+from app.core.config import get_settings
 from app.core.database import get_db, Base
 from app.core.security import get_password_hash, create_access_token
 
@@ -76,6 +79,27 @@ async def client(db_session: AsyncSession) -> AsyncGenerator[AsyncClient, None]:
     app.dependency_overrides.clear()
 
 
+@pytest.fixture
+def blob_store(tmp_path, monkeypatch):
+    """Point blob storage at a temporary directory."""
+    monkeypatch.setattr(get_settings(), "BLOB_BACKEND", "local")
+    monkeypatch.setattr(get_settings(), "BLOB_STORAGE_DIR", str(tmp_path / "blobs"))
+    get_blob_store.cache_clear()
+    yield get_blob_store()
+    get_blob_store.cache_clear()
+
+
+@pytest.fixture
+async def search_backend(tmp_path, monkeypatch):
+    """Point the local search index at a temporary file."""
+    monkeypatch.setattr(get_settings(), "SEARCH_SQLITE_PATH", str(tmp_path / "search.db"))
+    get_search_backend.cache_clear()
+    backend = get_search_backend()
+    yield backend
+    await backend.close()
+    get_search_backend.cache_clear()
+
+
 @pytest.fixture
 def test_user_data():
     """Test user data."""
@@ -0,0 +1,149 @@
+"""
+Tests for the in-process asset graph engine.
+"""
+import random
+import time
+
+import numpy as np
+import pytest
+import sys
+sys.path.insert(0, '.')
+
+from httpx import AsyncClient
+
+from app.core.security import create_access_token
+from app.models.asset import Asset, AssetRelation
+from app.models.project import Project
+from app.models.threat import ThreatScenario
+from app.models.user import User
+from app.services.asset_graph import AssetGraph
+
+
+def _graph(categories, edges, feasibility=None):
+    assets = [(i, f"asset {i}", category, None) for i, category in enumerate(categories)]
+    relations = [(n, u, v, "connects", None) for n, (u, v) in enumerate(edges)]
+    graph = AssetGraph.build(1, assets, relations)
+    if feasibility is not None:
+        graph.node_feasibility = np.array(feasibility)
+    return graph
+
+
+def test_reachable_forward_and_reverse():
+    """BFS levels follow relation direction and respect max_depth."""
+    graph = _graph(["Interface", "Hardware", "Hardware", "Hardware"], [(0, 1), (1, 2), (2, 3), (3, 1)])
+
+    assert graph.reachable(0) == [(1, 1), (2, 2), (3, 3)]
+    assert graph.reachable(0, max_depth=2) == [(1, 1), (2, 2)]
+    assert graph.reachable(3, reverse=True) == [(2, 1), (1, 2), (0, 3)]
+
+
+def test_attack_paths_hop_and_weighted():
+    """Hop count prefers short paths; feasibility weighting prefers easy ones."""
+    graph = _graph(
+        ["Interface", "Hardware", "Hardware", "External", "Hardware"],
+        [(0, 1), (1, 4), (0, 2), (2, 4), (3, 4)],
+        feasibility=[-1, 0, 3, -1, 0],
+    )
+
+    paths = graph.attack_paths(4, k=5)
+    assert [p.nodes for p in paths] == [[3, 4], [0, 1, 4], [0, 2, 4]]
+    assert [p.cost for p in paths] == [1, 2, 2]
+
+    paths = graph.attack_paths(4, k=2, weighted=True)
+    assert [p.nodes for p in paths] == [[3, 4], [0, 2, 4]]
+    assert [p.cost for p in paths] == [4, 5]
+
+
+def test_incremental_updates_match_rebuild():
+    """Adding and removing relations keeps the CSR arrays consistent."""
+    graph = _graph(["Interface", "Hardware", "Hardware"], [(0, 1)])
+    graph.add_asset(3, "asset 3", "Hardware", None)
+    assert graph.add_relation(10, 1, 3, "connects", "CAN")
+    assert graph.add_relation(11, 0, 2, "connects", None)
+    assert not graph.add_relation(12, 0, 99, "connects", None)
+    assert [p.nodes for p in graph.attack_paths(3)] == [[0, 1, 3]]
+
+    graph.remove_relation(0)
+    assert graph.attack_paths(3) == []
+    assert graph.indptr.tolist() == [0, 1, 2, 2, 2]
+    assert graph.reachable(0) == [(2, 1)]
+
+
+def test_queries_on_large_graph_are_fast():
+    """Queries over 10k assets finish in milliseconds."""
+    rng = random.Random(7)
+    n = 10_000
+    categories = ["Interface" if i % 500 == 0 else "Hardware" for i in range(n)]
+    edges = [(i, rng.randrange(n)) for i in range(n) for _ in range(3)]
+    graph = _graph(categories, edges, feasibility=[rng.randrange(-1, 4) for _ in range(n)])
+
+    start = time.perf_counter()
+    reached = graph.reachable(1)
+    paths = graph.attack_paths(n - 1, k=3, weighted=True)
+    elapsed = time.perf_counter() - start
+
+    assert len(reached) > n // 2
+    assert len(paths) == 3 and paths[0].cost <= paths[-1].cost
+    assert elapsed < 0.5
+
+
+@pytest.mark.asyncio
+async def test_graph_api_tracks_relation_writes(client: AsyncClient, db_session):
+    """Cached graphs are updated by relation writes and serve path queries."""
+    user = User(username="graph", email="graph@example.com", password_hash="x", status="active")
+    db_session.add(user)
+    await db_session.flush()
+    project = Project(name="Graph", owner_id=user.id, status="draft")
+    db_session.add(project)
+    await db_session.flush()
+    obd = Asset(project_id=project.id, asset_id="AST-1", name="OBD", category="Interface")
+    gateway = Asset(project_id=project.id, asset_id="AST-2", name="Gateway", category="Hardware")
+    ecu = Asset(project_id=project.id, asset_id="AST-3", name="ECU", category="Hardware")
+    db_session.add_all([obd, gateway, ecu])
+    await db_session.flush()
+    db_session.add(AssetRelation(
+        project_id=project.id, source_asset_id=obd.id, target_asset_id=gateway.id, relation_type="connects",
+    ))
+    db_session.add(ThreatScenario(
+        project_id=project.id, asset_id=ecu.id, threat_id="T-1",
+        security_attribute="Integrity", stride_type="T", threat_description="tamper",
+        attack_feasibility_value=2,
+    ))
+    await db_session.commit()
+
+    token = create_access_token({"sub": str(user.id), "username": user.username})
+    headers = {"Authorization": f"Bearer {token}"}
+    url = f"/api/v1/projects/{project.id}/assets"
+
+    try:
+        response = await client.get(f"{url}/graph", headers=headers)
+        assert len(response.json()["data"]["edges"]) == 1
+
+        response = await client.get(f"{url}/graph/attack-paths?target_id={ecu.id}", headers=headers)
+        assert response.json()["data"]["paths"] == []
+
+        response = await client.post(
+            f"{url}/relations",
+            json={"source_asset_id": gateway.id, "target_asset_id": ecu.id, "relation_type": "connects"},
+            headers=headers,
+        )
+        assert response.json()["code"] == 0
+
+        response = await client.get(
+            f"{url}/graph/attack-paths?target_id={ecu.id}&weighted=true", headers=headers
+        )
+        paths = response.json()["data"]["paths"]
+        assert [node["name"] for node in paths[0]["nodes"]] == ["OBD", "Gateway", "ECU"]
+        assert paths[0]["cost"] == 6
+
+        response = await client.get(f"{url}/graph/impact?asset_id={obd.id}", headers=headers)
+        assert [(a["name"], a["depth"]) for a in response.json()["data"]["assets"]] == [
+            ("Gateway", 1), ("ECU", 2),
+        ]
+
+        response = await client.get(f"{url}/graph/impact?asset_id=0", headers=headers)
+        assert response.status_code == 404
+    finally:
+        await db_session.delete(project)
+        await db_session.delete(user)
+        await db_session.commit()
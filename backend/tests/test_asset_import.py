@@ -0,0 +1,119 @@
+"""
+Tests for importing assets from parsed asset-list tables.
+"""
+import pytest
+import sys
+sys.path.insert(0, '.')
+
+from httpx import AsyncClient
+from sqlalchemy import select
+
+from app.core.security import create_access_token
+from app.models.asset import Asset
+from app.models.document import Document
+from app.models.project import Project
+from app.models.user import User
+from app.services.asset_import import detect_header, read_asset_tables
+
+REPORT_HEADER = [
+    "资产ID", "资产名称", "分类", "细分类", "备注",
+    "真实性", "完整性", "不可抵赖性", "机密性", "可用性", "权限",
+]
+
+
+def test_detect_header_skips_title_rows():
+    """The header may sit below a title and use English or spaced names."""
+    table = [
+        ["Vehicle asset list", "", ""],
+        ["", "", ""],
+        ["Asset ID", "Category", "Asset Name ", "Notes"],
+    ]
+    assert detect_header(table) == (2, {0: "asset_id", 1: "category", 2: "name"})
+    assert detect_header([["名称", "描述"], ["ECU", "x"]]) is None
+
+
+def test_read_asset_tables():
+    """Rows map onto AssetCreate; bad and repeated rows are reported."""
+    tables = [
+        [["Sheet without assets"], ["1"]],
+        [
+            REPORT_HEADER,
+            ["AST-001", "Gateway", "Hardware", "ECU", "", "√", "", "", "√", "", ""],
+            ["", "", "", "", "", "", "", "", "", "", ""],
+            ["AST-002", "", "Software", "", "", "", "", "", "", "", ""],
+            ["AST-001", "Gateway copy", "Hardware", "", "", "", "", "", "", "", ""],
+        ],
+    ]
+    rows = read_asset_tables(tables, source_document_id=7)
+
+    assert rows.tables == 1
+    assert [asset.asset_id for asset in rows.assets] == ["AST-001"]
+    asset = rows.assets[0]
+    assert (asset.authenticity, asset.integrity, asset.confidentiality) == (True, False, True)
+    assert asset.subcategory == "ECU" and asset.remarks is None
+    assert asset.source_document_id == 7
+    assert [(error["table"], error["row"]) for error in rows.errors] == [(2, 4), (2, 5)]
+    assert "name" in rows.errors[0]["message"]
+    assert "Duplicate asset ID AST-001" in rows.errors[1]["message"]
+
+
+@pytest.mark.asyncio
+async def test_import_assets_api(client: AsyncClient, db_session):
+    """Importing a parsed document inserts new assets and updates existing ones."""
+    user = User(username="importer", email="importer@example.com", password_hash="x", status="active")
+    db_session.add(user)
+    await db_session.flush()
+    project = Project(name="Import", owner_id=user.id, status="draft")
+    db_session.add(project)
+    await db_session.flush()
+    db_session.add(Asset(project_id=project.id, asset_id="AST-000", name="Old", category="Hardware",
+                         description="Not in the table"))
+    table = [REPORT_HEADER] + [
+        [f"AST-{i:03d}", f"ECU {i}", "Hardware", "", "", "", "√", "", "", "", ""]
+        for i in range(300)
+    ]
+    document = Document(
+        project_id=project.id, name="assets.xlsx", original_name="资产列表.xlsx", file_type="xlsx",
+        storage_path="assets.xlsx", category="asset_list", parse_status="completed",
+        parse_result={"tables": [table]}, uploaded_by=user.id,
+    )
+    unparsed = Document(
+        project_id=project.id, name="raw.xlsx", original_name="raw.xlsx", file_type="xlsx",
+        storage_path="raw.xlsx", uploaded_by=user.id,
+    )
+    db_session.add_all([document, unparsed])
+    await db_session.commit()
+
+    token = create_access_token({"sub": str(user.id), "username": user.username})
+    headers = {"Authorization": f"Bearer {token}"}
+    url = f"/api/v1/projects/{project.id}/assets/import"
+
+    try:
+        response = await client.post(url, json={"document_id": document.id}, headers=headers)
+        data = response.json()["data"]
+        assert data == {"created": 299, "updated": 1, "skipped": 0, "errors": []}
+
+        result = await db_session.execute(
+            select(Asset)
+            .where(Asset.project_id == project.id)
+            .order_by(Asset.asset_id)
+            .execution_options(populate_existing=True)
+        )
+        assets = result.scalars().all()
+        assert len(assets) == 300
+        assert assets[0].name == "ECU 0" and assets[0].integrity and not assets[0].is_ai_generated
+        # Columns the table lacks keep their stored values
+        assert assets[0].description == "Not in the table"
+        assert assets[-1].source_document_id == document.id
+
+        response = await client.post(
+            url, json={"document_id": document.id, "update_existing": False}, headers=headers
+        )
+        assert response.json()["data"]["skipped"] == 300
+
+        response = await client.post(url, json={"document_id": unparsed.id}, headers=headers)
+        assert response.json()["code"] == 30001
+    finally:
+        await db_session.delete(project)
+        await db_session.delete(user)
+        await db_session.commit()
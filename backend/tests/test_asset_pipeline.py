@@ -0,0 +1,259 @@
+"""
+Tests for the streaming document-to-assets pipeline.
+"""
+import asyncio
+import os
+import time
+import uuid
+
+import pytest
+import sys
+sys.path.insert(0, '.')
+
+from httpx import AsyncClient
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.core.exceptions import AIServiceError
+from app.core.security import create_access_token
+from app.models.asset import Asset
+from app.models.document import Document
+from app.models.project import Project
+from app.models.user import User
+from app.schemas.asset import AssetCreate
+from app.services.asset_pipeline import AssetPipeline
+from app.services.parsers.base import BaseParser, ParsedContent, ParserFactory
+from app.tasks import asset_identification
+
+DELAY = 0.05
+
+
+class SlowParser(BaseParser):
+    """Hands out one chapter per fragment, taking ``DELAY`` for each."""
+
+    def __init__(self, chapters, log):
+        self.chapters = chapters
+        self.log = log
+
+    @property
+    def supported_extensions(self):
+        return ["slow"]
+
+    async def parse(self, file_path, category=None):
+        content = ParsedContent()
+        async for fragment in self.iter_parse(file_path, category):
+            content.extend(fragment)
+        return content
+
+    async def iter_parse(self, file_path, category=None):
+        for number, (title, body) in enumerate(self.chapters, 1):
+            await asyncio.sleep(DELAY)
+            self.log.append(("parsed", number))
+            yield ParsedContent(
+                text_blocks=[title, body],
+                blocks=[
+                    {"type": "heading", "level": 1, "text": title, "section": [title]},
+                    {"type": "paragraph", "text": body, "section": [title]},
+                ],
+            )
+
+
+class FakeIdentifier:
+    """Returns one asset per line starting with ``ASSET``, after ``delay``."""
+
+    def __init__(self, log, fail_on=None, delay=DELAY):
+        self.log = log
+        self.fail_on = fail_on
+        self.delay = delay
+        self.running = 0
+        self.max_running = 0
+
+    async def identify_from_text(self, text):
+        self.running += 1
+        self.max_running = max(self.max_running, self.running)
+        try:
+            self.log.append(("identify", text.split("\n")[0]))
+            await asyncio.sleep(self.delay)
+            if self.fail_on and self.fail_on in text:
+                raise AIServiceError("Asset identification failed: timeout")
+            return [
+                AssetCreate(asset_id=line.split()[1], name=line.split()[2], category="Hardware")
+                for line in text.splitlines() if line.startswith("ASSET")
+            ]
+        finally:
+            self.running -= 1
+
+    async def close(self):
+        pass
+
+
+@pytest.fixture
+async def project_document(db_session, monkeypatch, blob_store, search_backend):
+    """A project with a document parsed by ``SlowParser``."""
+    user = User(username=f"pipe-{uuid.uuid4().hex[:8]}", email=f"{uuid.uuid4().hex[:8]}@example.com",
+                password_hash="x", status="active")
+    db_session.add(user)
+    await db_session.flush()
+    project = Project(name="Pipeline", owner_id=user.id, status="draft")
+    db_session.add(project)
+    await db_session.flush()
+
+    storage_path = f"{uuid.uuid4().hex}.slow"
+    os.makedirs("/tmp/tara-documents", exist_ok=True)
+    with open(f"/tmp/tara-documents/{storage_path}", "w") as f:
+        f.write("chapters")
+    document = Document(
+        project_id=project.id, name="spec.slow", original_name="spec.slow", file_type="slow",
+        storage_path=storage_path, parse_status="pending", uploaded_by=user.id,
+    )
+    db_session.add(document)
+    await db_session.commit()
+
+    monkeypatch.setattr(ParserFactory, "_parsers", dict(ParserFactory._parsers))
+    yield user, project, document
+    os.remove(f"/tmp/tara-documents/{storage_path}")
+
+
+def chapters(count):
+    return [
+        (f"{number} Chapter", f"ASSET AST-001 ECU{number}\nASSET AST-{number + 100} Bus{number % 2}")
+        for number in range(1, count + 1)
+    ]
+
+
+@pytest.mark.asyncio
+class TestAssetPipeline:
+    """Tests for ``AssetPipeline``."""
+
+    async def test_identification_overlaps_parsing(self, db_session, project_document):
+        """Chapters are identified while later ones parse; time tends to the slower stage."""
+        _, project, document = project_document
+        log = []
+        ParserFactory.register(SlowParser(chapters(6), log))
+
+        started = time.perf_counter()
+        result = await AssetPipeline(db_session, FakeIdentifier(log), concurrency=1).run(project.id, document.id)
+        elapsed = time.perf_counter() - started
+
+        # The first chapter is identified before the last one is parsed
+        assert log.index(("identify", "1 Chapter")) < log.index(("parsed", 6))
+        # Parsing and identification each take 6 * DELAY; run back to back 12
+        assert elapsed < 10 * DELAY
+        stages = {stage["name"]: stage for stage in result["stages"]}
+        assert stages["parse"]["processed"] == 6
+        assert stages["identify"]["processed"] == 6
+        assert all(stage["throughput"] > 0 for stage in result["stages"])
+
+        await db_session.refresh(document)
+        assert document.parse_status == "completed"
+
+    async def test_dedupes_and_persists(self, db_session, project_document):
+        """Repeated and existing names are dropped, IDs taken in the run or project renamed."""
+        _, project, document = project_document
+        db_session.add_all([
+            Asset(project_id=project.id, asset_id="AST-102", name="Manual", category="Hardware",
+                  is_ai_generated=False),
+            Asset(project_id=project.id, asset_id="AST-900", name="bus 1", category="Hardware",
+                  is_ai_generated=False),
+        ])
+        await db_session.commit()
+        ParserFactory.register(SlowParser(chapters(3), []))
+
+        result = await AssetPipeline(db_session, FakeIdentifier([])).run(project.id, document.id)
+
+        # ECU1-3 and Bus0; Bus1 is in the project, Bus0 identified with the existing AST-102
+        assert result["identified"] == 6
+        assert (result["created"], result["skipped"]) == (4, 0)
+        rows = await db_session.execute(
+            select(Asset.asset_id, Asset.name, Asset.is_ai_generated, Asset.source_document_id)
+            .where(Asset.project_id == project.id, Asset.source_document_id == document.id)
+        )
+        assets = {name: (asset_id, ai, source) for asset_id, name, ai, source in rows.all()}
+        ecu_ids = sorted(assets[f"ECU{number}"][0] for number in (1, 2, 3))
+        assert ecu_ids == ["AST-001", "AST-001-2", "AST-001-3"]
+        assert assets["Bus0"][0] == "AST-102-2"
+        assert all(ai and source == document.id for _, ai, source in assets.values())
+        assert result["created"] == len(assets)
+
+    async def test_backpressure_and_failed_chunks(self, db_session, project_document):
+        """Queues stay bounded; a failed identification call only loses its chunk."""
+        _, project, document = project_document
+        log = []
+        ParserFactory.register(SlowParser(chapters(12), log))
+        # Identification is the bottleneck, so every queue fills up
+        identifier = FakeIdentifier(log, fail_on="3 Chapter", delay=6 * DELAY)
+
+        pipeline = AssetPipeline(db_session, identifier, queue_size=1, concurrency=2)
+        result = await pipeline.run(project.id, document.id)
+
+        assert all(stage["max_queue_depth"] <= 1 for stage in result["stages"])
+        # Parsing waits for identification instead of running ahead: one
+        # item per queue, per stage and per identify worker at most
+        ahead = parsed = identifying = 0
+        for event, _ in log:
+            parsed += event == "parsed"
+            identifying += event == "identify"
+            ahead = max(ahead, parsed - identifying)
+        assert ahead <= 5
+        assert identifier.max_running == 2
+        assert result["errors"] == ["Asset identification failed: timeout"]
+        names = (await db_session.execute(
+            select(Asset.name).where(Asset.source_document_id == document.id)
+        )).scalars().all()
+        assert "ECU3" not in names and "ECU4" in names
+
+    async def test_cancel_marks_parse_failed(self, db_session, project_document):
+        """A cancelled run does not leave the document marked as parsing."""
+        _, project, document = project_document
+        ParserFactory.register(SlowParser(chapters(20), []))
+
+        run = asyncio.create_task(AssetPipeline(db_session, FakeIdentifier([])).run(project.id, document.id))
+        await asyncio.sleep(3 * DELAY)
+        run.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await run
+
+        await db_session.refresh(document)
+        assert document.parse_status == "failed"
+        assert document.parse_error == "Parsing was cancelled"
+
+
+@pytest.mark.asyncio
+async def test_identify_api(client: AsyncClient, db_session, test_engine, project_document, monkeypatch):
+    """The endpoint identifies unparsed project documents in a background task."""
+    user, project, document = project_document
+    parsed = Document(
+        project_id=project.id, name="old.slow", original_name="old.slow", file_type="slow",
+        storage_path="missing.slow", parse_status="completed", uploaded_by=user.id,
+    )
+    db_session.add(parsed)
+    await db_session.commit()
+    ParserFactory.register(SlowParser(chapters(2), []))
+    monkeypatch.setattr("app.services.asset_identifier.AssetIdentifier", lambda: FakeIdentifier([]))
+    monkeypatch.setattr(
+        "app.tasks.asset_identification.async_session_factory",
+        async_sessionmaker(test_engine, class_=AsyncSession, expire_on_commit=False),
+    )
+
+    token = create_access_token({"sub": str(user.id), "username": user.username})
+    headers = {"Authorization": f"Bearer {token}"}
+    response = await client.post(f"/api/v1/projects/{project.id}/assets/identify", headers=headers)
+    task = response.json()["data"]
+    assert task["status"] == "pending"
+    # Already parsed documents are skipped
+    assert task["document_ids"] == [document.id]
+
+    await asyncio.wait_for(asset_identification._tasks[task["task_id"]], timeout=5)
+    response = await client.get(
+        f"/api/v1/projects/{project.id}/assets/identify/{task['task_id']}", headers=headers,
+    )
+    task = response.json()["data"]
+    assert task["status"] == "completed"
+    assert task["result"]["created"] == 4
+    assert [item["document_id"] for item in task["result"]["documents"]] == [document.id]
+    assert [stage["name"] for stage in task["result"]["documents"][0]["stages"]] == [
+        "parse", "chunk", "identify", "dedupe", "persist",
+    ]
+
+    response = await client.get(f"/api/v1/projects/{project.id}/assets/identify/unknown", headers=headers)
+    assert response.status_code == 404
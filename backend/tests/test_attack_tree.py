@@ -0,0 +1,200 @@
+"""
+Tests for attack tree generation, evaluation and rendering.
+"""
+import time
+from types import SimpleNamespace
+
+import pytest
+import sys
+sys.path.insert(0, '.')
+
+from httpx import AsyncClient
+
+from app.core.security import create_access_token
+from app.models.asset import Asset, AssetRelation
+from app.models.project import Project
+from app.models.threat import ThreatScenario
+from app.models.user import User
+from app.services.report_generator import TARAReportGenerator
+from app.services.attack_tree import (
+    GATE_AND,
+    GATE_LEAF,
+    GATE_OR,
+    AttackTree,
+    AttackTreeBuilder,
+    attack_trees,
+    parse_attack_path,
+    render_png,
+    render_svg,
+)
+
+
+def _asset(id, name, category):
+    return SimpleNamespace(id=id, name=name, category=category)
+
+
+def _relation(source, target, protocol=None):
+    return SimpleNamespace(source_asset_id=source, target_asset_id=target, protocol=protocol)
+
+
+def _threat(id, asset_id, scenario, path, feasibility):
+    return SimpleNamespace(
+        id=id,
+        asset_id=asset_id,
+        threat_id=f"T-{id:03d}",
+        threat_description=f"threat {id}",
+        damage_scenario=scenario,
+        attack_path=path,
+        attack_feasibility_value=feasibility,
+    )
+
+
+def test_parse_attack_path():
+    """Arrows separate steps, new lines and semicolons separate alternatives."""
+    assert parse_attack_path("1. 接入OBD -> 2. 发送诊断请求 → 刷写固件") == [
+        ["接入OBD", "发送诊断请求", "刷写固件"],
+    ]
+    assert parse_attack_path("WiFi -> TBOX; BT -> IVI\n") == [["WiFi", "TBOX"], ["BT", "IVI"]]
+    assert parse_attack_path(None) == []
+
+
+def test_evaluate_and_or_with_shared_subtree():
+    """AND takes the hardest child, OR the easiest; shared nodes count once."""
+    tree = AttackTree("t", "scenario")
+    shared = tree.add("shared", GATE_LEAF, feasibility=1)
+    easy = tree.add("easy", GATE_LEAF, feasibility=3)
+    unrated = tree.add("unrated", GATE_LEAF)
+    left = tree.add("left", GATE_AND, [shared, easy])
+    right = tree.add("right", GATE_AND, [shared, unrated])
+    tree.add("root", GATE_OR, [left, right])
+
+    assert tree.evaluate() == 1
+    assert tree.nodes[left].feasibility == 1
+    assert tree.nodes[right].feasibility == 1
+    assert tree.depths()[shared] == 2
+
+
+def test_builder_shares_reach_subtrees():
+    """Threats against the same asset share one reach subtree."""
+    assets = [
+        _asset(1, "OBD", "Interface"),
+        _asset(2, "Gateway", "Hardware"),
+        _asset(3, "ECU", "Hardware"),
+        _asset(4, "Cloud", "External"),
+    ]
+    relations = [_relation(1, 2, "CAN"), _relation(2, 3, "CAN"), _relation(4, 3, "HTTPS"), _relation(3, 2)]
+    threats = [
+        _threat(1, 3, "车辆失控", "发送伪造报文", 2),
+        _threat(2, 3, "车辆失控", "刷写固件 -> 篡改标定", 1),
+        _threat(3, 2, "隐私泄露", None, 3),
+    ]
+    trees = AttackTreeBuilder(assets, relations, threats).build_all()
+
+    assert [tree.title for tree in trees] == ["车辆失控", "隐私泄露"]
+    tree = trees[0]
+    assert tree.threat_count == 2
+    assert tree.root.gate == GATE_OR
+    assert tree.root.feasibility == 2
+
+    # ECU is one hop from the Cloud entry point, two from OBD
+    reach_ecu = [node for node in tree.nodes if node.label.startswith("Via ")]
+    assert [node.label for node in reach_ecu] == ["Via Cloud"]
+    parents = [node for node in tree.nodes if reach_ecu[0].index in node.children]
+    assert len(parents) == 2 and all(node.gate == GATE_AND for node in parents)
+
+
+def test_large_tree_is_linear():
+    """A tree with thousands of nodes builds, evaluates and renders quickly."""
+    assets = [_asset(i, f"asset {i}", "Interface" if i % 50 == 0 else "Hardware") for i in range(500)]
+    relations = [_relation(i, i + 1) for i in range(499)]
+    threats = [
+        _threat(i, i % 500, "scenario", "a -> b -> c; d -> e", i % 4) for i in range(1000)
+    ]
+
+    start = time.perf_counter()
+    tree = AttackTreeBuilder(assets, relations, threats).build_all()[0]
+    svg = render_svg(tree)
+    png = render_png(tree, max_width=2000)
+    elapsed = time.perf_counter() - start
+
+    assert len(tree.nodes) > 5000
+    assert tree.root.feasibility == 3
+    assert svg.startswith("<svg") and svg.count("<rect") == len(tree.nodes)
+    assert png.startswith(b"\x89PNG")
+    assert elapsed < 10
+
+
+@pytest.mark.asyncio
+async def test_attack_tree_api(client: AsyncClient, db_session):
+    """Attack trees are listed per damage scenario and rendered as SVG."""
+    user = User(username="trees", email="trees@example.com", password_hash="x", status="active")
+    db_session.add(user)
+    await db_session.flush()
+    project = Project(name="Trees", owner_id=user.id, status="draft")
+    db_session.add(project)
+    await db_session.flush()
+    obd = Asset(project_id=project.id, asset_id="AST-1", name="OBD", category="Interface")
+    ecu = Asset(project_id=project.id, asset_id="AST-2", name="ECU", category="Hardware")
+    db_session.add_all([obd, ecu])
+    await db_session.flush()
+    db_session.add(AssetRelation(
+        project_id=project.id, source_asset_id=obd.id, target_asset_id=ecu.id, relation_type="connects",
+    ))
+    threat = ThreatScenario(
+        project_id=project.id, asset_id=ecu.id, threat_id="T-1",
+        security_attribute="Integrity", stride_type="T", threat_description="tamper",
+        damage_scenario="车辆失控", attack_path="接入OBD -> 刷写固件", attack_feasibility_value=2,
+    )
+    db_session.add(threat)
+    await db_session.commit()
+
+    token = create_access_token({"sub": str(user.id), "username": user.username})
+    headers = {"Authorization": f"Bearer {token}"}
+    url = f"/api/v1/projects/{project.id}/attack-trees"
+
+    try:
+        response = await client.get(url, headers=headers)
+        trees = response.json()["data"]
+        assert len(trees) == 1
+        assert trees[0]["feasibility_label"] == "Medium"
+
+        response = await client.get(f"{url}/{trees[0]['tree_id']}", headers=headers)
+        assert response.json()["data"]["nodes"][-1]["gate"] == GATE_OR
+
+        response = await client.get(f"{url}/{trees[0]['tree_id']}/render", headers=headers)
+        assert response.headers["content-type"].startswith("image/svg+xml")
+        response = await client.get(f"{url}/{trees[0]['tree_id']}/render?format=png", headers=headers)
+        assert response.content.startswith(b"\x89PNG")
+
+        # Cached trees are rebuilt once the project's threats change
+        cached = await attack_trees.get(db_session, project.id)
+        assert await attack_trees.get(db_session, project.id) is cached
+        threat.attack_feasibility_value = 3
+        await db_session.commit()
+        response = await client.get(url, headers=headers)
+        assert response.json()["data"][0]["feasibility_label"] == "High"
+
+        response = await client.get(f"{url}/missing/render", headers=headers)
+        assert response.status_code == 404
+    finally:
+        await db_session.delete(project)
+        await db_session.delete(user)
+        await db_session.commit()
+
+
+def test_report_lists_feasibility_label(tmp_path):
+    """The report's attack tree sheet shows the feasibility label, not the level."""
+    from openpyxl import load_workbook
+
+    assets = [_asset(1, "OBD", "Interface"), _asset(2, "ECU", "Hardware")]
+    threat = _threat(1, 2, "车辆失控", "接入OBD", 2)
+    project = SimpleNamespace(id=1, name="Report", code=None, description=None, status="draft", owner_id=1)
+
+    trees = AttackTreeBuilder(assets, [_relation(1, 2)], [threat]).build_all()
+
+    generator = TARAReportGenerator()
+    generator._create_attack_tree_sheet(project, trees, ["Very Low", "Low", "Medium", "High"])
+    path = tmp_path / "report.xlsx"
+    generator.wb.save(path)
+
+    assert load_workbook(path)["攻击树分析"]["B4"].value == "Medium"
@@ -0,0 +1,137 @@
+"""
+Tests for streaming threat and asset exports.
+"""
+import csv
+import io
+import json
+
+import pytest
+import sys
+sys.path.insert(0, '.')
+
+from contextlib import asynccontextmanager
+
+from httpx import AsyncClient
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.core.security import create_access_token
+from app.models.asset import Asset
+from app.models.project import Project
+from app.models.threat import SecurityMitigation, ThreatScenario
+from app.models.user import User
+from app.services import export_service
+
+
+@pytest.fixture
+def export_sessions(test_engine, monkeypatch):
+    """Streams read through test database sessions; yields those still open."""
+    factory = async_sessionmaker(test_engine, class_=AsyncSession, expire_on_commit=False)
+    open_sessions = set()
+
+    @asynccontextmanager
+    async def session_factory():
+        async with factory() as session:
+            open_sessions.add(session)
+            try:
+                yield session
+            finally:
+                open_sessions.discard(session)
+
+    monkeypatch.setattr(export_service, "async_session_factory", session_factory)
+    return open_sessions
+
+
+async def seed(db_session, username: str):
+    user = User(username=username, email=f"{username}@example.com", password_hash="x", status="active")
+    db_session.add(user)
+    await db_session.flush()
+    project = Project(name="Export", owner_id=user.id, status="draft")
+    db_session.add(project)
+    await db_session.flush()
+    assets = [
+        Asset(project_id=project.id, asset_id=f"AST-{i}", name=f"网关 {i}", category="Hardware")
+        for i in range(2)
+    ]
+    db_session.add_all(assets)
+    await db_session.flush()
+    threats = [
+        ThreatScenario(
+            project_id=project.id,
+            asset_id=assets[i % 2].id,
+            threat_id=f"T-{i:03d}",
+            security_attribute="Integrity",
+            stride_type="T" if i % 2 else "S",
+            threat_description=f"threat {i}",
+            elapsed_time="<=1 week" if i == 2 else None,
+            attack_potential=3 if i == 2 else None,
+        )
+        for i in range(5)
+    ]
+    db_session.add_all(threats)
+    await db_session.flush()
+    for goal in ("first", "second"):
+        db_session.add(SecurityMitigation(threat_id=threats[1].id, security_goal=goal))
+    await db_session.commit()
+
+    token = create_access_token({"sub": str(user.id), "username": user.username})
+    return user, project, {"Authorization": f"Bearer {token}"}
+
+
+@pytest.mark.asyncio
+async def test_threat_and_asset_export(client: AsyncClient, db_session, monkeypatch, export_sessions):
+    """CSV and NDJSON exports stream every filtered row across batches."""
+    monkeypatch.setattr(export_service.settings, "EXPORT_BATCH_SIZE", 2)
+    user, project, headers = await seed(db_session, "exporter")
+    url = f"/api/v1/projects/{project.id}"
+
+    try:
+        response = await client.get(f"{url}/threats/export", headers=headers)
+        assert response.headers["content-type"].startswith("text/csv")
+        assert f"project-{project.id}-threats.csv" in response.headers["content-disposition"]
+        rows = list(csv.DictReader(io.StringIO(response.content.decode("utf-8-sig"))))
+        assert [row["threat_id"] for row in rows] == [f"T-{i:03d}" for i in range(5)]
+        assert rows[1]["asset_name"] == "网关 1"
+        assert rows[1]["security_goal"] == "first"
+        assert rows[0]["security_goal"] == ""
+        assert (rows[2]["elapsed_time"], rows[2]["attack_potential"]) == ("<=1 week", "3")
+
+        response = await client.get(
+            f"{url}/threats/export", params={"format": "ndjson", "stride_type": "T"}, headers=headers
+        )
+        records = [json.loads(line) for line in response.text.splitlines()]
+        assert [record["threat_id"] for record in records] == ["T-001", "T-003"]
+        assert records[0]["security_goal"] == "first"
+        assert records[1]["security_goal"] is None
+
+        response = await client.get(f"{url}/assets/export", params={"format": "ndjson"}, headers=headers)
+        assert [json.loads(line)["asset_id"] for line in response.text.splitlines()] == ["AST-0", "AST-1"]
+
+        response = await client.get(f"{url}/threats/export", params={"format": "xlsx"}, headers=headers)
+        assert response.status_code == 422
+        # Every stream closed the session it read through
+        assert not export_sessions
+    finally:
+        await db_session.delete(project)
+        await db_session.delete(user)
+        await db_session.commit()
+
+
+@pytest.mark.asyncio
+async def test_threat_export_parquet(client: AsyncClient, db_session, export_sessions):
+    """Parquet exports round-trip through pyarrow."""
+    pq = pytest.importorskip("pyarrow.parquet")
+    user, project, headers = await seed(db_session, "parquet")
+
+    try:
+        response = await client.get(
+            f"/api/v1/projects/{project.id}/threats/export", params={"format": "parquet"}, headers=headers
+        )
+        table = pq.read_table(io.BytesIO(response.content))
+        assert table.num_rows == 5
+        assert table.column("threat_id").to_pylist() == [f"T-{i:03d}" for i in range(5)]
+        assert table.column("security_goal").to_pylist()[1] == "first"
+        assert table.column("attack_potential").to_pylist()[2] == 3
+    finally:
+        await db_session.delete(project)
+        await db_session.delete(user)
+        await db_session.commit()
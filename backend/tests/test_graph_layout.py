@@ -0,0 +1,169 @@
+"""
+Tests for server-side graph layout and level-of-detail views.
+"""
+import random
+import time
+
+import numpy as np
+import pytest
+import sys
+sys.path.insert(0, '.')
+
+from httpx import AsyncClient
+
+from app.core.security import create_access_token
+from app.models.asset import Asset, AssetRelation
+from app.models.project import Project
+from app.models.user import User
+from app.services.graph_layout import NODE_SPACING, GraphLayoutCache, _separate, compute_layout
+
+CATEGORIES = ["Interface", "Hardware", "Software", "Data"]
+
+
+def _graph(n, subcategories=3, edges_per_node=2, seed=1):
+    rng = random.Random(seed)
+    nodes = [
+        {"id": str(i), "name": f"asset {i}", "category": CATEGORIES[i % 4], "subcategory": f"sub {i % subcategories}"}
+        for i in range(n)
+    ]
+    edges = [
+        {"source": str(i), "target": str(rng.randrange(n)), "type": "connects", "protocol": "CAN"}
+        for i in range(n) for _ in range(edges_per_node)
+    ]
+    return {"nodes": nodes, "edges": edges}
+
+
+@pytest.mark.parametrize("algorithm", ["force", "hierarchical"])
+def test_layout_separates_clusters(algorithm):
+    """Every asset gets a distinct finite position and clusters do not overlap much."""
+    layout = compute_layout(_graph(300), algorithm)
+
+    assert np.isfinite(layout.positions).all()
+    assert len(np.unique(layout.positions.round(3), axis=0)) == 300
+
+    clusters = layout.clusters("category")
+    assert clusters["count"].tolist() == [75, 75, 75, 75]
+    if algorithm == "hierarchical":
+        # Entry points form the first column
+        assert clusters["x"].argmin() == 0
+
+
+def test_view_picks_level_of_detail():
+    """Zoomed-out views aggregate; zoomed-in views return individual assets."""
+    layout = compute_layout(_graph(2000, subcategories=5))
+
+    overview = layout.view(max_items=100)
+    assert overview["level"] == "subcategory"
+    assert sum(c["count"] for c in overview["clusters"]) == 2000
+    assert all(edge["count"] >= 1 for edge in overview["edges"])
+
+    assert layout.view(max_items=10)["level"] == "category"
+
+    cluster = overview["clusters"][0]
+    r = cluster["radius"] / 2
+    zoomed = layout.view(cluster["x"] - r, cluster["y"] - r, cluster["x"] + r, cluster["y"] + r, max_items=500)
+    assert zoomed["level"] == "node"
+    assert 0 < len(zoomed["nodes"]) <= 500
+    visible = {node["id"] for node in zoomed["nodes"]}
+    assert all(edge["source"] in visible and edge["target"] in visible for edge in zoomed["edges"])
+
+    capped = layout.view(level="node", max_items=50)
+    assert capped["truncated"] and len(capped["nodes"]) == 50
+
+
+def _separate_pairwise(centers, radii, rounds=50):
+    """Reference all-pairs disc separation."""
+    centers = centers.copy()
+    for _ in range(rounds):
+        delta = centers[:, None, :] - centers[None, :, :]
+        dist = np.maximum(np.sqrt((delta ** 2).sum(-1)), 1e-9)
+        overlap = radii[:, None] + radii[None, :] + NODE_SPACING - dist
+        np.fill_diagonal(overlap, 0)
+        overlap = np.maximum(overlap, 0)
+        if not overlap.any():
+            break
+        centers += (delta / dist[..., None] * overlap[..., None] / 2).sum(1)
+    return centers
+
+
+def test_separate_matches_pairwise():
+    """The sweep finds every overlapping pair, and stays fast with many clusters."""
+    rng = np.random.default_rng(3)
+    centers = rng.uniform(-20, 20, size=(200, 2))
+    radii = rng.uniform(0, 3, size=200)
+    np.testing.assert_allclose(_separate(centers, radii), _separate_pairwise(centers, radii))
+
+    centers = rng.uniform(-700, 700, size=(5_000, 2))
+    start = time.perf_counter()
+    _separate(centers, rng.uniform(0, 5, size=5_000))
+    assert time.perf_counter() - start < 5
+
+
+@pytest.mark.asyncio
+async def test_layout_cache_tracks_graph_changes():
+    """Layouts are reused until the graph structure changes."""
+    cache = GraphLayoutCache()
+    graph = _graph(100)
+    first = await cache.get(1, graph)
+    assert await cache.get(1, graph) is first
+
+    graph["edges"].append({"source": "0", "target": "1", "type": "connects", "protocol": None})
+    assert await cache.get(1, graph) is not first
+
+
+def test_large_layout_is_bounded():
+    """A 10k-asset project lays out in about a second and views stay small."""
+    graph = _graph(10_000, subcategories=10)
+
+    start = time.perf_counter()
+    layout = compute_layout(graph)
+    view = layout.view()
+    elapsed = time.perf_counter() - start
+
+    assert view["level"] == "subcategory"
+    assert len(view["clusters"]) == 20  # i % 4 and i % 10 pair up into 20 groups
+    assert elapsed < 5
+
+
+@pytest.mark.asyncio
+async def test_graph_view_api(client: AsyncClient, db_session):
+    """The view endpoint lays out the project graph."""
+    user = User(username="layout", email="layout@example.com", password_hash="x", status="active")
+    db_session.add(user)
+    await db_session.flush()
+    project = Project(name="Layout", owner_id=user.id, status="draft")
+    db_session.add(project)
+    await db_session.flush()
+    assets = [
+        Asset(project_id=project.id, asset_id=f"AST-{i}", name=f"asset {i}", category=CATEGORIES[i % 4])
+        for i in range(12)
+    ]
+    db_session.add_all(assets)
+    await db_session.flush()
+    db_session.add_all([
+        AssetRelation(
+            project_id=project.id, source_asset_id=assets[i].id, target_asset_id=assets[i + 1].id,
+            relation_type="connects",
+        )
+        for i in range(11)
+    ])
+    await db_session.commit()
+
+    token = create_access_token({"sub": str(user.id), "username": user.username})
+    headers = {"Authorization": f"Bearer {token}"}
+    url = f"/api/v1/projects/{project.id}/assets/graph/view"
+
+    try:
+        response = await client.get(url, headers=headers)
+        data = response.json()["data"]
+        assert data["level"] == "node"
+        assert len(data["nodes"]) == 12 and len(data["edges"]) == 11
+
+        response = await client.get(f"{url}?algorithm=hierarchical&max_items=5", headers=headers)
+        data = response.json()["data"]
+        assert data["level"] == "subcategory"
+        assert [c["count"] for c in data["clusters"]] == [3, 3, 3, 3]
+    finally:
+        await db_session.delete(project)
+        await db_session.delete(user)
+        await db_session.commit()
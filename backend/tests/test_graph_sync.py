@@ -0,0 +1,237 @@
+"""
+Tests for the graph backends and change-log synchronisation.
+"""
+from datetime import datetime, timedelta
+
+import pytest
+import sys
+sys.path.insert(0, '.')
+
+from sqlalchemy import func, insert, select
+
+from app.clients.graph import InMemoryGraphBackend
+from app.models.asset import Asset, AssetRelation
+from app.models.graph import GraphChange
+from app.models.project import Project
+from app.models.user import User
+from app.schemas.threat import ThreatBulkItem
+from app.services.change_log import prune_change_log
+from app.services.graph_sync import GraphSyncService
+from app.services.threat_service import ThreatService
+
+
+def _asset(id, category="Hardware", project_id=1):
+    return {"id": id, "project_id": project_id, "asset_id": f"AST-{id}", "name": f"asset {id}",
+            "category": category, "subcategory": None}
+
+
+def _relation(id, source, target, project_id=1):
+    return {"id": id, "project_id": project_id, "source": source, "target": target,
+            "type": "connects", "protocol": None}
+
+
+def _threat(id, asset_id, feasibility, project_id=1):
+    return {"id": id, "project_id": project_id, "asset_id": asset_id, "threat_id": f"T-{id}",
+            "stride_type": "T", "risk_level": None, "attack_feasibility_value": feasibility,
+            "damage_scenario": None}
+
+
+@pytest.mark.asyncio
+async def test_weighted_paths_match_across_backends():
+    """Neo4j returns the k cheapest paths by feasibility, not re-ranked hop-shortest ones."""
+    neo4j_client = pytest.importorskip("app.clients.graph.neo4j_client")
+
+    class FakeNeo4j(neo4j_client.Neo4jGraphBackend):
+        """Answers the node and whole-graph reads from the in-memory backend's rows."""
+
+        def __init__(self, memory: InMemoryGraphBackend):
+            self.memory = memory
+
+        async def _read(self, query, **params):
+            project_id = params["project_id"]
+            assets = sorted(self.memory._assets[project_id].values(), key=lambda row: row["id"])
+            if "RELATES" in query:
+                return [
+                    {key: row[key] for key in ("id", "source", "target", "type", "protocol")}
+                    for row in sorted(self.memory._relations[project_id].values(), key=lambda row: row["id"])
+                ]
+            feasibility = {}
+            for row in self.memory._threats.get(project_id, {}).values():
+                current = feasibility.get(row["asset_id"])
+                feasibility[row["asset_id"]] = max(row["attack_feasibility_value"], current or 0)
+            rows = [
+                {key: row[key] for key in ("id", "name", "category", "subcategory")}
+                | {"feasibility": feasibility.get(row["id"])}
+                for row in assets if params.get("id", row["id"]) == row["id"]
+            ]
+            if "max_feasibility" not in query:
+                rows = [
+                    {"asset_id": row["id"], "name": row["name"], "category": row["category"],
+                     "subcategory": row["subcategory"]}
+                    for row in rows
+                ]
+            return rows
+
+    memory = InMemoryGraphBackend()
+    # The two-hop paths from 1 run through unrated assets; the cheapest
+    # paths are longer and go through easy ones
+    await memory.upsert_assets(
+        [_asset(1, "Interface"), _asset(4, "Interface")] + [_asset(i) for i in (2, 3, 5, 6, 7, 9)]
+    )
+    await memory.upsert_relations([
+        _relation(10, 1, 6), _relation(11, 6, 9), _relation(12, 1, 7), _relation(13, 7, 9),
+        _relation(14, 1, 2), _relation(15, 2, 3), _relation(16, 3, 9),
+        _relation(17, 4, 5), _relation(18, 5, 9),
+    ])
+    await memory.upsert_threats([_threat(100, 2, 4), _threat(101, 3, 4), _threat(102, 5, 3)])
+
+    expected = await memory.attack_paths(1, 9, k=2, weighted=True)
+    result = await FakeNeo4j(memory).attack_paths(1, 9, k=2, weighted=True)
+
+    assert result == expected
+    assert [[node["id"] for node in path["nodes"]] for path in result["paths"]] == [
+        ["1", "2", "3", "9"], ["4", "5", "9"],
+    ]
+
+
+@pytest.mark.asyncio
+async def test_memory_backend_updates_compiled_graph():
+    """Writes after the first query update the compiled graph in place."""
+    backend = InMemoryGraphBackend()
+    await backend.upsert_assets([_asset(1, "Interface"), _asset(2), _asset(3)])
+    await backend.upsert_relations([_relation(10, 1, 2)])
+    assert (await backend.attack_paths(1, 3))["paths"] == []
+
+    await backend.upsert_relations([_relation(11, 2, 3)])
+    await backend.upsert_threats([_threat(100, 3, 3)])
+    result = await backend.attack_paths(1, 3, weighted=True)
+    assert [node["id"] for node in result["paths"][0]["nodes"]] == ["1", "2", "3"]
+    assert result["paths"][0]["cost"] == 5
+
+    # Re-pointing a relation replaces the old edge
+    await backend.upsert_relations([_relation(10, 1, 3)])
+    result = await backend.impact(1, 1)
+    assert [(a["id"], a["depth"]) for a in result["assets"]] == [("3", 1)]
+
+    await backend.delete_assets([3])
+    assert (await backend.get_graph(1))["edges"] == []
+    assert await backend.attack_paths(1, 3) is None
+
+    await backend.delete_project(1)
+    assert (await backend.get_graph(1))["nodes"] == []
+
+
+@pytest.mark.asyncio
+async def test_sync_replays_change_log(db_session):
+    """ORM and bulk writes are logged and replayed incrementally."""
+    user = User(username="graphsync", email="graphsync@example.com", password_hash="x", status="active")
+    db_session.add(user)
+    await db_session.flush()
+    project = Project(name="Graph sync", owner_id=user.id, status="draft")
+    db_session.add(project)
+    await db_session.flush()
+    obd = Asset(project_id=project.id, asset_id="AST-1", name="OBD", category="Interface")
+    ecu = Asset(project_id=project.id, asset_id="AST-2", name="ECU", category="Hardware")
+    db_session.add_all([obd, ecu])
+    await db_session.commit()
+
+    backend = InMemoryGraphBackend()
+    sync = GraphSyncService(db_session, backend)
+    try:
+        assert await sync.sync() == 0
+        assert len((await backend.get_graph(project.id))["nodes"]) == 2
+        assert await sync.sync() == 0
+
+        relation = AssetRelation(
+            project_id=project.id, source_asset_id=obd.id, target_asset_id=ecu.id, relation_type="connects",
+        )
+        db_session.add(relation)
+        ecu.name = "Engine ECU"
+        await db_session.commit()
+        await ThreatService(db_session).bulk_create(project.id, [
+            ThreatBulkItem(
+                asset_id=ecu.id, threat_id="T-1", security_attribute="Integrity",
+                stride_type="T", threat_description="tamper",
+                attack_vector="Network", attack_complexity="Low",
+                privileges_required="None", user_interaction="None",
+            ),
+        ])
+
+        assert await sync.sync() == 3
+        result = await backend.attack_paths(project.id, ecu.id, weighted=True)
+        assert [node["name"] for node in result["paths"][0]["nodes"]] == ["OBD", "Engine ECU"]
+        assert result["paths"][0]["cost"] == 1
+
+        await db_session.delete(relation)
+        await db_session.commit()
+        assert await sync.sync() == 1
+        assert (await backend.get_graph(project.id))["edges"] == []
+    finally:
+        await db_session.delete(project)
+        await db_session.delete(user)
+        await db_session.commit()
+
+    await sync.sync()
+    assert (await backend.get_graph(project.id))["nodes"] == []
+    logged = await db_session.scalar(
+        select(func.count()).select_from(GraphChange).where(GraphChange.project_id == project.id)
+    )
+    assert logged > 0
+
+
+async def _log(db_session, id, created_at=None):
+    """Commit a change log entry with an explicit id, as a late transaction would."""
+    row = {"id": id, "entity_type": "asset", "entity_id": 10**6 + id, "op": "upsert"}
+    if created_at is not None:
+        row["created_at"] = created_at
+    await db_session.execute(insert(GraphChange), [row])
+    await db_session.commit()
+
+
+@pytest.mark.asyncio
+async def test_sync_catches_late_commits(db_session):
+    """An id committed after higher ones is still applied; stale gaps are passed."""
+    backend = InMemoryGraphBackend()
+    sync = GraphSyncService(db_session, backend)
+    await sync.sync()
+    head = await db_session.scalar(select(func.max(GraphChange.id))) or 0
+
+    # head + 1 is still in flight when head + 2 commits
+    await _log(db_session, head + 2)
+    assert await sync.sync() == 1
+    assert await backend.get_checkpoint() == head
+    assert await sync.sync() == 0
+
+    await _log(db_session, head + 1)
+    assert await sync.sync() == 1
+    assert await backend.get_checkpoint() == head + 2
+
+    # A gap older than the gap window belongs to a rolled back transaction
+    await _log(db_session, head + 5, created_at=datetime.utcnow() - timedelta(hours=1))
+    assert await sync.sync() == 1
+    assert await backend.get_checkpoint() == head + 5
+
+
+@pytest.mark.asyncio
+async def test_prune_reloads_consumers_behind(db_session, monkeypatch, caplog):
+    """Applied entries are pruned; a consumer that missed some reloads."""
+    monkeypatch.setattr("app.services.change_log.settings.CHANGE_LOG_RETENTION_SECONDS", 0)
+    current, behind = InMemoryGraphBackend(), InMemoryGraphBackend()
+    await GraphSyncService(db_session, behind).sync()
+    await _log(db_session, (await behind.get_checkpoint()) + 1, created_at=datetime.utcnow() - timedelta(hours=1))
+    await GraphSyncService(db_session, current).sync()
+    checkpoint = await current.get_checkpoint()
+
+    assert await prune_change_log(db_session, [checkpoint, None]) == checkpoint
+    assert await prune_change_log(db_session, [checkpoint]) == 0
+    remaining = await db_session.scalar(
+        select(func.count()).select_from(GraphChange).where(GraphChange.id <= checkpoint)
+    )
+    assert remaining == 0
+
+    assert await GraphSyncService(db_session, current).sync() == 0
+    assert await current.get_checkpoint() >= checkpoint
+    # The lagging backend sees the marker and reloads instead of replaying
+    assert await GraphSyncService(db_session, behind).sync() == 0
+    assert await behind.get_checkpoint() >= checkpoint
+    assert "reloading" in caplog.text
@@ -0,0 +1,172 @@
+"""
+Tests for keyset (cursor) pagination of list endpoints.
+"""
+from datetime import datetime
+
+import pytest
+import sys
+sys.path.insert(0, '.')
+
+from httpx import AsyncClient
+from sqlalchemy import update
+
+from app.api.v1.pagination import decode_cursor, encode_cursor
+from app.core.security import create_access_token
+from app.models.asset import Asset
+from app.models.document import Document
+from app.models.project import Project
+from app.models.threat import SecurityMitigation, ThreatScenario
+from app.models.user import User
+from app.schemas.threat import ThreatResponse
+
+
+def test_cursor_round_trip():
+    """Cursors restore datetimes for DateTime key columns."""
+    created = datetime(2026, 1, 2, 3, 4, 5)
+    cursor = encode_cursor([created, 42])
+    assert decode_cursor(cursor, [Document.created_at, Document.id]) == [created, 42]
+
+
+@pytest.mark.asyncio
+async def test_project_cursor_includes_never_updated(client: AsyncClient, db_session):
+    """Projects without ``updated_at`` are paged by ``created_at`` instead of dropped."""
+    user = User(username="projpager", email="projpager@example.com", password_hash="x", status="active")
+    db_session.add(user)
+    await db_session.flush()
+    projects = [
+        Project(name=f"Project {i}", owner_id=user.id, status="draft",
+                created_at=datetime(2026, 1, i + 1), updated_at=datetime(2026, 2, i + 1))
+        for i in range(5)
+    ]
+    db_session.add_all(projects)
+    await db_session.flush()
+    project_ids = [project.id for project in projects]
+    await db_session.execute(
+        update(Project).where(Project.id.in_(project_ids[1::2])).values(updated_at=None)
+    )
+    await db_session.commit()
+
+    token = create_access_token({"sub": str(user.id), "username": user.username})
+    headers = {"Authorization": f"Bearer {token}"}
+
+    seen = []
+    cursor = ""
+    while cursor is not None:
+        response = await client.get(
+            "/api/v1/projects", params={"cursor": cursor, "page_size": 2}, headers=headers
+        )
+        data = response.json()["data"]
+        seen.extend(item["name"] for item in data["items"])
+        cursor = data["next_cursor"]
+
+    # Updated in February, then created in January
+    assert seen == ["Project 4", "Project 2", "Project 0", "Project 3", "Project 1"]
+
+    for project in projects:
+        await db_session.delete(project)
+    await db_session.delete(user)
+    await db_session.commit()
+
+
+@pytest.mark.asyncio
+async def test_threat_cursor_pagination(client: AsyncClient, db_session):
+    """Walking all cursor pages returns every threat exactly once, in order."""
+    user = User(username="pager", email="pager@example.com", password_hash="x", status="active")
+    db_session.add(user)
+    await db_session.flush()
+    project = Project(name="Paging", owner_id=user.id, status="draft")
+    db_session.add(project)
+    await db_session.flush()
+    asset = Asset(project_id=project.id, asset_id="AST-1", name="ECU", category="Hardware")
+    db_session.add(asset)
+    await db_session.flush()
+    for i in range(7):
+        db_session.add(ThreatScenario(
+            project_id=project.id,
+            asset_id=asset.id,
+            threat_id=f"T-{i % 3:03d}",  # duplicate threat_ids exercise the id tie-breaker
+            security_attribute="Integrity",
+            stride_type="T",
+            threat_description=f"threat {i}",
+        ))
+    await db_session.commit()
+
+    token = create_access_token({"sub": str(user.id), "username": user.username})
+    headers = {"Authorization": f"Bearer {token}"}
+    url = f"/api/v1/projects/{project.id}/threats"
+
+    seen = []
+    cursor = ""
+    while cursor is not None:
+        response = await client.get(url, params={"cursor": cursor, "page_size": 3}, headers=headers)
+        data = response.json()["data"]
+        assert data["total"] is None
+        seen.extend((item["threat_id"], item["id"]) for item in data["items"])
+        cursor = data["next_cursor"]
+
+    assert len(seen) == 7
+    assert seen == sorted(seen)
+
+    response = await client.get(
+        url, params={"cursor": "", "include_total": True}, headers=headers
+    )
+    assert response.json()["data"]["total"] == 7
+
+    response = await client.get(url, params={"cursor": "not-a-cursor"}, headers=headers)
+    assert response.status_code == 400
+
+    await db_session.delete(project)
+    await db_session.delete(user)
+    await db_session.commit()
+
+
+@pytest.mark.asyncio
+async def test_threat_list_fast_path_matches_schema(client: AsyncClient, db_session):
+    """Column-built list items serialize exactly like ThreatResponse."""
+    user = User(username="fastpath", email="fastpath@example.com", password_hash="x", status="active")
+    db_session.add(user)
+    await db_session.flush()
+    project = Project(name="Fast path", owner_id=user.id, status="draft")
+    db_session.add(project)
+    await db_session.flush()
+    asset = Asset(project_id=project.id, asset_id="AST-1", name="Gateway", category="Hardware")
+    db_session.add(asset)
+    await db_session.flush()
+    threats = [
+        ThreatScenario(
+            project_id=project.id,
+            asset_id=asset.id,
+            threat_id=f"T-{i:03d}",
+            security_attribute="Integrity",
+            stride_type="T",
+            threat_description=f"threat {i}",
+            attack_feasibility_value=i,
+        )
+        for i in range(3)
+    ]
+    db_session.add_all(threats)
+    await db_session.flush()
+    for goal in ("first", "second"):
+        db_session.add(SecurityMitigation(threat_id=threats[1].id, security_goal=goal))
+    await db_session.commit()
+
+    token = create_access_token({"sub": str(user.id), "username": user.username})
+    headers = {"Authorization": f"Bearer {token}"}
+    url = f"/api/v1/projects/{project.id}/threats"
+
+    try:
+        for params in ({"page": 1}, {"cursor": ""}):
+            response = await client.get(url, params=params, headers=headers)
+            body = response.json()
+            assert body["code"] == 0
+            items = body["data"]["items"]
+            assert [item["threat_id"] for item in items] == ["T-000", "T-001", "T-002"]
+            for item in items:
+                assert ThreatResponse.model_validate(item).model_dump(mode="json") == item
+            assert {item["asset_name"] for item in items} == {"Gateway"}
+            assert [m["security_goal"] for m in items[1]["mitigations"]] == ["first", "second"]
+            assert items[2]["mitigations"] == []
+    finally:
+        await db_session.delete(project)
+        await db_session.delete(user)
+        await db_session.commit()
@@ -0,0 +1,274 @@
+"""
+Tests for segmented parse result storage and the paged parse result API.
+"""
+import os
+from datetime import datetime
+
+import pytest
+import sys
+sys.path.insert(0, '.')
+
+import orjson
+from httpx import AsyncClient
+from sqlalchemy import event, func, select, update
+
+from app.core.security import create_access_token
+from app.models.document import Document, DocumentBlob
+from app.models.project import Project
+from app.models.user import User
+from app.services import parse_result_store
+from app.services.parse_result_store import (
+    clear_segment_cache,
+    read_section,
+    section_counts,
+    sweep_parse_blobs,
+    track_parse_blobs,
+    write_parse_result,
+)
+from app.services.parsers.base import store_image
+
+
+def sample_result(pages: int = 300) -> dict:
+    return {
+        "text_blocks": [f"第 {i} 页：网关应对诊断请求进行认证，并记录安全事件。" * 5 for i in range(pages)],
+        "tables": [[["信号", "周期"], [f"0x{i:03X}", "10ms"]] for i in range(pages // 10)],
+        "blocks": [{"type": "paragraph", "text": f"block {i}", "section": ["1 概述"]} for i in range(pages)],
+        "images": [],
+        "image_urls": [],
+        "metadata": {"page_count": pages},
+    }
+
+
+@pytest.fixture
+def small_segments(monkeypatch, blob_store):
+    monkeypatch.setattr(parse_result_store.settings, "PARSE_RESULT_SEGMENT_BYTES", 4096)
+    clear_segment_cache()
+    yield blob_store
+    clear_segment_cache()
+
+
+class TestParseResultStore:
+    """Tests for writing and reading segmented parse results."""
+
+    def test_round_trip_by_range(self, small_segments):
+        """Any range reads the same items as slicing the original."""
+        content = sample_result()
+        manifest = write_parse_result(content)
+
+        segments = manifest["segments"]["text_blocks"]
+        assert len(segments) > 5
+        assert manifest["counts"] == {"text_blocks": 300, "tables": 30, "blocks": 300, "images": 0}
+        assert section_counts(manifest) == manifest["counts"]
+        stored = sum(segment["size"] for segment in segments)
+        assert stored < len(orjson.dumps(content["text_blocks"])) / 5
+
+        for offset, limit in [(0, 10), (segments[1]["start"] - 3, 7), (250, 100), (300, 10)]:
+            assert read_section(manifest, "text_blocks", offset, limit) == \
+                content["text_blocks"][offset:offset + limit]
+        assert read_section(manifest, "blocks") == content["blocks"]
+        assert read_section(manifest, "tables", 29, 5) == content["tables"][29:]
+        assert len(orjson.dumps(manifest)) < 8192
+
+    def test_segments_are_content_addressed(self, small_segments):
+        """Re-storing an unchanged result writes no new blobs."""
+        content = sample_result(50)
+        first = write_parse_result(content)
+        content["text_blocks"][-1] = "changed"
+        second = write_parse_result(content)
+
+        first_keys = [segment["key"] for segment in first["segments"]["text_blocks"]]
+        second_keys = [segment["key"] for segment in second["segments"]["text_blocks"]]
+        assert first_keys[:-1] == second_keys[:-1]
+        assert first_keys[-1] != second_keys[-1]
+        assert first["segments"]["blocks"] == second["segments"]["blocks"]
+
+    def test_inline_results_still_read(self):
+        """Results stored whole in the row before segmentation are sliced in place."""
+        inline = {"tables": [[["a"]], [["b"]], [["c"]]], "metadata": {}}
+
+        assert read_section(inline, "tables", 1, 5) == [[["b"]], [["c"]]]
+        assert section_counts(inline)["tables"] == 3
+        assert read_section(None, "tables") == []
+
+
+@pytest.mark.asyncio
+async def test_parse_result_api(client: AsyncClient, db_session, test_engine, small_segments):
+    """Listing skips the result column; sections are served by range."""
+    user = User(username="reader", email="reader@example.com", password_hash="x", status="active")
+    db_session.add(user)
+    await db_session.flush()
+    project = Project(name="Parsed", owner_id=user.id, status="draft")
+    db_session.add(project)
+    await db_session.flush()
+    content = sample_result()
+    document = Document(
+        project_id=project.id, name="spec.pdf", original_name="spec.pdf", file_type="pdf",
+        storage_path="spec.pdf", parse_status="completed",
+        parse_result=write_parse_result(content), uploaded_by=user.id,
+    )
+    db_session.add(document)
+    await db_session.commit()
+
+    token = create_access_token({"sub": str(user.id), "username": user.username})
+    headers = {"Authorization": f"Bearer {token}"}
+    base = f"/api/v1/projects/{project.id}/documents"
+
+    statements = []
+
+    def record(conn, cursor, statement, *args):
+        statements.append(statement)
+
+    event.listen(test_engine.sync_engine, "before_cursor_execute", record)
+    try:
+        response = await client.get(base, headers=headers)
+    finally:
+        event.remove(test_engine.sync_engine, "before_cursor_execute", record)
+    assert response.json()["data"]["items"][0]["id"] == document.id
+    assert statements and not any("parse_result" in statement for statement in statements)
+
+    response = await client.get(f"{base}/{document.id}/parse-result", headers=headers)
+    data = response.json()["data"]
+    assert data["status"] == "completed"
+    assert data["result"]["counts"]["text_blocks"] == 300
+    assert data["result"]["metadata"] == {"page_count": 300}
+    assert "segments" not in data["result"]
+
+    response = await client.get(
+        f"{base}/{document.id}/parse-result/text_blocks",
+        params={"offset": 120, "limit": 40},
+        headers=headers,
+    )
+    page = response.json()["data"]
+    assert page["total"] == 300
+    assert page["items"] == content["text_blocks"][120:160]
+
+    response = await client.get(f"{base}/{document.id}/parse-result/secrets", headers=headers)
+    assert response.status_code == 422
+
+
+async def _expire_releases(db_session, store):
+    """Move every release and blob write past the sweep's grace period."""
+    await db_session.execute(
+        update(DocumentBlob)
+        .where(DocumentBlob.released_at.is_not(None))
+        .values(released_at=datetime(2000, 1, 1))
+    )
+    await db_session.commit()
+    for directory, _, files in os.walk(store.root):
+        for name in files:
+            os.utime(os.path.join(directory, name), (946684800, 946684800))
+
+
+@pytest.mark.asyncio
+async def test_unreferenced_blobs_are_swept(db_session, small_segments):
+    """Re-parsed and deleted documents free the blobs no other document uses."""
+    store = small_segments
+    user = User(username="sweeper", email="sweeper@example.com", password_hash="x", status="active")
+    db_session.add(user)
+    await db_session.flush()
+    project = Project(name="Sweep", owner_id=user.id, status="draft")
+    db_session.add(project)
+    await db_session.flush()
+
+    image = store_image(b"diagram", "image/png", 400, 300)
+    shared = sample_result(20)
+    first = write_parse_result({**shared, "images": [image.to_dict()]})
+    assert image.key in first["blobs"]
+    documents = []
+    for name, manifest in [("a.pdf", first), ("b.pdf", write_parse_result(shared))]:
+        document = Document(
+            project_id=project.id, name=name, original_name=name, file_type="pdf",
+            storage_path=name, parse_status="completed", parse_result=manifest, uploaded_by=user.id,
+        )
+        db_session.add(document)
+        await db_session.flush()
+        await track_parse_blobs(db_session, document.id, manifest)
+        documents.append(document)
+    await db_session.commit()
+    a, b = documents
+
+    try:
+        # Re-parse a: the image and its images segment are not used by b
+        second = write_parse_result(sample_result(5))
+        a.parse_result = second
+        await track_parse_blobs(db_session, a.id, second)
+        await db_session.commit()
+        assert await sweep_parse_blobs(db_session) == 0  # still in the grace period
+        await _expire_releases(db_session, store)
+
+        freed = set(first["blobs"]) - set(b.parse_result["blobs"]) - set(second["blobs"])
+        assert image.key in freed and len(freed) == 2
+        assert await sweep_parse_blobs(db_session) == 2
+        assert not any(store.exists(key) for key in freed)
+        assert all(store.exists(key) for key in b.parse_result["blobs"])
+
+        # b is deleted without releasing its references, as by a project delete
+        await db_session.delete(b)
+        await db_session.commit()
+        await sweep_parse_blobs(db_session)
+        await _expire_releases(db_session, store)
+        await sweep_parse_blobs(db_session)
+
+        assert not any(store.exists(key) for key in set(first["blobs"]) - set(second["blobs"]))
+        assert all(store.exists(key) for key in second["blobs"])
+    finally:
+        await db_session.delete(project)
+        await db_session.delete(user)
+        await db_session.commit()
+
+
+@pytest.mark.asyncio
+async def test_blobs_written_by_a_running_parse_are_kept(db_session, small_segments):
+    """A blob freed long ago survives a sweep once a new parse writes it again."""
+    store = small_segments
+    user = User(username="reuploader", email="reuploader@example.com", password_hash="x", status="active")
+    db_session.add(user)
+    await db_session.flush()
+    project = Project(name="Re-upload", owner_id=user.id, status="draft")
+    db_session.add(project)
+    await db_session.flush()
+
+    def add_document(name, manifest=None):
+        document = Document(
+            project_id=project.id, name=name, original_name=name, file_type="pdf",
+            storage_path=name, parse_status="parsing" if manifest is None else "completed",
+            parse_result=manifest, uploaded_by=user.id,
+        )
+        db_session.add(document)
+        return document
+
+    try:
+        logo = store_image(b"logo", "image/png", 400, 300)
+        first = write_parse_result({**sample_result(5), "images": [logo.to_dict()]})
+        old = add_document("old.pdf", first)
+        await db_session.flush()
+        await track_parse_blobs(db_session, old.id, first)
+        await db_session.commit()
+        await db_session.delete(old)
+        await db_session.commit()
+        await sweep_parse_blobs(db_session)
+        await _expire_releases(db_session, store)
+
+        # The same file is uploaded again; its parse writes the logo, but
+        # the references are only recorded when it completes
+        new = add_document("new.pdf")
+        await db_session.commit()
+        assert store_image(b"logo", "image/png", 400, 300).key == logo.key
+        second = write_parse_result({**sample_result(5), "images": [logo.to_dict()]})
+        assert await sweep_parse_blobs(db_session) == 0
+        assert all(store.exists(key) for key in second["blobs"])
+
+        new.parse_result = second
+        new.parse_status = "completed"
+        await track_parse_blobs(db_session, new.id, second)
+        await db_session.commit()
+        await _expire_releases(db_session, store)
+        assert await sweep_parse_blobs(db_session) == 0
+        assert all(store.exists(key) for key in second["blobs"])
+        assert await db_session.scalar(
+            select(func.count()).select_from(DocumentBlob).where(DocumentBlob.released_at.is_not(None))
+        ) == 0
+    finally:
+        await db_session.delete(project)
+        await db_session.delete(user)
+        await db_session.commit()
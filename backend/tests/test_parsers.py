@@ -1,11 +1,17 @@
 """
 Tests for document parsers.
 """
+import io
+
 import pytest
 import sys
 sys.path.insert(0, '.')
 
-from app.services.parsers.base import ParserFactory
+from app.services.parsers.base import ParsedContent, ParserFactory
+from app.services.parsers.excel_parser import ExcelParser
+from app.services.parsers.pdf_parser import PDFParser
+from app.services.parsers.pptx_parser import PPTXParser
+from app.services.parsers.word_parser import WordParser
 
 
 class TestParserFactory:
@@ -29,6 +35,11 @@ class TestParserFactory:
         assert parser is not None
         assert "xlsx" in parser.supported_extensions
 
+    def test_get_parser_for_powerpoint(self):
+        """Test getting parser for PowerPoint files."""
+        parser = ParserFactory.get_parser("pptx")
+        assert isinstance(parser, PPTXParser)
+
     def test_get_parser_for_image(self):
         """Test getting parser for image files."""
         parser = ParserFactory.get_parser("png")
@@ -48,6 +59,386 @@ class TestParserFactory:
         assert "xlsx" in extensions
         assert "png" in extensions
         assert "jpg" in extensions
+        assert "pptx" in extensions
+
+    def test_registered_extensions_match_parsers(self):
+        """The lazy registry lists exactly the extensions each parser supports."""
+        from app.services import parsers
+
+        for name, (_, extensions) in parsers.PARSERS.items():
+            parser = ParserFactory.get_parser(extensions[0])
+            assert type(parser).__name__ == name
+            assert parser.supported_extensions == extensions
+            assert all(ParserFactory.get_parser(extension) is parser for extension in extensions)
+
+    def test_warm_up_loads_lazy_parsers_once(self, monkeypatch):
+        """Warm-up instantiates each lazy parser once for all its extensions."""
+        path = "app.services.parsers.pdf_parser:PDFParser"
+        monkeypatch.setattr(ParserFactory, "_parsers", {})
+        ParserFactory.register_lazy(path, ["pdf", "pdfa"])
+
+        assert ParserFactory.warm_up() == ["pdf", "pdfa"]
+        assert isinstance(ParserFactory.get_parser("pdf"), PDFParser)
+        assert ParserFactory.get_parser("pdfa") is ParserFactory.get_parser("pdf")
+        assert ParserFactory.warm_up() == []
+
+
+class TestExcelParser:
+    """Tests for streaming spreadsheet parsing."""
+
+    @pytest.mark.asyncio
+    async def test_parse_xlsx(self, tmp_path):
+        """Sheets become padded tables; preview and row caps apply per sheet."""
+        from openpyxl import Workbook
+
+        wb = Workbook()
+        ws = wb.active
+        ws.title = "资产列表"
+        ws.append(["Vehicle asset list"])
+        ws.append([])
+        ws.append(["资产ID", "资产名称", "分类"])
+        for i in range(20):
+            ws.append([f"AST-{i:03d}", f"ECU {i}", "Hardware", None])
+        wb.create_sheet("Empty")
+        wb.create_sheet("Numbers").append([1.0, 2.5])
+        path = tmp_path / "assets.xlsx"
+        wb.save(path)
+
+        result = await ExcelParser(preview_rows=3, max_rows=15).parse(str(path))
+
+        assert "error" not in result.metadata
+        assert result.metadata["sheet_names"] == ["资产列表", "Empty", "Numbers"]
+        assert result.metadata["row_counts"] == {"资产列表": 22, "Empty": 0, "Numbers": 1}
+        assert result.metadata["truncated_sheets"] == ["资产列表"]
+        table = result.tables[0]
+        assert len(table) == 15
+        assert table[0] == ["Vehicle asset list", "", ""]
+        assert table[2] == ["AST-000", "ECU 0", "Hardware"]
+        assert result.tables[1] == [["1", "2.5"]]
+        assert result.text_blocks[0].count("\n") == 4
+
+    @pytest.mark.asyncio
+    async def test_parse_csv(self, tmp_path):
+        """CSV files in GBK with semicolons are detected and read."""
+        path = tmp_path / "资产.csv"
+        path.write_bytes("资产ID;资产名称\nAST-001;网关\n\nAST-002;车机\n".encode("gbk"))
+
+        result = await ExcelParser().parse(str(path))
+
+        assert result.metadata["sheet_names"] == ["资产"]
+        assert result.tables == [[["资产ID", "资产名称"], ["AST-001", "网关"], ["AST-002", "车机"]]]
+
+    @pytest.mark.asyncio
+    async def test_parse_invalid_file(self, tmp_path):
+        """Unreadable files record an error instead of raising."""
+        path = tmp_path / "broken.xls"
+        path.write_bytes(b"not a workbook")
+
+        result = await ExcelParser().parse(str(path))
+
+        assert result.metadata["error"]
+        assert result.tables == []
+
+
+@pytest.mark.usefixtures("blob_store")
+class TestWordParser:
+    """Tests for streaming DOCX parsing."""
+
+    @pytest.mark.asyncio
+    async def test_parse_docx_in_order(self, tmp_path):
+        """Blocks keep document order and section paths; merged cells appear once."""
+        from docx import Document
+
+        doc = Document()
+        doc.core_properties.title = "TARA 规范"
+        doc.add_heading("1 范围", level=1)
+        doc.add_paragraph("本文件规定了网关的安全要求。")
+        doc.add_heading("1.1 资产", level=2)
+        table = doc.add_table(rows=3, cols=3)
+        for row, values in enumerate([["分类", "资产ID", "资产名称"], ["硬件", "AST-001", "网关"], ["", "AST-002", "T-Box"]]):
+            for col, value in enumerate(values):
+                table.cell(row, col).text = value
+        table.cell(1, 0).merge(table.cell(2, 0))
+        title = table.cell(0, 1).merge(table.cell(0, 2))
+        title.text = "资产"
+        doc.add_paragraph("表后说明")
+        doc.add_heading("2 威胁", level=1)
+        doc.add_paragraph("")
+        doc.add_paragraph("欺骗")
+        path = tmp_path / "spec.docx"
+        doc.save(path)
+
+        result = await WordParser().parse(str(path))
+
+        assert "error" not in result.metadata
+        assert result.metadata["title"] == "TARA 规范"
+        assert [(block["type"], block.get("text")) for block in result.blocks] == [
+            ("heading", "1 范围"),
+            ("paragraph", "本文件规定了网关的安全要求。"),
+            ("heading", "1.1 资产"),
+            ("table", None),
+            ("paragraph", "表后说明"),
+            ("heading", "2 威胁"),
+            ("paragraph", "欺骗"),
+        ]
+        assert result.blocks[3]["section"] == ["1 范围", "1.1 资产"]
+        assert result.blocks[-1]["section"] == ["2 威胁"]
+        assert result.blocks[2]["level"] == 2
+        assert result.tables == [[
+            ["分类", "资产", ""],
+            ["硬件", "AST-001", "网关"],
+            ["", "AST-002", "T-Box"],
+        ]]
+        assert result.blocks[3]["merged"] == [[0, 1, 1, 2], [1, 0, 2, 1]]
+        assert result.text_blocks == [block["text"] for block in result.blocks if block["type"] != "table"]
+
+    @pytest.mark.asyncio
+    async def test_text_box_read_once(self, tmp_path):
+        """Text boxes are read from mc:Choice, not again from mc:Fallback."""
+        from docx import Document
+        from docx.oxml import parse_xml
+
+        doc = Document()
+        paragraph = doc.add_paragraph("网关")
+        box = (
+            '<w:p xmlns:w="http://schemas.openxmlformats.org/wordprocessingml/2006/main">'
+            '<w:r><w:t>{}</w:t></w:r></w:p>'
+        )
+        paragraph._p.append(parse_xml(
+            '<w:r xmlns:w="http://schemas.openxmlformats.org/wordprocessingml/2006/main"'
+            ' xmlns:mc="http://schemas.openxmlformats.org/markup-compatibility/2006">'
+            '<mc:AlternateContent><mc:Choice Requires="wps"><w:drawing><w:txbxContent>'
+            + box.format(" T-Box") + '</w:txbxContent></w:drawing></mc:Choice>'
+            '<mc:Fallback><w:pict><w:txbxContent>'
+            + box.format(" T-Box") + '</w:txbxContent></w:pict></mc:Fallback>'
+            '</mc:AlternateContent></w:r>'
+        ))
+        path = tmp_path / "box.docx"
+        doc.save(path)
+
+        result = await WordParser().parse(str(path))
+
+        assert result.text_blocks == ["网关 T-Box"]
+
+    @pytest.mark.asyncio
+    async def test_parse_legacy_doc(self, tmp_path):
+        """Binary .doc files record an error instead of raising."""
+        path = tmp_path / "old.doc"
+        path.write_bytes(b"\xd0\xcf\x11\xe0 not a zip")
+
+        result = await WordParser().parse(str(path))
+
+        assert "not supported" in result.metadata["error"]
+
+
+@pytest.mark.usefixtures("blob_store")
+class TestPPTXParser:
+    """Tests for PowerPoint parsing."""
+
+    @pytest.mark.asyncio
+    async def test_parse_pptx(self, tmp_path):
+        """Slides keep order and yield text, tables, notes and shared images once."""
+        from PIL import Image
+        from pptx import Presentation
+        from pptx.util import Inches
+
+        logo = tmp_path / "logo.png"
+        Image.new("RGB", (48, 48), "red").save(logo)
+
+        deck = Presentation()
+        for number in range(1, 4):
+            slide = deck.slides.add_slide(deck.slide_layouts[5])
+            slide.shapes.title.text = f"架构 {number}"
+            box = slide.shapes.add_textbox(Inches(1), Inches(2), Inches(4), Inches(1))
+            box.text_frame.text = f"网关连接 CAN {number}"
+            slide.shapes.add_picture(str(logo), Inches(0), Inches(0))
+            slide.notes_slide.notes_text_frame.text = f"备注 {number}"
+        table = deck.slides[1].shapes.add_table(2, 3, Inches(1), Inches(3), Inches(6), Inches(1)).table
+        table.cell(0, 0).merge(table.cell(0, 1))
+        table.cell(0, 0).text = "接口"
+        for col, value in enumerate(["CAN", "ETH", "USB"]):
+            table.cell(1, col).text = value
+        path = tmp_path / "arch.pptx"
+        deck.save(path)
+
+        result = await PPTXParser().parse(str(path))
+
+        assert "error" not in result.metadata
+        assert result.metadata["slide_count"] == 3
+        assert [(block["type"], block["slide"]) for block in result.blocks] == [
+            ("slide", 1), ("slide", 2), ("table", 2), ("slide", 3),
+        ]
+        slide = result.blocks[1]
+        assert slide["title"] == "架构 2"
+        assert slide["text"] == "网关连接 CAN 2"
+        assert slide["notes"] == "备注 2"
+        assert slide["images"] == [0]
+        assert len(result.images) == 1
+        assert result.tables == [[["接口", "", ""], ["CAN", "ETH", "USB"]]]
+        assert result.blocks[2]["merged"] == [[0, 0, 1, 2]]
+        assert result.blocks[2]["section"] == ["架构 2"]
+        assert result.text_blocks[1] == "Slide 2: 架构 2\n网关连接 CAN 2\n接口 |  | \nCAN | ETH | USB\nNotes: 备注 2"
+
+    @pytest.mark.asyncio
+    async def test_parse_legacy_ppt(self, tmp_path):
+        """Binary .ppt files record an error instead of raising."""
+        path = tmp_path / "old.ppt"
+        path.write_bytes(b"\xd0\xcf\x11\xe0 not a zip")
+
+        result = await PPTXParser().parse(str(path))
+
+        assert "not supported" in result.metadata["error"]
+
+
+def make_table_corpus(path):
+    """PDF mixing text pages with ruled, shaded and rule-only tables."""
+    import fitz
+
+    doc = fitz.open()
+    for number in range(6):
+        page = doc.new_page()
+        for line in range(40):
+            page.insert_text((50, 60 + line * 18), f"Page {number} line {line}: gateway requirements")
+        # Header and footer rules alone do not make a table
+        page.draw_line((50, 40), (550, 40))
+        page.draw_line((50, 800), (550, 800))
+
+    ruled = doc.new_page()
+    for row in range(5):
+        for col in range(4):
+            ruled.draw_rect(fitz.Rect(50 + col * 120, 100 + row * 24, 170 + col * 120, 124 + row * 24))
+            ruled.insert_text((56 + col * 120, 117 + row * 24), f"CAN {row}.{col}")
+
+    shaded = doc.new_page()
+    for row in range(3):
+        for col in range(3):
+            rect = fitz.Rect(50 + col * 150, 100 + row * 25, 198 + col * 150, 123 + row * 25)
+            shaded.draw_rect(rect, color=None, fill=(0.9, 0.9, 0.9))
+            shaded.insert_text((60 + col * 150, 115 + row * 25), f"ECU {row}{col}")
+
+    # Horizontal rules only: no vector cells, so no table in either mode
+    booktabs = doc.new_page()
+    for row in range(4):
+        booktabs.insert_text((60, 117 + row * 25), f"Signal {row}    0x{row:03X}    10 ms")
+    for y in (100, 125, 200):
+        booktabs.draw_line((50, y), (500, y))
+
+    doc.save(path)
+    doc.close()
+
+
+class TestPDFTableModes:
+    """Tests for PDF table detection modes."""
+
+    @pytest.mark.asyncio
+    async def test_fast_mode_keeps_tables(self, tmp_path, monkeypatch):
+        """Fast mode scans only ruled pages and finds the same tables."""
+        from app.services.parsers import pdf_parser
+
+        path = tmp_path / "spec.pdf"
+        make_table_corpus(path)
+        parser = PDFParser()
+
+        monkeypatch.setattr(pdf_parser.settings, "PDF_TABLE_MODE", "full")
+        full = await parser.parse(str(path))
+        monkeypatch.setattr(pdf_parser.settings, "PDF_TABLE_MODE", "fast")
+        fast = await parser.parse(str(path))
+
+        assert len(full.tables) == 2
+        assert fast.tables == full.tables
+        assert fast.tables[0][0] == ["CAN 0.0", "CAN 0.1", "CAN 0.2", "CAN 0.3"]
+        assert full.metadata["table_pages_scanned"] == 9
+        assert fast.metadata["table_pages_scanned"] == 2
+        assert fast.metadata["table_mode"] == "fast"
+        assert fast.text_blocks == full.text_blocks
+
+    @pytest.mark.asyncio
+    async def test_mode_by_category(self, tmp_path, monkeypatch):
+        """Categories override the default mode; "off" skips tables."""
+        from app.services.parsers import pdf_parser
+
+        path = tmp_path / "spec.pdf"
+        make_table_corpus(path)
+        monkeypatch.setattr(pdf_parser.settings, "PDF_TABLE_MODE", "off")
+
+        skipped = await PDFParser().parse(str(path), category="architecture")
+        matrix = await PDFParser().parse(str(path), category="communication_matrix")
+
+        assert skipped.tables == [] and skipped.metadata["table_pages_scanned"] == 0
+        assert matrix.metadata["table_mode"] == "full"
+        assert len(matrix.tables) == 2
+        assert pdf_parser.table_mode(None) == "off"
+
+    @pytest.mark.asyncio
+    async def test_iter_parse_matches_parse(self, tmp_path, monkeypatch):
+        """Page batches merge into the single-pass result."""
+        from app.services.parsers import pdf_parser
+
+        path = tmp_path / "spec.pdf"
+        make_table_corpus(path)
+        monkeypatch.setattr(pdf_parser.settings, "PDF_STREAM_PAGES", 4)
+        parser = PDFParser()
+
+        fragments = [fragment async for fragment in parser.iter_parse(str(path))]
+        merged = ParsedContent()
+        for fragment in fragments:
+            merged.extend(fragment)
+
+        assert len(fragments) == 3
+        assert merged.to_dict() == (await parser.parse(str(path))).to_dict()
+
+
+@pytest.mark.usefixtures("blob_store")
+class TestImageExtraction:
+    """Tests for image deduplication and blob-backed image handles."""
+
+    @pytest.mark.asyncio
+    async def test_pdf_images_deduplicated(self, tmp_path):
+        """A logo on every page is stored once; tiny images are dropped."""
+        import fitz
+        from PIL import Image
+
+        logo, copy, dot = tmp_path / "logo.png", tmp_path / "copy.png", tmp_path / "dot.png"
+        Image.new("RGB", (64, 48), "blue").save(logo)
+        Image.new("RGB", (64, 48), "blue").save(copy)
+        Image.new("RGB", (4, 4), "black").save(dot)
+
+        doc = fitz.open()
+        logo_xref = 0
+        for number in range(5):
+            page = doc.new_page()
+            page.insert_text((72, 72), f"Page {number}")
+            # Reusing the xref shares one image object across pages
+            logo_xref = page.insert_image(fitz.Rect(0, 0, 64, 48), filename=str(logo), xref=logo_xref)
+            page.insert_image(fitz.Rect(100, 100, 104, 104), filename=str(dot))
+        doc[4].insert_image(fitz.Rect(200, 200, 264, 248), filename=str(copy))
+        path = tmp_path / "spec.pdf"
+        doc.save(path)
+        doc.close()
+
+        result = await PDFParser().parse(str(path))
+
+        assert len(result.images) == 1
+        image = result.images[0]
+        assert (image.width, image.height, image.mime_type) == (64, 48, "image/png")
+        with Image.open(io.BytesIO(image.load())) as loaded:
+            assert loaded.size == (64, 48)
+        assert result.to_dict()["images"] == [image.to_dict()]
+
+    def test_images_stored_once(self, blob_store):
+        """Equal content gets one handle and one blob."""
+        from PIL import Image
+
+        buffer = io.BytesIO()
+        Image.new("RGB", (40, 40), "green").save(buffer, format="JPEG")
+        content = ParsedContent()
+
+        assert content.add_image(buffer.getvalue()) == 0
+        assert content.add_image(buffer.getvalue()) == 0
+        assert content.add_image(b"not an image") == 1
+        assert content.images[0].mime_type == "image/jpeg"
+        assert content.images[1].mime_type == "application/octet-stream"
+        assert blob_store.get(content.images[0].key) == buffer.getvalue()
 
 
 if __name__ == "__main__":
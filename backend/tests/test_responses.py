@@ -0,0 +1,97 @@
+"""
+Tests for the orjson response class and trusted routes.
+"""
+from datetime import datetime, timezone
+from decimal import Decimal
+from typing import ClassVar, Optional
+
+import pytest
+import sys
+sys.path.insert(0, '.')
+
+from fastapi import APIRouter, FastAPI
+from httpx import ASGITransport, AsyncClient
+from pydantic import BaseModel, ConfigDict, model_validator
+
+from app.core.responses import ORJSONResponse, TrustedRoute
+from app.schemas.common import ResponseModel
+
+
+class Item(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+
+    id: int
+    price: Decimal
+    created_at: datetime
+    note: Optional[str] = None
+
+    validations: ClassVar[int] = 0
+
+    @model_validator(mode="after")
+    def count(self):
+        Item.validations += 1
+        return self
+
+
+class OrmItem:
+    id = 2
+    price = Decimal("1.50")
+    created_at = datetime(2026, 1, 2, 3, 4, 5)
+    note = None
+
+
+def make_app() -> FastAPI:
+    router = APIRouter(prefix="/items", route_class=TrustedRoute)
+
+    @router.get("/built", response_model=ResponseModel[Item])
+    async def built():
+        return ResponseModel(data=Item(id=1, price=Decimal("9.99"), created_at=datetime(2026, 1, 2)))
+
+    @router.get("/orm", response_model=ResponseModel[Item])
+    async def orm():
+        return ResponseModel(data=OrmItem())
+
+    @router.post("", response_model=ResponseModel[Item], status_code=201)
+    async def create():
+        return ResponseModel(data=Item(id=3, price=Decimal("0"), created_at=datetime(2026, 1, 2)))
+
+    app = FastAPI(default_response_class=ORJSONResponse)
+    app.include_router(router)
+    return app
+
+
+def test_orjson_matches_pydantic_encoding():
+    """Plain content encodes datetimes and decimals the way Pydantic does."""
+    item = Item(
+        id=1,
+        price=Decimal("12.3400"),
+        created_at=datetime(2026, 1, 2, 3, 4, 5, 678, tzinfo=timezone.utc),
+    )
+    expected = item.model_dump_json().encode()
+    assert ORJSONResponse(item.model_dump()).body == expected
+    assert ORJSONResponse(item).body == expected
+
+
+@pytest.mark.asyncio
+async def test_trusted_route_skips_revalidation():
+    """Built models are returned without a second validation pass."""
+    app = make_app()
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
+        Item.validations = 0
+        response = await client.get("/items/built")
+        assert response.status_code == 200
+        assert response.json()["data"] == {
+            "id": 1, "price": "9.99", "created_at": "2026-01-02T00:00:00", "note": None,
+        }
+        assert Item.validations == 1
+
+        # Objects that cannot be serialized as is fall back to validation
+        response = await client.get("/items/orm")
+        assert response.json()["data"]["price"] == "1.50"
+
+        response = await client.post("/items")
+        assert response.status_code == 201
+        assert response.json()["data"]["id"] == 3
+
+    schema = app.openapi()["paths"]["/items/built"]["get"]["responses"]["200"]
+    assert schema["content"]["application/json"]["schema"]["$ref"].endswith("ResponseModel_Item_")
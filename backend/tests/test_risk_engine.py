@@ -0,0 +1,338 @@
+"""
+Tests for the vectorized risk engine.
+"""
+import itertools
+
+import pytest
+import sys
+sys.path.insert(0, '.')
+
+from httpx import AsyncClient
+from sqlalchemy import select
+
+from app.core.exceptions import ValidationError
+from app.core.security import create_access_token
+from app.models.asset import Asset
+from app.models.project import Project, ProjectConfig
+from app.models.threat import ThreatScenario
+from app.models.user import User
+from app.schemas.project import FEASIBILITY_FACTORS, RiskMethodology
+from app.services.risk_calculator import RiskCalculator
+from app.services.risk_engine import BatchRiskEngine, RiskRecomputeService, default_methodology
+from app.services.risk_methodology import MethodologyCache, load_methodology, risk_methodologies
+
+
+def _choices(values):
+    return [None, "Unknown", *values]
+
+
+def _calculator_fields(*params):
+    """Threat columns as rated step by step by ``RiskCalculator``."""
+    feas_value, feas_label = RiskCalculator.calculate_feasibility(*params[:4])
+    impact_value, impact_label = RiskCalculator.calculate_impact(*params[4:])
+    risk_level, risk_label = RiskCalculator.calculate_risk_level(feas_value, impact_value)
+    return {
+        "attack_feasibility_value": feas_value,
+        "attack_feasibility": feas_label,
+        "impact_level_value": impact_value,
+        "impact_level": impact_label,
+        "risk_level": risk_level,
+        "risk_level_label": risk_label,
+    }
+
+
+def test_batch_engine_matches_calculator():
+    """Every parameter combination evaluates exactly like RiskCalculator."""
+    feasibility = list(itertools.product(
+        _choices(RiskCalculator.ATTACK_VECTOR_VALUES),
+        _choices(RiskCalculator.ATTACK_COMPLEXITY_VALUES),
+        _choices(RiskCalculator.PRIVILEGES_REQUIRED_VALUES),
+        _choices(RiskCalculator.USER_INTERACTION_VALUES),
+    ))
+    impacts = list(itertools.product(
+        [None, "S0", "S3"], [None, "F2"], [None, "O1", "bogus"], [None, "P3"],
+    ))
+    combos = [f + i for f in feasibility for i in impacts]
+
+    engine = BatchRiskEngine()
+    columns = {
+        name: [combo[i] for combo in combos]
+        for i, name in enumerate(RiskCalculator.RISK_PARAMETERS)
+    }
+    result = engine.evaluate_columns(columns)
+
+    assert len(result) == len(combos)
+    for index, combo in enumerate(combos):
+        expected = _calculator_fields(*combo)
+        actual = engine.to_fields(
+            result.feasibility[index], result.impact[index], result.risk[index]
+        )
+        assert actual.pop("attack_potential") is None
+        assert actual == expected, combo
+
+
+
+def test_attack_potential_rating():
+    """The attack potential model sums factor ratings and bands them per Annex G."""
+    engine = BatchRiskEngine(default_methodology("attack_potential"))
+    row = {"impact_safety": "S2"}
+
+    def rate(*factors):
+        fields = engine.evaluate_row({**row, **dict(zip(FEASIBILITY_FACTORS["attack_potential"], factors))})
+        return fields["attack_potential"], fields["attack_feasibility_value"], fields["attack_feasibility"]
+
+    assert rate("<=1 week", "Proficient", "Restricted", "Easy", "Standard") == (8, 3, "High")
+    assert rate("<=6 months", "Expert", "Public", "Unlimited", "Standard") == (23, 0, "Very Low")
+    # Unknown labels score 0, a missing factor leaves the rating empty
+    assert rate("<=1 month", "Unknown", "Restricted", "Easy", "Specialized") == (12, 2, "Medium")
+    assert rate("<=1 day", None, "Public", "Easy", "Standard") == (None, None, None)
+
+
+def test_attack_potential_columns_match_rows():
+    """Columnar attack potential evaluation agrees with per-row evaluation."""
+    engine = BatchRiskEngine(load_methodology(
+        {"risk_methodology": {"feasibility": {"model": "attack_potential"}}}
+    ))
+    values = [
+        RiskCalculator.ELAPSED_TIME_VALUES,
+        RiskCalculator.SPECIALIST_EXPERTISE_VALUES,
+        RiskCalculator.KNOWLEDGE_OF_ITEM_VALUES,
+        RiskCalculator.WINDOW_OF_OPPORTUNITY_VALUES,
+        RiskCalculator.EQUIPMENT_VALUES,
+    ]
+    combos = list(itertools.product(*(_choices(v) for v in values)))
+    columns = {
+        name: [combo[i] for combo in combos]
+        for i, name in enumerate(FEASIBILITY_FACTORS["attack_potential"])
+    }
+    columns.update({name: ["S2"] * len(combos) for name in BatchRiskEngine.IMPACT_PARAMETERS})
+    result = engine.evaluate_columns(columns)
+
+    for index, combo in enumerate(combos):
+        fields = engine.to_fields(
+            result.feasibility[index], result.impact[index],
+            result.risk[index], result.potential[index],
+        )
+        expected = engine.evaluate_row({name: column[index] for name, column in columns.items()})
+        assert fields == expected, combo
+        if None not in combo:
+            assert fields["attack_potential"] == sum(v.get(c, 0) for v, c in zip(values, combo))
+
+
+@pytest.mark.asyncio
+async def test_recompute_updates_stale_rows(db_session):
+    """Recompute rewrites only threats whose stored metrics are stale."""
+    user = User(username="recompute", email="recompute@example.com", password_hash="x", status="active")
+    db_session.add(user)
+    await db_session.flush()
+    project = Project(name="Recompute", owner_id=user.id, status="draft")
+    db_session.add(project)
+    await db_session.flush()
+    asset = Asset(project_id=project.id, asset_id="AST-1", name="ECU", category="Hardware")
+    db_session.add(asset)
+    await db_session.flush()
+
+    params = {
+        "attack_vector": "Network", "attack_complexity": "Low",
+        "privileges_required": "None", "user_interaction": "None",
+        "impact_safety": "S2",
+    }
+    fresh = ThreatScenario(
+        project_id=project.id, asset_id=asset.id, threat_id="T-1",
+        security_attribute="Integrity", stride_type="T", threat_description="fresh", **params,
+    )
+    BatchRiskEngine().apply(fresh)
+    stale = ThreatScenario(
+        project_id=project.id, asset_id=asset.id, threat_id="T-2",
+        security_attribute="Integrity", stride_type="T", threat_description="stale",
+        risk_level=1, risk_level_label="可接受", **params,
+    )
+    db_session.add_all([fresh, stale])
+    await db_session.commit()
+
+    updated = await RiskRecomputeService(db_session).recompute(project.id)
+    assert updated == 1
+
+    result = await db_session.execute(
+        select(ThreatScenario.risk_level, ThreatScenario.risk_level_label)
+        .where(ThreatScenario.project_id == project.id)
+    )
+    assert set(result.all()) == {(4, "高")}
+
+    assert await RiskRecomputeService(db_session).recompute(project.id) == 0
+
+    await db_session.delete(project)
+    await db_session.delete(user)
+    await db_session.commit()
+
+
+FIVE_BY_FIVE = {
+    "name": "oem-5x5",
+    "feasibility": {
+        "factors": {
+            "attack_vector": {"Physical": 0, "Local": 1, "Adjacent": 2, "Network": 3},
+            "attack_complexity": {"High": 0, "Low": 1},
+            "privileges_required": {"High": 0, "Low": 1, "None": 2},
+            "user_interaction": {"Required": 0, "None": 1},
+        },
+        "thresholds": [1, 3, 5, 6, 7],
+        "labels": ["Very Low", "Low", "Medium", "High", "Very High"],
+    },
+    "impact": {
+        "values": {"S0": 0, "S1": 1, "S2": 2, "S3": 4, "F1": 1, "F2": 3},
+        "labels": ["Negligible", "Minor", "Moderate", "Major", "Severe"],
+    },
+    "risk_matrix": [
+        [1, 1, 1, 2, 2],
+        [1, 1, 2, 2, 3],
+        [1, 2, 2, 3, 4],
+        [2, 2, 3, 4, 5],
+        [2, 3, 4, 5, 5],
+    ],
+    "risk_labels": {1: "可接受", 2: "低", 3: "中", 4: "高", 5: "严重"},
+}
+
+
+def test_custom_methodology_row_matches_columns():
+    """Single-row and columnar evaluation agree for a 5x5 methodology."""
+    engine = BatchRiskEngine(RiskMethodology.model_validate(FIVE_BY_FIVE))
+    assert engine.shape == (5, 5)
+    assert engine.feasibility_table.shape == (5, 3, 4, 3)  # one extra slot per axis
+
+    rows = [
+        {"attack_vector": "Network", "attack_complexity": "Low",
+         "privileges_required": "None", "user_interaction": "None", "impact_safety": "S3"},
+        {"attack_vector": "Physical", "attack_complexity": "High",
+         "privileges_required": "High", "user_interaction": "Required", "impact_financial": "F1"},
+        {"attack_vector": "Satellite", "attack_complexity": "Low",
+         "privileges_required": "Low", "user_interaction": "None", "impact_privacy": "P9"},
+        {"impact_safety": "S2"},
+    ]
+    expected = [engine.evaluate_row(row) for row in rows]
+    engine.apply_batch(rows)
+    for row, fields in zip(rows, expected):
+        assert {key: row[key] for key in fields} == fields
+
+    assert rows[0]["attack_feasibility"] == "Very High"
+    assert rows[0]["risk_level"] == 5
+    assert rows[1]["risk_level"] == 1
+    assert rows[3]["risk_level"] is None
+
+
+def test_invalid_methodology_rejected():
+    """Matrix shape must match the number of feasibility and impact levels."""
+    with pytest.raises(ValidationError):
+        load_methodology({"risk_methodology": {**FIVE_BY_FIVE, "risk_matrix": [[1]]}})
+    assert load_methodology(None) == default_methodology()
+
+
+@pytest.mark.asyncio
+async def test_switching_methodology_recomputes(client: AsyncClient, db_session):
+    """Changing the project methodology re-rates existing threats."""
+    user = User(username="methodology", email="methodology@example.com", password_hash="x", status="active")
+    db_session.add(user)
+    await db_session.flush()
+    project = Project(name="Methodology", owner_id=user.id, status="draft")
+    db_session.add(project)
+    await db_session.flush()
+    db_session.add(ProjectConfig(project_id=project.id))
+    asset = Asset(project_id=project.id, asset_id="AST-1", name="ECU", category="Hardware")
+    db_session.add(asset)
+    await db_session.commit()
+
+    token = create_access_token({"sub": str(user.id), "username": user.username})
+    headers = {"Authorization": f"Bearer {token}"}
+    response = await client.post(
+        f"/api/v1/projects/{project.id}/threats",
+        json={
+            "asset_id": asset.id, "threat_id": "T-1", "security_attribute": "Integrity",
+            "stride_type": "T", "threat_description": "spoofed frames",
+            "attack_vector": "Network", "attack_complexity": "Low",
+            "privileges_required": "None", "user_interaction": "None",
+            "impact_safety": "S2",
+        },
+        headers=headers,
+    )
+    assert response.json()["data"]["risk_level"] == 4
+
+    try:
+        response = await client.put(
+            f"/api/v1/projects/{project.id}/config",
+            json={"config_json": {"risk_methodology": FIVE_BY_FIVE}},
+            headers=headers,
+        )
+        assert response.json()["data"] == {"risk_recomputed": 1}
+
+        result = await db_session.execute(
+            select(ThreatScenario.attack_feasibility, ThreatScenario.risk_level)
+            .where(ThreatScenario.project_id == project.id)
+        )
+        assert result.one() == ("Very High", 4)
+
+        response = await client.get(f"/api/v1/projects/{project.id}/threats/risk-matrix", headers=headers)
+        data = response.json()["data"]
+        assert len(data["matrix"]) == 5 and data["matrix"][4][2] == 1
+        assert data["high_risk_count"] == 1
+
+        response = await client.put(
+            f"/api/v1/projects/{project.id}/config",
+            json={"config_json": {"risk_methodology": {"risk_matrix": [[1]]}}},
+            headers=headers,
+        )
+        assert response.json()["code"] == 30001
+
+        # A stored definition that no longer validates can still be replaced
+        config = await db_session.scalar(select(ProjectConfig).where(ProjectConfig.project_id == project.id))
+        config.config_json = {"risk_methodology": {"risk_matrix": [[1]]}}
+        await db_session.commit()
+        response = await client.put(
+            f"/api/v1/projects/{project.id}/config",
+            json={"config_json": {"risk_methodology": {**FIVE_BY_FIVE, "high_risk_level": 5}}},
+            headers=headers,
+        )
+        assert response.json()["data"] == {"risk_recomputed": 1}
+        response = await client.get(f"/api/v1/projects/{project.id}/threats/risk-matrix", headers=headers)
+        assert response.json()["data"]["high_risk_count"] == 0
+    finally:
+        risk_methodologies.clear()
+        await db_session.delete(project)
+        await db_session.delete(user)
+        await db_session.commit()
+
+
+@pytest.mark.asyncio
+async def test_methodology_change_reaches_other_workers(db_session, monkeypatch):
+    """Invalidating a project in one worker's cache makes the others reload it."""
+    store = {}
+
+    async def cache_get(key):
+        return store.get(key)
+
+    async def cache_set(key, value, expire=None):
+        store[key] = value
+
+    monkeypatch.setattr("app.services.risk_methodology.cache_service.get", cache_get)
+    monkeypatch.setattr("app.services.risk_methodology.cache_service.set", cache_set)
+    user = User(username="workers", email="workers@example.com", password_hash="x", status="active")
+    db_session.add(user)
+    await db_session.flush()
+    project = Project(name="Workers", owner_id=user.id, status="draft")
+    db_session.add(project)
+    await db_session.flush()
+    config = ProjectConfig(project_id=project.id)
+    db_session.add(config)
+    await db_session.commit()
+
+    try:
+        writer, reader = MethodologyCache(ttl_seconds=3600), MethodologyCache(ttl_seconds=3600)
+        assert (await reader.get_engine(db_session, project.id)).shape == (4, 4)
+
+        config.config_json = {"risk_methodology": FIVE_BY_FIVE}
+        await db_session.commit()
+        await writer.invalidate(project.id)
+
+        assert (await reader.get_engine(db_session, project.id)).shape == (5, 5)
+    finally:
+        await db_session.delete(project)
+        await db_session.delete(user)
+        await db_session.commit()
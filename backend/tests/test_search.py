@@ -0,0 +1,164 @@
+"""
+Tests for full-text search over documents and threats.
+"""
+import pytest
+import sys
+sys.path.insert(0, '.')
+
+from httpx import AsyncClient
+
+from app.clients.search.text import highlight, split_passages, tokenize
+from app.core.security import create_access_token
+from app.models.asset import Asset
+from app.models.document import Document
+from app.models.project import Project
+from app.models.threat import ThreatScenario
+from app.models.user import User
+from app.services.parse_result_store import write_parse_result
+from app.services.search_index import SearchIndexService
+from app.tasks.change_log import sync_change_log
+
+
+def entry(key, project_id, kind, entity_id, body, title="", position=0):
+    return {
+        "key": key, "project_id": project_id, "kind": kind, "entity_id": entity_id,
+        "position": position, "title": title, "body": body,
+    }
+
+
+class TestText:
+    """Tests for tokenization and snippets."""
+
+    def test_tokenize(self):
+        """CJK runs become bigrams plus a final unigram; Latin words are lowercased."""
+        assert tokenize("网关认证 CAN-FD总线") == ["网关", "关认", "认证", "证", "can", "fd", "总线", "线"]
+        assert tokenize("网关认证", query=True) == ["网关", "关认", "认证"]
+
+    def test_highlight(self):
+        """Matches are marked in an escaped excerpt around the first match."""
+        text = "前言 " * 100 + "<b>网关</b>应对诊断请求进行认证 CAN FD"
+        snippet = highlight(text, "诊断请求 can-fd", width=60)
+
+        assert snippet.startswith("…")
+        assert "<mark>诊断请求</mark>" in snippet
+        assert "&lt;b&gt;网关&lt;/b&gt;" in snippet
+        assert "<mark>CAN</mark> <mark>FD</mark>" in snippet
+
+    def test_split_passages(self):
+        """Passages break at lines and never exceed the limit."""
+        text = "\n".join(["短行"] * 5 + ["长" * 25])
+        passages = split_passages(text, 10)
+
+        assert passages[0] == "短行\n短行\n短行"
+        assert all(len(passage) <= 10 for passage in passages)
+        assert "".join(passages).replace("\n", "") == text.replace("\n", "")
+
+
+@pytest.mark.asyncio
+class TestSQLiteBackend:
+    """Tests for the local FTS5 backend."""
+
+    async def test_chinese_phrase_search(self, search_backend):
+        """Words match as substrings, scoped to the project and kind."""
+        await search_backend.upsert([
+            entry("document:1:0:0", 1, "document", 1, "网关应对诊断请求进行认证", title="spec.pdf"),
+            entry("document:1:1:0", 1, "document", 1, "认证由网关完成", title="spec.pdf", position=1),
+            entry("threat:7", 1, "threat", 7, "攻击者伪造诊断请求", title="T-001"),
+            entry("threat:8", 2, "threat", 8, "攻击者伪造诊断请求", title="T-001"),
+        ])
+
+        result = await search_backend.search(1, "诊断请求")
+        assert result["total"] == 2
+        assert {(hit["kind"], hit["entity_id"]) for hit in result["hits"]} == {("document", 1), ("threat", 7)}
+        assert "<mark>诊断请求</mark>" in result["hits"][0]["snippet"]
+
+        # "网关认证" is not a substring of either passage
+        assert (await search_backend.search(1, "网关认证"))["total"] == 0
+        both = await search_backend.search(1, "网关 认证", kinds=["document"])
+        assert sorted(hit["position"] for hit in both["hits"]) == [0, 1]
+        # One character matches anywhere in a run, including its end
+        assert (await search_backend.search(1, "求"))["total"] == 2
+        assert (await search_backend.search(1, "spec"))["total"] == 2
+        assert (await search_backend.search(1, '" OR *'))["total"] == 0
+
+    async def test_rank_window(self, search_backend, monkeypatch):
+        """Broad queries count every match but rank only the newest."""
+        from app.clients.search import sqlite
+
+        await search_backend.upsert([entry(f"threat:{i}", 1, "threat", i, "篡改固件") for i in range(5)])
+        monkeypatch.setattr(sqlite.settings, "SEARCH_RANK_WINDOW", 2)
+
+        result = await search_backend.search(1, "篡改", limit=10)
+        assert result["total"] == 5
+        assert sorted(hit["entity_id"] for hit in result["hits"]) == [3, 4]
+
+    async def test_replace_and_delete(self, search_backend):
+        """Upserting a key replaces it; deletes remove every entry of an entity."""
+        await search_backend.upsert([
+            entry("threat:1", 1, "threat", 1, "重放攻击"),
+            entry("document:2:0:0", 1, "document", 2, "重放攻击防护"),
+            entry("document:2:0:1", 1, "document", 2, "重放计数器"),
+        ])
+        await search_backend.upsert([entry("threat:1", 1, "threat", 1, "拒绝服务")])
+        assert (await search_backend.search(1, "重放"))["total"] == 2
+
+        await search_backend.delete("document", [2])
+        assert (await search_backend.search(1, "重放"))["total"] == 0
+        await search_backend.delete_project(1)
+        assert (await search_backend.search(1, "拒绝服务"))["total"] == 0
+
+
+@pytest.mark.asyncio
+async def test_search_api_indexes_incrementally(client: AsyncClient, db_session, search_backend, blob_store):
+    """The background sync loads the index, then applies threat writes incrementally."""
+    user = User(username="searcher", email="searcher@example.com", password_hash="x", status="active")
+    db_session.add(user)
+    await db_session.flush()
+    project = Project(name="Search", owner_id=user.id, status="draft")
+    db_session.add(project)
+    await db_session.flush()
+    ecu = Asset(project_id=project.id, asset_id="AST-001", name="Gateway", category="Hardware")
+    db_session.add(ecu)
+    await db_session.flush()
+    spoofing = ThreatScenario(
+        project_id=project.id, asset_id=ecu.id, threat_id="T-001", security_attribute="Authenticity",
+        stride_type="S", threat_description="伪造诊断请求", damage_scenario="车辆功能被非法解锁",
+    )
+    flooding = ThreatScenario(
+        project_id=project.id, asset_id=ecu.id, threat_id="T-002", security_attribute="Availability",
+        stride_type="D", threat_description="总线泛洪导致网关拒绝服务",
+    )
+    document = Document(
+        project_id=project.id, name="spec.pdf", original_name="网关规范.pdf", file_type="pdf",
+        storage_path="spec.pdf", parse_status="completed", uploaded_by=user.id,
+        parse_result=write_parse_result({"text_blocks": ["1 概述", "网关应对诊断请求进行认证。"]}),
+    )
+    db_session.add_all([spoofing, flooding, document])
+    await db_session.commit()
+
+    token = create_access_token({"sub": str(user.id), "username": user.username})
+    headers = {"Authorization": f"Bearer {token}"}
+    url = f"/api/v1/projects/{project.id}/search"
+
+    # Searching never indexes
+    response = await client.get(url, params={"q": "诊断请求"}, headers=headers)
+    assert response.json()["data"]["total"] == 0
+
+    await sync_change_log(db_session)
+    response = await client.get(url, params={"q": "诊断请求"}, headers=headers)
+    data = response.json()["data"]
+    assert data["total"] == 2
+    hits = {(hit["kind"], hit["entity_id"]): hit for hit in data["hits"]}
+    assert hits[("document", document.id)]["position"] == 1
+    assert hits[("document", document.id)]["title"] == "网关规范.pdf"
+    assert hits[("threat", spoofing.id)]["title"] == "T-001"
+
+    spoofing.damage_scenario = "车门被远程解锁"
+    await db_session.delete(flooding)
+    await db_session.commit()
+    assert await SearchIndexService(db_session).sync() == 2
+
+    response = await client.get(url, params={"q": "远程解锁", "kind": "threat"}, headers=headers)
+    assert [hit["entity_id"] for hit in response.json()["data"]["hits"]] == [spoofing.id]
+    response = await client.get(url, params={"q": "拒绝服务"}, headers=headers)
+    assert response.json()["data"]["total"] == 0
@@ -0,0 +1,82 @@
+"""
+Tests for the password hashing pool.
+"""
+import asyncio
+import threading
+import time
+
+import pytest
+import sys
+sys.path.insert(0, '.')
+
+from httpx import AsyncClient
+
+from app.core import security
+from app.core.security import (
+    PasswordHashExecutor,
+    get_password_hash_async,
+    password_hasher,
+    verify_password_async,
+)
+
+
+@pytest.mark.asyncio
+class TestPasswordHashExecutor:
+    """Tests for ``PasswordHashExecutor``."""
+
+    async def test_hash_verify_round_trip(self, monkeypatch):
+        """Hashes made on the pool verify on the pool."""
+        monkeypatch.setattr(security.settings, "BCRYPT_ROUNDS", 4)
+        completed = password_hasher.completed
+
+        hashed = await get_password_hash_async("s3cret")
+
+        assert hashed.startswith("$2b$04$")
+        assert await verify_password_async("s3cret", hashed)
+        assert not await verify_password_async("wrong", hashed)
+        assert password_hasher.completed == completed + 3
+
+    async def test_pending_jobs_are_bounded(self):
+        """At most max_pending jobs are queued or running, max_workers at once."""
+        hasher = PasswordHashExecutor(max_workers=2, max_pending=3)
+        lock = threading.Lock()
+        running = peak = 0
+
+        def job(value):
+            nonlocal running, peak
+            with lock:
+                running += 1
+                peak = max(peak, running)
+            time.sleep(0.02)
+            with lock:
+                running -= 1
+            return value * 2
+
+        try:
+            results = await asyncio.gather(*(hasher.run(job, i) for i in range(10)))
+        finally:
+            hasher.shutdown()
+
+        assert results == [i * 2 for i in range(10)]
+        assert peak == 2
+        assert hasher.peak_pending == 3
+        assert hasher.stats() == {
+            "workers": 2,
+            "max_pending": 3,
+            "pending": 0,
+            "queued": 0,
+            "running": 0,
+            "peak_pending": 3,
+            "completed": 10,
+        }
+
+
+@pytest.mark.asyncio
+async def test_health_reports_hashing_stats(client: AsyncClient):
+    """The health check exposes the pool's counters."""
+    response = await client.get("/health")
+
+    stats = response.json()["password_hashing"]
+    assert stats["workers"] == password_hasher.max_workers
+    assert stats["max_pending"] == password_hasher.max_pending
+    assert {"pending", "queued", "running", "peak_pending", "completed"} <= set(stats)
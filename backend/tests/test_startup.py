@@ -0,0 +1,49 @@
+"""
+Tests for application import cost.
+"""
+import os
+import subprocess
+import sys
+
+# Cumulative import time of ``main`` (microseconds); generous so slow CI
+# machines pass, while parser dependencies creeping back in fail below
+IMPORT_BUDGET_US = 3_000_000
+
+# Only needed by processes that parse documents or write reports
+HEAVY_MODULES = ("fitz", "pymupdf", "openpyxl", "PIL", "lxml", "docx")
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def import_times(module: str) -> dict:
+    """Cumulative import time per module of a fresh ``import module``."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=BACKEND_DIR,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    times = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line.split("|")
+        times[name.strip()] = int(cumulative)
+    return times
+
+
+def test_main_skips_parser_dependencies():
+    """Importing the app loads no parser or spreadsheet library."""
+    times = import_times("main")
+
+    loaded = sorted(name for name in times if name.split(".")[0] in HEAVY_MODULES)
+    assert loaded == []
+    assert times["main"] < IMPORT_BUDGET_US
+
+
+def test_report_generator_defers_openpyxl():
+    """openpyxl loads when a report is generated, not with the service."""
+    times = import_times("app.services.report_generator")
+
+    assert not any(name.split(".")[0] == "openpyxl" for name in times)
@@ -0,0 +1,124 @@
+"""
+Tests for threat bulk creation.
+"""
+import uuid
+
+import pytest
+import sys
+sys.path.insert(0, '.')
+
+from sqlalchemy import select
+
+from app.core.exceptions import NotFoundError
+from app.models.asset import Asset
+from app.models.graph import GraphChange
+from app.models.project import Project
+from app.models.threat import SecurityMitigation, ThreatScenario
+from app.models.user import User
+from app.schemas.threat import MitigationCreate, ThreatBulkItem
+from app.services.threat_service import ThreatService
+
+
+@pytest.fixture
+async def project_assets(db_session):
+    """A project with two assets."""
+    user = User(username=f"bulk-{uuid.uuid4().hex[:8]}", email=f"{uuid.uuid4().hex[:8]}@example.com",
+                password_hash="x", status="active")
+    db_session.add(user)
+    await db_session.flush()
+    project = Project(name="Bulk threats", owner_id=user.id, status="draft")
+    db_session.add(project)
+    await db_session.flush()
+    gateway = Asset(project_id=project.id, asset_id="AST-001", name="Gateway", category="Hardware")
+    ecu = Asset(project_id=project.id, asset_id="AST-002", name="ECU", category="Hardware")
+    db_session.add_all([gateway, ecu])
+    await db_session.commit()
+    yield project, gateway, ecu
+    await db_session.delete(project)
+    await db_session.delete(user)
+    await db_session.commit()
+
+
+def threat(asset_id, threat_id, *goals):
+    return ThreatBulkItem(
+        asset_id=asset_id, threat_id=threat_id, security_attribute="Integrity", stride_type="T",
+        threat_description=f"tamper {threat_id}",
+        attack_vector="Network", attack_complexity="Low",
+        privileges_required="None", user_interaction="None",
+        mitigations=[MitigationCreate(security_goal=goal) for goal in goals],
+    )
+
+
+async def mitigations_by_threat(db_session, project_id):
+    result = await db_session.execute(
+        select(ThreatScenario.threat_description, SecurityMitigation.security_goal)
+        .outerjoin(SecurityMitigation, SecurityMitigation.threat_id == ThreatScenario.id)
+        .where(ThreatScenario.project_id == project_id)
+        .order_by(ThreatScenario.id, SecurityMitigation.id)
+    )
+    linked = {}
+    for description, goal in result.all():
+        goals = linked.setdefault(description, [])
+        if goal is not None:
+            goals.append(goal)
+    return linked
+
+
+@pytest.mark.asyncio
+class TestBulkCreate:
+    """Tests for ``ThreatService.bulk_create``."""
+
+    @pytest.mark.parametrize("returning", [True, False])
+    async def test_links_mitigations(self, db_session, project_assets, monkeypatch, returning):
+        """Mitigations land on their own threat, with or without INSERT ... RETURNING."""
+        project, gateway, ecu = project_assets
+        if not returning:
+            # As on MySQL: ids are read back by threat ID
+            dialect = (await db_session.connection()).dialect
+            monkeypatch.setattr(dialect, "insert_executemany_returning_sort_by_parameter_order", False)
+        # An existing threat shares an ID with the new ones
+        await ThreatService(db_session).bulk_create(project.id, [threat(gateway.id, "T-001", "old")])
+
+        items = [
+            threat(gateway.id, "T-001", "g1", "g2"),
+            threat(ecu.id, "T-002"),
+            threat(ecu.id, "T-001", "g3"),
+            threat(gateway.id, "T-003", "g4"),
+        ]
+        result = await ThreatService(db_session).bulk_create(project.id, items)
+
+        assert result == {"created": 4, "mitigations_created": 4}
+        assert await mitigations_by_threat(db_session, project.id) == {
+            "tamper T-001": ["old", "g1", "g2", "g3"],
+            "tamper T-002": [],
+            "tamper T-003": ["g4"],
+        }
+        per_row = await db_session.execute(
+            select(ThreatScenario.asset_id, SecurityMitigation.security_goal)
+            .join(SecurityMitigation, SecurityMitigation.threat_id == ThreatScenario.id)
+            .where(ThreatScenario.project_id == project.id)
+        )
+        assert dict((goal, asset_id) for asset_id, goal in per_row.all()) == {
+            "old": gateway.id, "g1": gateway.id, "g2": gateway.id, "g3": ecu.id, "g4": gateway.id,
+        }
+        # Every new threat is logged by id for the graph and search mirrors
+        logged = await db_session.execute(
+            select(GraphChange.entity_id).where(
+                GraphChange.project_id == project.id, GraphChange.entity_type == "threat",
+            )
+        )
+        assert None not in logged.scalars().all()
+
+    async def test_unknown_asset(self, db_session, project_assets):
+        """An asset outside the project rejects the whole batch."""
+        project, gateway, _ = project_assets
+
+        with pytest.raises(NotFoundError, match=r"\[999999\]"):
+            await ThreatService(db_session).bulk_create(
+                project.id, [threat(gateway.id, "T-001", "g1"), threat(999999, "T-002")],
+            )
+
+        created = await db_session.scalar(
+            select(ThreatScenario.id).where(ThreatScenario.project_id == project.id)
+        )
+        assert created is None
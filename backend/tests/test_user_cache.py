@@ -0,0 +1,196 @@
+"""
+Tests for the authenticated user cache.
+"""
+import asyncio
+
+import pytest
+import sys
+sys.path.insert(0, '.')
+
+from sqlalchemy import update
+
+from app.core import security
+from app.models.user import Permission, Role, User
+from app.services.cache_service import cache_service
+from app.services.user_cache import AuthenticatedUser, UserCache, user_cache
+from app.utils.ttl_cache import TTLCache
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class TestTTLCache:
+    """Tests for TTLCache class."""
+
+    def test_expiry(self):
+        clock = FakeClock()
+        cache = TTLCache(max_entries=10, ttl_seconds=5, clock=clock)
+        cache.set("a", 1)
+        assert cache.get("a") == 1
+        clock.now = 6
+        assert cache.get("a") is None
+
+    def test_lru_eviction(self):
+        cache = TTLCache(max_entries=2, ttl_seconds=60)
+        cache.set("a", 1)
+        cache.set("b", 2)
+        cache.get("a")
+        cache.set("c", 3)
+        assert cache.get("a") == 1
+        assert cache.get("b") is None
+        assert cache.get("c") == 3
+
+
+class TestAuthenticatedUser:
+    """Tests for AuthenticatedUser principal."""
+
+    def test_admin_has_all_permissions(self):
+        principal = AuthenticatedUser(
+            id=1, username="a", email="a@example.com", display_name=None,
+            status="active", roles=frozenset({"admin"}), permissions=frozenset(),
+        )
+        assert principal.has_permission("project:delete")
+
+    def test_round_trip(self):
+        principal = AuthenticatedUser(
+            id=2, username="b", email="b@example.com", display_name="B",
+            status="active", roles=frozenset({"viewer"}),
+            permissions=frozenset({"project:read"}),
+        )
+        assert AuthenticatedUser.from_dict(principal.to_dict()) == principal
+        assert principal.has_permission("project:read")
+        assert not principal.has_permission("project:delete")
+
+
+@pytest.mark.asyncio
+async def test_principal_cached_and_invalidated(db_session):
+    """Principals are served from cache until the user is written."""
+    role = Role(name="cache-test-role")
+    role.permissions.append(Permission(code="cache:test", name="Cache test"))
+    user = User(
+        username="cacheuser",
+        email="cacheuser@example.com",
+        password_hash="x",
+        status="active",
+    )
+    user.roles.append(role)
+    db_session.add(user)
+    await db_session.commit()
+
+    cache = UserCache()
+    principal = await cache.get_principal(user.id, db_session)
+    assert principal.permissions == frozenset({"cache:test"})
+    assert cache.stats()["size"] == 1
+
+    # Second lookup is served locally
+    assert await cache.get_principal(user.id, db_session) is principal
+
+    # Committing a change to the user invalidates the global cache entry
+    await user_cache.get_principal(user.id, db_session)
+    user.status = "locked"
+    await db_session.commit()
+    refreshed = await user_cache.get_principal(user.id, db_session)
+    assert refreshed.status == "locked"
+
+    await db_session.delete(user)
+    await db_session.delete(role)
+    await db_session.commit()
+
+
+@pytest.fixture
+def fake_redis(monkeypatch):
+    """Redis shared by every ``UserCache``, as between workers."""
+    redis = {}
+
+    async def get(key):
+        return redis.get(key)
+
+    async def get_many(keys):
+        return [redis.get(key) for key in keys]
+
+    async def set(key, value, expire=None):
+        redis[key] = value
+
+    async def delete(key):
+        redis.pop(key, None)
+
+    monkeypatch.setattr(cache_service, "get", get)
+    monkeypatch.setattr(cache_service, "get_many", get_many)
+    monkeypatch.setattr(cache_service, "set", set)
+    monkeypatch.setattr(cache_service, "delete", delete)
+    return redis
+
+
+@pytest.mark.asyncio
+async def test_changes_reach_other_workers(db_session, fake_redis):
+    """Bulk updates are seen by every worker, not just the one that committed."""
+    user = User(username="bulkuser", email="bulkuser@example.com", password_hash="x", status="active")
+    db_session.add(user)
+    await db_session.commit()
+    user_id = user.id
+
+    # Another worker has the principal cached locally
+    worker = UserCache()
+    assert (await worker.get_principal(user_id, db_session)).is_active
+
+    # Bulk statements skip the flush; rolled back ones change nothing
+    await db_session.execute(update(User).where(User.id == user_id).values(status="locked"))
+    await db_session.rollback()
+    await asyncio.gather(*user_cache._pending_tasks)
+    assert (await worker.get_principal(user_id, db_session)).is_active
+
+    await db_session.execute(update(User).where(User.id == user_id).values(status="locked"))
+    await db_session.commit()
+    await asyncio.gather(*user_cache._pending_tasks)
+
+    principal = await worker.get_principal(user_id, db_session)
+    assert not principal.is_active
+    # Served from the worker's local level until the next change
+    assert await worker.get_principal(user_id, db_session) is principal
+
+    await db_session.delete(user)
+    await db_session.commit()
+
+
+@pytest.mark.asyncio
+async def test_login_keeps_cached_principals(client, db_session, fake_redis, monkeypatch):
+    """Recording a login is not a principal change; a status change is."""
+    monkeypatch.setattr(security.settings, "BCRYPT_ROUNDS", 4)
+    users = [
+        User(username=f"login{i}", email=f"login{i}@example.com",
+             password_hash=security.get_password_hash("s3cret"), status="active")
+        for i in range(2)
+    ]
+    db_session.add_all(users)
+    await db_session.commit()
+    user_ids = [user.id for user in users]
+
+    worker = UserCache()
+    cached = [await worker.get_principal(user_id, db_session) for user_id in user_ids]
+
+    response = await client.post(
+        "/api/v1/auth/login", json={"username": "login0", "password": "s3cret"},
+    )
+    assert response.status_code == 200
+    await asyncio.gather(*user_cache._pending_tasks)
+    await db_session.execute(update(User).values(last_login_at=None))
+    await db_session.commit()
+    await asyncio.gather(*user_cache._pending_tasks)
+    for user_id, principal in zip(user_ids, cached):
+        assert await worker.get_principal(user_id, db_session) is principal
+
+    # Only the changed user is reloaded
+    users[0].status = "locked"
+    await db_session.commit()
+    await asyncio.gather(*user_cache._pending_tasks)
+    assert (await worker.get_principal(user_ids[0], db_session)).status == "locked"
+    assert await worker.get_principal(user_ids[1], db_session) is cached[1]
+
+    for user in users:
+        await db_session.delete(user)
+    await db_session.commit()
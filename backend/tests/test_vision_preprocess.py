@@ -0,0 +1,192 @@
+"""
+Tests for vision preprocessing of architecture diagrams.
+"""
+import io
+import json
+
+import pytest
+import sys
+sys.path.insert(0, '.')
+
+from PIL import Image, ImageDraw
+
+from app.core.config import get_settings
+from app.services import vision_preprocess
+from app.services.asset_identifier import AssetIdentifier
+from app.services.parsers.image_parser import ImageParser
+from app.services.vision_preprocess import (
+    merge_architecture_results,
+    perceptual_hash,
+    prepare_vision_input,
+    vision_cache,
+)
+
+settings = get_settings()
+
+
+def diagram(width: int, height: int, fmt: str = "PNG", **save_args) -> bytes:
+    """Boxes joined by lines, like a small architecture diagram."""
+    image = Image.new("RGB", (width, height), "white")
+    draw = ImageDraw.Draw(image)
+    step = max(width, height) // 8
+    for i in range(0, width - step, step):
+        draw.rectangle([i + 10, height // 3, i + step - 10, height // 2], outline="black", width=4)
+        draw.line([i + step - 10, height * 5 // 12, i + step + 10, height * 5 // 12], fill="blue", width=4)
+    buffer = io.BytesIO()
+    image.save(buffer, format=fmt, **save_args)
+    return buffer.getvalue()
+
+
+def sent_size(image) -> tuple:
+    with Image.open(io.BytesIO(image.data)) as decoded:
+        return decoded.size
+
+
+def test_prepare_small_diagram():
+    """Small diagrams become one image at a patch-aligned size, never larger."""
+    prepared = prepare_vision_input(diagram(600, 400))
+
+    assert prepared.tiles == []
+    assert prepared.overview.size == sent_size(prepared.overview) == (588, 392)
+    assert prepared.overview.data_url().startswith(f"data:{prepared.overview.mime_type};base64,")
+
+
+def test_prepare_downsizes_photos():
+    """Photos of whiteboards are downsized and sent as JPEG."""
+    photo = Image.effect_noise((1400, 1000), 40).convert("RGB")
+    buffer = io.BytesIO()
+    photo.save(buffer, format="PNG")
+
+    prepared = prepare_vision_input(buffer.getvalue())
+
+    assert prepared.tiles == []
+    assert prepared.overview.mime_type == "image/jpeg"
+    assert len(prepared.overview.data) < len(buffer.getvalue()) / 4
+
+
+def test_prepare_large_diagram_tiles():
+    """Large diagrams get a downsized overview plus overlapping tiles."""
+    source = diagram(4200, 2100)
+    prepared = prepare_vision_input(source)
+
+    width, height = prepared.overview.size
+    assert width * height <= settings.VISION_MAX_PIXELS
+    assert width % settings.VISION_PATCH_SIZE == 0 and height % settings.VISION_PATCH_SIZE == 0
+    assert 1 < len(prepared.tiles) <= settings.VISION_MAX_TILES
+    boxes = [tile.box for tile in prepared.tiles]
+    assert boxes[0][0] == 0 and max(box[2] for box in boxes) == 4200
+    assert boxes[0][2] > boxes[1][0]  # neighbours overlap
+    for tile in prepared.tiles:
+        tile_width, tile_height = sent_size(tile)
+        assert tile_width * tile_height <= settings.VISION_MAX_PIXELS
+
+
+def test_perceptual_hash_survives_reencoding():
+    """Re-encoded copies of a diagram hash equal; other diagrams do not."""
+    png = prepare_vision_input(diagram(800, 600))
+    jpeg = prepare_vision_input(diagram(800, 600, "JPEG", quality=80))
+    other = prepare_vision_input(diagram(800, 500))
+    blank = perceptual_hash(Image.new("RGB", (800, 600), "white"))
+
+    assert png.phash == jpeg.phash
+    assert other.phash != png.phash
+    assert blank != png.phash
+
+
+def test_merge_architecture_results():
+    """Assets are merged by name and relations re-pointed to merged IDs."""
+    overview = {
+        "assets": [{"asset_id": "HW-001", "name": "Gateway", "category": "Hardware", "integrity": True}],
+        "relations": [],
+    }
+    tile = {
+        "assets": [
+            {"asset_id": "HW-001", "name": "T-Box", "category": "Hardware"},
+            {"asset_id": "HW-002", "name": "gateway ", "category": "Hardware",
+             "description": "Central gateway", "confidentiality": True},
+        ],
+        "relations": [
+            {"source": "HW-001", "target": "HW-002", "relation_type": "connects_to", "protocol": "CAN"},
+            {"source": "HW-001", "target": "HW-002", "relation_type": "connects_to", "protocol": "CAN"},
+        ],
+    }
+
+    merged = merge_architecture_results([overview, tile])
+
+    assert [(asset["asset_id"], asset["name"]) for asset in merged["assets"]] == [
+        ("HW-001", "Gateway"), ("HW-002", "T-Box"),
+    ]
+    gateway = merged["assets"][0]
+    assert gateway["integrity"] and gateway["confidentiality"]
+    assert gateway["description"] == "Central gateway"
+    assert merged["relations"] == [
+        {"source": "HW-002", "target": "HW-001", "relation_type": "connects_to", "protocol": "CAN"},
+    ]
+
+
+class FakeVisionClient:
+    def __init__(self):
+        self.calls = []
+
+    async def vision_completion(self, image_url, prompt, model, temperature):
+        self.calls.append((len(image_url), prompt))
+        index = len(self.calls)
+        return json.dumps({
+            "assets": [{"asset_id": "HW-001", "name": f"ECU {index}", "category": "硬件资产"}],
+            "relations": [],
+        })
+
+
+@pytest.mark.asyncio
+async def test_identify_from_architecture_cached(monkeypatch):
+    """Tiles are analysed in one pass; only the same diagram in the same project hits the cache."""
+    store = {}
+
+    async def cache_get(key):
+        return store.get(key)
+
+    async def cache_set(key, value, expire=None):
+        store[key] = value
+
+    monkeypatch.setattr(vision_preprocess.cache_service, "get", cache_get)
+    monkeypatch.setattr(vision_preprocess.cache_service, "set", cache_set)
+    vision_cache.clear_local()
+    client = FakeVisionClient()
+    identifier = AssetIdentifier(qwen_client=client)
+
+    result = await identifier.identify_from_architecture(diagram(4200, 2100), 1)
+
+    tiles = len(client.calls) - 1
+    assert tiles > 1
+    assert "第 1/" in client.calls[1][1]
+    assert [asset.name for asset in result["assets"]] == [f"ECU {i}" for i in range(1, tiles + 2)]
+    assert result["assets"][0].category == "Hardware"
+    assert len(store) == 1
+
+    vision_cache.clear_local()
+    again = await identifier.identify_from_architecture(diagram(4200, 2100), 1)
+    assert len(client.calls) == tiles + 1
+    assert again["assets"] == result["assets"]
+
+    # Another project, or a re-encoded (possibly revised) diagram with the
+    # same perceptual hash, is analysed again
+    await identifier.identify_from_architecture(diagram(4200, 2100), 2)
+    assert len(client.calls) == 2 * (tiles + 1)
+    await identifier.identify_from_architecture(diagram(4200, 2100, "JPEG", quality=90), 1)
+    assert len(client.calls) == 3 * (tiles + 1)
+    assert len(store) == 3
+
+
+@pytest.mark.asyncio
+async def test_image_parser_metadata(tmp_path, blob_store):
+    """The parser keeps a preview and hash without encoding the whole image."""
+    source = diagram(800, 600)
+    path = tmp_path / "arch.png"
+    path.write_bytes(source)
+
+    result = await ImageParser().parse(str(path))
+
+    assert result.metadata["width"] == 800
+    assert result.metadata["phash"] == prepare_vision_input(source).phash
+    assert result.metadata["base64_preview"] == ImageParser.image_to_base64(source)[:100] + "..."
+    assert result.images[0].load() == source
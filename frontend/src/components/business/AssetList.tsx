@@ -101,7 +101,15 @@ export default function AssetList({ projectId }: AssetListProps) {
   })
 
   const identifyMutation = useMutation({
-    mutationFn: () => assetService.identify(projectId),
+    mutationFn: async () => {
+      // Identification runs in the background; wait for it to finish
+      let task = await assetService.identify(projectId)
+      while (task.status === 'pending' || task.status === 'running') {
+        await new Promise((resolve) => setTimeout(resolve, 2000))
+        task = await assetService.getIdentification(projectId, task.task_id)
+      }
+      return task
+    },
     onSuccess: () => {
       queryClient.invalidateQueries({ queryKey: ['assets', projectId] })
     },
@@ -68,6 +68,29 @@ export interface AssetGraph {
   }>
 }
 
+export interface AssetIdentificationResult {
+  document_id: number
+  identified: number
+  created: number
+  skipped: number
+  errors: string[]
+  elapsed_seconds: number
+}
+
+export interface AssetIdentification {
+  created: number
+  documents: AssetIdentificationResult[]
+}
+
+export interface AssetIdentificationTask {
+  task_id: string
+  project_id: number
+  status: 'pending' | 'running' | 'completed' | 'failed'
+  document_ids: number[]
+  result?: AssetIdentification
+  error?: string
+}
+
 export interface PaginatedResponse<T> {
   items: T[]
   total: number
@@ -117,10 +140,15 @@ export const assetService = {
     return response.data
   },
 
-  identify: async (projectId: number, documentId?: number): Promise<{ task_id: string }> => {
+  identify: async (projectId: number, documentId?: number): Promise<AssetIdentificationTask> => {
     const response = await api.post(`/projects/${projectId}/assets/identify`, {}, {
       params: documentId ? { document_id: documentId } : undefined,
     })
     return response.data
   },
+
+  getIdentification: async (projectId: number, taskId: string): Promise<AssetIdentificationTask> => {
+    const response = await api.get(`/projects/${projectId}/assets/identify/${taskId}`)
+    return response.data
+  },
 }
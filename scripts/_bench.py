@@ -0,0 +1,75 @@
+"""Shared helpers for the benchmark scripts.
+
+Benchmarks run the FastAPI app in-process against a throwaway SQLite
+database, so they need the backend dev dependencies (aiosqlite) only.
+"""
+
+import os
+import statistics
+import sys
+import tempfile
+from pathlib import Path
+
+# Point the app at a throwaway SQLite database before any app import
+_DB_DIR = tempfile.mkdtemp(prefix="tara-bench-")
+os.environ.setdefault("DATABASE_URL", f"sqlite+aiosqlite:///{_DB_DIR}/bench.db")
+
+# Add backend to path
+sys.path.insert(0, str(Path(__file__).parent.parent / "backend"))
+
+from httpx import ASGITransport, AsyncClient  # noqa: E402
+
+from app.core.database import Base, async_session_factory, engine  # noqa: E402
+from app.core.security import create_access_token, get_password_hash  # noqa: E402
+from app.models.user import User  # noqa: E402
+
+
+async def create_tables():
+    """Create all database tables in the benchmark database."""
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+
+
+async def create_user(username: str = "bench", password: str = "benchpass") -> User:
+    """Create an active user and return it."""
+    async with async_session_factory() as session:
+        user = User(
+            username=username,
+            email=f"{username}@bench.local",
+            password_hash=get_password_hash(password),
+            display_name=username,
+            status="active",
+        )
+        session.add(user)
+        await session.commit()
+        await session.refresh(user)
+        return user
+
+
+def auth_headers(user: User) -> dict[str, str]:
+    """Bearer token headers for ``user``."""
+    token = create_access_token({"sub": str(user.id), "username": user.username})
+    return {"Authorization": f"Bearer {token}"}
+
+
+def client() -> AsyncClient:
+    """In-process HTTP client for the application."""
+    from main import app
+
+    return AsyncClient(transport=ASGITransport(app=app), base_url="http://bench")
+
+
+def summarize(samples_ms: list[float]) -> str:
+    """Format latency samples as p50/p95/p99/max."""
+    if not samples_ms:
+        return "no samples"
+    ordered = sorted(samples_ms)
+
+    def pct(p: float) -> float:
+        return ordered[min(int(len(ordered) * p), len(ordered) - 1)]
+
+    return (
+        f"n={len(ordered)} mean={statistics.fmean(ordered):.2f}ms "
+        f"p50={pct(0.50):.2f}ms p95={pct(0.95):.2f}ms "
+        f"p99={pct(0.99):.2f}ms max={ordered[-1]:.2f}ms"
+    )
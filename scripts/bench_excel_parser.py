@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+"""Excel parser benchmark.
+
+Generates a workbook with one large sheet and reports parse time and
+peak traced memory. ``--legacy`` loads the workbook the previous way
+(full cell model, openpyxl's default mode) for comparison.
+
+Usage:
+    python scripts/bench_excel_parser.py [--rows 50000] [--cols 12] [--legacy]
+"""
+
+import argparse
+import asyncio
+import os
+import tempfile
+import time
+import tracemalloc
+
+import _bench  # noqa: F401  (adds backend to the path)
+from openpyxl import Workbook, load_workbook
+
+from app.services.parsers.excel_parser import ExcelParser
+
+
+def make_workbook(path: str, rows: int, cols: int):
+    """Write a workbook of ``rows`` x ``cols`` with openpyxl's write-only mode."""
+    wb = Workbook(write_only=True)
+    ws = wb.create_sheet("资产列表")
+    ws.append([f"列{c}" for c in range(cols)])
+    for r in range(rows):
+        ws.append([f"AST-{r:06d}" if c == 0 else r * c for c in range(cols)])
+    wb.save(path)
+
+
+def legacy_parse(path: str) -> int:
+    """Previous parser: load every cell, then walk the sheets."""
+    wb = load_workbook(path, data_only=True)
+    count = 0
+    for ws in wb.worksheets:
+        for row in ws.iter_rows(values_only=True):
+            row_data = ["" if cell is None else str(cell).strip() for cell in row]
+            if any(row_data):
+                count += 1
+    wb.close()
+    return count
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=50000, help="data rows")
+    parser.add_argument("--cols", type=int, default=12, help="columns per row")
+    parser.add_argument("--legacy", action="store_true", help="load the full workbook model")
+    args = parser.parse_args()
+
+    path = os.path.join(tempfile.mkdtemp(prefix="tara-bench-"), "bench.xlsx")
+    make_workbook(path, args.rows, args.cols)
+    print(f"workbook: {args.rows} rows x {args.cols} cols, {os.path.getsize(path) / 1024:.0f} KiB")
+
+    tracemalloc.start()
+    start = time.perf_counter()
+    if args.legacy:
+        rows = legacy_parse(path)
+    else:
+        result = await ExcelParser().parse(path)
+        rows = sum(result.metadata["row_counts"].values())
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    mode = "legacy" if args.legacy else "read-only"
+    print(f"{mode}: {rows} rows in {elapsed:.2f}s, peak {peak / 1024 / 1024:.1f} MiB")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
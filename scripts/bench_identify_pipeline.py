@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""Document-to-assets pipeline benchmark.
+
+Parses a generated PDF specification (table detection on every page, as
+for communication matrices) and identifies assets with a simulated model
+that takes ``--ai-seconds`` per call, then reports end-to-end time and
+the per-stage metrics. ``--legacy`` parses the whole document before the
+first identification call, as before, for comparison.
+
+Usage:
+    python scripts/bench_identify_pipeline.py [--pages 60] [--ai-seconds 1.0] [--legacy]
+"""
+
+import argparse
+import asyncio
+import os
+import re
+import time
+import uuid
+
+import _bench
+from bench_pdf_parser import make_document
+
+from app.core.database import async_session_factory
+from app.models.document import Document
+from app.models.project import Project
+from app.schemas.asset import AssetCreate
+from app.services.asset_pipeline import AssetPipeline
+from app.services.parsers import pdf_parser
+from app.services.parsers.base import BaseParser
+from app.services.parsers.pdf_parser import PDFParser
+
+
+class SimulatedIdentifier:
+    """Stands in for the model: waits, then reports one asset per page."""
+
+    def __init__(self, seconds: float):
+        self.seconds = seconds
+
+    async def identify_from_text(self, text: str) -> list[AssetCreate]:
+        await asyncio.sleep(self.seconds)
+        pages = sorted(set(re.findall(r"^(\d+)\.\d+ ", text, re.MULTILINE)))
+        return [AssetCreate(asset_id=f"AST-{page}", name=f"Module {page}", category="Software") for page in pages]
+
+    async def close(self):
+        pass
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--pages", type=int, default=60, help="pages in the document")
+    parser.add_argument("--ai-seconds", type=float, default=1.0, help="simulated time per identification call")
+    parser.add_argument("--legacy", action="store_true", help="parse the whole document before identifying")
+    args = parser.parse_args()
+
+    await _bench.create_tables()
+    user = await _bench.create_user()
+    storage_path = f"{uuid.uuid4().hex}.pdf"
+    os.makedirs("/tmp/tara-documents", exist_ok=True)
+    make_document(f"/tmp/tara-documents/{storage_path}", args.pages, table_every=20)
+    pdf_parser.settings.PDF_TABLE_MODE = "full"
+    if args.legacy:
+        # One fragment: the whole document, parsed before chunking starts
+        PDFParser.iter_parse = BaseParser.iter_parse
+
+    async with async_session_factory() as db:
+        project = Project(name="Bench", owner_id=user.id, status="draft")
+        db.add(project)
+        await db.flush()
+        document = Document(
+            project_id=project.id, name="spec.pdf", original_name="spec.pdf", file_type="pdf",
+            storage_path=storage_path, parse_status="pending", uploaded_by=user.id,
+        )
+        db.add(document)
+        await db.commit()
+
+        start = time.perf_counter()
+        result = await AssetPipeline(db, SimulatedIdentifier(args.ai_seconds)).run(project.id, document.id)
+        elapsed = time.perf_counter() - start
+    os.remove(f"/tmp/tara-documents/{storage_path}")
+
+    stages = {stage["name"]: stage for stage in result["stages"]}
+    mode = "legacy" if args.legacy else "pipeline"
+    print(f"{mode}: {result['created']} assets in {elapsed:.2f}s "
+          f"(parse busy {stages['parse']['busy_seconds']:.2f}s, identify busy "
+          f"{stages['identify']['busy_seconds'] / stages['identify']['workers']:.2f}s per worker)")
+    for stage in result["stages"]:
+        print(f"  {stage['name']:<8} processed={stage['processed']:<4} elapsed={stage['elapsed_seconds']:.2f}s "
+              f"throughput={stage['throughput']:.2f}/s max_queue={stage['max_queue_depth']} "
+              f"mean_queue={stage['mean_queue_depth']:.2f}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,144 @@
+#!/usr/bin/env python3
+"""List endpoint benchmark suite.
+
+Seeds one large project and times every list endpoint at its largest page
+size. ``--baseline`` runs the app with FastAPI's stock behaviour (stdlib
+JSON encoding and response-model re-validation of every response) for
+comparison; the threat list's column fast path is used in both modes.
+
+Usage:
+    python scripts/bench_list_endpoints.py [--rows 1000] [--requests 50] [--baseline]
+"""
+
+import argparse
+import asyncio
+import logging
+
+parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+parser.add_argument("--rows", type=int, default=1000, help="rows per seeded table")
+parser.add_argument("--requests", type=int, default=50, help="timed requests per endpoint")
+parser.add_argument("--baseline", action="store_true", help="stock FastAPI encoding and validation")
+args = parser.parse_args()
+
+import time  # noqa: E402
+
+import _bench  # noqa: E402
+
+if args.baseline:
+    # Undo the app defaults before the application modules are imported
+    import fastapi
+    from fastapi.routing import APIRoute
+
+    import app.core.responses as responses
+
+    class StockFastAPI(fastapi.FastAPI):
+        def __init__(self, **kwargs):
+            kwargs.pop("default_response_class", None)
+            super().__init__(**kwargs)
+
+    fastapi.FastAPI = StockFastAPI
+    responses.TrustedRoute = APIRoute
+
+from app.core.database import async_session_factory  # noqa: E402
+from app.models.asset import Asset  # noqa: E402
+from app.models.document import Document  # noqa: E402
+from app.models.project import Project, ProjectMember, ProjectVersion  # noqa: E402
+from app.models.report import Report  # noqa: E402
+from app.models.user import User  # noqa: E402
+from app.schemas.threat import ThreatBulkItem  # noqa: E402
+from app.services.threat_service import ThreatService  # noqa: E402
+
+
+async def seed(owner_id: int) -> int:
+    """Create the benchmark project and return its id."""
+    n = args.rows
+    async with async_session_factory() as session:
+        session.add_all([
+            Project(name=f"Project {i}", owner_id=owner_id, status="draft") for i in range(100)
+        ])
+        project = Project(name="Bench", owner_id=owner_id, status="draft")
+        session.add(project)
+        await session.flush()
+        users = [
+            User(username=f"member{i}", email=f"member{i}@bench.local", password_hash="x", status="active")
+            for i in range(100)
+        ]
+        assets = [
+            Asset(project_id=project.id, asset_id=f"AST-{i:05d}", name=f"ECU {i}", category="Hardware",
+                  description="Electronic control unit on the powertrain CAN bus")
+            for i in range(n)
+        ]
+        session.add_all(users + assets)
+        await session.flush()
+        session.add_all([
+            ProjectMember(project_id=project.id, user_id=user.id, role="editor") for user in users
+        ])
+        session.add_all([
+            ProjectVersion(project_id=project.id, version=f"1.{i}", status="draft", created_by=owner_id)
+            for i in range(100)
+        ])
+        session.add_all([
+            Document(project_id=project.id, name=f"doc-{i}.pdf", original_name=f"Spec {i}.pdf",
+                     file_type="pdf", file_size=1 << 20, storage_path=f"documents/doc-{i}.pdf",
+                     uploaded_by=owner_id)
+            for i in range(n)
+        ])
+        session.add_all([
+            Report(project_id=project.id, title=f"TARA report {i}", generated_by=owner_id)
+            for i in range(n)
+        ])
+        await session.commit()
+
+        await ThreatService(session).bulk_create(project.id, [
+            ThreatBulkItem(
+                asset_id=assets[i % n].id,
+                threat_id=f"T-{i:05d}",
+                security_attribute="Integrity",
+                stride_type="T",
+                threat_description=f"Tampering with message {i} on the vehicle bus",
+                damage_scenario=f"Damage scenario {i % 50}",
+                attack_feasibility_value=i % 4,
+                impact_level_value=(i // 4) % 4,
+            )
+            for i in range(n)
+        ])
+        return project.id
+
+
+async def main():
+    # Request logging would dominate the timings
+    logging.disable(logging.INFO)
+
+    await _bench.create_tables()
+    user = await _bench.create_user()
+    headers = _bench.auth_headers(user)
+    project_id = await seed(user.id)
+
+    base = f"/api/v1/projects/{project_id}"
+    endpoints = {
+        "projects": ("/api/v1/projects", {"page_size": 100}),
+        "versions": (f"{base}/versions", {}),
+        "members": (f"{base}/members", {}),
+        "documents": (f"{base}/documents", {"page_size": 100}),
+        "assets": (f"{base}/assets", {"page_size": 100}),
+        "threats": (f"{base}/threats", {"page_size": 100}),
+        "attack-trees": (f"{base}/attack-trees", {}),
+        "reports": (f"{base}/reports", {"page_size": 100}),
+    }
+
+    print("mode:", "baseline (stock FastAPI)" if args.baseline else "orjson + trusted responses")
+    async with _bench.client() as client:
+        for label, (url, params) in endpoints.items():
+            for _ in range(5):
+                response = await client.get(url, params=params, headers=headers)
+                assert response.status_code == 200 and response.json()["code"] == 0, response.text
+            samples: list[float] = []
+            for _ in range(args.requests):
+                start = time.perf_counter()
+                await client.get(url, params=params, headers=headers)
+                samples.append((time.perf_counter() - start) * 1000)
+            print(f"{label:13} {len(response.content) // 1024:>5}KiB {_bench.summarize(samples)}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
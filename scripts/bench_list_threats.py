@@ -0,0 +1,159 @@
+#!/usr/bin/env python3
+"""Threat list benchmark.
+
+Seeds a project with 10k threats (two mitigations each) and walks every
+cursor page of ``GET /projects/{id}/threats``, comparing the column/orjson
+fast path with the previous ORM path (``selectinload`` + per-row
+``ThreatResponse`` + response-model validation), which is mounted on a
+side route for the run. Reports request latency and the peak traced
+allocation of one page.
+
+Usage:
+    python scripts/bench_list_threats.py [--threats 10000] [--page-size 100]
+"""
+
+import argparse
+import asyncio
+import logging
+import time
+import tracemalloc
+from typing import Optional
+
+import _bench
+from sqlalchemy import select
+from sqlalchemy.orm import selectinload
+
+from app.api.v1.deps import CurrentUser, DbSession
+from app.api.v1.pagination import paginate_keyset
+from app.core.database import async_session_factory
+from app.models.asset import Asset
+from app.models.project import Project
+from app.models.threat import ThreatScenario
+from app.schemas.common import PaginatedResponse, ResponseModel
+from app.schemas.threat import MitigationCreate, MitigationResponse, ThreatBulkItem, ThreatResponse
+from app.services.threat_service import ThreatService
+
+parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+parser.add_argument("--threats", type=int, default=10000, help="threats in the project")
+parser.add_argument("--page-size", type=int, default=100, help="rows per page")
+args = parser.parse_args()
+
+
+async def legacy_list_threats(
+    project_id: int,
+    current_user: CurrentUser,
+    db: DbSession,
+    page_size: int = 20,
+    cursor: Optional[str] = None,
+):
+    """The ORM implementation the fast path replaced."""
+    query = (
+        select(ThreatScenario)
+        .options(selectinload(ThreatScenario.asset), selectinload(ThreatScenario.mitigations))
+        .where(ThreatScenario.project_id == project_id)
+    )
+    threats, next_cursor = await paginate_keyset(
+        db, query, [ThreatScenario.threat_id, ThreatScenario.id], cursor, page_size
+    )
+    items = [
+        ThreatResponse(
+            **{
+                name: getattr(t, name)
+                for name in ThreatResponse.model_fields
+                if name not in ("asset_name", "mitigations")
+            },
+            asset_name=t.asset.name if t.asset else None,
+            mitigations=[MitigationResponse.model_validate(m) for m in t.mitigations],
+        )
+        for t in threats
+    ]
+    return ResponseModel(
+        data=PaginatedResponse(items=items, total=None, page=1, page_size=page_size, next_cursor=next_cursor)
+    )
+
+
+async def seed(owner_id: int) -> int:
+    async with async_session_factory() as session:
+        project = Project(name="Bench", owner_id=owner_id, status="draft")
+        session.add(project)
+        await session.flush()
+        assets = [
+            Asset(project_id=project.id, asset_id=f"AST-{i:03d}", name=f"ECU {i}", category="Hardware")
+            for i in range(50)
+        ]
+        session.add_all(assets)
+        await session.commit()
+        items = [
+            ThreatBulkItem(
+                asset_id=assets[i % len(assets)].id,
+                threat_id=f"T-{i:05d}",
+                security_attribute="Integrity",
+                stride_type="T",
+                threat_description=f"Tampering with message {i} on the vehicle bus",
+                damage_scenario="Unintended vehicle behaviour",
+                attack_feasibility_value=i % 4,
+                impact_level_value=(i // 4) % 4,
+                mitigations=[
+                    MitigationCreate(security_goal="Message authentication", security_requirement="SecOC"),
+                    MitigationCreate(security_goal="Intrusion detection"),
+                ],
+            )
+            for i in range(args.threats)
+        ]
+        await ThreatService(session).bulk_create(project.id, items)
+        return project.id
+
+
+async def walk(client, url: str, headers: dict) -> tuple[list[float], int]:
+    """Fetch every cursor page; returns latencies and the row count."""
+    samples: list[float] = []
+    rows = 0
+    cursor = ""
+    while cursor is not None:
+        start = time.perf_counter()
+        response = await client.get(url, params={"cursor": cursor, "page_size": args.page_size}, headers=headers)
+        samples.append((time.perf_counter() - start) * 1000)
+        data = response.json()["data"]
+        rows += len(data["items"])
+        cursor = data["next_cursor"]
+    return samples, rows
+
+
+async def page_peak_kib(client, url: str, headers: dict) -> float:
+    tracemalloc.start()
+    await client.get(url, params={"cursor": "", "page_size": args.page_size}, headers=headers)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return peak / 1024
+
+
+async def main():
+    from main import app
+
+    # Request logging would dominate the per-page timings
+    logging.disable(logging.INFO)
+    app.add_api_route(
+        "/bench/projects/{project_id}/threats",
+        legacy_list_threats,
+        response_model=ResponseModel[PaginatedResponse[ThreatResponse]],
+    )
+
+    await _bench.create_tables()
+    user = await _bench.create_user()
+    headers = _bench.auth_headers(user)
+    project_id = await seed(user.id)
+
+    routes = {
+        "orm (previous)": f"/bench/projects/{project_id}/threats",
+        "fast path": f"/api/v1/projects/{project_id}/threats",
+    }
+    async with _bench.client() as client:
+        for label, url in routes.items():
+            await walk(client, url, headers)  # warm up
+            samples, rows = await walk(client, url, headers)
+            peak = await page_peak_kib(client, url, headers)
+            print(f"{label:15} rows={rows} {_bench.summarize(samples)} page peak={peak:.0f}KiB")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""Login storm benchmark.
+
+Fires a burst of concurrent logins while probing ``/health`` and reports
+login throughput plus probe latency. With bcrypt on the password hashing
+pool the probe latency should stay flat during the storm; ``--inline``
+runs bcrypt on the event loop (the previous behaviour) for comparison.
+
+Usage:
+    python scripts/bench_login.py [--logins 50] [--rounds 12] [--inline]
+"""
+
+import argparse
+import asyncio
+import os
+import time
+
+# Parse early so BCRYPT_ROUNDS is set before settings are loaded
+parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+parser.add_argument("--logins", type=int, default=50, help="concurrent logins")
+parser.add_argument("--rounds", type=int, default=12, help="bcrypt cost factor")
+parser.add_argument("--inline", action="store_true", help="hash on the event loop")
+args = parser.parse_args()
+os.environ["BCRYPT_ROUNDS"] = str(args.rounds)
+
+import _bench  # noqa: E402
+from app.api.v1.endpoints import auth  # noqa: E402
+from app.core.security import password_hasher, verify_password  # noqa: E402
+
+
+async def probe(client, stop: asyncio.Event, samples: list[float]):
+    """Hit /health every 10ms and record latencies."""
+    while not stop.is_set():
+        start = time.perf_counter()
+        await client.get("/health")
+        samples.append((time.perf_counter() - start) * 1000)
+        await asyncio.sleep(0.01)
+
+
+async def main():
+    await _bench.create_tables()
+    await _bench.create_user("bench", "benchpass")
+
+    if args.inline:
+        async def inline_verify(plain: str, hashed: str) -> bool:
+            return verify_password(plain, hashed)
+
+        auth.verify_password_async = inline_verify
+
+    async with _bench.client() as client:
+        # Idle baseline
+        idle: list[float] = []
+        stop = asyncio.Event()
+        task = asyncio.create_task(probe(client, stop, idle))
+        await asyncio.sleep(1.0)
+        stop.set()
+        await task
+
+        # Login storm
+        storm: list[float] = []
+        stop = asyncio.Event()
+        task = asyncio.create_task(probe(client, stop, storm))
+        start = time.perf_counter()
+        responses = await asyncio.gather(*[
+            client.post("/api/v1/auth/login", json={"username": "bench", "password": "benchpass"})
+            for _ in range(args.logins)
+        ])
+        elapsed = time.perf_counter() - start
+        stop.set()
+        await task
+
+    ok = sum(1 for r in responses if r.status_code == 200)
+    mode = "inline (event loop)" if args.inline else "password hashing pool"
+    print(f"bcrypt rounds={args.rounds}, mode={mode}")
+    print(f"logins: {ok}/{args.logins} ok in {elapsed:.2f}s ({args.logins / elapsed:.1f}/s)")
+    print(f"/health idle:  {_bench.summarize(idle)}")
+    print(f"/health storm: {_bench.summarize(storm)}")
+    if not args.inline:
+        print(f"pool: {password_hasher.stats()}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+"""PDF parser benchmark.
+
+Generates a text-heavy specification (running header rules on every
+page, a ruled table every ``--table-every`` pages) and reports parse
+time, tables found and pages scanned for tables. ``--legacy`` runs
+table detection on every page ("full" mode), as before, for comparison.
+
+Usage:
+    python scripts/bench_pdf_parser.py [--pages 200] [--table-every 20] [--legacy]
+"""
+
+import argparse
+import asyncio
+import os
+import tempfile
+import time
+
+import _bench  # noqa: F401  (adds backend to the path)
+import fitz
+
+from app.services.parsers import pdf_parser
+from app.services.parsers.pdf_parser import PDFParser
+
+
+def make_document(path: str, pages: int, table_every: int):
+    """Write ``pages`` pages of text, with a ruled table every ``table_every`` pages."""
+    doc = fitz.open()
+    for number in range(pages):
+        page = doc.new_page()
+        page.draw_line((50, 40), (550, 40))
+        page.insert_text((50, 32), f"Gateway specification - page {number + 1}")
+        if table_every and number % table_every == table_every - 1:
+            for row in range(12):
+                for col in range(5):
+                    rect = fitz.Rect(50 + col * 100, 80 + row * 22, 150 + col * 100, 102 + row * 22)
+                    page.draw_rect(rect)
+                    page.insert_text((54 + col * 100, 96 + row * 22), f"0x{row:02X}-{col}")
+            continue
+        for line in range(45):
+            page.insert_text(
+                (50, 70 + line * 16),
+                f"{number}.{line} The gateway shall authenticate diagnostic requests and log events.",
+            )
+    doc.save(path)
+    doc.close()
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--pages", type=int, default=200, help="pages in the document")
+    parser.add_argument("--table-every", type=int, default=20, help="one table page per this many pages")
+    parser.add_argument("--legacy", action="store_true", help="run table detection on every page")
+    args = parser.parse_args()
+
+    path = os.path.join(tempfile.mkdtemp(prefix="tara-bench-"), "bench.pdf")
+    make_document(path, args.pages, args.table_every)
+    print(f"document: {args.pages} pages, {os.path.getsize(path) / 1024:.0f} KiB")
+
+    mode = "full" if args.legacy else "fast"
+    pdf_parser.settings.PDF_TABLE_MODE = mode
+    start = time.perf_counter()
+    result = await PDFParser().parse(path)
+    elapsed = time.perf_counter() - start
+
+    scanned = result.metadata["table_pages_scanned"]
+    print(f"{mode}: {len(result.tables)} tables, {scanned} pages scanned in {elapsed:.2f}s")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""Search backend benchmark.
+
+Indexes a project with many document passages and threats into the local
+SQLite FTS5 backend, with other projects alongside, and reports indexing
+throughput and query latency for Chinese and mixed queries. Text is drawn
+from a Zipf-distributed vocabulary of domain terms and random filler
+words; ``--narrow`` uses the domain terms only, so nearly every passage
+matches every query (worst case for ranking).
+
+Usage:
+    python scripts/bench_search.py [--documents 3000] [--passages 10] [--threats 5000] [--narrow]
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import tempfile
+import time
+
+import _bench  # noqa: F401  (adds backend to the path)
+
+from app.clients.search import SQLiteSearchBackend
+
+DOMAIN_WORDS = [
+    "网关", "诊断", "请求", "认证", "车载", "总线", "刷写", "固件", "密钥", "证书", "远程", "解锁",
+    "拒绝服务", "重放", "篡改", "日志", "安全", "事件", "CAN", "FD", "UDS", "OTA", "T-Box", "ECU",
+]
+QUERIES = ["诊断请求", "固件 刷写", "CAN", "远程解锁", "密钥 证书 OTA", "拒绝服务"]
+
+
+def vocabulary(rng: random.Random, narrow: bool):
+    """Words and Zipf weights; domain terms are spread over the frequency ranks."""
+    if narrow:
+        return DOMAIN_WORDS, None
+    filler = ["".join(chr(rng.randint(0x4E00, 0x9FA5)) for _ in range(rng.randint(2, 3))) for _ in range(5000)]
+    for rank, word in zip(range(20, 5000, 200), DOMAIN_WORDS):
+        filler[rank] = word
+    return filler, [1 / (rank + 1) for rank in range(len(filler))]
+
+
+def sentence(rng: random.Random, words, weights, count: int) -> str:
+    return "".join(rng.choices(words, weights, k=count)) + "。"
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--documents", type=int, default=3000, help="documents in the searched project")
+    parser.add_argument("--passages", type=int, default=10, help="passages per document")
+    parser.add_argument("--threats", type=int, default=5000, help="threats in the searched project")
+    parser.add_argument("--projects", type=int, default=3, help="projects of the same size")
+    parser.add_argument("--narrow", action="store_true", help="domain terms only")
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    words, weights = vocabulary(rng, args.narrow)
+    backend = SQLiteSearchBackend(os.path.join(tempfile.mkdtemp(prefix="tara-bench-"), "search.db"))
+    await backend.ensure_schema()
+
+    start = time.perf_counter()
+    entries = 0
+    for project_id in range(1, args.projects + 1):
+        rows = [
+            {
+                "key": f"document:{project_id}-{d}:{p}:0", "project_id": project_id, "kind": "document",
+                "entity_id": project_id * 100000 + d, "position": p, "title": f"spec-{d}.pdf",
+                "body": "\n".join(sentence(rng, words, weights, 12) for _ in range(8)),
+            }
+            for d in range(args.documents)
+            for p in range(args.passages)
+        ]
+        rows += [
+            {
+                "key": f"threat:{project_id}-{t}", "project_id": project_id, "kind": "threat",
+                "entity_id": project_id * 100000 + t, "position": 0, "title": f"T-{t:04d}",
+                "body": sentence(rng, words, weights, 10) + "\n" + sentence(rng, words, weights, 8),
+            }
+            for t in range(args.threats)
+        ]
+        for offset in range(0, len(rows), 5000):
+            await backend.upsert(rows[offset:offset + 5000])
+        entries += len(rows)
+    elapsed = time.perf_counter() - start
+    print(f"indexed {entries} entries in {elapsed:.1f}s ({entries / elapsed:.0f}/s)")
+
+    for query in QUERIES:
+        await backend.search(1, query)  # warm up
+        timings = []
+        for _ in range(10):
+            start = time.perf_counter()
+            result = await backend.search(1, query, limit=20)
+            timings.append(time.perf_counter() - start)
+        timings.sort()
+        print(f"{query!r}: {result['total']} hits, median {timings[5] * 1000:.1f} ms, max {timings[-1] * 1000:.1f} ms")
+
+    await backend.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""Word parser benchmark.
+
+Generates a specification-like document (headings, paragraphs and tables
+with merged cells) and reports parse time and peak traced memory.
+``--legacy`` parses it the previous way, through python-docx's object
+model with ``cell.text`` per cell, for comparison.
+
+Usage:
+    python scripts/bench_word_parser.py [--sections 100] [--rows 30] [--legacy]
+"""
+
+import argparse
+import asyncio
+import os
+import tempfile
+import time
+import tracemalloc
+
+import _bench  # noqa: F401  (adds backend to the path)
+from docx import Document
+
+from app.services.parsers.word_parser import WordParser
+
+
+def make_document(path: str, sections: int, rows: int):
+    """Write ``sections`` headed sections, each with text and a merged-cell table."""
+    doc = Document()
+    for s in range(sections):
+        doc.add_heading(f"{s + 1} 功能 {s}", level=1)
+        for p in range(5):
+            doc.add_paragraph(f"第 {s}.{p} 段：网关应对诊断请求进行认证，并记录安全事件。" * 3)
+        doc.add_heading(f"{s + 1}.1 资产", level=2)
+        table = doc.add_table(rows=rows, cols=6)
+        for r in range(rows):
+            for c in range(6):
+                table.cell(r, c).text = f"R{r}C{c}"
+        # Category column merged in groups of five rows
+        for r in range(0, rows - 4, 5):
+            table.cell(r, 0).merge(table.cell(r + 4, 0))
+    doc.save(path)
+
+
+def legacy_parse(path: str) -> int:
+    """Previous parser: paragraphs, then tables through ``cell.text``."""
+    doc = Document(path)
+    blocks = [para.text.strip() for para in doc.paragraphs if para.text.strip()]
+    for table in doc.tables:
+        blocks.append([[cell.text.strip() for cell in row.cells] for row in table.rows])
+    return len(blocks)
+
+
+async def parse(path: str, legacy: bool) -> int:
+    if legacy:
+        return legacy_parse(path)
+    result = await WordParser().parse(path)
+    return len(result.blocks)
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sections", type=int, default=100, help="top-level sections")
+    parser.add_argument("--rows", type=int, default=30, help="table rows per section")
+    parser.add_argument("--legacy", action="store_true", help="parse through python-docx")
+    args = parser.parse_args()
+
+    path = os.path.join(tempfile.mkdtemp(prefix="tara-bench-"), "bench.docx")
+    make_document(path, args.sections, args.rows)
+    print(f"document: {args.sections} sections, {os.path.getsize(path) / 1024:.0f} KiB")
+
+    start = time.perf_counter()
+    blocks = await parse(path, args.legacy)
+    elapsed = time.perf_counter() - start
+
+    # Second run under tracemalloc, which slows parsing down
+    tracemalloc.start()
+    await parse(path, args.legacy)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    mode = "legacy" if args.legacy else "streaming"
+    print(f"{mode}: {blocks} blocks in {elapsed:.2f}s, peak {peak / 1024 / 1024:.1f} MiB")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())